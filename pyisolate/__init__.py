@@ -64,7 +64,7 @@ from .errors import (
     TimeoutError,
     WallTimeExceeded,
 )
-from .logging import setup_structured_logging  # noqa: F401
+from .logging import setup_batched_logging, setup_structured_logging  # noqa: F401
 from .telemetry import DenialEvent  # noqa: F401
 
 try:
@@ -111,23 +111,31 @@ from .supervisor import (  # noqa: F401
     BackendMode,
     Sandbox,
     Supervisor,
+    apply_policy,
+    close_many,
+    events,
     list_active,
     reload_policy,
     set_policy_token,
     shutdown,
     spawn,
+    spawn_many,
 )
 
 __all__ = [
     "spawn",
+    "spawn_many",
+    "close_many",
     "BackendMode",
     "DEFAULT_BACKEND",
     "SUPPORTED_BACKENDS",
     "IMPLEMENTED_BACKENDS",
     "list_active",
+    "events",
     "Sandbox",
     "Supervisor",
     "reload_policy",
+    "apply_policy",
     "shutdown",
     "SandboxError",
     "PolicyError",
@@ -179,6 +187,7 @@ __all__ = [
     "refresh_remote",
     "resolve_policy",
     "setup_structured_logging",
+    "setup_batched_logging",
     "DenialEvent",
     "no_gil_readiness_report",
     "warn_if_unsafe_native_extensions",
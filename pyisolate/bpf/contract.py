@@ -12,7 +12,9 @@ must write the map with:
 
 This module is the single source of truth for those constants and their byte
 encoding, shared by the manager (which writes the map) and the tests (which
-assert the encoding matches the kernel struct).
+assert the encoding matches the kernel struct). It also holds the layout of the
+breach events ``resource_guard.bpf.c`` writes to its ring buffer, which the
+resource watchdog decodes.
 
 Granularity note: ``deny_mask`` is a coarse per-cgroup, per-capability-class
 switch.  It can express "deny all filesystem" or "deny all network", but not
@@ -25,6 +27,7 @@ denial when the policy grants nothing in a class.
 from __future__ import annotations
 
 import os
+import struct
 
 from ..policy.model import RuntimePolicy
 
@@ -38,6 +41,16 @@ DENY_RISKY = 1 << 3
 #: Name of the pinned map the LSM program consults (defined in the .bpf.c).
 SANDBOX_POLICY_MAP = "sandbox_policy"
 
+# Resource kinds in breach events. These MUST match the ``PYI_RESOURCE_*``
+# defines in resource_guard.bpf.c.
+RESOURCE_CPU = 1
+RESOURCE_RSS = 2
+RESOURCE_NET = 3
+
+#: ``struct resource_event``: cgroup_id, pid_tgid, observed, quota (u64) and
+#: resource, breached (u32), little-endian. CPU is observed in nanoseconds.
+RESOURCE_EVENT = struct.Struct("<QQQQII")
+
 
 def _policy_allows_any_fs(policy: object) -> bool:
     if policy is None:
@@ -87,17 +100,26 @@ def _byte_tokens(data: bytes) -> list[str]:
     return [f"0x{byte:02x}" for byte in data]
 
 
+def sandbox_policy_key(cgroup_id: int) -> bytes:
+    """Return a cgroup id as the little-endian u64 map key."""
+    return int(cgroup_id).to_bytes(8, "little")
+
+
+def sandbox_policy_value(deny_mask: int, audit_only: bool = False) -> bytes:
+    """Return ``struct pyisolate_policy`` (two little-endian u32s)."""
+    return int(deny_mask).to_bytes(4, "little") + (1 if audit_only else 0).to_bytes(
+        4, "little"
+    )
+
+
 def encode_sandbox_policy_key(cgroup_id: int) -> list[str]:
     """Encode a cgroup id as the little-endian u64 map key."""
-    return _byte_tokens(int(cgroup_id).to_bytes(8, "little"))
+    return _byte_tokens(sandbox_policy_key(cgroup_id))
 
 
 def encode_sandbox_policy_value(deny_mask: int, audit_only: bool = False) -> list[str]:
     """Encode ``struct pyisolate_policy`` (two little-endian u32s)."""
-    return _byte_tokens(
-        int(deny_mask).to_bytes(4, "little")
-        + (1 if audit_only else 0).to_bytes(4, "little")
-    )
+    return _byte_tokens(sandbox_policy_value(deny_mask, audit_only))
 
 
 def cgroup_id_for_path(path: "str | os.PathLike[str] | None") -> int | None:
@@ -112,3 +134,18 @@ def cgroup_id_for_path(path: "str | os.PathLike[str] | None") -> int | None:
         return os.stat(path).st_ino
     except OSError:
         return None
+
+
+def decode_resource_event(raw: bytes | bytearray | memoryview) -> dict[str, int]:
+    """Decode one ring-buffer record into a ``struct resource_event`` dict."""
+    cgroup_id, pid_tgid, observed, quota, resource, breached = RESOURCE_EVENT.unpack(
+        raw
+    )
+    return {
+        "cgroup_id": cgroup_id,
+        "pid_tgid": pid_tgid,
+        "observed": observed,
+        "quota": quota,
+        "resource": resource,
+        "breached": breached,
+    }
@@ -4,28 +4,36 @@ This module compiles a very small eBPF program and attempts to attach it via
 ``bpftool``.  The build is intentionally simple and serves purely as a proof of
 concept used by the tests.  ``bpftool`` and ``llvm-objdump`` may not be
 available on the test system; any missing executables are therefore ignored.
+
+Map entries are written with the ``bpf(2)`` syscall through
+:class:`~pyisolate.bpf.maps.BpfMapClient`; ``bpftool map update`` is only used
+when a pinned map cannot be opened natively.
 """
 
 import hashlib
+import itertools
 import json
 import logging
 import os
 import shlex
 import subprocess
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Sequence
 
 from platformdirs import user_cache_dir
 
-from ..policy.compiler import PolicyCompilerError, compile_policy
-from ..policy.model import from_compiled_policy, to_bpf_map_entries
+from ..policy.cache import shared_policy_cache
+from ..policy.compiler import PolicyCompilerError
+from ..policy.model import RuntimePolicySet, from_compiled_policy, to_bpf_map_state
+from .maps import BpfBatchError, BpfMapClient
+from .reload import DELETE, MapOp, ReloadPlan, plan_reload
 
 logger = logging.getLogger(__name__)
 
 # BPF hash maps require fixed-width keys and values. The logical entries from
-# ``to_bpf_map_entries`` (e.g. ``"default:0"`` -> ``"/tmp/**"``) are therefore
-# encoded to fixed-width little-endian byte strings before being handed to
-# ``bpftool``, which consumes them as space-separated hex tokens. A blake2b
+# ``to_bpf_map_state`` (e.g. ``"default:/tmp/**"`` -> ``"readwrite:/tmp/**"``)
+# are therefore encoded to fixed-width byte strings before being written with
+# ``bpf(2)``, or handed to ``bpftool`` as space-separated hex tokens. A blake2b
 # digest gives a deterministic, collision-resistant fixed-width encoding for the
 # variable-length logical strings; the matching kernel-side derivation is a
 # separate concern from this user-space encoding.
@@ -33,10 +41,22 @@ BPF_KEY_BYTES = 8
 BPF_VALUE_BYTES = 8
 
 
+def encode_map_bytes(text: str, width: int) -> bytes:
+    """Encode *text* as a fixed-width *width*-byte map key or value."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=width).digest()
+
+
 def encode_map_field(text: str, width: int) -> list[str]:
     """Encode *text* as *width* hex byte tokens (``["0x.."]``) for ``bpftool``."""
-    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=width).digest()
-    return [f"0x{byte:02x}" for byte in digest]
+    return [f"0x{byte:02x}" for byte in encode_map_bytes(text, width)]
+
+
+class _PartialMapUpdate(RuntimeError):
+    """A batch of map writes failed after its first ``applied`` entries."""
+
+    def __init__(self, message: str, applied: int) -> None:
+        super().__init__(message)
+        self.applied = applied
 
 
 class BPFManager:
@@ -92,6 +112,11 @@ class BPFManager:
         self._filter_pin_dir = self._bpffs_root / "syscall_filter"
         self._guard_pin_dir = self._bpffs_root / "resource_guard"
         self._skel_cache = self._SKEL_CACHE
+        self._maps = BpfMapClient()
+        # Entries last written to the policy maps, and the ``policy_maps``
+        # object they were written for.
+        self._map_state: dict[tuple[str, str], str] = {}
+        self._map_state_source: object = None
 
     # internal helper
     def _run(self, cmd: list[str], *, raise_on_error: bool = False) -> bool:
@@ -151,6 +176,14 @@ class BPFManager:
             raise ValueError(f"invalid rollout mode: {mode}")
 
         strict_mode = mode == "hardened"
+        # Reloading re-pins the maps; descriptors opened before refer to the
+        # old ones, and the fresh maps hold none of the entries written to
+        # them. Recording them as empty makes the next apply_policy write the
+        # whole policy rather than a delta. ``_current_map_state`` would
+        # rebuild the old entries from ``policy_maps`` if no state were
+        # recorded for it.
+        self._maps.close()
+        self._remember_map_state(self.policy_maps, {})
 
         dummy_compile = [
             "clang",
@@ -287,7 +320,7 @@ class BPFManager:
 
     def _load_runtime_policy_yaml(self, path: Path):
         try:
-            return from_compiled_policy(compile_policy(path))
+            return shared_policy_cache().runtime(path)
         except FileNotFoundError:
             raise
         except Exception as exc:
@@ -346,50 +379,75 @@ class BPFManager:
                 f"Unable to read policy file {policy_path}: {exc}"
             ) from exc
 
+        self.apply_policy(runtime_policy)
+
+    def apply_policy(self, policy_set: RuntimePolicySet) -> None:
+        """Refresh maps from an already-compiled policy set.
+
+        :meth:`hot_reload` loads a file and delegates here; callers holding a
+        compiled policy skip the file round-trip entirely.
+        """
+        if not self.loaded:
+            raise RuntimeError("BPF not loaded")
+
         # Build the replacement policy first, but only publish it after every
-        # kernel map update succeeds. This keeps userspace state aligned with the
+        # kernel map change succeeds. This keeps userspace state aligned with the
         # last fully-applied BPF policy if a partial hot reload fails.
-        new_policy_maps = runtime_policy.to_dict()
-        attempted_updates: list[tuple[str, str, str]] = []
-        previous_entries: dict[tuple[str, str], str] = {}
-        if self.policy_maps:
-            try:
-                previous_entries = {
-                    (map_name, key): value
-                    for map_name, key, value in to_bpf_map_entries(
-                        from_compiled_policy(self.policy_maps)
-                    )
-                }
-            except (TypeError, ValueError) as exc:
-                logger.warning(
-                    "unable to build rollback entries from current policy maps: %s",
-                    exc,
-                )
-
-        for map_name, key, value in to_bpf_map_entries(runtime_policy):
-            logger.info("updating map %s[%s] -> %s", map_name, key, value)
-            try:
-                self._update_bpf_map(map_name, key, value)
-            except RuntimeError as exc:
-                rollback_errors = self._rollback_bpf_map_updates(
-                    attempted_updates, previous_entries
-                )
-                rollback_context = ""
-                if rollback_errors:
-                    rollback_context = (
-                        f"; rollback errors: {'; '.join(rollback_errors)}"
-                    )
-                raise RuntimeError(
-                    f"BPF map update failed for {map_name}[{key}] with value {value!r} "
-                    f"after {len(attempted_updates)} successful update(s): {exc}"
-                    f"{rollback_context}"
-                ) from exc
-            attempted_updates.append((map_name, key, value))
+        new_policy_maps = policy_set.to_dict()
+        current = self._current_map_state()
+        target = to_bpf_map_state(policy_set)
+        plan = plan_reload(current, target)
+        logger.info(
+            "policy reload: %(insert)d insert(s), %(update)d update(s), "
+            "%(delete)d delete(s)",
+            plan.counts(),
+        )
+        for op in plan.ops:
+            logger.info("%s map %s[%s] -> %s", op.kind, op.map_name, op.key, op.value)
+        try:
+            self._apply_map_ops(plan.ops)
+        except _PartialMapUpdate as exc:
+            failed = plan.ops[exc.applied]
+            applied = ReloadPlan(plan.ops[: exc.applied])
+            state, rollback_errors = self._rollback_map_ops(
+                applied.inverse(), applied.apply_to(current)
+            )
+            rollback_context = ""
+            if rollback_errors:
+                rollback_context = f"; rollback errors: {'; '.join(rollback_errors)}"
+            self._remember_map_state(self.policy_maps, state)
+            value = "" if failed.value is None else f" with value {failed.value!r}"
+            raise RuntimeError(
+                f"BPF map {failed.kind} failed for {failed.map_name}[{failed.key}]{value} "
+                f"after {exc.applied} successful update(s): {exc}"
+                f"{rollback_context}"
+            ) from exc
 
         # Replace the active policy entirely to drop removed entries. Store the
         # canonical structure, not the source JSON shape, so the userspace and BPF
         # paths have one representation.
         self.policy_maps = new_policy_maps
+        self._remember_map_state(new_policy_maps, target)
+
+    def _current_map_state(self) -> dict[tuple[str, str], str]:
+        """Return the entries the maps hold for the active ``policy_maps``."""
+        if self._map_state_source is self.policy_maps:
+            return self._map_state
+        if not self.policy_maps:
+            return {}
+        try:
+            return to_bpf_map_state(from_compiled_policy(self.policy_maps))
+        except (TypeError, ValueError) as exc:
+            logger.warning(
+                "unable to build map entries from current policy maps: %s", exc
+            )
+            return {}
+
+    def _remember_map_state(
+        self, source: dict[str, object], state: dict[tuple[str, str], str]
+    ) -> None:
+        self._map_state = state
+        self._map_state_source = source
 
     def set_sandbox_policy(
         self,
@@ -409,9 +467,23 @@ class BPFManager:
             SANDBOX_POLICY_MAP,
             encode_sandbox_policy_key,
             encode_sandbox_policy_value,
+            sandbox_policy_key,
+            sandbox_policy_value,
         )
 
         pinned = self._bpffs_root / SANDBOX_POLICY_MAP
+        try:
+            if self._maps.update(
+                str(pinned),
+                sandbox_policy_key(cgroup_id),
+                sandbox_policy_value(deny_mask, audit_only),
+            ):
+                return True
+        except OSError as exc:
+            logger.error("bpf map update of %s failed: %s", pinned, exc)
+            if strict:
+                raise RuntimeError(f"bpf map update of {pinned} failed: {exc}") from exc
+            return False
         return self._run(
             [
                 "bpftool",
@@ -429,13 +501,23 @@ class BPFManager:
         )
 
     def _update_bpf_map(self, map_name: str, key: str, value: str) -> None:
+        pinned = f"/sys/fs/bpf/{map_name}"
+        try:
+            if self._maps.update(
+                pinned,
+                encode_map_bytes(key, BPF_KEY_BYTES),
+                encode_map_bytes(value, BPF_VALUE_BYTES),
+            ):
+                return
+        except OSError as exc:
+            raise RuntimeError(f"bpf map update of {pinned} failed: {exc}") from exc
         self._run(
             [
                 "bpftool",
                 "map",
                 "update",
                 "pinned",
-                f"/sys/fs/bpf/{map_name}",
+                pinned,
                 "key",
                 *encode_map_field(key, BPF_KEY_BYTES),
                 "value",
@@ -445,36 +527,111 @@ class BPFManager:
             raise_on_error=True,
         )
 
-    def _rollback_bpf_map_updates(
-        self,
-        attempted_updates: list[tuple[str, str, str]],
-        previous_entries: dict[tuple[str, str], str],
-    ) -> list[str]:
-        """Best-effort rollback for map entries changed during hot reload."""
-
-        rollback_errors: list[str] = []
-        for rollback_map, rollback_key, _ in reversed(attempted_updates):
-            previous_value = previous_entries.get((rollback_map, rollback_key))
-            if previous_value is None:
-                logger.warning(
-                    "no previous value available to rollback %s[%s]",
-                    rollback_map,
-                    rollback_key,
-                )
+    def _update_bpf_map_batch(
+        self, map_name: str, items: list[tuple[str, str]]
+    ) -> None:
+        """Write *items* into one map, in a single ``bpf(2)`` call if possible.
+
+        Raises :class:`_PartialMapUpdate` counting the entries written before
+        the failure.
+        """
+        pinned = f"/sys/fs/bpf/{map_name}"
+        encoded = [
+            (
+                encode_map_bytes(key, BPF_KEY_BYTES),
+                encode_map_bytes(value, BPF_VALUE_BYTES),
+            )
+            for key, value in items
+        ]
+        try:
+            if self._maps.update_batch(pinned, encoded):
+                return
+        except BpfBatchError as exc:
+            raise _PartialMapUpdate(
+                f"bpf map update of {pinned} failed: {exc}", exc.done
+            ) from exc
+        for applied, (key, value) in enumerate(items):
+            try:
+                self._update_bpf_map(map_name, key, value)
+            except RuntimeError as exc:
+                raise _PartialMapUpdate(str(exc), applied) from exc
+
+    def _apply_map_ops(self, ops: Sequence[MapOp]) -> None:
+        """Apply *ops* in order, one batch per run of same-map writes or deletes.
+
+        Raises :class:`_PartialMapUpdate` counting the operations applied
+        before the failure.
+        """
+        applied = 0
+        runs = itertools.groupby(ops, key=lambda op: (op.map_name, op.kind == DELETE))
+        for (map_name, delete), run in runs:
+            group = list(run)
+            try:
+                if delete:
+                    self._delete_bpf_map_batch(map_name, [op.key for op in group])
+                else:
+                    self._update_bpf_map_batch(
+                        map_name, [(op.key, op.value or "") for op in group]
+                    )
+            except _PartialMapUpdate as exc:
+                exc.applied += applied
+                raise
+            applied += len(group)
+
+    def _rollback_map_ops(
+        self, rollback: ReloadPlan, state: dict[tuple[str, str], str]
+    ) -> tuple[dict[tuple[str, str], str], list[str]]:
+        """Best-effort rollback: apply *rollback*, skipping operations that fail.
+
+        Returns the resulting map entries, starting from *state*, and one
+        error message per operation that could not be applied.
+        """
+        errors: list[str] = []
+        remaining = rollback.ops
+        while remaining:
+            try:
+                self._apply_map_ops(remaining)
+            except _PartialMapUpdate as exc:
+                state = ReloadPlan(remaining[: exc.applied]).apply_to(state)
+                op = remaining[exc.applied]
+                errors.append(f"{op.kind} {op.map_name}[{op.key}]: {exc}")
+                remaining = remaining[exc.applied + 1 :]
                 continue
+            state = ReloadPlan(remaining).apply_to(state)
+            break
+        return state, errors
+
+    def _delete_bpf_map_batch(self, map_name: str, keys: list[str]) -> None:
+        """Delete *keys* from one map; keys already absent are skipped natively.
+
+        Raises :class:`_PartialMapUpdate` counting the keys deleted before the
+        failure.
+        """
+        pinned = f"/sys/fs/bpf/{map_name}"
+        encoded = [encode_map_bytes(key, BPF_KEY_BYTES) for key in keys]
+        try:
+            if self._maps.delete_batch(pinned, encoded):
+                return
+        except BpfBatchError as exc:
+            raise _PartialMapUpdate(
+                f"bpf map delete from {pinned} failed: {exc}", exc.done
+            ) from exc
+        for applied, key in enumerate(keys):
             try:
-                logger.info(
-                    "rolling back map %s[%s] -> %s",
-                    rollback_map,
-                    rollback_key,
-                    previous_value,
+                self._run(
+                    [
+                        "bpftool",
+                        "map",
+                        "delete",
+                        "pinned",
+                        pinned,
+                        "key",
+                        *encode_map_field(key, BPF_KEY_BYTES),
+                    ],
+                    raise_on_error=True,
                 )
-                self._update_bpf_map(rollback_map, rollback_key, previous_value)
-            except RuntimeError as rollback_exc:
-                rollback_errors.append(
-                    f"{rollback_map}[{rollback_key}] -> {previous_value!r}: {rollback_exc}"
-                )
-        return rollback_errors
+            except RuntimeError as exc:
+                raise _PartialMapUpdate(str(exc), applied) from exc
 
     def open_ring_buffer(self):
         """Return an iterator over resource guard events."""
@@ -0,0 +1,306 @@
+"""Native access to pinned BPF maps through the ``bpf(2)`` syscall.
+
+Writing a map entry with ``bpftool map update pinned ...`` forks and execs a
+process per entry: a policy hot reload with thousands of rules launched
+thousands of processes, and every spawn launched one more. :class:`BpfMapClient`
+issues the syscalls directly through ctypes instead:
+
+* ``BPF_OBJ_GET`` opens a pinned map once; the descriptor is cached per path,
+  so later writes to the same map cost one syscall;
+* ``BPF_MAP_UPDATE_BATCH`` / ``BPF_MAP_DELETE_BATCH`` write or delete many
+  entries in one call. Kernels or map types without batch support are
+  detected on first use and written one element at a time instead.
+
+The syscalls go through a :class:`BpfSyscalls` object, which tests replace
+with a fake that keeps maps in dictionaries. When ``bpf(2)`` is unavailable or
+a map cannot be opened (not pinned, no permission), the client methods return
+``False`` and :class:`~pyisolate.bpf.manager.BPFManager` falls back to
+``bpftool``. Errors from the writes themselves are raised as :class:`OSError`.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import logging
+import os
+import platform
+import threading
+from typing import Optional, Sequence
+
+__all__ = [
+    "BPF_ANY",
+    "BPF_EXIST",
+    "BPF_NOEXIST",
+    "BpfBatchError",
+    "BpfMapClient",
+    "BpfSyscalls",
+]
+
+logger = logging.getLogger(__name__)
+
+# bpf(2) commands, from include/uapi/linux/bpf.h.
+BPF_MAP_UPDATE_ELEM = 2
+BPF_MAP_DELETE_ELEM = 3
+BPF_OBJ_GET = 7
+BPF_MAP_UPDATE_BATCH = 26
+BPF_MAP_DELETE_BATCH = 27
+
+# Update flags.
+BPF_ANY = 0
+BPF_NOEXIST = 1
+BPF_EXIST = 2
+
+_SYS_BPF = {"x86_64": 321, "aarch64": 280, "arm64": 280, "riscv64": 280}.get(
+    platform.machine()
+)
+
+# The kernel's internal "operation not supported" errno, which batch commands
+# return for map types without batch support.
+_ENOTSUPP = 524
+_NO_BATCH = frozenset({errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, _ENOTSUPP})
+
+
+class BpfBatchError(OSError):
+    """A batch operation failed after applying its first ``done`` elements."""
+
+    def __init__(self, code: int, message: str, done: int) -> None:
+        super().__init__(code, message)
+        self.done = done
+
+
+class _ObjAttr(ctypes.Structure):
+    _fields_ = [
+        ("pathname", ctypes.c_uint64),
+        ("bpf_fd", ctypes.c_uint32),
+        ("file_flags", ctypes.c_uint32),
+    ]
+
+
+class _ElemAttr(ctypes.Structure):
+    _fields_ = [
+        ("map_fd", ctypes.c_uint32),
+        ("_pad", ctypes.c_uint32),
+        ("key", ctypes.c_uint64),
+        ("value", ctypes.c_uint64),
+        ("flags", ctypes.c_uint64),
+    ]
+
+
+class _BatchAttr(ctypes.Structure):
+    _fields_ = [
+        ("in_batch", ctypes.c_uint64),
+        ("out_batch", ctypes.c_uint64),
+        ("keys", ctypes.c_uint64),
+        ("values", ctypes.c_uint64),
+        ("count", ctypes.c_uint32),
+        ("map_fd", ctypes.c_uint32),
+        ("elem_flags", ctypes.c_uint64),
+        ("flags", ctypes.c_uint64),
+    ]
+
+
+def _address(buf: ctypes.Array) -> int:
+    return ctypes.addressof(buf)
+
+
+class BpfSyscalls:
+    """The ``bpf(2)`` commands :class:`BpfMapClient` needs, via ctypes.
+
+    Each method raises :class:`OSError` with the syscall's errno on failure.
+    """
+
+    def __init__(self) -> None:
+        self._libc: Optional[ctypes.CDLL] = None
+
+    def _bpf(self, cmd: int, attr: ctypes.Structure) -> int:
+        if _SYS_BPF is None:
+            raise OSError(errno.ENOSYS, f"bpf(2) not supported on {platform.machine()}")
+        if self._libc is None:
+            self._libc = ctypes.CDLL(None, use_errno=True)
+        ret = self._libc.syscall(
+            ctypes.c_long(_SYS_BPF),
+            ctypes.c_int(cmd),
+            ctypes.byref(attr),
+            ctypes.c_uint(ctypes.sizeof(attr)),
+        )
+        if ret < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        return ret
+
+    def obj_get(self, path: str) -> int:
+        """Open the object pinned at *path* and return a new descriptor."""
+        name = ctypes.create_string_buffer(os.fsencode(path))
+        return self._bpf(BPF_OBJ_GET, _ObjAttr(pathname=_address(name)))
+
+    def map_update(self, fd: int, key: bytes, value: bytes, flags: int) -> None:
+        k = ctypes.create_string_buffer(key, len(key))
+        v = ctypes.create_string_buffer(value, len(value))
+        attr = _ElemAttr(map_fd=fd, key=_address(k), value=_address(v), flags=flags)
+        self._bpf(BPF_MAP_UPDATE_ELEM, attr)
+
+    def map_delete(self, fd: int, key: bytes) -> None:
+        k = ctypes.create_string_buffer(key, len(key))
+        self._bpf(BPF_MAP_DELETE_ELEM, _ElemAttr(map_fd=fd, key=_address(k)))
+
+    def map_update_batch(
+        self, fd: int, keys: bytes, values: bytes, count: int, flags: int
+    ) -> None:
+        """Write *count* packed fixed-width keys and values in one call."""
+        k = ctypes.create_string_buffer(keys, len(keys))
+        v = ctypes.create_string_buffer(values, len(values))
+        attr = _BatchAttr(
+            keys=_address(k),
+            values=_address(v),
+            count=count,
+            map_fd=fd,
+            elem_flags=flags,
+        )
+        self._batch(BPF_MAP_UPDATE_BATCH, attr)
+
+    def map_delete_batch(self, fd: int, keys: bytes, count: int) -> None:
+        """Delete *count* packed fixed-width keys in one call."""
+        k = ctypes.create_string_buffer(keys, len(keys))
+        attr = _BatchAttr(keys=_address(k), count=count, map_fd=fd)
+        self._batch(BPF_MAP_DELETE_BATCH, attr)
+
+    def _batch(self, cmd: int, attr: _BatchAttr) -> None:
+        try:
+            self._bpf(cmd, attr)
+        except OSError as exc:
+            # The kernel reports how many elements it processed in ``count``.
+            raise BpfBatchError(exc.errno, exc.strerror, attr.count) from None
+
+    def close(self, fd: int) -> None:
+        os.close(fd)
+
+
+class BpfMapClient:
+    """Writes pinned BPF maps with cached descriptors and batched syscalls.
+
+    The ``update``/``delete`` methods return ``False`` when the map cannot be
+    used natively, so the caller can fall back to ``bpftool``.
+    """
+
+    def __init__(self, syscalls: Optional[BpfSyscalls] = None) -> None:
+        self._sys = syscalls if syscalls is not None else BpfSyscalls()
+        self._lock = threading.Lock()
+        self._fds: dict[str, int] = {}
+        # Maps whose type or kernel rejected a batch command.
+        self._unbatched: set[str] = set()
+        self._disabled = False
+
+    @property
+    def available(self) -> bool:
+        """``False`` once ``bpf(2)`` itself turned out to be unavailable."""
+        return not self._disabled
+
+    def _fd(self, path: str) -> Optional[int]:
+        with self._lock:
+            fd = self._fds.get(path)
+            if fd is not None or self._disabled:
+                return fd
+        try:
+            fd = self._sys.obj_get(path)
+        except OSError as exc:
+            if exc.errno == errno.ENOSYS:
+                self._disabled = True
+            logger.debug("cannot open pinned map %s with bpf(2): %s", path, exc)
+            return None
+        with self._lock:
+            cached = self._fds.setdefault(path, fd)
+        if cached != fd:
+            # Another thread opened it first.
+            self._sys.close(fd)
+        return cached
+
+    def update(self, path: str, key: bytes, value: bytes, flags: int = BPF_ANY) -> bool:
+        """Write one entry of the map pinned at *path*."""
+        fd = self._fd(path)
+        if fd is None:
+            return False
+        self._sys.map_update(fd, key, value, flags)
+        return True
+
+    def update_batch(
+        self, path: str, items: Sequence[tuple[bytes, bytes]], flags: int = BPF_ANY
+    ) -> bool:
+        """Write every ``(key, value)`` in *items*, in order.
+
+        Raises :class:`BpfBatchError` whose ``done`` counts the leading items
+        that were written.
+        """
+        fd = self._fd(path)
+        if fd is None:
+            return False
+        if len(items) > 1 and path not in self._unbatched:
+            keys = b"".join(key for key, _ in items)
+            values = b"".join(value for _, value in items)
+            try:
+                self._sys.map_update_batch(fd, keys, values, len(items), flags)
+                return True
+            except BpfBatchError as exc:
+                if exc.done or exc.errno not in _NO_BATCH:
+                    raise
+                self._unbatched.add(path)
+        for done, (key, value) in enumerate(items):
+            try:
+                self._sys.map_update(fd, key, value, flags)
+            except OSError as exc:
+                raise BpfBatchError(exc.errno, exc.strerror, done) from None
+        return True
+
+    def delete_batch(self, path: str, keys: Sequence[bytes]) -> bool:
+        """Delete *keys* from the map pinned at *path*; missing keys are skipped.
+
+        Raises :class:`BpfBatchError` whose ``done`` is the index of the key
+        that could not be deleted.
+        """
+        fd = self._fd(path)
+        if fd is None:
+            return False
+        start = 0
+        while len(keys) - start > 1 and path not in self._unbatched:
+            pending = keys[start:]
+            try:
+                self._sys.map_delete_batch(fd, b"".join(pending), len(pending))
+                return True
+            except BpfBatchError as exc:
+                if exc.errno == errno.ENOENT:
+                    # The batch stops at the first missing key.
+                    start += exc.done + 1
+                elif exc.done or exc.errno not in _NO_BATCH:
+                    raise BpfBatchError(
+                        exc.errno, exc.strerror, start + exc.done
+                    ) from None
+                else:
+                    self._unbatched.add(path)
+        for index in range(start, len(keys)):
+            try:
+                self._sys.map_delete(fd, keys[index])
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                raise BpfBatchError(exc.errno, exc.strerror, index) from None
+        return True
+
+    def forget(self, path: str) -> None:
+        """Close the cached descriptor for *path*, e.g. after it was re-pinned."""
+        with self._lock:
+            fd = self._fds.pop(path, None)
+            self._unbatched.discard(path)
+        if fd is not None:
+            self._sys.close(fd)
+
+    def close(self) -> None:
+        """Close every cached descriptor."""
+        with self._lock:
+            fds = list(self._fds.values())
+            self._fds.clear()
+            self._unbatched.clear()
+        for fd in fds:
+            try:
+                self._sys.close(fd)
+            except OSError:
+                pass
@@ -0,0 +1,109 @@
+"""Incremental planning of BPF policy map reloads.
+
+A hot reload used to rewrite every map entry of the new policy and never
+delete entries that disappeared, because entries were keyed by position
+(``sandbox:index``): removing one rule renumbered every rule after it. With
+the content-addressed keys of :func:`~pyisolate.policy.model.to_bpf_map_state`
+a rule keeps its key while it exists, so :func:`plan_reload` can diff the
+entries currently in the maps against the new policy and emit only inserts,
+updates and deletes. A reload that changes a few rules out of thousands costs
+a few map writes.
+
+Operations are ordered so the maps never grant more than either policy
+would: entries that restrict (deny-map writes, allow-map deletes) are applied
+before entries that relax (allow-map writes, deny-map deletes). A failed
+reload is undone by applying :meth:`ReloadPlan.inverse` of the part that was
+applied.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+__all__ = ["MapOp", "ReloadPlan", "plan_reload"]
+
+MapState = Mapping[tuple[str, str], str]
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class MapOp:
+    """One change to one map entry."""
+
+    kind: str
+    """``insert``, ``update`` or ``delete``."""
+    map_name: str
+    key: str
+    value: Optional[str] = None
+    """The value written; ``None`` for a delete."""
+    previous: Optional[str] = None
+    """The value replaced or deleted; ``None`` for an insert."""
+
+    def inverse(self) -> "MapOp":
+        """Return the operation that undoes this one."""
+        if self.kind == INSERT:
+            return MapOp(DELETE, self.map_name, self.key, previous=self.value)
+        if self.kind == DELETE:
+            return MapOp(INSERT, self.map_name, self.key, value=self.previous)
+        return MapOp(UPDATE, self.map_name, self.key, self.previous, self.value)
+
+    def restricts(self) -> bool:
+        """Whether applying this operation can only take permissions away."""
+        deny = self.map_name.endswith("_deny")
+        return deny != (self.kind == DELETE)
+
+
+@dataclass(frozen=True)
+class ReloadPlan:
+    """The operations that turn one set of map entries into another."""
+
+    ops: tuple[MapOp, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of operations of each kind."""
+        counts = {INSERT: 0, UPDATE: 0, DELETE: 0}
+        for op in self.ops:
+            counts[op.kind] += 1
+        return counts
+
+    def inverse(self, applied: Optional[int] = None) -> "ReloadPlan":
+        """Return the plan undoing the first *applied* operations (default all)."""
+        done = self.ops if applied is None else self.ops[:applied]
+        return ReloadPlan(tuple(op.inverse() for op in reversed(done)))
+
+    def apply_to(self, state: MapState) -> dict[tuple[str, str], str]:
+        """Return a copy of *state* with every operation applied."""
+        result = dict(state)
+        for op in self.ops:
+            if op.kind == DELETE:
+                result.pop((op.map_name, op.key), None)
+            else:
+                result[(op.map_name, op.key)] = op.value  # type: ignore[assignment]
+        return result
+
+
+def plan_reload(current: MapState, target: MapState) -> ReloadPlan:
+    """Return the operations that change map entries *current* into *target*.
+
+    Restricting operations come first; within each half, operations are
+    grouped by map and kind so they can be applied as one batch per group.
+    """
+    ops: list[MapOp] = []
+    for entry, value in target.items():
+        previous = current.get(entry)
+        if previous is None:
+            ops.append(MapOp(INSERT, entry[0], entry[1], value))
+        elif previous != value:
+            ops.append(MapOp(UPDATE, entry[0], entry[1], value, previous))
+    for entry, previous in current.items():
+        if entry not in target:
+            ops.append(MapOp(DELETE, entry[0], entry[1], previous=previous))
+    ops.sort(key=lambda op: (not op.restricts(), op.map_name, op.kind == DELETE))
+    return ReloadPlan(tuple(ops))
@@ -1,23 +1,34 @@
-"""Minimal cgroup v2 helper."""
+"""Minimal cgroup v2 helper.
+
+:func:`create` and :func:`delete` work synchronously. :class:`CgroupPool`
+keeps both off a spawn's path: it hands out cgroups created ahead of time,
+and deletes released ones on a background worker that retries a cgroup whose
+last task has not left yet.
+"""
 
 from __future__ import annotations
 
 import ctypes
 import errno
+import itertools
 import logging
 import os
 import threading
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Literal
 
 __all__ = [
     "CgroupEnforcement",
+    "CgroupPool",
     "create",
     "attach_current",
     "delete",
     "list_children",
     "cleanup_orphans",
+    "parse_cpu_stat",
+    "parse_memory_events",
 ]
 
 # Allow tests to override the base cgroup directory
@@ -27,6 +38,21 @@ log = logging.getLogger(__name__)
 
 RolloutMode = Literal["dev", "compatibility", "hardened"]
 
+DEFAULT_POOL_SIZE = 4
+"""Spare cgroups a :class:`CgroupPool` keeps ready."""
+
+DEFAULT_DELETE_RETRY = 5.0
+"""Seconds a busy cgroup released to a :class:`CgroupPool` keeps being retried."""
+
+_MAX_RETRY_DELAY = 0.5
+
+# Spares live beside the sandbox cgroups under names no sandbox can take
+# (``Supervisor`` names cannot start with a dot) and that carry the owning
+# pid, so orphan cleanup can tell whose they are. A spare keeps its name once
+# checked out: cgroup v2 refuses to rename a cgroup directory.
+_SPARE_PREFIX = ".pool-"
+_private_ids = itertools.count()
+
 
 @dataclass(frozen=True)
 class CgroupEnforcement:
@@ -133,7 +159,15 @@ def create(
         status = CgroupEnforcement(path=None, mode=mode)
         return _failure(status, msg)
 
-    status = CgroupEnforcement(path=path, mode=mode)
+    return _apply_limits(CgroupEnforcement(path=path, mode=mode), cpu_ms, mem_bytes)
+
+
+def _apply_limits(
+    status: CgroupEnforcement, cpu_ms: int | None, mem_bytes: int | None
+) -> CgroupEnforcement:
+    path = status.path
+    assert path is not None
+    mode = status.mode
     if cpu_ms is not None:
         quota_us = cpu_ms * 1000
         if _write(path / "cpu.max", f"{quota_us} 1000000"):
@@ -160,6 +194,24 @@ def create(
     return status
 
 
+def parse_cpu_stat(data: bytes) -> float:
+    """Return the CPU milliseconds in a ``cpu.stat`` file's ``usage_usec``."""
+    for line in data.splitlines():
+        if line.startswith(b"usage_usec "):
+            return int(line.split()[1]) / 1000.0
+    raise ValueError("cpu.stat has no usage_usec")
+
+
+def parse_memory_events(data: bytes) -> dict[str, int]:
+    """Return the counters in a ``memory.events`` file (``oom_kill`` etc.)."""
+    counters: dict[str, int] = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b" ")
+        if value:
+            counters[key.decode("ascii", "replace")] = int(value)
+    return counters
+
+
 def _as_path(path: Path | CgroupEnforcement | None) -> Path | None:
     if isinstance(path, CgroupEnforcement):
         return path.path
@@ -190,18 +242,11 @@ def attach_current(path: Path | CgroupEnforcement | None) -> None:
         log.warning("Failed to attach thread to %s: %s", path, exc)
 
 
-def delete(path: Path | CgroupEnforcement | None) -> None:
-    """Remove a cgroup directory with best-effort thread drain."""
-    path = _as_path(path)
-    if path is None:
-        return
-
+def _drain_threads(path: Path) -> None:
+    """Best-effort move of lingering tasks to the parent, so rmdir can work."""
     parent_threads = path.parent / "cgroup.threads"
-    child_threads = path / "cgroup.threads"
-
-    # Best-effort drain of lingering tasks so rmdir has a chance to succeed.
     try:
-        tids = child_threads.read_text().splitlines()
+        tids = (path / "cgroup.threads").read_text().splitlines()
     except (OSError, PermissionError, FileNotFoundError):
         tids = []
 
@@ -214,17 +259,51 @@ def delete(path: Path | CgroupEnforcement | None) -> None:
             # leaks. Keep going and rely on errno-aware rmdir logging below.
             continue
 
-    try:
-        path.rmdir()
-    except FileNotFoundError as exc:
+
+def _log_delete_failure(path: Path, exc: OSError) -> None:
+    if isinstance(exc, FileNotFoundError):
         log.warning("Cgroup path missing while deleting %s: %s", path, exc)
-    except PermissionError as exc:
+    elif isinstance(exc, PermissionError):
         log.warning("Permission denied deleting cgroup %s: %s", path, exc)
+    elif exc.errno in {errno.EBUSY, errno.ENOTEMPTY}:
+        log.warning("Cgroup %s is busy/non-empty; skipping delete: %s", path, exc)
+    else:
+        log.warning("Failed to delete cgroup %s: %s", path, exc)
+
+
+def delete(path: Path | CgroupEnforcement | None) -> None:
+    """Remove a cgroup directory with best-effort thread drain."""
+    path = _as_path(path)
+    if path is None:
+        return
+    _drain_threads(path)
+    try:
+        path.rmdir()
     except OSError as exc:
-        if exc.errno in {errno.EBUSY, errno.ENOTEMPTY}:
-            log.warning("Cgroup %s is busy/non-empty; skipping delete: %s", path, exc)
-        else:
-            log.warning("Failed to delete cgroup %s: %s", path, exc)
+        _log_delete_failure(path, exc)
+
+
+def _private_name(prefix: str) -> str:
+    return f"{prefix}{os.getpid()}-{next(_private_ids)}"
+
+
+def _owned_by_live_process(name: str) -> bool:
+    """Whether *name* is a pool cgroup of a running process."""
+    if not name.startswith(_SPARE_PREFIX):
+        return False
+    try:
+        pid = int(name[len(_SPARE_PREFIX) :].partition("-")[0])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
 
 
 def list_children() -> list[Path]:
@@ -243,8 +322,230 @@ def cleanup_orphans(active_names: set[str] | None = None) -> list[Path]:
     active = active_names or set()
     removed: list[Path] = []
     for child in list_children():
-        if child.name in active:
+        if child.name in active or _owned_by_live_process(child.name):
             continue
         delete(child)
         removed.append(child)
     return removed
+
+
+class CgroupPool:
+    """Spare sandbox cgroups made ahead of time, and deletion off the hot path.
+
+    :meth:`checkout` writes a spare's limits and hands it out under its own
+    path instead of creating a cgroup -- cgroup v2 does not allow renaming
+    one, so callers must use the returned path rather than assume
+    ``<root>/<name>``. After each checkout the worker makes new spares, up to
+    ``size``. A spare has never held a task, so its counters start at zero
+    just like a new cgroup's, which is why released cgroups are deleted rather
+    than put back.
+
+    :meth:`release` leaves draining and removing a cgroup to the worker. A
+    cgroup whose last task has not left yet fails with ``EBUSY``; it is
+    retried with backoff for up to ``retry_for`` seconds. Until it is gone its
+    path stays reserved: a checkout of the same name while ``<root>/<name>``
+    is pending gets a fresh cgroup instead.
+
+    The worker thread is started on demand and exits when it has nothing to
+    do. Where cgroups cannot be created the pool stops making spares and
+    :meth:`checkout` falls back to :func:`create`.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        *,
+        retry_for: float = DEFAULT_DELETE_RETRY,
+        name: str = "pyisolate-cgroups",
+    ) -> None:
+        if size < 0:
+            raise ValueError("size must not be negative")
+        self.size = size
+        self._retry_for = retry_for
+        self._name = name
+        self._cond = threading.Condition(threading.Lock())
+        self._spares: list[Path] = []
+        # Released cgroups not yet removed: [due, attempts, first try, path].
+        self._doomed: list[list] = []
+        # Paths of released cgroups, including any being removed right now.
+        self._reserved: set[Path] = set()
+        self._refill_failed = False
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._spares)
+
+    def pending(self) -> list[Path]:
+        """Released cgroups the worker has not removed yet."""
+        with self._cond:
+            return [entry[3] for entry in self._doomed]
+
+    def checkout(
+        self,
+        name: str,
+        cpu_ms: int | None = None,
+        mem_bytes: int | None = None,
+        *,
+        mode: RolloutMode = "dev",
+    ) -> CgroupEnforcement:
+        """Return a cgroup called *name* with the given limits, like :func:`create`."""
+        if mode not in {"dev", "compatibility", "hardened"}:
+            raise ValueError(f"invalid rollout mode: {mode}")
+        name = _validate_name(name)
+        with self._cond:
+            spare = self._spares.pop() if self._spares else None
+            reserved = _BASE / name in self._reserved
+            # Where spares cannot be made the worker would exit at once.
+            if not self._refill_failed or self._doomed:
+                self._wake_locked()
+        if spare is not None and spare.parent != _BASE:
+            log.debug("cgroup root changed; not using spare cgroup %s", spare)
+            self._delete_later(spare)
+            spare = None
+        if spare is None and reserved:
+            # The name's own cgroup is still being deleted; do not share it.
+            made = self._make_spares(1)
+            spare = made[0] if made else None
+        if spare is not None:
+            status = CgroupEnforcement(path=spare, mode=mode)
+            return _apply_limits(status, cpu_ms, mem_bytes)
+        return create(name, cpu_ms, mem_bytes, mode=mode)
+
+    def release(self, path: Path | CgroupEnforcement | None) -> None:
+        """Delete a sandbox's cgroup in the background; its path stays reserved
+        until it is gone."""
+        path = _as_path(path)
+        if path is None:
+            return
+        self._delete_later(path)
+
+    def fill(self) -> int:
+        """Create spares up to ``size`` now, in the caller; return how many."""
+        with self._cond:
+            wanted = self.size - len(self._spares)
+        created = self._make_spares(wanted)
+        with self._cond:
+            self._spares.extend(created)
+        return len(created)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until the worker is idle; ``False`` on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._thread is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop the worker, remove the spares and try each pending delete once."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush(timeout)
+        with self._cond:
+            spares, self._spares = self._spares, []
+            doomed = [entry[3] for entry in self._doomed]
+            self._doomed = []
+            self._reserved.clear()
+        for path in spares + doomed:
+            delete(path)
+
+    def _delete_later(self, path: Path) -> None:
+        with self._cond:
+            if not self._closed:
+                now = time.monotonic()
+                self._doomed.append([now, 0, now, path])
+                self._reserved.add(path)
+                self._wake_locked()
+                return
+        delete(path)
+
+    def _wake_locked(self) -> None:
+        if self._closed:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=self._name, daemon=True
+            )
+            self._thread.start()
+        else:
+            self._cond.notify_all()
+
+    def _make_spares(self, count: int) -> list[Path]:
+        created: list[Path] = []
+        for _ in range(count):
+            spare = _BASE / _private_name(_SPARE_PREFIX)
+            try:
+                spare.mkdir(parents=True)
+            except OSError as exc:
+                log.debug("cannot pre-create cgroups under %s: %s", _BASE, exc)
+                self._refill_failed = True
+                break
+            created.append(spare)
+        return created
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                due = [entry for entry in self._doomed if entry[0] <= now]
+                wanted = self.size - len(self._spares)
+                if self._closed or self._refill_failed:
+                    wanted = 0
+                if not due and wanted <= 0:
+                    if self._closed or not self._doomed:
+                        self._thread = None
+                        self._cond.notify_all()
+                        return
+                    self._cond.wait(min(entry[0] for entry in self._doomed) - now)
+                    continue
+                self._doomed = [entry for entry in self._doomed if entry[0] > now]
+            retry = []
+            removed = []
+            for entry in due:
+                if _try_delete(entry[3]):
+                    removed.append(entry[3])
+                    continue
+                if now - entry[2] >= self._retry_for:
+                    log.warning(
+                        "Cgroup %s still busy after %.1fs; giving up",
+                        entry[3],
+                        now - entry[2],
+                    )
+                    continue
+                entry[1] += 1
+                entry[0] = now + min(0.01 * 2 ** entry[1], _MAX_RETRY_DELAY)
+                retry.append(entry)
+            created = self._make_spares(wanted) if wanted > 0 else []
+            with self._cond:
+                self._doomed.extend(retry)
+                self._reserved.difference_update(removed)
+                if not self._closed:
+                    self._spares.extend(created)
+                    created = []
+            # Made while close() ran: it has already collected the spares.
+            for spare in created:
+                delete(spare)
+
+
+def _try_delete(path: Path) -> bool:
+    """Drain and remove *path* once; ``False`` if it is busy and worth retrying.
+
+    Only ``EBUSY`` is retried: cgroupfs reports a cgroup that still has tasks
+    that way, while ``ENOTEMPTY`` means a plain directory, which never clears.
+    """
+    _drain_threads(path)
+    try:
+        path.rmdir()
+    except FileNotFoundError:
+        return True
+    except OSError as exc:
+        if exc.errno == errno.EBUSY:
+            return False
+        _log_delete_failure(path, exc)
+    return True
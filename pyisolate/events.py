@@ -0,0 +1,201 @@
+"""Lifecycle event stream of a supervisor.
+
+A control plane that wants to notice exits, quota kills and quarantines used
+to poll ``list_active()`` and each sandbox's ``stats``, allocating a handle per
+sandbox on every poll. :meth:`Supervisor.events` subscribes to the changes
+instead. The supervisor publishes a
+:class:`~pyisolate.telemetry.LifecycleEvent` at the point each change
+happens, and every subscription receives it:
+
+* publishing never blocks: each subscription has its own bounded buffer, and
+  when a slow subscriber's buffer is full its oldest event is dropped and
+  counted in :attr:`EventSubscription.dropped`;
+* a subscription is a blocking iterator, an async iterator, or polled with
+  :meth:`EventSubscription.get`; it ends once closed and drained, which
+  supervisor shutdown does for every subscription;
+* with no subscribers, publishing costs one attribute read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from .telemetry import LifecycleEvent, LifecycleKind
+
+__all__ = ["DEFAULT_MAXSIZE", "EventHub", "EventSubscription"]
+
+DEFAULT_MAXSIZE = 1024
+"""Events buffered per subscription before the oldest are dropped."""
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class EventSubscription(Iterator[LifecycleEvent], AsyncIterator[LifecycleEvent]):
+    """One subscriber's bounded buffer of lifecycle events."""
+
+    def __init__(
+        self,
+        hub: "EventHub",
+        maxsize: int,
+        kinds: Optional[frozenset[str]],
+    ) -> None:
+        self._hub = hub
+        self._kinds = kinds
+        self._cond = threading.Condition(threading.Lock())
+        self._buffer: deque[LifecycleEvent] = deque(maxlen=maxsize)
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._dropped = 0
+        self._closed = False
+
+    def __enter__(self) -> "EventSubscription":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._buffer)
+
+    @property
+    def dropped(self) -> int:
+        """Events discarded because the buffer was full."""
+        with self._cond:
+            return self._dropped
+
+    @property
+    def closed(self) -> bool:
+        with self._cond:
+            return self._closed
+
+    def get(self, timeout: Optional[float] = None) -> Optional[LifecycleEvent]:
+        """Return the next event, waiting up to *timeout* seconds.
+
+        Returns ``None`` on timeout, or once the subscription is closed and
+        its buffer drained.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._buffer:
+                if self._closed:
+                    return None
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                self._cond.wait(remaining)
+            return self._buffer.popleft()
+
+    def __iter__(self) -> "EventSubscription":
+        return self
+
+    def __next__(self) -> LifecycleEvent:
+        event = self.get()
+        if event is None:
+            raise StopIteration
+        return event
+
+    def __aiter__(self) -> "EventSubscription":
+        return self
+
+    async def __anext__(self) -> LifecycleEvent:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._buffer:
+                    return self._buffer.popleft()
+                if self._closed:
+                    raise StopAsyncIteration
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await waiter[1]
+            finally:
+                with self._cond:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def close(self) -> None:
+        """Stop receiving events; buffered ones can still be read."""
+        self._hub._unsubscribe(self)
+        with self._cond:
+            self._closed = True
+            self._notify_locked()
+
+    def _offer(self, event: LifecycleEvent) -> None:
+        if self._kinds is not None and event.kind not in self._kinds:
+            return
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._buffer) == self._buffer.maxlen:
+                self._dropped += 1
+            self._buffer.append(event)
+            self._notify_locked()
+
+    def _notify_locked(self) -> None:
+        self._cond.notify_all()
+        for loop, future in self._waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:  # the subscriber's loop has been closed
+                pass
+        self._waiters.clear()
+
+
+class EventHub:
+    """Fans lifecycle events out to every open :class:`EventSubscription`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Replaced rather than mutated, so publishers read it without the lock.
+        self._subscribers: tuple[EventSubscription, ...] = ()
+
+    def subscribe(
+        self,
+        *,
+        kinds: Optional[Iterable[LifecycleKind]] = None,
+        maxsize: int = DEFAULT_MAXSIZE,
+    ) -> EventSubscription:
+        """Return a subscription to events of *kinds* (default: all)."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        subscription = EventSubscription(
+            self, maxsize, frozenset(kinds) if kinds is not None else None
+        )
+        with self._lock:
+            self._subscribers += (subscription,)
+        return subscription
+
+    def publish(
+        self,
+        kind: LifecycleKind,
+        sandbox: Optional[str] = None,
+        reason: Optional[str] = None,
+    ) -> None:
+        """Deliver an event to every subscription without blocking."""
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+        event = LifecycleEvent(kind, sandbox, reason)
+        for subscription in subscribers:
+            subscription._offer(event)
+
+    def close(self) -> None:
+        """Close every subscription, ending their iterators once drained."""
+        for subscription in self._subscribers:
+            subscription.close()
+
+    def _unsubscribe(self, subscription: EventSubscription) -> None:
+        with self._lock:
+            self._subscribers = tuple(
+                s for s in self._subscribers if s is not subscription
+            )
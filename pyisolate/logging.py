@@ -1,9 +1,57 @@
-"""Logging helpers for PyIsolate."""
+"""Logging helpers for PyIsolate.
+
+:func:`setup_structured_logging` writes each record as JSON straight to a
+stream from the thread that logged it. Sandboxes log from hot paths -- every
+denial, and every ``exec``/``call`` at debug level -- so
+:func:`setup_batched_logging` moves the writing off those threads:
+
+* a :class:`DroppingQueueHandler` puts records on a bounded queue and, when
+  the queue is full, drops the newest or the oldest record instead of
+  blocking the logging thread;
+* a :class:`RateLimitFilter` on that handler admits at most ``rate`` records
+  per second, with bursts of ``burst``, of each repetitive record -- one
+  logger (so one sandbox) and one message template -- and reports how many it
+  suppressed on the next record it admits;
+* a listener thread hands the records to a :class:`BatchingJSONHandler`,
+  which writes them to the stream in one ``write`` per ``batch_size`` records
+  or per ``flush_interval`` seconds, whichever comes first.
+"""
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import IO, Literal, Optional
+
+__all__ = [
+    "BatchingJSONHandler",
+    "DroppingQueueHandler",
+    "JSONFormatter",
+    "LoggingPipeline",
+    "LoggingStats",
+    "RateLimitFilter",
+    "setup_batched_logging",
+    "setup_structured_logging",
+]
+
+OverflowPolicy = Literal["drop_new", "drop_oldest"]
+
+DEFAULT_BATCH_SIZE = 256
+"""Records written per ``write`` call by the batching handler."""
+
+DEFAULT_FLUSH_INTERVAL = 0.05
+"""Seconds a record may wait in a partial batch."""
+
+DEFAULT_QUEUE_SIZE = 10_000
+"""Records queued for the listener before the overflow policy applies."""
 
 
 class JSONFormatter(logging.Formatter):
@@ -23,6 +71,9 @@ class JSONFormatter(logging.Formatter):
         }
         if record.exc_info:
             payload["exc_info"] = self.formatException(record.exc_info)
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            payload["suppressed"] = suppressed
         return json.dumps(payload)
 
 
@@ -32,3 +83,289 @@ def setup_structured_logging(level: int = logging.INFO) -> None:
     handler = logging.StreamHandler()
     handler.setFormatter(JSONFormatter())
     logging.basicConfig(level=level, handlers=[handler])
+
+
+class BatchingJSONHandler(logging.Handler):
+    """Buffer formatted records and write them to *stream* in batches.
+
+    The buffer is written once it holds *batch_size* records; whoever drives
+    the handler calls :meth:`flush` once :meth:`flush_due` reaches zero.
+    :class:`LoggingPipeline`'s listener does both.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[IO[str]] = None,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        super().__init__()
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.stream = stream if stream is not None else sys.stderr
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.setFormatter(JSONFormatter())
+        self._buffer: list[str] = []
+        self._first: Optional[float] = None
+        self.writes = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if not self._buffer:
+            self._first = time.monotonic()
+        self._buffer.append(line)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush_due(self) -> Optional[float]:
+        """Seconds until the buffered batch is due, or ``None`` if empty."""
+        if self._first is None:
+            return None
+        return max(0.0, self._first + self.flush_interval - time.monotonic())
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if not self._buffer:
+                return
+            batch, self._buffer, self._first = self._buffer, [], None
+            self.stream.write("\n".join(batch) + "\n")
+            self.stream.flush()
+            self.writes += 1
+        except Exception:
+            # Losing a batch must not kill the listener thread.
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+        finally:
+            self.release()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A :class:`~logging.handlers.QueueHandler` that never blocks on a full
+    queue: it drops the new record, or the oldest queued one."""
+
+    def __init__(
+        self, queue_: "queue.Queue[logging.LogRecord]", overflow: OverflowPolicy
+    ) -> None:
+        if overflow not in ("drop_new", "drop_oldest"):
+            raise ValueError(f"unknown overflow policy: {overflow!r}")
+        super().__init__(queue_)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener is in this process, so unlike the stdlib version this
+        # skips pre-rendering the record with a default formatter: only the
+        # message arguments are resolved, as they may change after logging.
+        if record.args:
+            record = copy.copy(record)
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+        self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """Token-bucket limit on each ``(logger, message template)`` pair.
+
+    Records above *max_level* always pass. Suppressed records are counted,
+    and the count is attached to the next admitted record of the same pair
+    as ``record.suppressed``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        *,
+        max_level: int = logging.WARNING,
+        max_keys: int = 4096,
+    ) -> None:
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self.max_keys = max_keys
+        self.suppressed = 0
+        self._lock = threading.Lock()
+        # key -> [tokens, last refill, suppressed since the last admitted]
+        self._buckets: dict[tuple[str, object], list[float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    # Forget full buckets: they behave exactly like new ones.
+                    self._buckets = {
+                        k: b
+                        for k, b in self._buckets.items()
+                        if b[0] + (now - b[1]) * self.rate < self.burst or b[2]
+                    }
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] = tokens - 1
+            if bucket[2]:
+                record.suppressed = int(bucket[2])
+                bucket[2] = 0
+        return True
+
+
+@dataclass(frozen=True)
+class LoggingStats:
+    """Counters reported by :meth:`LoggingPipeline.stats`."""
+
+    queued: int
+    dropped: int
+    """Records discarded by the overflow policy."""
+    suppressed: int
+    """Records withheld by the rate limit."""
+    writes: int
+    """Batched ``write`` calls made to the stream."""
+
+
+class _BatchingListener(logging.handlers.QueueListener):
+    def __init__(
+        self, queue_: "queue.Queue[logging.LogRecord]", writer: BatchingJSONHandler
+    ) -> None:
+        super().__init__(queue_, writer, respect_handler_level=True)
+        self._writer = writer
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        # Wait for a record only until the buffered batch is due.
+        while True:
+            try:
+                return self.queue.get(block, self._writer.flush_due())
+            except queue.Empty:
+                self._writer.flush()
+                if not block:
+                    raise
+
+    def enqueue_sentinel(self) -> None:
+        # The queue is bounded: wait for room rather than raise ``Full``.
+        self.queue.put(self._sentinel)
+
+
+class LoggingPipeline:
+    """Queue, rate limit and batching writer installed by
+    :func:`setup_batched_logging`."""
+
+    def __init__(
+        self,
+        stream: Optional[IO[str]] = None,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        overflow: OverflowPolicy = "drop_new",
+        rate: Optional[float] = None,
+        burst: int = 10,
+    ) -> None:
+        self._queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+        self.writer = BatchingJSONHandler(
+            stream, batch_size=batch_size, flush_interval=flush_interval
+        )
+        self.handler = DroppingQueueHandler(self._queue, overflow)
+        self.rate_limit: Optional[RateLimitFilter] = None
+        if rate is not None:
+            self.rate_limit = RateLimitFilter(rate, burst)
+            self.handler.addFilter(self.rate_limit)
+        self._listener = _BatchingListener(self._queue, self.writer)
+        self._started = False
+
+    def __enter__(self) -> "LoggingPipeline":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start the listener thread that writes queued records."""
+        if not self._started:
+            self._listener.start()
+            self._started = True
+
+    def stop(self) -> None:
+        """Write every queued record, then stop the listener thread."""
+        if self._started:
+            self._listener.stop()
+            self._started = False
+        self.writer.flush()
+
+    def stats(self) -> LoggingStats:
+        """Return queue depth and the drop, suppression and write counters."""
+        return LoggingStats(
+            queued=self._queue.qsize(),
+            dropped=self.handler.dropped,
+            suppressed=self.rate_limit.suppressed if self.rate_limit else 0,
+            writes=self.writer.writes,
+        )
+
+
+def setup_batched_logging(
+    level: int = logging.INFO,
+    stream: Optional[IO[str]] = None,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    overflow: OverflowPolicy = "drop_new",
+    rate: Optional[float] = None,
+    burst: int = 10,
+) -> LoggingPipeline:
+    """Configure the root logger to emit JSON through a batching pipeline.
+
+    Logging threads only enqueue; see the module documentation. *rate* (per
+    second) and *burst* rate-limit repetitive records, and are off by
+    default. Call :meth:`LoggingPipeline.stop` to write out what is queued.
+    """
+
+    pipeline = LoggingPipeline(
+        stream,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        queue_size=queue_size,
+        overflow=overflow,
+        rate=rate,
+        burst=burst,
+    )
+    logging.basicConfig(level=level, handlers=[pipeline.handler])
+    pipeline.start()
+    return pipeline
@@ -1,21 +1,138 @@
+"""Policy-violation alerts.
+
+Sandbox threads report a violation by calling :meth:`AlertManager.notify`
+from their own exception path. By default every registered callback runs
+right there, so a slow callback (a webhook, say) stalls the guest's next
+operation. With ``asynchronous=True`` the guest thread only enqueues:
+
+* alerts go into a bounded queue; when it is full the alert is dropped and
+  counted rather than blocking the guest;
+* repeats of a ``(sandbox, error type)`` alert within ``coalesce_window``
+  seconds of the first are counted and not dispatched again;
+* up to ``workers`` threads, started on demand and exiting once the queue is
+  empty, run the callbacks;
+* a callback still running after ``callback_timeout`` seconds is abandoned:
+  its worker is replaced and the alert's remaining callbacks run on another
+  worker. Python cannot interrupt the callback, so its thread finishes it and
+  then exits.
+
+:meth:`AlertManager.stats` reports the queue depth and the drop, coalescing,
+failure and timeout counters.
+"""
+
+from __future__ import annotations
+
 import logging
+import threading
+import time
+from collections import deque
 from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+__all__ = ["AlertCallback", "AlertManager", "AlertStats"]
 
 logger = logging.getLogger(__name__)
 
 AlertCallback = Callable[[str, Exception], object]
 
+DEFAULT_MAXSIZE = 1024
+"""Alerts queued for dispatch before new ones are dropped."""
+
+DEFAULT_WORKERS = 2
+"""Threads running callbacks at once in asynchronous mode."""
+
+DEFAULT_COALESCE_WINDOW = 1.0
+"""Seconds during which repeats of one sandbox's error type are coalesced."""
+
+DEFAULT_CALLBACK_TIMEOUT = 5.0
+"""Seconds a callback may run before its worker is abandoned."""
+
+
+@dataclass(frozen=True)
+class AlertStats:
+    """Counters reported by :meth:`AlertManager.stats`."""
+
+    enqueued: int
+    dispatched: int
+    coalesced: int
+    """Repeats within the coalescing window that were not dispatched."""
+    dropped: int
+    """Alerts discarded because the queue was full."""
+    failed: int
+    """Callback calls that raised."""
+    timed_out: int
+    """Callback calls abandoned after ``callback_timeout``."""
+    queued: int
+    workers: int
+
+
+class _Worker:
+    __slots__ = ("seq", "busy", "abandoned", "alert", "remaining")
+
+    def __init__(self) -> None:
+        self.seq = 0
+        self.busy = False
+        self.abandoned = False
+        self.alert: Optional[tuple[str, Exception]] = None
+        self.remaining: tuple[AlertCallback, ...] = ()
+
 
 class AlertManager:
     """Dispatch callbacks on policy violations."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        asynchronous: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        maxsize: int = DEFAULT_MAXSIZE,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        callback_timeout: Optional[float] = DEFAULT_CALLBACK_TIMEOUT,
+        schedule: Optional[Callable[[float, Callable[[], None]], Any]] = None,
+        name: str = "pyisolate-alerts",
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
         self._subs: list[AlertCallback] = []
+        self.asynchronous = asynchronous
+        self.workers = workers
+        self.maxsize = maxsize
+        self.coalesce_window = coalesce_window
+        self.callback_timeout = callback_timeout
+        # Arms callback deadlines; ``TimerWheel.call_later`` or compatible.
+        self._schedule = schedule
+        self._name = name
+        self._cond = threading.Condition(threading.Lock())
+        # (sandbox, error, callbacks still to run, or None for all of them).
+        self._queue: deque[
+            tuple[str, Exception, Optional[tuple[AlertCallback, ...]]]
+        ] = deque()
+        self._workers: dict[_Worker, threading.Thread] = {}
+        # (sandbox, error type) -> when its coalescing window opened.
+        self._recent: dict[tuple[str, type], float] = {}
+        self._closed = False
+        self._enqueued = 0
+        self._dispatched = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._failed = 0
+        self._timed_out = 0
 
     def register(self, callback: AlertCallback) -> None:
         self._subs.append(callback)
 
     def notify(self, sandbox: str, error: Exception) -> list[Exception]:
+        """Report *error* from *sandbox* to every registered callback.
+
+        Synchronously, returns the exceptions callbacks raised. In
+        asynchronous mode the alert is only queued, and the result is empty.
+        """
+        if self.asynchronous:
+            self._enqueue(sandbox, error)
+            return []
         errors: list[Exception] = []
         for cb in list(self._subs):
             try:
@@ -24,3 +141,143 @@ class AlertManager:
                 errors.append(exc)
                 logger.exception("alert callback %r failed for sandbox %s", cb, sandbox)
         return errors
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued alerts are dispatched; ``False`` on timeout.
+
+        Callbacks that were abandoned after ``callback_timeout`` are not
+        waited for.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or any(w.busy and not w.abandoned for w in self._workers):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting alerts and dispatch those already queued."""
+        with self._cond:
+            self._closed = True
+        self.flush(timeout)
+
+    def stats(self) -> AlertStats:
+        """Return dispatch counters and the current queue depth."""
+        with self._cond:
+            return AlertStats(
+                enqueued=self._enqueued,
+                dispatched=self._dispatched,
+                coalesced=self._coalesced,
+                dropped=self._dropped,
+                failed=self._failed,
+                timed_out=self._timed_out,
+                queued=len(self._queue),
+                workers=len(self._workers),
+            )
+
+    def _enqueue(self, sandbox: str, error: Exception) -> None:
+        key = (sandbox, type(error))
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self._dropped += 1
+                return
+            opened = self._recent.get(key)
+            if opened is not None and now - opened < self.coalesce_window:
+                self._coalesced += 1
+                return
+            if len(self._queue) >= self.maxsize:
+                self._dropped += 1
+                return
+            if len(self._recent) >= self.maxsize:
+                self._recent = {
+                    k: t
+                    for k, t in self._recent.items()
+                    if now - t < self.coalesce_window
+                }
+            self._recent[key] = now
+            self._queue.append((sandbox, error, None))
+            self._enqueued += 1
+            self._spawn_locked()
+
+    def _spawn_locked(self) -> None:
+        idle = sum(1 for w in self._workers if not w.busy)
+        if idle >= len(self._queue) or len(self._workers) >= self.workers:
+            return
+        worker = _Worker()
+        thread = threading.Thread(
+            target=self._run, args=(worker,), name=self._name, daemon=True
+        )
+        self._workers[worker] = thread
+        thread.start()
+
+    def _run(self, worker: _Worker) -> None:
+        while True:
+            with self._cond:
+                if worker.abandoned or not self._queue:
+                    if not worker.abandoned:
+                        del self._workers[worker]
+                    self._cond.notify_all()
+                    return
+                sandbox, error, callbacks = self._queue.popleft()
+                if callbacks is None:
+                    callbacks = tuple(self._subs)
+                    self._dispatched += 1
+                worker.busy = True
+                worker.alert = (sandbox, error)
+            for index, cb in enumerate(callbacks):
+                with self._cond:
+                    if worker.abandoned:
+                        break
+                    worker.seq += 1
+                    worker.remaining = callbacks[index + 1 :]
+                    timer = self._arm(worker, worker.seq)
+                try:
+                    cb(sandbox, error)
+                except Exception:
+                    with self._cond:
+                        self._failed += 1
+                    logger.exception(
+                        "alert callback %r failed for sandbox %s", cb, sandbox
+                    )
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+            with self._cond:
+                worker.busy = False
+                worker.alert = None
+                worker.remaining = ()
+                self._cond.notify_all()
+
+    def _arm(self, worker: _Worker, seq: int) -> Any:
+        if self.callback_timeout is None:
+            return None
+        schedule = self._schedule
+        if schedule is None:
+            from ..runtime.timers import shared_timer_wheel
+
+            schedule = shared_timer_wheel().call_later
+        return schedule(self.callback_timeout, lambda: self._overdue(worker, seq))
+
+    def _overdue(self, worker: _Worker, seq: int) -> None:
+        # Runs on the timer thread: give up on the worker's current callback,
+        # requeue the alert's remaining callbacks and start a replacement.
+        with self._cond:
+            alert = worker.alert
+            if worker.seq != seq or alert is None or worker.abandoned:
+                return
+            worker.abandoned = True
+            self._timed_out += 1
+            del self._workers[worker]
+            sandbox, error = alert
+            if worker.remaining:
+                self._queue.appendleft((sandbox, error, worker.remaining))
+            self._spawn_locked()
+            self._cond.notify_all()
+        logger.warning(
+            "alert callback for sandbox %s exceeded %.1fs; abandoning it",
+            sandbox,
+            self.callback_timeout,
+        )
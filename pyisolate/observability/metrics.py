@@ -1,13 +1,68 @@
-"""Simple Prometheus text exporter for sandbox metrics.
+"""Prometheus exporter for sandbox metrics.
 
 The real project would export statistics gathered from eBPF maps.  This
 implementation gathers ``SandboxThread.stats`` from the supervisor and formats
-them as standard Prometheus ``Gauge`` metrics.  It is intentionally minimal but
-useful for tests and examples.
+them as standard Prometheus metrics.
+
+Scrapes are cheap enough for many replicas polling thousands of sandboxes:
+
+* label strings and sample prefixes are built once per sandbox, and a
+  sandbox's samples are only re-formatted when its stats change;
+* stats are sampled without copying denial logs; per-label denial counts are
+  kept by the sandbox as denials happen;
+* :class:`MetricsServer` serves the exposition over HTTP from a cache that is
+  regenerated at most every ``max_age`` seconds, gzip-compressed once per
+  regeneration, in the Prometheus text or OpenMetrics format the scraper asks
+  for.
+
+Each exposition reports how long the previous one took to render as
+``pyisolate_scrape_duration_seconds``.
 """
 
+from __future__ import annotations
+
+import gzip
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable, Optional
+
+__all__ = ["MetricsExporter", "MetricsServer"]
+
+logger = logging.getLogger(__name__)
+
 LATENCY_BUCKET_ORDER = ["0.5", "1", "5", "10", "inf"]
 
+TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# (name, type, help) of every family, in exposition order.
+_FAMILIES = (
+    ("pyisolate_cpu_ms", "gauge", "CPU time consumed by sandbox in milliseconds"),
+    ("pyisolate_mem_bytes", "gauge", "Resident memory used by sandbox in bytes"),
+    ("pyisolate_errors_total", "counter", "Total errors encountered by sandbox"),
+    ("pyisolate_denials_total", "counter", "Total denied operations by sandbox"),
+    (
+        "pyisolate_denial_events_total",
+        "counter",
+        "Structured denied operations labeled by decision dimensions",
+    ),
+    ("pyisolate_cost", "gauge", "Internal cost score for sandbox"),
+    (
+        "pyisolate_latency_ms",
+        "histogram",
+        "Sandbox operation latency in milliseconds",
+    ),
+)
+
+_SCRAPE_DURATION = (
+    "pyisolate_scrape_duration_seconds",
+    "gauge",
+    "Time taken to render the previous metrics exposition",
+)
+
 
 def _escape_label(value: str) -> str:
     """Escape a label value according to the Prometheus text exposition format.
@@ -20,107 +75,317 @@ def _escape_label(value: str) -> str:
     return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
 
 
+def _metadata(name: str, typ: str, help_text: str, openmetrics: bool) -> str:
+    # OpenMetrics names a counter family without its ``_total`` sample suffix.
+    if openmetrics and typ == "counter" and name.endswith("_total"):
+        name = name[: -len("_total")]
+    return f"# HELP {name} {help_text}\n# TYPE {name} {typ}\n"
+
+
+def _count_denials(denials: Iterable[Any]) -> dict[tuple[str, str, str, str], int]:
+    counts: dict[tuple[str, str, str, str], int] = {}
+    for event in denials:
+        if hasattr(event, "to_dict"):
+            event = event.to_dict()
+        key = (
+            str(event.get("capability", "unknown")),
+            str(event.get("policy_rule", "unknown")),
+            str(event.get("kernel_decision", "unknown")),
+            str(event.get("broker_decision", "unknown")),
+        )
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+class _SandboxSeries:
+    """Pre-built label strings and the last rendered samples of one sandbox."""
+
+    def __init__(self, name: str) -> None:
+        label = f'sandbox="{_escape_label(name)}"'
+        self.label = label
+        self.cpu = f"pyisolate_cpu_ms{{{label}}} "
+        self.mem = f"pyisolate_mem_bytes{{{label}}} "
+        self.errors = f"pyisolate_errors_total{{{label}}} "
+        self.denials = f"pyisolate_denials_total{{{label}}} "
+        self.cost = f"pyisolate_cost{{{label}}} "
+        self.buckets = [
+            f'pyisolate_latency_ms_bucket{{{label},le="{le}"}} '
+            for le in (*LATENCY_BUCKET_ORDER[:-1], "+Inf")
+        ]
+        self.count = f"pyisolate_latency_ms_count{{{label}}} "
+        self.sum = f"pyisolate_latency_ms_sum{{{label}}} "
+        self._denial_prefixes: dict[tuple[str, str, str, str], str] = {}
+        self.key: Any = None
+        # One pre-joined chunk of sample lines per family in ``_FAMILIES``.
+        self.chunks: tuple[str, ...] = ()
+
+    def update(self, stats: Any) -> None:
+        latency = stats.latency
+        # Emit the canonical +Inf bucket while still accepting either "inf"
+        # (legacy/internal) or "+Inf" in source stats.
+        counts = [latency.get(bucket, 0) for bucket in LATENCY_BUCKET_ORDER[:-1]]
+        counts.append(latency.get("inf", latency.get("+Inf", 0)))
+        denial_counts = getattr(stats, "denial_counts", None)
+        if not denial_counts:
+            denial_counts = _count_denials(getattr(stats, "denials", ()))
+        key = (
+            stats.cpu_ms,
+            stats.mem_bytes,
+            stats.errors,
+            stats.operations,
+            stats.cost,
+            stats.latency_sum,
+            tuple(counts),
+            tuple(denial_counts.items()),
+        )
+        if key == self.key:
+            return
+        self.key = key
+        events = []
+        for labels, count in denial_counts.items():
+            prefix = self._denial_prefixes.get(labels)
+            if prefix is None:
+                capability, policy_rule, kernel, broker = map(_escape_label, labels)
+                prefix = self._denial_prefixes[labels] = (
+                    f"pyisolate_denial_events_total{{{self.label},"
+                    f'capability="{capability}",policy_rule="{policy_rule}",'
+                    f'kernel_decision="{kernel}",broker_decision="{broker}"}} '
+                )
+            events.append(f"{prefix}{count}\n")
+        cumul = 0
+        latency_lines = []
+        for prefix, count in zip(self.buckets, counts):
+            cumul += count
+            latency_lines.append(f"{prefix}{cumul}\n")
+        latency_lines.append(f"{self.count}{stats.operations}\n")
+        latency_lines.append(f"{self.sum}{stats.latency_sum:.3f}\n")
+        self.chunks = (
+            f"{self.cpu}{stats.cpu_ms:.0f}\n",
+            f"{self.mem}{stats.mem_bytes}\n",
+            f"{self.errors}{stats.errors}\n",
+            f"{self.denials}{sum(denial_counts.values())}\n",
+            "".join(events),
+            f"{self.cost}{stats.cost:.6f}\n",
+            "".join(latency_lines),
+        )
+
+
 class MetricsExporter:
-    def export(self) -> str:
-        """Return metrics for all active sandboxes in Prometheus text format."""
-
-        from ..supervisor import list_active
-
-        lines: list[str] = []
-        described: set[str] = set()
-
-        def emit(name: str, help_text: str, typ: str, sample: str) -> None:
-            if name not in described:
-                lines.append(f"# HELP {name} {help_text}")
-                lines.append(f"# TYPE {name} {typ}")
-                described.add(name)
-            lines.append(sample)
-
-        active = list_active()
-        for name in sorted(active):
-            sb = active[name]
-            stats = sb.stats
-            label = _escape_label(name)
-            emit(
-                "pyisolate_cpu_ms",
-                "CPU time consumed by sandbox in milliseconds",
-                "gauge",
-                f'pyisolate_cpu_ms{{sandbox="{label}"}} {stats.cpu_ms:.0f}',
-            )
-            emit(
-                "pyisolate_mem_bytes",
-                "Resident memory used by sandbox in bytes",
-                "gauge",
-                f'pyisolate_mem_bytes{{sandbox="{label}"}} {stats.mem_bytes}',
-            )
-            emit(
-                "pyisolate_errors_total",
-                "Total errors encountered by sandbox",
-                "counter",
-                f'pyisolate_errors_total{{sandbox="{label}"}} {stats.errors}',
-            )
-            denials = getattr(stats, "denials", [])
-            emit(
-                "pyisolate_denials_total",
-                "Total denied operations by sandbox",
-                "counter",
-                f'pyisolate_denials_total{{sandbox="{label}"}} {len(denials)}',
+    """Renders the stats of every active sandbox as a metrics exposition."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._series: dict[str, _SandboxSeries] = {}
+        # Seconds the previous export took, reported by the next one.
+        self.last_duration: Optional[float] = None
+
+    def export(self, *, openmetrics: bool = False) -> str:
+        """Return metrics for all active sandboxes.
+
+        The Prometheus text format is returned by default; ``openmetrics=True``
+        returns the OpenMetrics text format, terminated by ``# EOF``.
+        """
+
+        from ..supervisor import active_items
+
+        with self._lock:
+            started = time.perf_counter()
+            active = dict(active_items())
+            series = self._series
+            for name in [name for name in series if name not in active]:
+                del series[name]
+            ordered = []
+            for name in sorted(active):
+                entry = series.get(name)
+                if entry is None:
+                    entry = series[name] = _SandboxSeries(name)
+                sb = active[name]
+                sample = getattr(sb, "sample_stats", None)
+                entry.update(sample(denials=False) if sample else sb.stats)
+                ordered.append(entry)
+
+            parts: list[str] = []
+            if ordered:
+                for index, (name, typ, help_text) in enumerate(_FAMILIES):
+                    samples = "".join(entry.chunks[index] for entry in ordered)
+                    if samples:
+                        parts.append(_metadata(name, typ, help_text, openmetrics))
+                        parts.append(samples)
+            if self.last_duration is not None:
+                parts.append(_metadata(*_SCRAPE_DURATION, openmetrics))
+                parts.append(f"{_SCRAPE_DURATION[0]} {self.last_duration:.6f}\n")
+            if openmetrics:
+                parts.append("# EOF\n")
+            text = "".join(parts)
+            self.last_duration = time.perf_counter() - started
+            return text
+
+
+def _media_ranges(header: str) -> dict[str, float]:
+    """Map each media type or coding in an ``Accept*`` header to its quality."""
+    ranges: dict[str, float] = {}
+    for item in header.split(","):
+        value, *params = item.split(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, raw = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        ranges[value] = max(quality, ranges.get(value, 0.0))
+    return ranges
+
+
+def _wants_openmetrics(accept: str) -> bool:
+    ranges = _media_ranges(accept)
+    openmetrics = ranges.get("application/openmetrics-text", 0.0)
+    text = max(ranges.get("text/plain", 0.0), ranges.get("*/*", 0.0))
+    return openmetrics > 0 and openmetrics >= text
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    ranges = _media_ranges(accept_encoding)
+    return ranges.get("gzip", ranges.get("*", 0.0)) > 0
+
+
+@dataclass
+class _Exposition:
+    body: bytes
+    generated: float
+    gzipped: Optional[bytes] = None
+
+
+class MetricsServer:
+    """Serves :class:`MetricsExporter` output over HTTP.
+
+    An exposition is rendered at most once every *max_age* seconds per format
+    and shared by every scraper in that window; concurrent scrapes of a stale
+    exposition wait for one render rather than each rendering their own.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        exporter: Optional[MetricsExporter] = None,
+        max_age: float = 1.0,
+        path: str = "/metrics",
+    ) -> None:
+        if max_age < 0:
+            raise ValueError("max_age must not be negative")
+        self.exporter = exporter if exporter is not None else MetricsExporter()
+        self.max_age = max_age
+        self.path = path
+        self._host = host
+        self._port = port
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._cache: dict[bool, _Exposition] = {}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MetricsServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The bound ``(host, port)``; the port is chosen at :meth:`start`."""
+        with self._lock:
+            if self._httpd is None:
+                return self._host, self._port
+            host, port = self._httpd.server_address[:2]
+            return str(host), int(port)
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}{self.path}"
+
+    def start(self) -> None:
+        """Bind the socket and serve on a background thread."""
+        with self._lock:
+            if self._httpd is not None:
+                return
+            self._httpd = ThreadingHTTPServer(
+                (self._host, self._port), self._handler_class()
             )
-            for event in denials:
-                if hasattr(event, "to_dict"):
-                    event = event.to_dict()
-                capability = _escape_label(str(event.get("capability", "unknown")))
-                policy_rule = _escape_label(str(event.get("policy_rule", "unknown")))
-                kernel_decision = _escape_label(
-                    str(event.get("kernel_decision", "unknown"))
-                )
-                broker_decision = _escape_label(
-                    str(event.get("broker_decision", "unknown"))
-                )
-                emit(
-                    "pyisolate_denial_events_total",
-                    "Structured denied operations labeled by decision dimensions",
-                    "counter",
-                    (
-                        f'pyisolate_denial_events_total{{sandbox="{label}",'
-                        f'capability="{capability}",policy_rule="{policy_rule}",'
-                        f'kernel_decision="{kernel_decision}",'
-                        f'broker_decision="{broker_decision}"}} 1'
-                    ),
-                )
-            emit(
-                "pyisolate_cost",
-                "Internal cost score for sandbox",
-                "gauge",
-                f'pyisolate_cost{{sandbox="{label}"}} {stats.cost:.6f}',
+            self._httpd.daemon_threads = True
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever,
+                args=(0.05,),
+                name="pyisolate-metrics-server",
+                daemon=True,
             )
-            cumul = 0
-            for bucket in LATENCY_BUCKET_ORDER:
-                if bucket == "inf":
-                    count = stats.latency.get("inf", stats.latency.get("+Inf", 0))
-                else:
-                    count = stats.latency.get(bucket, 0)
-                cumul += count
-                # Emit Prometheus canonical +Inf label while still accepting
-                # either "inf" (legacy/internal) or "+Inf" in source stats.
-                le = "+Inf" if bucket == "inf" else bucket
-                emit(
-                    "pyisolate_latency_ms",
-                    "Sandbox operation latency in milliseconds",
-                    "histogram",
-                    f'pyisolate_latency_ms_bucket{{sandbox="{label}",le="{le}"}} {cumul}',
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        with self._lock:
+            httpd, self._httpd = self._httpd, None
+            thread, self._thread = self._thread, None
+        if httpd is None:
+            return
+        httpd.shutdown()
+        httpd.server_close()
+        if thread is not None:
+            thread.join()
+
+    def exposition(self, *, openmetrics: bool = False, gzipped: bool = False) -> bytes:
+        """Return the cached exposition body, rendering it if it is stale."""
+        with self._render_lock:
+            entry = self._cache.get(openmetrics)
+            now = time.monotonic()
+            if entry is None or now - entry.generated >= self.max_age:
+                text = self.exporter.export(openmetrics=openmetrics)
+                entry = _Exposition(text.encode("utf-8"), time.monotonic())
+                self._cache[openmetrics] = entry
+            if not gzipped:
+                return entry.body
+            if entry.gzipped is None:
+                entry.gzipped = gzip.compress(entry.body, compresslevel=6, mtime=0)
+            return entry.gzipped
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != server.path:
+                    self.send_error(404)
+                    return
+                openmetrics = _wants_openmetrics(self.headers.get("Accept", ""))
+                compress = _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+                try:
+                    body = server.exposition(openmetrics=openmetrics, gzipped=compress)
+                except Exception:
+                    logger.exception("rendering metrics failed")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE,
                 )
-            emit(
-                "pyisolate_latency_ms",
-                "Sandbox operation latency in milliseconds",
-                "histogram",
-                f'pyisolate_latency_ms_count{{sandbox="{label}"}} {stats.operations}',
-            )
-            emit(
-                "pyisolate_latency_ms",
-                "Sandbox operation latency in milliseconds",
-                "histogram",
-                f'pyisolate_latency_ms_sum{{sandbox="{label}"}} {stats.latency_sum:.3f}',
-            )
+                if compress:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Vary", "Accept, Accept-Encoding")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("metrics %s - %s", self.address_string(), format % args)
 
-        return "\n".join(lines) + ("\n" if lines else "")
+        return Handler
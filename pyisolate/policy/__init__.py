@@ -3,7 +3,6 @@
 import logging
 import os
 import socket
-import tempfile
 import urllib.parse
 import urllib.request
 from collections.abc import Iterable, Mapping
@@ -72,11 +71,14 @@ except ModuleNotFoundError:  # minimal fallback when PyYAML is unavailable
 
 
 from ..capabilities import ConnectTCP, CpuBudget, Import, ReadPath, WritePath
+from .cache import PolicyCache, freeze_policy_set, shared_policy_cache
 from .compiler import (  # noqa: F401
     CompiledPolicy,
     PolicyCompilerError,
     SandboxPolicy,
+    _compile_text,
     compile_policy,
+    compile_policy_data,
 )
 from .model import (  # noqa: F401
     FilesystemRule,
@@ -87,6 +89,12 @@ from .model import (  # noqa: F401
     from_sandbox_policy,
     from_yaml_dict,
     to_bpf_map_entries,
+    to_bpf_map_state,
+)
+from .remote import (  # noqa: F401
+    _MAX_REMOTE_POLICY_BYTES,
+    RemotePolicyStats,
+    RemotePolicyWatcher,
 )
 
 logger = logging.getLogger(__name__)
@@ -228,45 +236,53 @@ def _validate(data: object) -> None:
             raise ValueError(f'"{section}" must be a mapping')
 
 
-def refresh(path: str, token: str, *, dry_run: bool = False):
-    """Parse *path* and atomically update eBPF policy maps."""
-
+def _compile_validated(text: str) -> CompiledPolicy:
     # Fail fast if the YAML is malformed/schema-invalid before compiling/reloading.
-    with open(path, "r", encoding="utf-8") as fh:
-        try:
-            data = yaml.safe_load(fh)
-        except Exception as exc:  # broad due to optional parser
-            raise ValueError(f"invalid YAML: {exc}") from None
+    try:
+        data = yaml.safe_load(text)
+    except Exception as exc:  # broad due to optional parser
+        raise ValueError(f"invalid YAML: {exc}") from None
 
     _validate(data)
 
     # Compile only after schema/version validation passes.
-    compiled = compile_policy(path)
+    return _compile_text(text)
 
-    import json
 
-    if compiled.deny_log:
-        for line in compiled.deny_log:
-            logger.warning("policy deny rule active: %s", line)
+def _runtime_validated(text: str) -> RuntimePolicySet:
+    return freeze_policy_set(from_compiled_policy(_compile_validated(text)))
+
+
+def _dry_run(text: str) -> CompiledPolicy:
+    compiled = _compile_validated(text)
+    for line in compiled.deny_log:
+        logger.warning("policy deny rule active: %s", line)
+    return compiled
 
-    if dry_run:
-        return compiled
 
-    # Write the compiled representation for the BPF manager
-    with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as tmp:
-        json.dump(from_compiled_policy(compiled).to_dict(), tmp)
-        json_path = Path(tmp.name)
+def _apply(policy_set: RuntimePolicySet, token: str) -> None:
+    for line in policy_set.deny_log:
+        logger.warning("policy deny rule active: %s", line)
 
     # Upon successful parse, swap the live maps via the supervisor
-    try:
-        from ..supervisor import reload_policy
+    from ..supervisor import apply_policy
 
-        reload_policy(str(json_path.resolve()), token)
-    finally:
-        try:
-            os.unlink(json_path)
-        except OSError:
-            pass
+    apply_policy(policy_set, token)
+
+
+def refresh(path: str, token: str, *, dry_run: bool = False):
+    """Parse *path* and atomically update eBPF policy maps.
+
+    The compiled policy is memoized by file content, so refreshing an
+    unchanged file does not parse it again, and is handed to the supervisor
+    in memory.
+    """
+
+    if dry_run:
+        with open(path, "r", encoding="utf-8") as fh:
+            return _dry_run(fh.read())
+
+    _apply(shared_policy_cache().load(path, _runtime_validated), token)
 
 
 def _is_timeout_error(exc: Exception) -> bool:
@@ -277,11 +293,6 @@ def _is_timeout_error(exc: Exception) -> bool:
     return False
 
 
-# Policy documents are small YAML files; the bound exists because the response
-# body comes from the network and is buffered in full before validation.
-_MAX_REMOTE_POLICY_BYTES = 1 << 20  # 1 MiB
-
-
 def refresh_remote(
     url: str,
     token: str,
@@ -290,7 +301,11 @@ def refresh_remote(
     *,
     dry_run: bool = False,
 ):
-    """Fetch policy YAML from *url* over HTTP(S) and apply it."""
+    """Fetch policy YAML from *url* over HTTP(S) and apply it.
+
+    Every call downloads and applies the document; :class:`RemotePolicyWatcher`
+    polls a URL and applies only changes.
+    """
     scheme = urllib.parse.urlsplit(url).scheme.lower()
     if scheme not in {"http", "https"}:
         raise ValueError(f"policy URL scheme must be http or https, got {scheme!r}")
@@ -318,14 +333,9 @@ def refresh_remote(
                 ) from exc
             raise
 
-    with tempfile.NamedTemporaryFile("w", delete=False, suffix=".yml") as tmp:
-        tmp.write(text)
-        tmp_path = tmp.name
-
-    try:
-        return refresh(tmp_path, token, dry_run=dry_run)
-    finally:
-        os.unlink(tmp_path)
+    if dry_run:
+        return _dry_run(text)
+    _apply(shared_policy_cache().load_text(text, _runtime_validated), token)
 
 
 def _policy_root():
@@ -360,7 +370,7 @@ def _runtime_policy_from_sandbox(sandbox_policy: SandboxPolicy) -> RuntimePolicy
 
 
 def _runtime_policy_from_dict(data: dict) -> RuntimePolicy:
-    policy_set = from_yaml_dict(data)
+    policy_set = shared_policy_cache().runtime_from_mapping(data)
     if "default" in policy_set.sandboxes:
         return policy_set.sandbox("default")
     if len(policy_set.sandboxes) == 1:
@@ -402,6 +412,8 @@ def resolve_policy(policy: str | Policy | SandboxPolicy | CompiledPolicy | dict
 
     String inputs are fail-closed: they must name an existing file in ``policy/``
     or a supported named policy, otherwise :class:`PolicyCompilerError` is raised.
+    String and mapping inputs are compiled once per distinct content and the
+    resulting immutable :class:`RuntimePolicy` is shared between calls.
     """
 
     if policy is None or isinstance(policy, (Policy, RuntimePolicy)):
@@ -414,12 +426,21 @@ def resolve_policy(policy: str | Policy | SandboxPolicy | CompiledPolicy | dict
         return _runtime_policy_from_dict(policy)
     if isinstance(policy, str):
         path = _resolve_policy_path(policy)
-        compiled = compile_policy(path)
-        selector = path.stem if path.stem in compiled.sandboxes else policy
-        return _runtime_policy_from_sandbox(_select_sandbox_policy(compiled, selector))
+        policy_set = shared_policy_cache().runtime(path)
+        selector = path.stem if path.stem in policy_set.sandboxes else policy
+        return _select_sandbox_policy(policy_set, selector)
     raise ValueError(f"unsupported policy type: {type(policy).__name__}")
 
 
+def invalidate_policy_cache(path: str | os.PathLike[str] | None = None) -> None:
+    """Drop memoized compilations of *path*, or of every policy when ``None``.
+
+    Entries are keyed by content, so an edited file is recompiled without
+    this; it is for files whose timestamps cannot be trusted.
+    """
+    shared_policy_cache().invalidate(path)
+
+
 __all__ = [
     "Policy",
     "ReadPath",
@@ -429,10 +450,14 @@ __all__ = [
     "CpuBudget",
     "refresh",
     "compile_policy",
+    "compile_policy_data",
     "PolicyCompilerError",
     "refresh_remote",
     "resolve_policy",
     "NAMED_POLICIES",
     "SandboxPolicy",
     "CompiledPolicy",
+    "PolicyCache",
+    "RemotePolicyWatcher",
+    "invalidate_policy_cache",
 ]
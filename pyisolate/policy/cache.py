@@ -0,0 +1,193 @@
+"""Memoized policy compilation.
+
+Resolving a named policy, reloading a policy file or spawning through
+``sdk.sandbox`` used to re-read the YAML, re-parse it and re-resolve its
+inheritance every time, even though the document rarely changes.
+:class:`PolicyCache` compiles each distinct document once:
+
+* files are keyed by the SHA-256 of their contents. A per-path index of
+  ``(mtime_ns, size, inode)`` skips re-reading a file whose metadata is
+  unchanged; a file modified within the last second is always re-hashed,
+  since a second write in the same timestamp tick would otherwise go unseen;
+* mappings are keyed by the SHA-256 of their canonical JSON form.
+
+Cached values are canonical :class:`~pyisolate.policy.model.RuntimePolicySet`
+objects whose sandboxes mapping is read-only, so they are shared between
+callers rather than copied. The cache is a bounded LRU;
+:meth:`PolicyCache.invalidate` drops entries explicitly, for example before a
+hot reload from a filesystem whose timestamps cannot be trusted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Mapping, Optional, TypeVar
+
+from .compiler import _compile_text
+from .model import RuntimePolicySet, from_compiled_policy, from_yaml_dict
+
+__all__ = [
+    "PolicyCache",
+    "PolicyCacheStats",
+    "freeze_policy_set",
+    "shared_policy_cache",
+]
+
+DEFAULT_MAXSIZE = 128
+"""Compiled documents kept by the shared cache."""
+
+_RACY_WINDOW_NS = 1_000_000_000
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PolicyCacheStats:
+    """Counters reported by :meth:`PolicyCache.stats`."""
+
+    hits: int
+    misses: int
+    entries: int
+    maxsize: int
+
+
+def freeze_policy_set(policy_set: RuntimePolicySet) -> RuntimePolicySet:
+    """Return *policy_set* with a read-only sandboxes mapping."""
+    if isinstance(policy_set.sandboxes, MappingProxyType):
+        return policy_set
+    return replace(policy_set, sandboxes=MappingProxyType(dict(policy_set.sandboxes)))
+
+
+def _runtime_from_text(text: str) -> RuntimePolicySet:
+    return freeze_policy_set(from_compiled_policy(_compile_text(text)))
+
+
+class PolicyCache:
+    """Bounded LRU of compiled policies keyed by content."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        # Resolved path -> (mtime_ns, size, inode, sha256 of the contents).
+        self._files: OrderedDict[str, tuple[int, int, int, str]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def runtime(self, path: str | os.PathLike[str]) -> RuntimePolicySet:
+        """Return the compiled policy set of the YAML file at *path*."""
+        return self.load(path, _runtime_from_text)
+
+    def runtime_from_mapping(self, data: Mapping[str, Any]) -> RuntimePolicySet:
+        """Return the compiled policy set of a YAML-shaped mapping."""
+        try:
+            canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            # Not JSON-shaped, so no stable key: compile without caching.
+            return freeze_policy_set(from_yaml_dict(data))
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return self._get(
+            ("mapping", digest), lambda: freeze_policy_set(from_yaml_dict(data))
+        )
+
+    def load(self, path: str | os.PathLike[str], build: Callable[[str], T]) -> T:
+        """Return ``build(text)`` for the file at *path*, memoized by content.
+
+        *build* is part of the key, so one file can be cached in several
+        forms. It must return an object callers will not mutate.
+        """
+        resolved = os.path.realpath(path)
+        st = os.stat(resolved)
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            known = self._files.get(resolved)
+            if (
+                known is not None
+                and known[:3] == signature
+                and time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS
+                and (build, known[3]) in self._entries
+            ):
+                self._hits += 1
+                self._entries.move_to_end((build, known[3]))
+                return self._entries[(build, known[3])]
+        with open(resolved, "rb") as fh:
+            raw = fh.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            self._files[resolved] = (*signature, digest)
+            self._files.move_to_end(resolved)
+            while len(self._files) > self.maxsize:
+                self._files.popitem(last=False)
+        return self._get((build, digest), lambda: build(raw.decode("utf-8")))
+
+    def load_text(self, text: str, build: Callable[[str], T]) -> T:
+        """Return ``build(text)`` memoized by content, as :meth:`load` does."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self._get((build, digest), lambda: build(text))
+
+    def _get(self, key: Hashable, build: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self._misses += 1
+        # Compile without the lock; a concurrent miss may compile it twice.
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, path: str | os.PathLike[str] | None = None) -> None:
+        """Forget *path*'s compiled forms, or every entry when *path* is ``None``."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._files.clear()
+                return
+            known = self._files.pop(os.path.realpath(path), None)
+            if known is None:
+                return
+            digest = known[3]
+            for key in [
+                k for k in self._entries if isinstance(k, tuple) and k[1] == digest
+            ]:
+                del self._entries[key]
+
+    def stats(self) -> PolicyCacheStats:
+        """Return hit and miss counts and the current size."""
+        with self._lock:
+            return PolicyCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+
+_shared: Optional[PolicyCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_policy_cache() -> PolicyCache:
+    """Return the process-wide cache used by the policy helpers."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PolicyCache()
+        return _shared
@@ -9,6 +9,7 @@ same path.
 
 from __future__ import annotations
 
+from collections.abc import Hashable, Mapping
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List
@@ -95,11 +96,13 @@ def _simple_parse(text: str) -> Dict[str, Any]:
     return data
 
 
-def _compile_fs(rules: List[dict], sb_name: str) -> List[FSRule]:
+def _compile_fs(
+    rules: List[dict], sb_name: str, seen: Dict[str, str] | None = None
+) -> List[FSRule]:
     compiled: List[FSRule] = []
-    seen: Dict[str, str] = {}
+    seen = {} if seen is None else seen
     for rule in rules:
-        if not isinstance(rule, dict) or len(rule) != 1:
+        if not isinstance(rule, Mapping) or len(rule) != 1:
             raise PolicyCompilerError(f"invalid fs rule in '{sb_name}': {rule}")
         action, path = next(iter(rule.items()))
         if action not in ("allow", "deny", "read", "write"):
@@ -118,16 +121,18 @@ def _compile_fs(rules: List[dict], sb_name: str) -> List[FSRule]:
     return compiled
 
 
-def _compile_tcp(rules: List[dict], sb_name: str) -> List[TCPRule]:
+def _compile_tcp(
+    rules: List[dict], sb_name: str, seen: Dict[str, str] | None = None
+) -> List[TCPRule]:
     compiled: List[TCPRule] = []
-    seen: Dict[str, str] = {}
+    seen = {} if seen is None else seen
     for rule in rules:
-        if not isinstance(rule, dict) or len(rule) != 1:
+        if not isinstance(rule, Mapping) or len(rule) != 1:
             raise PolicyCompilerError(f"invalid net rule in '{sb_name}': {rule}")
         action, addr = next(iter(rule.items()))
         if action not in ("connect", "deny"):
             raise PolicyCompilerError(f"invalid net action '{action}' in '{sb_name}'")
-        addresses = addr if isinstance(addr, list) else [addr]
+        addresses = addr if isinstance(addr, (list, tuple)) else [addr]
         for address in addresses:
             if not isinstance(address, str):
                 raise PolicyCompilerError(
@@ -142,92 +147,254 @@ def _compile_tcp(rules: List[dict], sb_name: str) -> List[TCPRule]:
     return compiled
 
 
+def _compile_imports(modules: list, sb_name: str) -> List[str]:
+    for module in modules:
+        if not isinstance(module, str):
+            raise PolicyCompilerError(
+                f"import rules in '{sb_name}' must be strings: {module!r}"
+            )
+    return list(modules)
+
+
+class _CompiledRules:
+    """The compiled form of one field's inherited rule list.
+
+    A child's rule list starts with its parent's, so the child's compiled
+    form is the parent's extended with its own rules, without re-validating
+    or re-building what it inherits.
+    """
+
+    __slots__ = ("field", "count", "rules", "capabilities", "denied", "_seen")
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        # Number of source items compiled, i.e. the inherited prefix length.
+        self.count = 0
+        self.rules: list = []
+        self.capabilities: list[object] = []
+        self.denied: list[str] = []
+        self._seen: Dict[str, str] = {}
+
+    def extended(self, items: list, sb_name: str) -> "_CompiledRules":
+        """Return this compiled form followed by *items*, checked in *sb_name*."""
+        new = _CompiledRules(self.field)
+        new.count = self.count + len(items)
+        new._seen = dict(self._seen)
+        if self.field == "fs":
+            rules: list = _compile_fs(items, sb_name, new._seen)
+            capabilities: list[object] = []
+            for rule in rules:
+                if rule.action == "allow":
+                    capabilities.extend([ReadPath(rule.path), WritePath(rule.path)])
+                elif rule.action == "read":
+                    capabilities.append(ReadPath(rule.path))
+                elif rule.action == "write":
+                    capabilities.append(WritePath(rule.path))
+            denied = [f"fs={r.path}" for r in rules if r.action == "deny"]
+        elif self.field == "net":
+            rules = _compile_tcp(items, sb_name, new._seen)
+            capabilities = []
+            for tcp_rule in rules:
+                if tcp_rule.action == "connect":
+                    try:
+                        capabilities.append(ConnectTCP.from_address(tcp_rule.addr))
+                    except ValueError:
+                        pass
+            denied = [f"net={r.addr}" for r in rules if r.action == "deny"]
+        else:
+            rules = _compile_imports(items, sb_name)
+            capabilities = [Import(module) for module in rules]
+            denied = []
+        new.rules = self.rules + rules
+        new.capabilities = self.capabilities + capabilities
+        new.denied = self.denied + denied
+        return new
+
+
 def _norm_rule_list(value: object, *, field_name: str, sb_name: str) -> list:
     if value is None:
         return []
-    if not isinstance(value, list):
+    if not isinstance(value, (list, tuple)):
         raise PolicyCompilerError(f"'{field_name}' in '{sb_name}' must be a list")
-    return value
-
-
-def _merge_unique(parent: list, child: list) -> list:
-    merged = list(parent)
-    for item in child:
-        if item not in merged:
-            merged.append(item)
-    return merged
-
-
-def _resolve_sandbox(
-    name: str, raw_boxes: dict[str, dict[str, Any]], defaults: dict[str, Any]
-) -> dict[str, Any]:
-    resolved: dict[str, dict[str, Any]] = {}
-    resolving: set[str] = set()
-
-    def _resolve(current: str) -> dict[str, Any]:
-        if current in resolved:
-            return resolved[current]
-        if current in resolving:
-            raise PolicyCompilerError(f"cyclic inheritance detected at '{current}'")
-        if current not in raw_boxes:
-            raise PolicyCompilerError(f"unknown parent sandbox '{current}'")
-        resolving.add(current)
-        cfg = raw_boxes[current]
-        parent_name = cfg.get("extends")
-        parent_cfg: dict[str, Any] = {}
-        if parent_name is not None:
+    return list(value)
+
+
+def _rule_key(item: object) -> Hashable:
+    """Return a hashable stand-in for *item* that compares equal when it does."""
+    if isinstance(item, Mapping):
+        return (Mapping, frozenset((k, _rule_key(v)) for k, v in item.items()))
+    if isinstance(item, list):
+        return (list, tuple(_rule_key(v) for v in item))
+    if isinstance(item, tuple):
+        return (tuple, tuple(_rule_key(v) for v in item))
+    hash(item)
+    return item
+
+
+class _RuleList:
+    """An inherited rule list plus the keys of its items, for O(1) membership."""
+
+    __slots__ = ("items", "_keys")
+
+    def __init__(self, items: list, keys: set[Hashable]) -> None:
+        self.items = items
+        self._keys = keys
+
+    @classmethod
+    def of(cls, items: list) -> "_RuleList":
+        rules = cls(list(items), set())
+        for item in rules.items:
+            try:
+                rules._keys.add(_rule_key(item))
+            except TypeError:
+                pass  # unhashable: found by the linear scan in _contains
+        return rules
+
+    def _contains(self, item: object) -> bool:
+        try:
+            return _rule_key(item) in self._keys
+        except TypeError:
+            return item in self.items
+
+    def extended(self, child: list) -> "_RuleList":
+        """Return these rules followed by the items of *child* not yet present."""
+        if not child:
+            return self
+        merged = _RuleList(list(self.items), set(self._keys))
+        for item in child:
+            if not merged._contains(item):
+                merged.items.append(item)
+                try:
+                    merged._keys.add(_rule_key(item))
+                except TypeError:
+                    pass
+        return merged
+
+
+class _InheritanceResolver:
+    """Resolves ``extends`` chains of one document.
+
+    Each sandbox is resolved once and reused by every sandbox extending it,
+    so a document of many sandboxes sharing a few templates costs one merge
+    per sandbox rather than one per ancestor. Chains are walked iteratively,
+    so their depth is not limited by the recursion limit.
+    """
+
+    def __init__(
+        self,
+        raw_boxes: Mapping[str, Mapping[str, Any]],
+        defaults: Mapping[str, Any],
+    ) -> None:
+        self._raw = raw_boxes
+        self._defaults = defaults
+        self._base: dict[str, _RuleList] | None = None
+        self._resolved: dict[str, dict[str, Any]] = {}
+        self._compiled: dict[tuple[str | None, str], _CompiledRules] = {}
+
+    def resolve(self, name: str) -> dict[str, Any]:
+        """Return the ``fs``/``net``/``imports`` lists and ``cpu_ms`` of *name*."""
+        chain: list[str] = []
+        pending: set[str] = set()
+        current = name
+        while current not in self._resolved:
+            if current in pending:
+                raise PolicyCompilerError(f"cyclic inheritance detected at '{current}'")
+            if current not in self._raw:
+                raise PolicyCompilerError(f"unknown parent sandbox '{current}'")
+            pending.add(current)
+            chain.append(current)
+            parent_name = self._raw[current].get("extends")
+            if parent_name is None:
+                break
             if not isinstance(parent_name, str):
                 raise PolicyCompilerError(f"'extends' in '{current}' must be a string")
-            parent_cfg = _resolve(parent_name)
-        base = {
-            "fs": _merge_unique(
-                _norm_rule_list(
-                    defaults.get("fs", []), field_name="fs", sb_name=current
-                ),
-                _norm_rule_list(
-                    parent_cfg.get("fs", []), field_name="fs", sb_name=current
-                ),
-            ),
-            "net": _merge_unique(
-                _norm_rule_list(
-                    defaults.get("net", defaults.get("tcp", [])),
-                    field_name="net",
-                    sb_name=current,
-                ),
-                _norm_rule_list(
-                    parent_cfg.get("net", parent_cfg.get("tcp", [])),
-                    field_name="net",
-                    sb_name=current,
+            current = parent_name
+        for box in reversed(chain):
+            self._resolved[box] = self._inherit(box)
+        resolved = self._resolved[name]
+        return {
+            "fs": resolved["fs"].items,
+            "net": resolved["net"].items,
+            "imports": resolved["imports"].items,
+            "cpu_ms": resolved["cpu_ms"],
+        }
+
+    def compiled(self, name: str, field: str) -> _CompiledRules:
+        """Return the compiled ``fs``, ``net`` or ``imports`` rules of *name*.
+
+        *name* must have been resolved. Its ancestors' compiled rules are
+        reused, and any still missing are compiled here with errors reported
+        against *name*, as if its whole rule list had been compiled at once.
+        """
+        chain: list[str] = []
+        current: str | None = name
+        while current is not None and (current, field) not in self._compiled:
+            chain.append(current)
+            current = self._raw[current].get("extends")
+        if current is None:
+            base = self._compiled.get((None, field))
+            if base is None:
+                items = self._defaults_for(name)[field].items
+                base = _CompiledRules(field).extended(items, name)
+                self._compiled[(None, field)] = base
+        else:
+            base = self._compiled[(current, field)]
+        for box in reversed(chain):
+            items = self._resolved[box][field].items
+            base = base.extended(items[base.count :], name)
+            self._compiled[(box, field)] = base
+        return base
+
+    def _defaults_for(self, sb_name: str) -> dict[str, _RuleList]:
+        if self._base is None:
+            defaults = self._defaults
+            self._base = {
+                "fs": _RuleList.of(
+                    _norm_rule_list(
+                        defaults.get("fs", []), field_name="fs", sb_name=sb_name
+                    )
                 ),
-            ),
-            "imports": _merge_unique(
-                _norm_rule_list(
-                    defaults.get("imports", []), field_name="imports", sb_name=current
+                "net": _RuleList.of(
+                    _norm_rule_list(
+                        defaults.get("net", defaults.get("tcp", [])),
+                        field_name="net",
+                        sb_name=sb_name,
+                    )
                 ),
-                _norm_rule_list(
-                    parent_cfg.get("imports", []), field_name="imports", sb_name=current
+                "imports": _RuleList.of(
+                    _norm_rule_list(
+                        defaults.get("imports", []),
+                        field_name="imports",
+                        sb_name=sb_name,
+                    )
                 ),
-            ),
-        }
-        child_fs = _norm_rule_list(cfg.get("fs", []), field_name="fs", sb_name=current)
+            }
+        return self._base
+
+    def _inherit(self, name: str) -> dict[str, Any]:
+        cfg = self._raw[name]
+        parent_name = cfg.get("extends")
+        if parent_name is None:
+            # Without a parent the sandbox starts from the defaults; a parent
+            # already starts with them.
+            parent: Mapping[str, Any] = self._defaults_for(name)
+            inherited_cpu = self._defaults.get("cpu_ms")
+        else:
+            parent = self._resolved[parent_name]
+            inherited_cpu = parent["cpu_ms"]
+        child_fs = _norm_rule_list(cfg.get("fs", []), field_name="fs", sb_name=name)
         child_net = _norm_rule_list(
-            cfg.get("net", cfg.get("tcp", [])), field_name="net", sb_name=current
+            cfg.get("net", cfg.get("tcp", [])), field_name="net", sb_name=name
         )
         child_imports = _norm_rule_list(
-            cfg.get("imports", []), field_name="imports", sb_name=current
+            cfg.get("imports", []), field_name="imports", sb_name=name
         )
-        cpu_ms = cfg.get("cpu_ms", parent_cfg.get("cpu_ms", defaults.get("cpu_ms")))
-        out = {
-            "fs": _merge_unique(base["fs"], child_fs),
-            "net": _merge_unique(base["net"], child_net),
-            "imports": _merge_unique(base["imports"], child_imports),
-            "cpu_ms": cpu_ms,
+        return {
+            "fs": parent["fs"].extended(child_fs),
+            "net": parent["net"].extended(child_net),
+            "imports": parent["imports"].extended(child_imports),
+            "cpu_ms": cfg.get("cpu_ms", inherited_cpu),
         }
-        resolving.remove(current)
-        resolved[current] = out
-        return out
-
-    return _resolve(name)
 
 
 def compile_policy(path: str | Path) -> CompiledPolicy:
@@ -235,7 +402,10 @@ def compile_policy(path: str | Path) -> CompiledPolicy:
 
     with open(path, "r", encoding="utf-8") as fh:
         text = fh.read()
+    return _compile_text(text)
+
 
+def _compile_text(text: str) -> CompiledPolicy:
     if hasattr(yaml, "__file__"):
         data = yaml.safe_load(text) or {}
     else:
@@ -246,6 +416,19 @@ def compile_policy(path: str | Path) -> CompiledPolicy:
 
     if not isinstance(data, dict):
         raise PolicyCompilerError("policy document must be a mapping")
+    return compile_policy_data(data)
+
+
+def compile_policy_data(data: Mapping[str, Any]) -> CompiledPolicy:
+    """Validate and compile an already-parsed policy document.
+
+    *data* has the shape of the YAML DSL, for example the result of
+    ``yaml.safe_load`` or :meth:`pyisolate.policy.Policy.to_dict`. It is not
+    modified.
+    """
+
+    if not isinstance(data, Mapping):
+        raise PolicyCompilerError("policy document must be a mapping")
 
     schema_version = str(data.get("version", "0.1"))
     if schema_version not in {"0.1", "1", "1.0"}:
@@ -254,35 +437,26 @@ def compile_policy(path: str | Path) -> CompiledPolicy:
     defaults = data.get("defaults", {})
     if defaults is None:
         defaults = {}
-    if not isinstance(defaults, dict):
+    if not isinstance(defaults, Mapping):
         raise PolicyCompilerError("'defaults' must be a mapping")
 
     sandboxes = data.get("sandboxes")
     if sandboxes is None:
         sb_cfg = {k: v for k, v in data.items() if k != "version"}
         sandboxes = {"default": sb_cfg}
-    if not isinstance(sandboxes, dict):
+    if not isinstance(sandboxes, Mapping):
         raise PolicyCompilerError("missing or invalid 'sandboxes' section")
 
     compiled_boxes: Dict[str, SandboxPolicy] = {}
     deny_log: list[str] = []
+    resolver = _InheritanceResolver(sandboxes, defaults)
     for name, cfg in sandboxes.items():
-        if not isinstance(cfg, dict):
+        if not isinstance(cfg, Mapping):
             raise PolicyCompilerError(f"sandbox '{name}' must be a mapping")
-        resolved_cfg = _resolve_sandbox(name, sandboxes, defaults)
-        fs_raw = resolved_cfg.get("fs", [])
-        fs_compiled = _compile_fs(fs_raw, name)
-        tcp_raw = resolved_cfg.get("net", [])
-        tcp_compiled = _compile_tcp(tcp_raw, name)
-
-        imports_raw = resolved_cfg.get("imports", [])
-        imports: list[str] = []
-        for module in imports_raw:
-            if not isinstance(module, str):
-                raise PolicyCompilerError(
-                    f"import rules in '{name}' must be strings: {module!r}"
-                )
-            imports.append(module)
+        resolved_cfg = resolver.resolve(name)
+        fs = resolver.compiled(name, "fs")
+        tcp = resolver.compiled(name, "net")
+        imports = resolver.compiled(name, "imports")
 
         cpu_ms = resolved_cfg.get("cpu_ms")
         if cpu_ms is not None:
@@ -291,37 +465,19 @@ def compile_policy(path: str | Path) -> CompiledPolicy:
                     f"cpu_ms in '{name}' must be a positive integer"
                 )
 
-        capabilities: list[object] = []
-        for rule in fs_compiled:
-            if rule.action == "allow":
-                capabilities.extend([ReadPath(rule.path), WritePath(rule.path)])
-            elif rule.action == "read":
-                capabilities.append(ReadPath(rule.path))
-            elif rule.action == "write":
-                capabilities.append(WritePath(rule.path))
-        for tcp_rule in tcp_compiled:
-            if tcp_rule.action == "connect":
-                try:
-                    capabilities.append(ConnectTCP.from_address(tcp_rule.addr))
-                except ValueError:
-                    pass
-        capabilities.extend(Import(module) for module in imports)
+        capabilities = fs.capabilities + tcp.capabilities + imports.capabilities
         if cpu_ms is not None:
             capabilities.append(CpuBudget(cpu_ms))
 
         compiled_boxes[name] = SandboxPolicy(
-            fs=fs_compiled,
-            tcp=tcp_compiled,
-            imports=imports,
+            fs=list(fs.rules),
+            tcp=list(tcp.rules),
+            imports=list(imports.rules),
             capabilities=capabilities,
             cpu_ms=cpu_ms,
         )
-        deny_log.extend(
-            [f"sandbox={name} fs={r.path}" for r in fs_compiled if r.action == "deny"]
-        )
-        deny_log.extend(
-            [f"sandbox={name} net={r.addr}" for r in tcp_compiled if r.action == "deny"]
-        )
+        deny_log.extend(f"sandbox={name} {rule}" for rule in fs.denied)
+        deny_log.extend(f"sandbox={name} {rule}" for rule in tcp.denied)
 
     return CompiledPolicy(
         schema_version="1.0" if schema_version == "1" else schema_version,
@@ -337,5 +493,6 @@ __all__ = [
     "SandboxPolicy",
     "TCPRule",
     "compile_policy",
+    "compile_policy_data",
     "PolicyCompilerError",
 ]
@@ -9,7 +9,6 @@ updates both normalize inputs into :class:`RuntimePolicySet` first.
 from __future__ import annotations
 
 from dataclasses import asdict, dataclass, field
-from pathlib import Path
 from typing import Any, Mapping
 
 
@@ -344,35 +343,17 @@ def from_compiled_policy(compiled: Any) -> RuntimePolicySet:
 def from_yaml_dict(data: Mapping[str, Any]) -> RuntimePolicySet:
     """Compile a YAML dictionary into the canonical runtime policy set."""
 
-    import tempfile
+    from .compiler import compile_policy_data
 
-    from .compiler import compile_policy
-
-    try:
-        import yaml  # type: ignore
-    except ModuleNotFoundError:  # pragma: no cover - package fallback
-        from . import yaml  # type: ignore[attr-defined]
-
-    tmp = tempfile.NamedTemporaryFile("w", delete=False, suffix=".yml")
-    # Capture the name before writing so cleanup runs even if the dump raises;
-    # delete=False means a failed serialization would otherwise leak the file.
-    tmp_path = tmp.name
-    try:
-        with tmp:
-            if hasattr(yaml, "safe_dump"):
-                yaml.safe_dump(dict(data), tmp)
-            else:  # pragma: no cover - only used with the minimal fallback parser
-                tmp.write(str(dict(data)))
-        return from_compiled_policy(compile_policy(tmp_path))
-    finally:
-        Path(tmp_path).unlink(missing_ok=True)
+    return from_compiled_policy(compile_policy_data(data))
 
 
 def to_bpf_map_entries(policy_set: RuntimePolicySet) -> list[tuple[str, str, str]]:
     """Translate canonical policies to concrete BPF map update entries.
 
-    Each returned tuple is ``(map_name, key, value)``.  The string values are the
-    stable user-space encoding passed to ``bpftool`` by the placeholder manager.
+    Each returned tuple is ``(map_name, key, value)``.  Keys are positional
+    (``sandbox:index``), so inserting one rule renumbers every later rule of the
+    same kind; hot reloads use the content-addressed :func:`to_bpf_map_state`.
     """
 
     entries: list[tuple[str, str, str]] = []
@@ -395,6 +376,41 @@ def to_bpf_map_entries(policy_set: RuntimePolicySet) -> list[tuple[str, str, str
     return entries
 
 
+def to_bpf_map_state(policy_set: RuntimePolicySet) -> dict[tuple[str, str], str]:
+    """Return the map contents for *policy_set* as ``{(map_name, key): value}``.
+
+    Keys are content-addressed -- ``sandbox:path``, ``sandbox:destination`` or
+    ``sandbox:module`` -- so a rule keeps its key when rules around it are
+    added or removed, and two policy sets can be diffed entry by entry.
+    Filesystem allow values carry the access mode (``readwrite:/srv/**``); an
+    allow path listed more than once gets the union of its modes.
+    """
+
+    state: dict[tuple[str, str], str] = {}
+    for sandbox_name in sorted(policy_set.sandboxes):
+        policy = policy_set.sandboxes[sandbox_name]
+        access: dict[str, set[str]] = {}
+        for rule in policy.allow_fs:
+            modes = access.setdefault(rule.path, set())
+            modes.update(
+                ("read", "write") if rule.access == "readwrite" else (rule.access,)
+            )
+        for path, modes in access.items():
+            mode = "readwrite" if len(modes) == 2 else next(iter(modes))
+            state[("policy_fs_allow", f"{sandbox_name}:{path}")] = f"{mode}:{path}"
+        for rule in policy.deny_fs:
+            state[("policy_fs_deny", f"{sandbox_name}:{rule.path}")] = rule.path
+        for net_rule in policy.allow_tcp:
+            key = f"{sandbox_name}:{net_rule.destination}"
+            state[("policy_net_allow", key)] = net_rule.destination
+        for net_rule in policy.deny_tcp:
+            key = f"{sandbox_name}:{net_rule.destination}"
+            state[("policy_net_deny", key)] = net_rule.destination
+        for module in policy.imports:
+            state[("policy_import_allow", f"{sandbox_name}:{module}")] = module
+    return state
+
+
 __all__ = [
     "FilesystemRule",
     "NetworkRule",
@@ -404,4 +420,5 @@ __all__ = [
     "from_sandbox_policy",
     "from_yaml_dict",
     "to_bpf_map_entries",
+    "to_bpf_map_state",
 ]
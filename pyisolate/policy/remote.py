@@ -0,0 +1,315 @@
+"""Polling of a remote policy document.
+
+:func:`pyisolate.policy.refresh_remote` downloads, compiles and applies a
+document every time it is called. :class:`RemotePolicyWatcher` polls one URL
+on a background thread and applies the document only when it changed:
+
+* requests are conditional (``If-None-Match`` / ``If-Modified-Since``), so an
+  unchanged document costs a ``304 Not Modified`` and no body;
+* a ``200`` whose body hashes to the document last applied is not compiled
+  or applied again;
+* one keep-alive connection is reused across polls and reopened when the
+  server closes it;
+* failures back off exponentially, with jitter, up to ``max_backoff``.
+
+:meth:`RemotePolicyWatcher.stats` reports the version last applied and the
+latency of the last fetch and apply.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import logging
+import random
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Optional
+
+__all__ = ["RemotePolicyStats", "RemotePolicyWatcher"]
+
+logger = logging.getLogger(__name__)
+
+# Policy documents are small YAML files; the bound exists because the response
+# body comes from the network and is buffered in full before validation.
+_MAX_REMOTE_POLICY_BYTES = 1 << 20  # 1 MiB
+
+APPLIED = "applied"
+NOT_MODIFIED = "not-modified"
+UNCHANGED = "unchanged"
+
+
+@dataclass(frozen=True)
+class RemotePolicyStats:
+    """Counters and last-poll details reported by :meth:`RemotePolicyWatcher.stats`."""
+
+    polls: int
+    applied: int
+    not_modified: int
+    """Polls answered with ``304 Not Modified``."""
+    unchanged: int
+    """Polls whose body matched the document already applied."""
+    errors: int
+    consecutive_errors: int
+    version: Optional[str]
+    """ETag of the applied document, or ``sha256:<digest>`` without one."""
+    digest: Optional[str]
+    applied_at: Optional[float]
+    """Wall-clock time the current document was applied."""
+    fetch_seconds: Optional[float]
+    """Latency of the last request, from send to end of body."""
+    apply_seconds: Optional[float]
+    """Compile and reload time of the last applied document."""
+    last_error: Optional[str]
+
+
+class RemotePolicyWatcher:
+    """Polls *url* and applies its policy document when it changes."""
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        *,
+        interval: float = 30.0,
+        timeout: float = 10.0,
+        max_backoff: float = 300.0,
+        jitter: float = 0.1,
+        name: str = "pyisolate-policy-watcher",
+    ) -> None:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in {"http", "https"}:
+            raise ValueError(f"policy URL scheme must be http or https, got {scheme!r}")
+        if not parts.hostname:
+            raise ValueError(f"policy URL has no host: {url!r}")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in [0, 1)")
+        self.url = url
+        self.interval = interval
+        self.timeout = timeout
+        self.max_backoff = max(max_backoff, interval)
+        self.jitter = jitter
+        self._token = token
+        self._scheme = scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._target = urllib.parse.urlunsplit(
+            ("", "", parts.path or "/", parts.query, "")
+        )
+        self._name = name
+        self._random = random.Random()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        # Serializes polls; the stats lock is never held across network I/O.
+        self._poll_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._polls = 0
+        self._applied = 0
+        self._not_modified = 0
+        self._unchanged = 0
+        self._errors = 0
+        self._consecutive_errors = 0
+        self._version: Optional[str] = None
+        self._digest: Optional[str] = None
+        self._applied_at: Optional[float] = None
+        self._fetch_seconds: Optional[float] = None
+        self._apply_seconds: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    def __enter__(self) -> "RemotePolicyWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start polling on a background thread; the first poll is immediate."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=self._name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling, wait for the thread and close the connection."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._poll_lock:
+            self._close()
+
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def poll(self) -> str:
+        """Fetch the document once and apply it if it changed.
+
+        Returns ``"applied"``, ``"not-modified"`` or ``"unchanged"``. Fetch,
+        validation and reload errors propagate after being counted.
+        """
+        with self._poll_lock:
+            try:
+                outcome = self._poll()
+            except Exception as exc:
+                with self._lock:
+                    self._polls += 1
+                    self._errors += 1
+                    self._consecutive_errors += 1
+                    self._last_error = f"{type(exc).__name__}: {exc}"
+                raise
+        with self._lock:
+            self._polls += 1
+            self._consecutive_errors = 0
+            self._last_error = None
+            if outcome == NOT_MODIFIED:
+                self._not_modified += 1
+            elif outcome == UNCHANGED:
+                self._unchanged += 1
+            else:
+                self._applied += 1
+        return outcome
+
+    def stats(self) -> RemotePolicyStats:
+        """Return poll counters and details of the applied document."""
+        with self._lock:
+            return RemotePolicyStats(
+                polls=self._polls,
+                applied=self._applied,
+                not_modified=self._not_modified,
+                unchanged=self._unchanged,
+                errors=self._errors,
+                consecutive_errors=self._consecutive_errors,
+                version=self._version,
+                digest=self._digest,
+                applied_at=self._applied_at,
+                fetch_seconds=self._fetch_seconds,
+                apply_seconds=self._apply_seconds,
+                last_error=self._last_error,
+            )
+
+    def next_delay(self) -> float:
+        """Seconds to wait before the next poll.
+
+        ``interval`` while polls succeed; after *n* consecutive failures,
+        ``interval * 2**n`` capped at ``max_backoff``. Either is spread by
+        ``jitter`` so many watchers of one server do not poll in lockstep.
+        """
+        with self._lock:
+            failures = self._consecutive_errors
+        delay = self.interval
+        if failures:
+            delay = min(self.max_backoff, self.interval * 2 ** min(failures, 32))
+        return delay * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as exc:  # noqa: BLE001 - keep polling after failures
+                logger.warning("remote policy poll of %s failed: %s", self.url, exc)
+            if self._stop.wait(self.next_delay()):
+                break
+
+    def _poll(self) -> str:
+        status, headers, body, elapsed = self._fetch()
+        with self._lock:
+            self._fetch_seconds = elapsed
+        if status == 304:
+            return NOT_MODIFIED
+        if status != 200:
+            raise RuntimeError(f"policy fetch from {self.url} returned HTTP {status}")
+        digest = hashlib.sha256(body).hexdigest()
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if digest == self._digest:
+            self._etag, self._last_modified = etag, last_modified
+            return UNCHANGED
+        started = time.monotonic()
+        self._apply(body.decode("utf-8"))
+        applied_in = time.monotonic() - started
+        self._etag, self._last_modified = etag, last_modified
+        with self._lock:
+            self._digest = digest
+            self._version = etag or f"sha256:{digest}"
+            self._applied_at = time.time()
+            self._apply_seconds = applied_in
+        logger.info("applied remote policy %s from %s", self._version, self.url)
+        return APPLIED
+
+    def _apply(self, text: str) -> None:
+        from . import _apply as apply_policy_set
+        from . import _runtime_validated
+        from .cache import shared_policy_cache
+
+        policy_set = shared_policy_cache().load_text(text, _runtime_validated)
+        apply_policy_set(policy_set, self._token)
+
+    def _fetch(self) -> tuple[int, http.client.HTTPMessage, bytes, float]:
+        headers = {"Accept": "application/yaml, text/plain, */*"}
+        if self._etag is not None:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified is not None:
+            headers["If-Modified-Since"] = self._last_modified
+        # A kept-alive connection the server has since closed fails on first
+        # use; that one failure is retried on a fresh connection.
+        for attempt in (0, 1):
+            reused = self._conn is not None
+            conn = self._connection()
+            started = time.monotonic()
+            try:
+                conn.request("GET", self._target, headers=headers)
+                response = conn.getresponse()
+                body = response.read(_MAX_REMOTE_POLICY_BYTES + 1)
+            except (http.client.HTTPException, ConnectionError) as exc:
+                self._close()
+                if reused and attempt == 0:
+                    logger.debug("reconnecting to %s after %s", self.url, exc)
+                    continue
+                raise
+            except Exception:
+                self._close()
+                raise
+            elapsed = time.monotonic() - started
+            if len(body) > _MAX_REMOTE_POLICY_BYTES:
+                self._close()
+                raise ValueError(
+                    f"remote policy from {self.url} exceeds "
+                    f"{_MAX_REMOTE_POLICY_BYTES} bytes"
+                )
+            if response.will_close:
+                self._close()
+            return response.status, response.headers, body, elapsed
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self._scheme == "https":
+                self._conn = http.client.HTTPSConnection(
+                    self._host, self._port, timeout=self.timeout
+                )
+            else:
+                self._conn = http.client.HTTPConnection(
+                    self._host, self._port, timeout=self.timeout
+                )
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
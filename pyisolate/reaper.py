@@ -0,0 +1,154 @@
+"""Background teardown of exited sandboxes.
+
+Removing a dead sandbox means deleting its cgroup, removing its temp directory
+and rewriting the recovery registry (with an fsync). The supervisor used to do
+that for every dead sandbox at the start and end of each ``spawn`` and in
+``list_active``, under its registry lock, so spawn latency grew with the number
+of sandboxes that had exited and with the disk I/O their teardown cost.
+
+:class:`SandboxReaper` takes that work off the hot paths. A sandbox reports its
+own exit -- the thread backend when its run loop returns, the process backend
+when its guest is reaped or its channel closes -- by calling :meth:`notify`.
+Notifications are collected for a short window and handed to the supervisor's
+teardown callback in one batch, on a worker thread that is started on demand
+and exits as soon as nothing is left to reap.
+
+A notification may arrive slightly before the sandbox has finished exiting
+(a thread reports from the end of its run loop). Such a sandbox is retried on
+the next batch, for up to ``retry_for`` seconds; a sandbox still alive after
+that is left to the supervisor's shutdown sweep.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+__all__ = ["SandboxReaper"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW = 0.01
+"""Seconds the worker waits for more exits before tearing down a batch."""
+
+DEFAULT_RETRY_FOR = 5.0
+"""Seconds a notified sandbox that is still alive keeps being retried."""
+
+_MAX_RETRY_DELAY = 0.5
+
+
+class SandboxReaper:
+    """Batches exited sandboxes for teardown on an on-demand worker thread."""
+
+    def __init__(
+        self,
+        teardown: Callable[[list[Any]], None],
+        *,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        retry_for: float = DEFAULT_RETRY_FOR,
+        name: str = "pyisolate-reaper",
+    ) -> None:
+        if batch_window < 0:
+            raise ValueError("batch_window must not be negative")
+        self._teardown = teardown
+        self._batch_window = batch_window
+        self._retry_for = retry_for
+        self._name = name
+        self._cond = threading.Condition(threading.Lock())
+        # Sandboxes waiting for teardown, keyed by identity so a sandbox that
+        # reports its exit more than once is reaped once; the value is when it
+        # was first notified.
+        self._queued: dict[int, tuple[Any, float]] = {}
+        self._inflight: list[Any] = []
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._queued) + len(self._inflight)
+
+    def notify(self, sandbox: Any) -> None:
+        """Queue *sandbox*, which has exited or is about to, for teardown.
+
+        Cheap and non-blocking, so sandboxes may call it from their own exit
+        path. Never calls back into the sandbox.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._queued.setdefault(id(sandbox), (sandbox, time.monotonic()))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+
+    def pending(self) -> list[Any]:
+        """Sandboxes notified but not yet torn down, including a running batch."""
+        with self._cond:
+            return [sb for sb, _ in self._queued.values()] + self._inflight
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued sandbox has been handled; ``False`` on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._thread is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting notifications and wait for a running batch.
+
+        Sandboxes still queued are dropped; the supervisor sweeps its registry
+        for dead sandboxes itself when it shuts down.
+        """
+        with self._cond:
+            self._closed = True
+            self._queued.clear()
+            self._cond.notify_all()
+        self.flush(timeout)
+
+    def _run(self) -> None:
+        delay = self._batch_window
+        while True:
+            with self._cond:
+                if not self._closed:
+                    # Let exits that arrive together land in one batch.
+                    self._cond.wait(delay)
+                entries = list(self._queued.values())
+                self._queued.clear()
+                # Still reported by pending() until the teardown has run.
+                self._inflight = [sandbox for sandbox, _ in entries]
+            # ``is_alive`` may reap a process guest, which notifies again; it
+            # must run without the lock held.
+            dead: list[Any] = []
+            retry: list[tuple[Any, float]] = []
+            now = time.monotonic()
+            for sandbox, since in entries:
+                if not sandbox.is_alive():
+                    dead.append(sandbox)
+                elif now - since < self._retry_for:
+                    retry.append((sandbox, since))
+            if dead:
+                try:
+                    self._teardown(dead)
+                except Exception:  # noqa: BLE001 - keep reaping later exits
+                    logger.exception("sandbox teardown failed")
+            with self._cond:
+                self._inflight = []
+                for sandbox, since in retry:
+                    self._queued.setdefault(id(sandbox), (sandbox, since))
+                if not self._queued:
+                    self._thread = None
+                    self._cond.notify_all()
+                    return
+            if dead:
+                delay = self._batch_window
+            else:
+                # Only sandboxes still exiting are left: back off between checks.
+                delay = min(max(delay * 2, 0.001), _MAX_RETRY_DELAY)
@@ -2,6 +2,27 @@
 
 The supervisor persists lightweight sandbox metadata to allow restart-time cleanup
 of leaked resources (cgroups, temp directories) after crashes.
+
+The registry is a JSON snapshot (``supervisor_registry.json``) plus an
+append-only journal next to it (``supervisor_registry.json.journal``) holding
+one ``put`` or ``drop`` record per line. Recording a spawn or teardown appends
+a record instead of rewriting the whole registry, so its cost does not grow
+with the number of live sandboxes. Writers that arrive while an ``fsync`` is in
+progress share the next one (group commit), and a call returns only once its
+record is durable. When the journal holds more than twice as many records as
+there are live sandboxes (and at least ``_COMPACT_MIN_RECORDS``), it is folded
+into a fresh snapshot and truncated. :func:`recover` replays the snapshot and
+then the journal.
+
+Replaying a record is idempotent -- ``put`` overwrites and ``drop`` removes --
+so a crash between writing a snapshot and truncating the journal replays
+records the snapshot already contains, with the same result. A torn record at
+the end of the journal is ignored.
+
+Tenant quota reservations have their own ledger (:class:`QuotaLedger`, at
+``PYISOLATE_QUOTA_LEDGER``), compacted the same way into per-tenant totals.
+
+One supervisor process owns a registry at a time.
 """
 
 from __future__ import annotations
@@ -13,15 +34,15 @@ import shutil
 import tempfile
 import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Mapping, Optional
 
 log = logging.getLogger(__name__)
 
-# Serializes read-modify-write access to the on-disk registry so concurrent
-# supervisor operations (spawn/drop from different threads) neither lose
-# updates nor race on the temporary file used for the atomic replace.
+# Guards the choice of journal: tests (and embedders) repoint _REGISTRY_PATH.
 _REGISTRY_LOCK = threading.Lock()
 
+_COMPACT_MIN_RECORDS = 1024
+
 _STATE_ROOT = Path(
     os.environ.get("PYISOLATE_STATE_ROOT", Path(tempfile.gettempdir()) / "pyisolate")
 )
@@ -84,32 +105,228 @@ def _write_registry(sandboxes: dict[str, dict[str, Any]]) -> None:
     _atomic_write_json(_REGISTRY_PATH, {"sandboxes": sandboxes})
 
 
+def _journal_path() -> Path:
+    return _REGISTRY_PATH.with_name(_REGISTRY_PATH.name + ".journal")
+
+
+def _apply(sandboxes: dict[str, dict[str, Any]], record: Any) -> bool:
+    """Apply one journal record; ``False`` if it is not a valid record."""
+    if not isinstance(record, dict) or not isinstance(record.get("name"), str):
+        return False
+    op = record.get("op")
+    if op == "put" and isinstance(record.get("meta"), dict):
+        sandboxes[record["name"]] = dict(record["meta"])
+        return True
+    if op == "drop":
+        sandboxes.pop(record["name"], None)
+        return True
+    return False
+
+
+def _replay_journal(path: Path, sandboxes: dict[str, dict[str, Any]]) -> int:
+    """Apply the records in *path* to *sandboxes*; return how many there were."""
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return 0
+    except OSError as exc:
+        log.warning("failed to read recovery journal %s: %s", path, exc)
+        return 0
+    lines = data.split(b"\n")
+    # Everything after the last newline is a record whose write never finished.
+    complete, torn = lines[:-1], lines[-1]
+    if torn:
+        log.warning("ignoring torn record at the end of recovery journal %s", path)
+    applied = 0
+    for line in complete:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if _apply(sandboxes, record):
+            applied += 1
+        else:
+            log.warning("skipping invalid record in recovery journal %s", path)
+    return applied
+
+
+class _Journal:
+    """The open journal for one registry path, with its replayed state."""
+
+    def __init__(self, snapshot: Path) -> None:
+        self.snapshot = snapshot
+        self.path = _journal_path()
+        self.sandboxes = _read_registry()
+        snapshot_valid = bool(self.sandboxes) or not snapshot.exists()
+        self.records = _replay_journal(self.path, self.sandboxes)
+        _ensure_parent(self.path)
+        # Records, durability bookkeeping and compaction are guarded by _lock;
+        # _sync_cond coordinates the group commit.
+        self._lock = threading.Lock()
+        self._sync_cond = threading.Condition(threading.Lock())
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+        if self.records or not snapshot_valid:
+            # Start from a clean snapshot and an empty journal; this also
+            # resets a corrupt snapshot and drops a torn final record.
+            self._fd = -1
+            self._compact_locked()
+        self._fd = os.open(
+            self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o600
+        )
+        if self.path.stat().st_size:
+            os.ftruncate(self._fd, 0)
+
+    def append(self, records: list[dict[str, Any]]) -> bool:
+        """Apply *records* and return once they are durable on disk.
+
+        ``False`` if this journal was closed first; nothing was written.
+        """
+        data = b"".join(
+            json.dumps(record, sort_keys=True, separators=(",", ":")).encode() + b"\n"
+            for record in records
+        )
+        with self._lock:
+            if self._fd < 0:
+                return False
+            for record in records:
+                _apply(self.sandboxes, record)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self._fd, view) :]
+            self._appended += 1
+            ticket = self._appended
+            self.records += len(records)
+            if self.records > max(_COMPACT_MIN_RECORDS, 2 * len(self.sandboxes)):
+                # The snapshot is fsynced, which makes these records durable
+                # too; nothing is left for the group commit to do.
+                self._compact_locked()
+                self._mark_synced(ticket)
+                return True
+        self._commit(ticket)
+        return True
+
+    def _commit(self, ticket: int) -> None:
+        """Group commit: wait until an ``fsync`` covering *ticket* completes.
+
+        The first writer to find no ``fsync`` in progress runs one for every
+        record appended so far; writers that arrive meanwhile wait for it and,
+        if it started before their write, run the next.
+        """
+        with self._sync_cond:
+            while self._synced < ticket:
+                if self._syncing:
+                    self._sync_cond.wait()
+                    continue
+                self._syncing = True
+                covered = self._appended
+                self._sync_cond.release()
+                try:
+                    os.fsync(self._fd)
+                finally:
+                    self._sync_cond.acquire()
+                    self._syncing = False
+                    self._synced = max(self._synced, covered)
+                    self._sync_cond.notify_all()
+
+    def _mark_synced(self, ticket: int) -> None:
+        with self._sync_cond:
+            self._synced = max(self._synced, ticket)
+            self._sync_cond.notify_all()
+
+    def _compact_locked(self) -> None:
+        _atomic_write_json(self.snapshot, {"sandboxes": self.sandboxes})
+        if self._fd >= 0:
+            os.ftruncate(self._fd, 0)
+        self.records = 0
+
+    def close(self) -> None:
+        """Make every appended record durable and close the journal."""
+        with self._lock:
+            if self._fd < 0:
+                return
+            with self._sync_cond:
+                while self._syncing:
+                    self._sync_cond.wait()
+                try:
+                    os.fsync(self._fd)
+                finally:
+                    os.close(self._fd)
+                    self._fd = -1
+                    # Writers still waiting for a group commit are covered.
+                    self._synced = self._appended
+                    self._sync_cond.notify_all()
+
+
+_journal: Optional[_Journal] = None
+
+
+def _get_journal() -> _Journal:
+    global _journal
+    with _REGISTRY_LOCK:
+        if _journal is None or _journal.snapshot != _REGISTRY_PATH:
+            if _journal is not None:
+                _journal.close()
+            _journal = _Journal(_REGISTRY_PATH)
+        return _journal
+
+
 def recover() -> dict[str, dict[str, Any]]:
-    """Load persisted sandbox metadata.
+    """Load persisted sandbox metadata: the snapshot, then the journal.
 
-    Corrupt registries are tolerated and reset to an empty map.
+    Corrupt registries are tolerated and reset to an empty map. The journal is
+    compacted into the snapshot on the way.
     """
 
+    global _journal
     with _REGISTRY_LOCK:
-        sandboxes = _read_registry()
-        if not sandboxes and _REGISTRY_PATH.exists():
-            # Normalize a corrupt/invalid registry to empty valid JSON.
-            _write_registry({})
-    return sandboxes
+        # Replay from disk rather than trusting what this process last wrote.
+        if _journal is not None:
+            _journal.close()
+            _journal = None
+    journal = _get_journal()
+    with journal._lock:
+        return {name: dict(meta) for name, meta in journal.sandboxes.items()}
+
+
+def _append(records: list[dict[str, Any]]) -> None:
+    # A journal closed under us (recover() reopening it) takes no records;
+    # the replacement does.
+    while not _get_journal().append(records):
+        pass
 
 
 def update_sandbox(name: str, meta: dict[str, Any]) -> None:
-    with _REGISTRY_LOCK:
-        sandboxes = _read_registry()
-        sandboxes[name] = dict(meta)
-        _write_registry(sandboxes)
+    _append([{"op": "put", "name": name, "meta": dict(meta)}])
+
+
+def update_sandboxes(entries: Mapping[str, dict[str, Any]]) -> None:
+    """Record several sandboxes with one journal write and one ``fsync``."""
+    records = [
+        {"op": "put", "name": name, "meta": dict(meta)}
+        for name, meta in entries.items()
+    ]
+    if records:
+        _append(records)
 
 
 def drop_sandbox(name: str) -> None:
-    with _REGISTRY_LOCK:
-        sandboxes = _read_registry()
-        sandboxes.pop(name, None)
-        _write_registry(sandboxes)
+    drop_sandboxes([name])
+
+
+def drop_sandboxes(names: Iterable[str]) -> None:
+    """Remove several sandboxes with one journal write and one ``fsync``."""
+
+    journal = _get_journal()
+    with journal._lock:
+        records = [
+            {"op": "drop", "name": name}
+            for name in dict.fromkeys(names)
+            if name in journal.sandboxes
+        ]
+    if records:
+        _append(records)
 
 
 def _validate_name(name: str) -> str:
@@ -163,3 +380,255 @@ def cleanup_temp_orphans(active_names: set[str]) -> list[Path]:
         cleanup_temp_dir(child)
         removed.append(child)
     return removed
+
+
+class QuotaLedger:
+    """Durable per-tenant reservation counts: a delta log plus a snapshot.
+
+    The ledger file holds one ``tenant,delta`` line per reservation and
+    release; a tenant that would not survive that format (a comma, a line
+    break, a leading ``[`` or ``#``) is written as a JSON ``[tenant, delta]``
+    array instead. Lines are buffered and written in batches: once ``flush_every``
+    are pending, or ``flush_interval`` seconds after the first, through
+    *schedule* (``TimerWheel.call_later``, say) when one is given, and always
+    on :meth:`flush` and :meth:`close`. A crash loses at most the pending
+    batch. The scheduled callback only starts a flusher thread, which does
+    the write (and any compaction, with its fsync) and then exits, so the
+    scheduler's thread never waits on the disk.
+
+    Once the ledger holds ``compact_every`` lines its totals are written to a
+    JSON snapshot beside it (``<ledger>.snapshot``) and the ledger is replaced
+    by a header line naming the next *epoch*. The snapshot records the epoch
+    it covers up to, so a crash between the two steps is detected at
+    :meth:`load` -- the ledger's epoch is older than the snapshot's -- and the
+    already-counted lines are skipped. Loading reads the snapshot and at most
+    ``compact_every`` lines, however long the host has been up. A ledger
+    without a header, as written before snapshots existed, is epoch 0; a long
+    one is compacted the first time it is loaded.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        flush_every: int = 256,
+        flush_interval: float = 0.05,
+        compact_every: int = 100_000,
+        schedule: Optional[Callable[[float, Callable[[], None]], Any]] = None,
+    ) -> None:
+        if flush_every < 1 or compact_every < 1:
+            raise ValueError("flush_every and compact_every must be positive")
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_name(self.path.name + ".snapshot")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self._schedule = schedule
+        self._lock = threading.Lock()
+        self._totals: dict[str, int] = {}
+        self._pending: list[str] = []
+        self._flush_armed = False
+        self._flusher_cond = threading.Condition(threading.Lock())
+        self._flusher: Optional[threading.Thread] = None
+        self._flush_requested = False
+        self._epoch = 0
+        self._lines = 0
+        self._fd = -1
+        self._closed = False
+
+    def load(self) -> dict[str, int]:
+        """Replay the snapshot and the ledger; return the per-tenant totals."""
+        with self._lock:
+            snap_epoch, totals = self._read_snapshot()
+            epoch, deltas, end = self._read_ledger()
+            if end is not None:
+                # Cut off a torn last line so the next append starts a line.
+                os.truncate(self.path, end)
+            stale = epoch < snap_epoch
+            if stale:
+                # Crashed after writing the snapshot but before resetting the
+                # ledger: the snapshot already counts every line in it.
+                deltas = []
+                epoch = snap_epoch
+            for tenant, delta in deltas:
+                totals[tenant] = totals.get(tenant, 0) + delta
+            self._totals = totals
+            self._epoch = epoch
+            self._lines = len(deltas)
+            if stale or self._lines >= self.compact_every:
+                self._compact_locked()
+            self._open_locked()
+            return dict(totals)
+
+    def record(self, tenant: str, delta: int) -> None:
+        """Buffer one reservation (``+1``) or release (``-1``)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._totals[tenant] = self._totals.get(tenant, 0) + delta
+            self._pending.append(_ledger_line(tenant, delta))
+            if len(self._pending) >= self.flush_every or self._schedule is None:
+                self._flush_locked()
+            elif not self._flush_armed:
+                self._flush_armed = True
+                self._schedule(self.flush_interval, self._request_flush)
+
+    def compact(self) -> None:
+        """Flush, then fold the ledger into the snapshot now."""
+        with self._lock:
+            self._flush_locked()
+            if not self._closed:
+                self._compact_locked()
+
+    def flush(self) -> None:
+        """Write every pending line now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _request_flush(self) -> None:
+        # Runs on the scheduler's thread: hand the flush to a flusher thread,
+        # started on demand, rather than writing here.
+        with self._flusher_cond:
+            self._flush_requested = True
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run_flusher,
+                    name="pyisolate-quota-ledger",
+                    daemon=True,
+                )
+                self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while True:
+            with self._flusher_cond:
+                if not self._flush_requested:
+                    self._flusher = None
+                    self._flusher_cond.notify_all()
+                    return
+                self._flush_requested = False
+            try:
+                self.flush()
+            except OSError:
+                log.exception("failed to flush quota ledger %s", self.path)
+
+    def close(self) -> None:
+        """Flush and close; later records are ignored."""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+    def _flush_locked(self) -> None:
+        self._flush_armed = False
+        if not self._pending or self._closed:
+            return
+        if self._fd < 0:
+            self._open_locked()
+        view = memoryview("".join(self._pending).encode("utf-8"))
+        while view:
+            view = view[os.write(self._fd, view) :]
+        self._lines += len(self._pending)
+        self._pending.clear()
+        if self._lines >= self.compact_every:
+            self._compact_locked()
+
+    def _open_locked(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+        _ensure_parent(self.path)
+        self._fd = os.open(
+            self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o600
+        )
+
+    def _compact_locked(self) -> None:
+        epoch = self._epoch + 1
+        totals = {tenant: n for tenant, n in self._totals.items() if n}
+        # The snapshot goes first: until the ledger is replaced, a reader sees
+        # a ledger epoch older than the snapshot's and skips its lines.
+        _atomic_write_json(self.snapshot_path, {"epoch": epoch, "totals": totals})
+        _ensure_parent(self.path)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=str(self.path.parent), prefix=f"{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(f"#epoch,{epoch}\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._epoch = epoch
+        self._lines = 0
+        if self._fd >= 0:
+            self._open_locked()
+
+    def _read_snapshot(self) -> tuple[int, dict[str, int]]:
+        try:
+            data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return 0, {}
+        except (OSError, ValueError) as exc:
+            log.warning("failed to read quota snapshot %s: %s", self.snapshot_path, exc)
+            return 0, {}
+        epoch = data.get("epoch") if isinstance(data, dict) else None
+        totals = data.get("totals") if isinstance(data, dict) else None
+        if not isinstance(epoch, int) or not isinstance(totals, dict):
+            log.warning("invalid quota snapshot %s", self.snapshot_path)
+            return 0, {}
+        return epoch, {
+            tenant: n
+            for tenant, n in totals.items()
+            if isinstance(tenant, str) and isinstance(n, int)
+        }
+
+    def _read_ledger(self) -> tuple[int, list[tuple[str, int]], Optional[int]]:
+        """Return the ledger's epoch, its deltas and where a torn tail starts."""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return 0, [], None
+        complete = data.rfind(b"\n") + 1
+        torn = complete if complete < len(data) else None
+        lines = data[:complete].decode("utf-8", errors="replace").splitlines()
+        epoch = 0
+        if lines and lines[0].startswith("#epoch,"):
+            try:
+                epoch = int(lines.pop(0)[len("#epoch,") :])
+            except ValueError:
+                log.warning("invalid epoch header in quota ledger %s", self.path)
+        deltas = []
+        for line in lines:
+            entry = _parse_ledger_line(line)
+            if entry is not None:
+                deltas.append(entry)
+        return epoch, deltas, torn
+
+
+def _ledger_line(tenant: str, delta: int) -> str:
+    if tenant.isprintable() and "," not in tenant and tenant[:1] not in ("[", "#"):
+        return f"{tenant},{delta}\n"
+    return json.dumps([tenant, delta]) + "\n"
+
+
+def _parse_ledger_line(line: str) -> Optional[tuple[str, int]]:
+    if line.startswith("["):
+        try:
+            tenant, delta = json.loads(line)
+        except ValueError:
+            return None
+        if isinstance(tenant, str) and tenant and type(delta) is int:
+            return tenant, delta
+        return None
+    tenant, _, delta_str = line.partition(",")
+    if not tenant:
+        return None
+    try:
+        return tenant, int(delta_str)
+    except ValueError:
+        return None
@@ -9,75 +9,104 @@ recover an unrestricted ``__import__``) can still run here, but they only ever
 touch *this* process, which later hardening layers (seccomp, rlimits, Landlock,
 cgroups) confine at the kernel level.
 
-The parent speaks a tiny length-framed JSON protocol over an inherited
-``AF_UNIX`` socket.  JSON is deliberate: the parent must never ``pickle.loads``
-bytes produced by untrusted guest code, so values crossing the boundary are
-restricted to JSON-serializable data.
+The parent speaks a tiny length-framed protocol over an inherited ``AF_UNIX``
+socket.  Frame bodies are JSON or the tagged binary codec from
+:mod:`pyisolate.runtime.codec`; both are deliberate: the parent must never
+``pickle.loads`` bytes produced by untrusted guest code, so values crossing the
+boundary are restricted to plain data (JSON types, plus ``bytes`` and tuples
+under the binary codec).  The bootstrap frame is always JSON and offers the
+codecs the parent can decode; the child answers with its choice in ``ready``.
+
+When the parent offers ``"shm"``, payloads of at least
+:data:`~pyisolate.runtime.shm.SHM_THRESHOLD` bytes leave the byte stream: the
+child writes them to a sealed memfd (:mod:`pyisolate.runtime.shm`) and sends an
+``shm`` frame with the descriptor attached via ``SCM_RIGHTS``. ``kind`` is
+``"buffer"`` for a posted bytes-like message, which the parent receives as a
+read-only ``memoryview`` of the mapping, ``"array"`` for a posted
+:class:`~pyisolate.runtime.protocol.ArrayPayload` (with ``dtype`` and
+``shape``), or ``"frame"`` for any other frame whose encoded body is that
+large.
 
 Parent -> child frames::
 
     {"op": "bootstrap", "name": ..., "allowed_imports": [...] | null,
-     "fs": [...] | null, "tcp": [...] | null}
+     "fs": [...] | null, "tcp": [...] | null, "codecs": [...], "shm": bool}
     {"op": "exec", "source": "..."}
     {"op": "call", "target": "mod.fn", "args": [...], "kwargs": {...}}
     {"op": "stop"}
 
 Child -> parent frames::
 
-    {"ev": "ready"}
+    {"ev": "ready", "codec": "binary/1" | "json", "cpu_ms": <float>}
     {"ev": "post", "message": <json>}
+    {"ev": "shm", "kind": "buffer" | "array" | "frame", "size": <bytes>,
+     "dtype": ..., "shape": [...]}  + 1 fd
     {"ev": "log", "level": ..., "message": ..., "fields": {...}}
     {"ev": "metric", "name": ..., "value": ..., "tags": {...}}
-    {"ev": "done"}
-    {"ev": "error", "exc_type": "PolicyError", "message": "..."}
+    {"ev": "done", "cpu_ms": <float>, "wall_ms": <float>}
+    {"ev": "error", "exc_type": "PolicyError", "message": "...",
+     "cpu_ms": <float>, "wall_ms": <float>}
+
+``done`` and ``error`` close an operation and report the process CPU time and
+the wall time it took, which the parent folds into the sandbox's ``Stats``.
+``ready`` reports the CPU time start-up used, which the parent's quota
+watchdog does not charge to the guest.
 """
 
 from __future__ import annotations
 
-import json
+import os
 import socket
-import struct
 import sys
+import time
 from pathlib import Path
 from typing import Any
 
 from .. import errors
+from . import codec as _codec
 from . import landlock as _landlock
+from . import shm as _shm
 from .confine import apply_confinement
+from .framing import FrameBuffer, send_frame
+from .protocol import ArrayPayload
 from .thread import _SAFE_BUILTINS, _blocked_open, _make_importer, _thread_local
 
-_LEN = struct.Struct("!I")
 
-
-def _send_frame(sock: socket.socket, obj: dict[str, Any]) -> None:
-    # json.dumps raises TypeError for non-serializable payloads; that propagates
+def _send_frame(
+    sock: socket.socket, obj: dict[str, Any], codec: str = _codec.CODEC_JSON
+) -> None:
+    # Both codecs raise TypeError for non-serializable payloads; that propagates
     # into guest code (e.g. out of ``post``) instead of silently crossing the
     # boundary, which is the contract for the process backend.
-    data = json.dumps(obj).encode("utf-8")
-    sock.sendall(_LEN.pack(len(data)) + data)
+    send_frame(sock, _codec.encode(obj, codec))
 
 
-def _recv_exact(sock: socket.socket, size: int) -> bytes | None:
-    chunks: list[bytes] = []
-    remaining = size
-    while remaining:
-        chunk = sock.recv(remaining)
-        if not chunk:
-            return None
-        chunks.append(chunk)
-        remaining -= len(chunk)
-    return b"".join(chunks)
+def _send_frame_with_fd(
+    sock: socket.socket, obj: dict[str, Any], fd: int, codec: str = _codec.CODEC_JSON
+) -> None:
+    # The descriptor rides on the first byte of the frame header; the parent
+    # queues it until it parses this frame.
+    send_frame(sock, _codec.encode(obj, codec), [fd])
+
+
+def _buffer_size(message: Any) -> int | None:
+    """Return the byte size of a raw buffer message, or ``None`` for other data."""
+    kind = type(message)
+    if kind is bytes or kind is bytearray:
+        return len(message)
+    if kind is memoryview:
+        return message.nbytes
+    return None
 
 
-def _recv_frame(sock: socket.socket) -> dict[str, Any] | None:
-    header = _recv_exact(sock, _LEN.size)
-    if header is None:
-        return None
-    (size,) = _LEN.unpack(header)
-    body = _recv_exact(sock, size)
-    if body is None:
-        return None
-    return json.loads(body.decode("utf-8"))
+def _recv_frame(sock: socket.socket, frames: FrameBuffer) -> dict[str, Any] | None:
+    while (body := frames.pop()) is None:
+        if not frames.recv(sock):
+            return None
+    frame = _codec.decode(body)
+    if not isinstance(frame, dict):
+        raise _codec.CodecError("frame body must be a mapping")
+    return frame
 
 
 class _GuestChannel:
@@ -85,27 +114,61 @@ class _GuestChannel:
     cell operations that frame back to the supervisor process."""
 
     def __init__(
-        self, sock: socket.socket, capabilities: list[str] | None = None
+        self,
+        sock: socket.socket,
+        capabilities: list[str] | None = None,
+        codec: str = _codec.CODEC_JSON,
+        shm: bool = False,
     ) -> None:
         self._sock = sock
         # Names of the broker capabilities granted to this guest. ``request``
         # is gated on membership, mirroring SandboxThread._request.
         self._capabilities = set(capabilities or [])
+        self.codec = codec
+        self.shm = shm and _shm.available()
+
+    def send(self, obj: dict[str, Any]) -> None:
+        if not self.shm:
+            _send_frame(self._sock, obj, self.codec)
+            return
+        data = _codec.encode(obj, self.codec)
+        if len(data) < _shm.SHM_THRESHOLD:
+            send_frame(self._sock, data)
+            return
+        self._send_shm("frame", data)
+
+    def _send_shm(self, kind: str, data: Any, **meta: Any) -> None:
+        fd = _shm.create_sealed(data, f"pyisolate-{kind}")
+        try:
+            frame = {"ev": "shm", "kind": kind, "size": os.fstat(fd).st_size}
+            frame.update(meta)
+            _send_frame_with_fd(self._sock, frame, fd, self.codec)
+        finally:
+            os.close(fd)
 
     def post(self, message: Any) -> None:
-        _send_frame(self._sock, {"ev": "post", "message": message})
+        # Raw buffers skip the codec entirely when they go out of line. Only the
+        # binary codec can represent bytes, so JSON mode keeps refusing them.
+        size = _buffer_size(message)
+        if self.shm and self.codec != _codec.CODEC_JSON:
+            if size is not None and size >= _shm.SHM_THRESHOLD:
+                self._send_shm("buffer", message)
+                return
+            if type(message) is ArrayPayload and message.nbytes >= _shm.SHM_THRESHOLD:
+                self._send_shm(
+                    "array",
+                    message.data,
+                    dtype=message.dtype,
+                    shape=list(message.shape),
+                )
+                return
+        self.send({"ev": "post", "message": message})
 
     def log(self, level: str, message: str, **fields: Any) -> None:
-        _send_frame(
-            self._sock,
-            {"ev": "log", "level": level, "message": message, "fields": fields},
-        )
+        self.send({"ev": "log", "level": level, "message": message, "fields": fields})
 
     def metric(self, name: str, value: Any, tags: dict[str, str] | None = None) -> None:
-        _send_frame(
-            self._sock,
-            {"ev": "metric", "name": name, "value": value, "tags": tags or {}},
-        )
+        self.send({"ev": "metric", "name": name, "value": value, "tags": tags or {}})
 
     def request(self, capability: str, action: str, payload: Any = None) -> None:
         # Capability-gated broker mediation, mirroring SandboxThread._request:
@@ -114,14 +177,13 @@ class _GuestChannel:
         # The guest never performs the privileged action itself.
         if capability not in self._capabilities:
             raise errors.PolicyError(f"capability request blocked: {capability}")
-        _send_frame(
-            self._sock,
+        self.send(
             {
                 "ev": "request",
                 "capability": capability,
                 "action": action,
                 "payload": payload or {},
-            },
+            }
         )
 
 
@@ -184,6 +246,7 @@ def _build_guest_globals(
         "log": channel.log,
         "metric": channel.metric,
         "request": channel.request,
+        "ArrayPayload": ArrayPayload,
         "__builtins__": builtins_dict,
     }
 
@@ -208,7 +271,9 @@ def _run_call(
 
 
 def _serve(sock: socket.socket) -> None:
-    bootstrap = _recv_frame(sock)
+    # One receive buffer for the life of the connection, reused for every frame.
+    frames = FrameBuffer()
+    bootstrap = _recv_frame(sock, frames)
     if bootstrap is None or bootstrap.get("op") != "bootstrap":
         return
     allowed_imports = bootstrap.get("allowed_imports")
@@ -217,7 +282,15 @@ def _serve(sock: socket.socket) -> None:
         fs=bootstrap.get("fs"),
         tcp=bootstrap.get("tcp"),
     )
-    channel = _GuestChannel(sock, bootstrap.get("capabilities"))
+    # The parent only offers codecs it can decode, so the child may switch to
+    # its pick immediately; the choice is echoed in "ready" for the parent's
+    # own sends.
+    channel = _GuestChannel(
+        sock,
+        bootstrap.get("capabilities"),
+        codec=_codec.negotiate(bootstrap.get("codecs")),
+        shm=bool(bootstrap.get("shm", False)),
+    )
     guest_globals = _build_guest_globals(channel, allowed_imports)
 
     # Confine the process *before* any guest code runs. Everything this module
@@ -235,8 +308,7 @@ def _serve(sock: socket.socket) -> None:
             require_landlock=bool(bootstrap.get("require_landlock", False)),
             default_deny_fs=bool(bootstrap.get("default_deny_fs", True)),
         )
-        _send_frame(
-            sock,
+        channel.send(
             {
                 "ev": "confinement",
                 "seccomp": report.seccomp,
@@ -248,18 +320,27 @@ def _serve(sock: socket.socket) -> None:
                 "landlock_net": report.landlock_net,
                 "landlock_net_ports": report.landlock_net_ports,
                 "skipped": report.skipped,
-            },
+            }
         )
 
-    _send_frame(sock, {"ev": "ready"})
+    channel.send(
+        {"ev": "ready", "codec": channel.codec, "cpu_ms": time.process_time() * 1000}
+    )
 
     while True:
-        frame = _recv_frame(sock)
+        try:
+            frame = _recv_frame(sock, frames)
+        except _codec.CodecError:
+            # A frame the supervisor sent that we cannot parse means the two
+            # ends disagree about the protocol; there is no safe way to resync.
+            return
         if frame is None:
             return
         op = frame.get("op")
         if op == "stop":
             return
+        start_cpu = time.process_time()
+        start_wall = time.perf_counter()
         try:
             if op == "exec":
                 _run_exec(frame.get("source", ""), guest_globals)
@@ -274,16 +355,23 @@ def _serve(sock: socket.socket) -> None:
             else:
                 raise errors.SandboxError(f"unknown cell operation: {op!r}")
         except BaseException as exc:  # noqa: BLE001 - surface every failure to host
-            _send_frame(
-                sock,
+            channel.send(
                 {
                     "ev": "error",
                     "exc_type": type(exc).__name__,
                     "message": str(exc),
-                },
+                    **_op_usage(start_cpu, start_wall),
+                }
             )
         else:
-            _send_frame(sock, {"ev": "done"})
+            channel.send({"ev": "done", **_op_usage(start_cpu, start_wall)})
+
+
+def _op_usage(start_cpu: float, start_wall: float) -> dict[str, float]:
+    return {
+        "cpu_ms": (time.process_time() - start_cpu) * 1000,
+        "wall_ms": (time.perf_counter() - start_wall) * 1000,
+    }
 
 
 def main(argv: list[str]) -> int:
@@ -0,0 +1,388 @@
+"""Frame codecs for the ``backend="process"`` channel.
+
+Every frame on the supervisor/guest socket is a 4-byte big-endian length
+followed by a body. Two body encodings are understood:
+
+* **JSON** -- the original wire format and the compatibility mode. A JSON body
+  is always an object, so it always starts with ``{``.
+* **Binary** -- a compact, versioned, tagged encoding. A binary body starts with
+  a ``0x00`` marker byte followed by the codec version, which can never be the
+  first byte of a JSON object, so a receiver can tell the two apart per frame.
+
+Which encoding a *sender* uses is negotiated in the bootstrap frame (which is
+always JSON): the supervisor offers the codecs it can decode, the guest picks
+the first one it supports and echoes it back in its ``ready`` frame. Receivers
+accept both encodings at all times, so frames already in flight when the
+negotiation completes still decode.
+
+The binary codec covers exactly ``None``, ``bool``, ``int``, ``float``,
+``str``, ``bytes``, ``list``, ``tuple``, ``dict`` and
+:class:`~pyisolate.runtime.protocol.ArrayPayload`, whose buffer is carried raw
+and decoded as a ``memoryview`` into the frame body rather than copied. JSON
+has no encoding for an ``ArrayPayload``, so the JSON codec refuses one with a
+``TypeError``, like any other value it cannot represent. The decoder has no notion
+of classes, callables or code objects -- an unknown tag is a
+:class:`CodecError`, never a lookup -- so, like JSON, it cannot be made to
+instantiate anything executable from guest-controlled bytes.
+
+Both decoders read a ``bytes``, ``bytearray`` or ``memoryview`` body in place,
+without first copying the whole frame. Decoded values never borrow from a
+*writable* body -- array buffers are copied out of it -- so its owner may reuse
+the buffer as soon as :func:`decode` returns.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Callable, Iterable
+
+from .protocol import ArrayPayload
+
+__all__ = [
+    "BINARY_CODEC_VERSION",
+    "CODEC_BINARY",
+    "CODEC_JSON",
+    "CodecError",
+    "SUPPORTED_CODECS",
+    "decode",
+    "decode_binary",
+    "encode",
+    "encode_binary",
+    "encoder_for",
+    "negotiate",
+]
+
+BINARY_CODEC_VERSION = 1
+"""Version byte written after the binary marker; bump on incompatible changes."""
+
+CODEC_JSON = "json"
+CODEC_BINARY = f"binary/{BINARY_CODEC_VERSION}"
+
+SUPPORTED_CODECS: tuple[str, ...] = (CODEC_BINARY, CODEC_JSON)
+"""Codecs this build can decode, in order of preference."""
+
+_MARKER = 0x00
+_HEADER = bytes((_MARKER, BINARY_CODEC_VERSION))
+
+# Nesting bound for both directions. The decoder is recursive, so an unbounded
+# depth would let a hostile guest exhaust the supervisor's C stack (or at least
+# raise RecursionError from deep inside the reader thread) with a few kilobytes
+# of ``[[[[...``. The encoder applies the same bound so a self-referencing
+# container fails cleanly instead of recursing until the interpreter gives up.
+MAX_DEPTH = 256
+
+# Lists of at least this many numbers are packed as one contiguous array rather
+# than as tagged scalars. Below it the homogeneity scan costs more than it saves.
+_PACK_THRESHOLD = 8
+
+_T_NONE = ord("N")
+_T_TRUE = ord("T")
+_T_FALSE = ord("F")
+_T_INT = ord("q")  # signed 64-bit
+_T_BIGINT = ord("n")  # u32 length + signed little-endian magnitude
+_T_FLOAT = ord("d")
+_T_STR = ord("s")
+_T_BYTES = ord("b")
+_T_LIST = ord("l")
+_T_TUPLE = ord("t")
+_T_DICT = ord("m")
+_T_FLOAT_ARRAY = ord("D")  # list[float] packed as float64
+_T_INT_ARRAY = ord("Q")  # list[int] packed as int64
+_T_ARRAY = ord("a")  # ArrayPayload: dtype, shape, raw buffer
+
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_U64 = struct.Struct("<Q")
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+_BIG_ENDIAN_HOST = sys.byteorder == "big"
+
+
+class CodecError(ValueError):
+    """Raised when a frame body cannot be encoded or decoded."""
+
+
+def negotiate(offered: Iterable[str] | None) -> str:
+    """Pick the first codec in *offered* that this build supports.
+
+    A peer that offers nothing (or nothing we understand) predates the binary
+    codec, so fall back to JSON rather than failing the handshake.
+    """
+    for name in offered or ():
+        if name in SUPPORTED_CODECS:
+            return name
+    return CODEC_JSON
+
+
+# -- encoding ------------------------------------------------------------
+
+
+def _packed(typecode: str, values: list[Any]) -> bytes:
+    data = array(typecode, values)
+    if _BIG_ENDIAN_HOST:
+        data.byteswap()
+    return data.tobytes()
+
+
+def _encode_list(value: list[Any], out: list[bytes], depth: int) -> None:
+    if len(value) >= _PACK_THRESHOLD:
+        first = type(value[0])
+        if first is float and all(type(item) is float for item in value):
+            out.append(bytes((_T_FLOAT_ARRAY,)) + _U32.pack(len(value)))
+            out.append(_packed("d", value))
+            return
+        if first is int and all(type(item) is int for item in value):
+            try:
+                packed = _packed("q", value)
+            except OverflowError:
+                pass
+            else:
+                out.append(bytes((_T_INT_ARRAY,)) + _U32.pack(len(value)))
+                out.append(packed)
+                return
+    out.append(bytes((_T_LIST,)) + _U32.pack(len(value)))
+    for item in value:
+        _encode_value(item, out, depth + 1)
+
+
+def _encode_value(value: Any, out: list[bytes], depth: int) -> None:
+    if depth > MAX_DEPTH:
+        raise CodecError(f"value nests deeper than {MAX_DEPTH} levels")
+    kind = type(value)
+    if value is None:
+        out.append(b"N")
+    elif kind is bool:
+        out.append(b"T" if value else b"F")
+    elif kind is int:
+        if _INT64_MIN <= value <= _INT64_MAX:
+            out.append(b"q" + _I64.pack(value))
+        else:
+            raw = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+            out.append(b"n" + _U32.pack(len(raw)))
+            out.append(raw)
+    elif kind is float:
+        out.append(b"d" + _F64.pack(value))
+    elif kind is str:
+        raw = value.encode("utf-8")
+        out.append(b"s" + _U32.pack(len(raw)))
+        out.append(raw)
+    elif kind is bytes or kind is bytearray or kind is memoryview:
+        raw = bytes(value)
+        out.append(b"b" + _U32.pack(len(raw)))
+        out.append(raw)
+    elif kind is list:
+        _encode_list(value, out, depth)
+    elif kind is tuple:
+        out.append(b"t" + _U32.pack(len(value)))
+        for item in value:
+            _encode_value(item, out, depth + 1)
+    elif kind is ArrayPayload:
+        dtype = value.dtype.encode("ascii")
+        out.append(b"a" + bytes((len(dtype),)) + dtype + _U32.pack(len(value.shape)))
+        out.extend(_U64.pack(dim) for dim in value.shape)
+        out.append(_U32.pack(value.nbytes))
+        out.append(value.data)
+    elif kind is dict:
+        out.append(b"m" + _U32.pack(len(value)))
+        for key, item in value.items():
+            _encode_value(key, out, depth + 1)
+            _encode_value(item, out, depth + 1)
+    else:
+        # Exact type checks, not isinstance: a guest-defined ``str`` or ``dict``
+        # subclass could override the very methods used to serialize it, so
+        # subclasses are refused the same way json.dumps refuses unknown types.
+        raise TypeError(
+            f"Object of type {kind.__name__} is not serializable by the "
+            f"{CODEC_BINARY} codec"
+        )
+
+
+def encode_binary(obj: Any) -> bytes:
+    """Encode *obj* as a binary frame body (marker, version, value)."""
+    out: list[bytes] = [_HEADER]
+    _encode_value(obj, out, 0)
+    return b"".join(out)
+
+
+def _refuse_json(value: Any) -> Any:
+    if type(value) is ArrayPayload:
+        raise TypeError(
+            f"ArrayPayload is not serializable by the {CODEC_JSON} codec; "
+            f"it needs the {CODEC_BINARY} codec"
+        )
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_json(obj: Any) -> bytes:
+    return json.dumps(obj, default=_refuse_json).encode("utf-8")
+
+
+Encoder = Callable[[Any], bytes]
+
+
+def encoder_for(codec: str) -> Encoder:
+    """Return the body encoder for a negotiated codec name."""
+    if codec == CODEC_BINARY:
+        return encode_binary
+    if codec == CODEC_JSON:
+        return _encode_json
+    raise CodecError(f"unknown codec: {codec!r}")
+
+
+def encode(obj: Any, codec: str = CODEC_JSON) -> bytes:
+    """Encode a frame body with the negotiated *codec*."""
+    return encoder_for(codec)(obj)
+
+
+# -- decoding ------------------------------------------------------------
+
+
+_unpack_u32 = _U32.unpack_from
+_unpack_i64 = _I64.unpack_from
+_unpack_f64 = _F64.unpack_from
+_unpack_u64 = _U64.unpack_from
+
+
+def _unpacked(typecode: str, raw: bytes | memoryview) -> list[Any]:
+    data = array(typecode)
+    data.frombytes(raw)
+    if _BIG_ENDIAN_HOST:
+        data.byteswap()
+    return data.tolist()
+
+
+def _decode_value(data: bytes | memoryview, pos: int, depth: int) -> tuple[Any, int]:
+    # Hot path: one function call per value, positions as plain ints and
+    # ``unpack_from`` on the original buffer so no intermediate slices are made
+    # for fixed-width scalars. Every length is checked against ``len(data)``
+    # before it is trusted.
+    if depth > MAX_DEPTH:
+        raise CodecError(f"value nests deeper than {MAX_DEPTH} levels")
+    try:
+        tag = data[pos]
+    except IndexError:
+        raise CodecError("truncated binary frame") from None
+    pos += 1
+    try:
+        if tag == _T_STR or tag == _T_BYTES or tag == _T_BIGINT:
+            (size,) = _unpack_u32(data, pos)
+            pos += 4
+            end = pos + size
+            if end > len(data):
+                raise CodecError("truncated binary frame")
+            if tag == _T_STR:
+                try:
+                    return str(data[pos:end], "utf-8"), end
+                except UnicodeDecodeError as exc:
+                    raise CodecError(f"invalid UTF-8 in string: {exc}") from None
+            if tag == _T_BYTES:
+                return bytes(data[pos:end]), end
+            return int.from_bytes(data[pos:end], "little", signed=True), end
+        if tag == _T_INT:
+            return _unpack_i64(data, pos)[0], pos + 8
+        if tag == _T_DICT:
+            (count,) = _unpack_u32(data, pos)
+            pos += 4
+            result: dict[Any, Any] = {}
+            depth += 1
+            for _ in range(count):
+                key, pos = _decode_value(data, pos, depth)
+                item, pos = _decode_value(data, pos, depth)
+                try:
+                    result[key] = item
+                except TypeError:
+                    raise CodecError("unhashable dict key in binary frame") from None
+            return result, pos
+        if tag == _T_FLOAT:
+            return _unpack_f64(data, pos)[0], pos + 8
+        if tag == _T_NONE:
+            return None, pos
+        if tag == _T_TRUE:
+            return True, pos
+        if tag == _T_FALSE:
+            return False, pos
+        if tag == _T_LIST or tag == _T_TUPLE:
+            (count,) = _unpack_u32(data, pos)
+            pos += 4
+            items = []
+            append = items.append
+            depth += 1
+            for _ in range(count):
+                item, pos = _decode_value(data, pos, depth)
+                append(item)
+            return (items if tag == _T_LIST else tuple(items)), pos
+        if tag == _T_FLOAT_ARRAY or tag == _T_INT_ARRAY:
+            (count,) = _unpack_u32(data, pos)
+            pos += 4
+            end = pos + count * 8
+            if end > len(data):
+                raise CodecError("truncated binary frame")
+            typecode = "d" if tag == _T_FLOAT_ARRAY else "q"
+            return _unpacked(typecode, data[pos:end]), end
+        if tag == _T_ARRAY:
+            return _decode_array(data, pos)
+    except (struct.error, IndexError):
+        raise CodecError("truncated binary frame") from None
+    raise CodecError(f"unknown binary tag 0x{tag:02x}")
+
+
+def _decode_array(data: bytes | memoryview, pos: int) -> tuple[ArrayPayload, int]:
+    size = data[pos]
+    dtype = str(data[pos + 1 : pos + 1 + size], "ascii", "replace")
+    pos += 1 + size
+    (ndim,) = _unpack_u32(data, pos)
+    pos += 4
+    if ndim > MAX_DEPTH:
+        raise CodecError(f"array has more than {MAX_DEPTH} dimensions")
+    shape = []
+    for _ in range(ndim):
+        shape.append(_unpack_u64(data, pos)[0])
+        pos += 8
+    (nbytes,) = _unpack_u32(data, pos)
+    pos += 4
+    end = pos + nbytes
+    if end > len(data):
+        raise CodecError("truncated binary frame")
+    raw = memoryview(data)[pos:end]
+    if not raw.readonly:
+        # The body's owner may reuse a writable buffer once decode returns.
+        raw = memoryview(raw.tobytes())
+    try:
+        # Otherwise a view into the frame body, not a copy; ArrayPayload
+        # validates that the dtype is known and the shape matches the byte
+        # count.
+        payload = ArrayPayload(data=raw, dtype=dtype, shape=tuple(shape))
+    except ValueError as exc:
+        raise CodecError(f"invalid array payload: {exc}") from None
+    return payload, end
+
+
+def decode_binary(body: bytes | bytearray | memoryview) -> Any:
+    """Decode a binary frame body produced by :func:`encode_binary`."""
+    data = body if type(body) is bytes else memoryview(body).cast("B")
+    if len(data) < 2 or data[0] != _MARKER:
+        raise CodecError("not a binary frame")
+    if data[1] != BINARY_CODEC_VERSION:
+        raise CodecError(f"unsupported binary codec version {data[1]}")
+    value, pos = _decode_value(data, 2, 0)
+    if pos != len(data):
+        raise CodecError("trailing bytes after binary frame value")
+    return value
+
+
+def _decode_json(body: bytes | bytearray | memoryview) -> Any:
+    try:
+        return json.loads(str(body, "utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise CodecError(f"invalid JSON frame: {exc}") from None
+
+
+def decode(body: bytes | bytearray | memoryview) -> Any:
+    """Decode a frame body in whichever encoding it announces."""
+    if len(body) and body[0] == _MARKER:
+        return decode_binary(body)
+    return _decode_json(body)
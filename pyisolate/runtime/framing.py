@@ -0,0 +1,227 @@
+"""Length-prefixed framing for the process-backend channel.
+
+Both ends of a ``backend="process"`` socketpair exchange frames of a 4-byte
+big-endian length followed by the body (see :mod:`pyisolate.runtime.codec`).
+This module holds the byte-moving half of that protocol so the supervisor and
+the guest share one implementation:
+
+* :func:`send_frame` hands the header and body to ``sendmsg`` as separate
+  buffers, so a frame is never concatenated (and the body never copied) just to
+  prepend four bytes. Descriptors ride along as ``SCM_RIGHTS``.
+* :class:`FrameBuffer` is a per-connection receive buffer filled in place with
+  ``recvmsg_into``. It grows by doubling while a large frame is arriving --
+  never ahead of the bytes the peer actually sends -- is compacted rather than
+  reallocated once consumed data piles up, and drops back to its initial size
+  once large frames give way to small ones, so it does not pin memory for
+  long.
+"""
+
+from __future__ import annotations
+
+import array
+import os
+import socket
+import struct
+from collections import deque
+from typing import Iterable, Optional, Sequence
+
+__all__ = ["LEN", "FrameBuffer", "send_frame"]
+
+LEN = struct.Struct("!I")
+"""The frame header: body length as an unsigned 32-bit big-endian integer."""
+
+MAX_FDS = 4
+"""Descriptors accepted per read; the protocol never sends more than one per
+frame."""
+
+RECV_SIZE = 64 * 1024
+"""Initial receive-buffer capacity and the smallest read requested."""
+
+_SHRINK_ABOVE = 4 * 1024 * 1024
+# A buffer grown past this is released when it drains on a small frame.
+
+_BOUNDED_READ_MIN = RECV_SIZE // 4
+# Frames at least this large are read up to their end and no further.
+
+_MAX_QUEUED_FDS = 16
+# Descriptors waiting for the frame they belong to. A well-behaved peer never
+# has more than one in flight; any beyond this are closed on arrival.
+
+_FD_ANCILLARY = socket.CMSG_SPACE(MAX_FDS * array.array("i").itemsize)
+
+
+def _close_fds(fds: Iterable[int]) -> None:
+    for fd in fds:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def send_frame(
+    sock: socket.socket, body: bytes | memoryview, fds: Sequence[int] = ()
+) -> None:
+    """Send one frame, header and body as separate ``sendmsg`` buffers.
+
+    Any *fds* are attached to the first byte of the header. A short send on a
+    blocking socket is finished with ``sendall`` on the unsent tail, so the body
+    is still never copied.
+    """
+    header = LEN.pack(len(body))
+    if fds:
+        ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+        sent = sock.sendmsg([header, body], ancillary)
+    else:
+        sent = sock.sendmsg([header, body])
+    if sent < LEN.size:
+        sock.sendall(header[sent:])
+        sent = LEN.size
+    if sent < LEN.size + len(body):
+        sock.sendall(memoryview(body)[sent - LEN.size :])
+
+
+class FrameBuffer:
+    """Reusable receive buffer and incremental parser for one connection.
+
+    Reads land wherever the kernel splits the stream, so bytes accumulate here
+    until a whole frame is available. Descriptors passed with ``SCM_RIGHTS``
+    arrive with the first bytes of the frame that describes them and the
+    protocol attaches at most one per frame, so a FIFO pairs them up in order
+    for the frames that take one (:meth:`take_fd`).
+
+    :meth:`pop` returns a ``memoryview`` into the buffer rather than a copy.
+    It is valid until the next :meth:`recv` or :meth:`pop`, which release it.
+    """
+
+    __slots__ = ("_buf", "_mem", "_start", "_end", "_fds", "_view")
+
+    def __init__(self) -> None:
+        self._buf = bytearray(RECV_SIZE)
+        # The buffer is replaced, never resized in place, so one long-lived view
+        # of it can be sliced for every read and every popped frame.
+        self._mem = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self._fds: deque[int] = deque()
+        self._view: Optional[memoryview] = None
+
+    def __len__(self) -> int:
+        """Bytes received but not yet consumed."""
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def recv(self, sock: socket.socket, flags: int = 0) -> int:
+        """Read once from *sock* into the buffer; return the byte count.
+
+        ``0`` means end of stream. ``BlockingIOError`` propagates for a
+        non-blocking read with nothing to return, and other ``OSError`` too.
+        """
+        self._release_view()
+        size = self._read_size()
+        self._reserve(size)
+        end = self._end
+        nbytes, ancdata, _flags, _addr = sock.recvmsg_into(
+            [self._mem[end : end + size]], _FD_ANCILLARY, flags
+        )
+        self._end = end + nbytes
+        for level, kind, payload in ancdata:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds = array.array("i")
+                fds.frombytes(payload[: len(payload) - len(payload) % fds.itemsize])
+                self._queue_fds(fds)
+        return nbytes
+
+    def _read_size(self) -> int:
+        """How many bytes the next read asks for.
+
+        Small frames are read ahead, up to ``RECV_SIZE`` at a time. Once the
+        header of a large frame is in, the read stops at that frame's end: the
+        body lands in place, the buffer is empty again after :meth:`pop`, and a
+        partial frame never has to be moved down to make room. Each read may at
+        most double the buffer, so the peer must actually send bytes to make it
+        grow.
+        """
+        if self._end - self._start < LEN.size:
+            return RECV_SIZE
+        (length,) = LEN.unpack_from(self._buf, self._start)
+        if length < _BOUNDED_READ_MIN:
+            return RECV_SIZE
+        return min(LEN.size + length - (self._end - self._start), len(self._buf))
+
+    def _reserve(self, size: int) -> None:
+        """Make at least *size* bytes free at the end of the buffer."""
+        if len(self._buf) - self._end >= size:
+            return
+        live = self._end - self._start
+        if live + size <= len(self._buf) and self._start:
+            self._buf[:live] = self._buf[self._start : self._end]
+        else:
+            grown = bytearray(max(2 * len(self._buf), live + size))
+            grown[:live] = self._mem[self._start : self._end]
+            self._buf, self._mem = grown, memoryview(grown)
+        self._start, self._end = 0, live
+
+    def _queue_fds(self, fds: Iterable[int]) -> None:
+        for fd in fds:
+            if len(self._fds) < _MAX_QUEUED_FDS:
+                self._fds.append(fd)
+            else:
+                _close_fds([fd])
+
+    def _release_view(self) -> None:
+        view, self._view = self._view, None
+        if view is not None:
+            try:
+                view.release()
+            except BufferError:
+                # A caller kept a slice of it. The buffer is never resized in
+                # place, so that slice stays valid and only sees stale bytes.
+                pass
+
+    def next_length(self) -> Optional[int]:
+        """Body length of the next frame, once its header has arrived."""
+        if self._end - self._start < LEN.size:
+            return None
+        return LEN.unpack_from(self._buf, self._start)[0]
+
+    def pop(self) -> Optional[memoryview]:
+        """Consume the next complete frame and return a view of its body."""
+        if self._end - self._start < LEN.size:
+            return None
+        (length,) = LEN.unpack_from(self._buf, self._start)
+        start = self._start + LEN.size
+        end = start + length
+        if end > self._end:
+            return None
+        self._release_view()
+        self._view = view = self._mem[start:end]
+        if end == self._end:
+            self._start = self._end = 0
+            if len(self._buf) > _SHRINK_ABOVE and length < _BOUNDED_READ_MIN:
+                # The large frames that grew the buffer have stopped coming;
+                # the view keeps the old one alive until it is released.
+                self._buf = bytearray(RECV_SIZE)
+                self._mem = memoryview(self._buf)
+        else:
+            self._start = end
+        return view
+
+    def take_fd(self) -> Optional[int]:
+        try:
+            return self._fds.popleft()
+        except IndexError:
+            return None
+
+    def close(self) -> None:
+        """Close descriptors that never met their frame.
+
+        Safe to call from a thread other than the reader's.
+        """
+        while True:
+            fd = self.take_fd()
+            if fd is None:
+                return
+            _close_fds([fd])
@@ -0,0 +1,176 @@
+"""One selector thread for every process-backend channel.
+
+A ``ProcessSandbox`` that owns a blocking reader thread costs one OS thread per
+sandbox for as long as the sandbox lives, even though the thread spends almost
+all of that time parked in ``recv``. :class:`IOHub` replaces those threads with
+a single one that waits on every registered socket through
+:mod:`selectors` (``epoll`` on Linux) and calls the owner's callback when its
+socket is readable. The callback reads without blocking and parses whatever
+arrived; it must never block, because every other sandbox shares the thread.
+
+Registration changes are queued and applied by the hub thread itself, woken
+through a socketpair, so callers never touch the selector while it is inside
+``select``. Like :class:`~pyisolate.runtime.timers.TimerWheel`, the hub starts
+its thread on first use and can be restarted after :meth:`IOHub.close`.
+"""
+
+from __future__ import annotations
+
+import logging
+import selectors
+import socket
+import threading
+from typing import Callable, Optional
+
+__all__ = ["IOHub", "shared_io_hub"]
+
+logger = logging.getLogger(__name__)
+
+ReadCallback = Callable[[], None]
+
+
+class IOHub:
+    """Dispatches readability of many sockets from one selector thread."""
+
+    def __init__(self, name: str = "pyisolate-iohub") -> None:
+        self._name = name
+        self._lock = threading.Lock()
+        self._pending: list[tuple[bool, socket.socket, Optional[ReadCallback]]] = []
+        self._registered = 0
+        self._thread: Optional[threading.Thread] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+
+    def __len__(self) -> int:
+        """Number of sockets currently registered (including queued adds)."""
+        return self._registered
+
+    def register(self, sock: socket.socket, callback: ReadCallback) -> None:
+        """Call *callback* on the hub thread whenever *sock* is readable."""
+        with self._lock:
+            self._registered += 1
+            self._pending.append((True, sock, callback))
+            self._ensure_running_locked()
+            self._wake_locked()
+
+    def unregister(self, sock: socket.socket) -> None:
+        """Stop watching *sock*; safe to call more than once, or after close.
+
+        A callback already running on the hub thread finishes, but none starts
+        for *sock* once the hub has been woken to apply the change.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            self._pending.append((False, sock, None))
+            self._wake_locked()
+
+    def close(self) -> None:
+        """Stop the hub thread and forget every registration."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._pending.clear()
+            self._registered = 0
+            self._wake_locked()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1.0)
+
+    def _ensure_running_locked(self) -> None:
+        if self._thread is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._selector, self._wake_r, self._wake_w),
+            name=self._name,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _wake_locked(self) -> None:
+        if self._wake_w is None:
+            return
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            # A full wake pipe already guarantees a wakeup.
+            pass
+
+    def _apply_pending(self, selector: selectors.BaseSelector) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for add, sock, callback in pending:
+            if add:
+                try:
+                    selector.register(sock, selectors.EVENT_READ, callback)
+                except (KeyError, ValueError, OSError):
+                    # Already registered, or closed before the hub got to it;
+                    # the owner notices a closed socket on its own.
+                    with self._lock:
+                        self._registered -= 1
+            else:
+                try:
+                    selector.unregister(sock)
+                except (KeyError, ValueError):
+                    continue
+                with self._lock:
+                    self._registered -= 1
+
+    def _run(
+        self,
+        selector: selectors.BaseSelector,
+        wake_r: socket.socket,
+        wake_w: socket.socket,
+    ) -> None:
+        me = threading.current_thread()
+        try:
+            while True:
+                self._apply_pending(selector)
+                if self._thread is not me:
+                    return
+                ready = selector.select()
+                if any(key.fileobj is wake_r for key, _events in ready):
+                    try:
+                        while wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    # Apply changes queued before these events were reported, so
+                    # a socket unregistered meanwhile is not called back.
+                    self._apply_pending(selector)
+                    if self._thread is not me:
+                        return
+                registered = selector.get_map()
+                for key, _events in ready:
+                    if key.fileobj is wake_r or registered.get(key.fileobj) is not key:
+                        continue
+                    try:
+                        key.data()
+                    except Exception:  # noqa: BLE001 - keep serving other channels
+                        logger.exception("I/O hub callback failed")
+        finally:
+            selector.close()
+            wake_r.close()
+            wake_w.close()
+            with self._lock:
+                if self._selector is selector:
+                    self._selector = None
+                    self._wake_r = self._wake_w = None
+
+
+_shared: Optional[IOHub] = None
+_shared_lock = threading.Lock()
+
+
+def shared_io_hub() -> IOHub:
+    """Return the process-wide hub used when no supervisor supplies one."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = IOHub()
+        return _shared
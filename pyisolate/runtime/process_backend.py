@@ -1,12 +1,15 @@
 """Supervisor-side handle for the ``backend="process"`` isolation mode.
 
 ``ProcessSandbox`` launches guest code in a separate OS process
-(:mod:`pyisolate.runtime.child`) and speaks the same length-framed JSON
-protocol over an inherited ``AF_UNIX`` socketpair.  It duck-types the subset of
-the :class:`~pyisolate.runtime.thread.SandboxThread` surface that
-:class:`pyisolate.supervisor.Sandbox` delegates to (``exec``, ``call``,
-``recv``, ``stop``, ``kill``, ``cancel``, ``reap``, ``is_alive``, ``name``),
-so the existing handle wrapper works unchanged.
+(:mod:`pyisolate.runtime.child`) and speaks a length-framed protocol over an
+inherited ``AF_UNIX`` socketpair; frame bodies are JSON or the binary codec in
+:mod:`pyisolate.runtime.codec`, negotiated in the bootstrap frame, and payloads
+too large for the byte stream arrive as sealed memfds
+(:mod:`pyisolate.runtime.shm`) passed with ``SCM_RIGHTS``.  It
+duck-types the subset of the :class:`~pyisolate.runtime.thread.SandboxThread`
+surface that :class:`pyisolate.supervisor.Sandbox` delegates to (``exec``,
+``call``, ``recv``, ``stop``, ``kill``, ``cancel``, ``reap``, ``is_alive``,
+``name``), so the existing handle wrapper works unchanged.
 
 Unlike the sub-interpreter backend, the boundary here is a real process
 boundary: guest code runs in a distinct address space and cannot read or
@@ -20,29 +23,58 @@ supervisor's ``os.environ`` -- see :func:`build_child_env`.
 
 from __future__ import annotations
 
-import json
+import functools
 import logging
 import math
 import os
 import queue
+import signal
 import socket
-import struct
 import subprocess
 import sys
 import threading
-from typing import Any, Mapping, Optional
+import time
+from typing import Any, Callable, Mapping, Optional
 
 from .. import errors
 from ..policy.model import RuntimePolicy
-from .protocol import BrokerRequest
+from . import codec as _codec
+from . import shm as _shm
+from .framing import FrameBuffer, send_frame
+from .iohub import IOHub, shared_io_hub
+from .procstats import (
+    ProcSample,
+    ProcStatsCollector,
+    sample_from_rusage,
+    shared_proc_stats,
+)
+from .protocol import ArrayPayload, BrokerRequest
 from .thread import Stats
+from .timers import TimerHandle, TimerWheel, shared_timer_wheel
 
 logger = logging.getLogger(__name__)
 
-_LEN = struct.Struct("!I")
+# Reads one hub wakeup performs for a sandbox before yielding to the others.
+_HUB_READS_PER_WAKE = 16
+
+# Guest frames that carry output and count against ``output_bytes_max``, the
+# same set SandboxThread._emit charges.
+_OUTPUT_EVENTS = frozenset({"post", "log", "metric", "request", "shm"})
+
+_SHM_KINDS = ("buffer", "array", "frame")
 
-# Guest results and errors cross the boundary as JSON. Never unpickle data
-# produced by untrusted guest code in the supervisor process.
+# Control frames (``done``, ``error``, ``confinement``) are not charged, so a
+# frame may exceed the remaining output budget by this much before it is
+# refused unread.
+_CONTROL_FRAME_SLACK = 64 * 1024
+
+# Upper bounds, in milliseconds, of the latency histogram buckets; the same
+# buckets SandboxThread fills.
+_LATENCY_BUCKETS = (("0.5", 0.5), ("1", 1.0), ("5", 5.0), ("10", 10.0))
+
+# Guest results and errors cross the boundary as JSON or the binary codec, both
+# of which decode to plain data only. Never unpickle data produced by untrusted
+# guest code in the supervisor process.
 _CHILD_MODULE = "pyisolate.runtime.child"
 
 # The guest process starts from a scrubbed environment, not the supervisor's.
@@ -125,6 +157,13 @@ def _cpu_seconds_from_ms(cpu_ms: Optional[int]) -> Optional[int]:
     return seconds
 
 
+def _usage_ms(value: Any) -> Optional[float]:
+    """A guest-reported duration, or ``None`` unless it is a sane number."""
+    if type(value) not in (int, float) or not math.isfinite(value) or value < 0:
+        return None
+    return float(value)
+
+
 def _extract_fs_tcp(policy: Any) -> tuple[Optional[list[str]], Optional[list[str]]]:
     """Best-effort extraction of filesystem/TCP allow-lists from a policy.
 
@@ -207,8 +246,45 @@ def _dedupe_read_write(
     return (read_unique or None, write_unique or None)
 
 
+def _close_fds(fds: list[int]) -> None:
+    for fd in fds:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
 class ProcessSandbox:
-    """Runs guest code in a confined child process behind a JSON channel."""
+    """Runs guest code in a confined child process behind a framed channel.
+
+    ``codec`` selects the frame encoding this sandbox offers the guest:
+    ``"binary"`` (the default) negotiates the tagged binary codec, which also
+    carries ``bytes`` and tuples; ``"json"`` keeps the original JSON-only wire
+    format for compatibility. ``shm`` offers out-of-line transfer of large
+    payloads through sealed memfds.
+
+    ``io`` picks who reads the channel. ``"hub"`` (the default) registers the
+    socket with an :class:`~pyisolate.runtime.iohub.IOHub` -- ``iohub`` or the
+    process-wide one -- so any number of sandboxes share a single reader
+    thread; ``"thread"`` starts a dedicated blocking reader for this sandbox.
+
+    ``output_bytes_max`` is charged here, in the supervisor, for every output
+    frame the guest sends -- inline or out of line -- before the payload is
+    buffered or mapped. A guest that overruns it is killed and the waiting
+    caller gets :class:`~pyisolate.errors.OutputExceeded`.
+
+    :attr:`stats` combines the per-operation CPU and wall time the guest reports
+    with ``/proc`` samples, taken when stats are read, from a
+    :class:`~pyisolate.runtime.procstats.ProcStatsCollector` -- ``procstats``
+    or the process-wide one -- and the rusage ``wait4`` returns when the guest
+    is reaped. CPU covers the whole guest process, interpreter start-up
+    included; memory is the resident-set high-water mark.
+
+    ``on_exit`` is called with the sandbox once its guest has gone: when it is
+    reaped, and also when its channel closes without a caller stopping it,
+    which can be shortly before the process has exited. It may be called more
+    than once and must not block.
+    """
 
     def __init__(
         self,
@@ -223,23 +299,49 @@ class ProcessSandbox:
         cpu_seconds: Optional[int] = None,
         wall_time_ms: Optional[int] = None,
         open_files_max: Optional[int] = None,
+        output_bytes_max: Optional[int] = None,
         confine: bool = True,
         require_seccomp: bool = False,
         require_landlock: bool = False,
         default_deny_fs: bool = True,
         env: Optional[Mapping[str, str]] = None,
+        codec: str = "binary",
+        shm: bool = True,
+        timers: Optional[TimerWheel] = None,
+        io: str = "hub",
+        iohub: Optional[IOHub] = None,
+        procstats: Optional[ProcStatsCollector] = None,
+        on_exit: Optional[Callable[["ProcessSandbox"], object]] = None,
     ) -> None:
+        if io not in ("hub", "thread"):
+            raise ValueError("io must be 'hub' or 'thread'")
+        if codec == "binary":
+            offered = [_codec.CODEC_BINARY, _codec.CODEC_JSON]
+        elif codec == "json":
+            offered = [_codec.CODEC_JSON]
+        else:
+            raise ValueError("codec must be 'binary' or 'json'")
         self.name = name
         self._backend = backend
         self._outbox: "queue.Queue[Any]" = queue.Queue()
         self._closed = False
         self._lock = threading.Lock()
+        # Frames are parsed incrementally from whatever each read returns, by
+        # the shared I/O hub or, with ``io="thread"``, a reader of our own.
+        self.io = io
+        self._iohub = iohub if io == "hub" else None
+        self._frames = FrameBuffer()
         # Wall-clock enforcement. RLIMIT_CPU bounds CPU time in the guest, but a
         # guest that blocks forever burns no CPU, so wall time is enforced here
-        # in the supervisor: arm a timer when an operation is dispatched and
-        # kill the guest if it has not reported completion in time.
+        # in the supervisor: arm a deadline on the shared timer wheel when an
+        # operation is dispatched and kill the guest if it has not reported
+        # completion in time.
         self.wall_time_ms = wall_time_ms
-        self._wall_timer: Optional[threading.Timer] = None
+        self._timers = timers
+        self._wall_timer: Optional[TimerHandle] = None
+        # Bumped on every arm, so a deadline that fires after its timer was
+        # cancelled or replaced can tell it is stale.
+        self._wall_generation = 0
         self._pending_ops = 0
         self._timer_lock = threading.Lock()
         # A dying guest is noticed by two racing observers -- the wall-clock
@@ -247,6 +349,8 @@ class ProcessSandbox:
         # exactly one error, the specific one.
         self._termination_lock = threading.Lock()
         self._termination_surfaced = False
+        self.output_bytes_max = output_bytes_max
+        self._output_bytes = 0
         if cpu_seconds is None:
             cpu_seconds = _cpu_seconds_from_ms(cpu_ms)
         # Tenant-quota bookkeeping mirrors SandboxThread so the supervisor's
@@ -254,15 +358,40 @@ class ProcessSandbox:
         self._tenant: Optional[str] = None
         self._tenant_quota: Optional[int] = None
         self._tenant_quota_reserved = False
+        self._on_exit = on_exit
         # Handle-surface attributes the Sandbox wrapper reads. Features not yet
         # implemented for this backend (see the methods below) are surfaced as
         # explicit NotImplementedError rather than AttributeError.
         self._cgroup_path = None
         self.quota_enforcement = None
+        # Quotas the supervisor's ResourceWatchdog enforces from /proc, on top
+        # of the coarser rlimits; CPU is charged from ``boot_cpu_ms``, the
+        # start-up CPU the guest reports in its ``ready`` frame.
+        self.cpu_quota_ms = cpu_ms
+        self.mem_quota_bytes = mem_bytes
+        self.boot_cpu_ms: Optional[float] = None
         self.termination_reason: Optional[str] = None
         self._quarantine_reason: Optional[str] = None
         self._ops = 0
         self._errors = 0
+        # Resource accounting. The last /proc sample (or the exit rusage) is the
+        # base; CPU the guest reported for operations finished since then is
+        # added on top until the next sample supersedes it.
+        self._usage_lock = threading.Lock()
+        self._cpu_ms_sampled = 0.0
+        self._cpu_ms_since_sample = 0.0
+        self._rss_bytes = 0
+        self._peak_rss_bytes = 0
+        self._exited = False
+        self._latency = {"0.5": 0, "1": 0, "5": 0, "10": 0, "inf": 0}
+        self._latency_sum = 0.0
+        # The guest is reaped with wait4, never by Popen, so its rusage is kept.
+        self._reap_lock = threading.Lock()
+        # Frames are sent as JSON until the guest's ``ready`` frame confirms the
+        # codec it picked from ``offered``; the reader decodes either encoding.
+        self._offered_codecs = tuple(offered)
+        self.codec = _codec.CODEC_JSON
+        self._encode = _codec.encoder_for(_codec.CODEC_JSON)
         # Populated from the child's "confinement" frame during startup.
         self.confinement: Optional[dict[str, Any]] = None
         self._confined = threading.Event()
@@ -290,6 +419,8 @@ class ProcessSandbox:
         # unexpected child exit surfaces as EOF on the parent side.
         child_sock.close()
         self._sock = parent_sock
+        self._procstats = procstats if procstats is not None else shared_proc_stats()
+        self._procstats.register(self._proc.pid, self._on_sample)
 
         self._send(
             {
@@ -308,61 +439,210 @@ class ProcessSandbox:
                 "require_seccomp": require_seccomp,
                 "require_landlock": require_landlock,
                 "default_deny_fs": default_deny_fs,
+                "codecs": offered,
+                "shm": shm and _shm.available(),
             }
         )
 
-        self._reader = threading.Thread(
-            target=self._read_loop, name=f"pyisolate-proc-{name}", daemon=True
-        )
-        self._reader.start()
+        self._reader: Optional[threading.Thread] = None
+        if io == "hub":
+            if self._iohub is None:
+                self._iohub = shared_io_hub()
+            self._iohub.register(self._sock, self._on_readable)
+        else:
+            self._reader = threading.Thread(
+                target=self._read_loop, name=f"pyisolate-proc-{name}", daemon=True
+            )
+            self._reader.start()
         if not confine:
             self._confined.set()
 
     # -- transport ---------------------------------------------------------
 
     def _send(self, obj: dict[str, Any]) -> None:
-        data = json.dumps(obj).encode("utf-8")
+        data = self._encode(obj)
         with self._lock:
             if self._closed:
                 raise errors.SandboxError("sandbox process channel is closed")
-            self._sock.sendall(_LEN.pack(len(data)) + data)
-
-    def _recv_exact(self, size: int) -> bytes | None:
-        chunks: list[bytes] = []
-        remaining = size
-        while remaining:
-            try:
-                chunk = self._sock.recv(remaining)
-            except OSError:
-                return None
-            if not chunk:
-                return None
-            chunks.append(chunk)
-            remaining -= len(chunk)
-        return b"".join(chunks)
+            send_frame(self._sock, data)
 
     def _read_loop(self) -> None:
+        """Blocking reader for ``io="thread"``: one thread per sandbox."""
         while True:
-            header = self._recv_exact(_LEN.size)
-            if header is None:
+            try:
+                received = self._frames.recv(self._sock)
+            except OSError:
+                received = 0
+            if not received:
                 break
-            (length,) = _LEN.unpack(header)
-            body = self._recv_exact(length)
-            if body is None:
+            if not self._drain_frames():
                 break
+        self._on_channel_closed()
+
+    def _on_readable(self) -> None:
+        """Hub callback: read what is buffered without blocking, then parse it.
+
+        The hub thread serves every sandbox, so a chatty guest gets a bounded
+        number of reads per wakeup; anything left keeps the socket readable
+        and is picked up on the next pass.
+        """
+        for _ in range(_HUB_READS_PER_WAKE):
             try:
-                frame = json.loads(body.decode("utf-8"))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                continue
-            self._dispatch(frame)
+                received = self._frames.recv(self._sock, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                return
+            except OSError:
+                received = 0
+            if not received:
+                self._stop_reading()
+                self._on_channel_closed()
+                return
+            if not self._drain_frames():
+                self._stop_reading()
+                return
+
+    def _stop_reading(self) -> None:
+        if self._iohub is not None:
+            self._iohub.unregister(self._sock)
+
+    def _drain_frames(self) -> bool:
+        """Handle every complete frame buffered so far.
+
+        Returns ``False`` once the guest has overrun its output budget and the
+        channel should not be read any further.
+        """
+        frames = self._frames
+        while True:
+            length = frames.next_length()
+            if length is None:
+                return True
+            if (
+                self.output_bytes_max is not None
+                and self._output_bytes + length
+                > self.output_bytes_max + _CONTROL_FRAME_SLACK
+            ):
+                # Refuse the frame from its header rather than buffer it first.
+                self._on_output_exceeded()
+                return False
+            body = frames.pop()
+            if body is None:
+                return True
+            self._handle_body(body, length)
+
+    def _handle_body(self, body: memoryview, length: int) -> None:
+        try:
+            frame = _codec.decode(body)
+        except _codec.CodecError:
+            return
+        if not isinstance(frame, dict):
+            return
+        if frame.get("ev") == "shm":
+            frame = self._receive_shm(frame, self._frames.take_fd())
+            if frame is None:
+                return
+        elif frame.get("ev") in _OUTPUT_EVENTS and not self._charge_output(length):
+            return
+        self._dispatch(frame)
+
+    def _on_channel_closed(self) -> None:
         # The channel closed. If this was not a caller-initiated stop, the guest
         # process died on its own -- e.g. a seccomp-denied syscall killed it --
         # so surface that to any waiter instead of letting recv() hang to
         # timeout.
+        self._frames.close()
         if not self._closed:
             self._closed = True
             self._confined.set()
-            self._surface_termination()
+            # A quota breach sets ``termination_reason`` before killing the guest
+            # and surfaces the error itself once the kill has completed; the EOF
+            # that kill causes must not report it early, while the guest may
+            # still look alive to the caller.
+            if self.termination_reason is None:
+                self._surface_termination()
+            self._notify_exit()
+
+    def _notify_exit(self) -> None:
+        if self._on_exit is not None:
+            try:
+                self._on_exit(self)
+            except Exception:  # noqa: BLE001 - a callback must not break reaping
+                logger.exception("exit callback for %s failed", self.name)
+
+    def _receive_shm(
+        self, frame: dict[str, Any], fd: Optional[int]
+    ) -> Optional[dict[str, Any]]:
+        """Map an out-of-line payload and return the frame it stands for.
+
+        The size is charged against ``output_bytes_max`` before anything is
+        mapped, so an oversized buffer costs the supervisor nothing.
+        """
+        size = frame.get("size")
+        kind = frame.get("kind")
+        if fd is None:
+            return None
+        if type(size) is not int or kind not in _SHM_KINDS:
+            _close_fds([fd])
+            return None
+        if not self._charge_output(size):
+            _close_fds([fd])
+            return None
+        try:
+            view = _shm.map_sealed(fd, size)
+        except (OSError, ValueError):
+            return None
+        if kind == "buffer":
+            return {"ev": "post", "message": view}
+        if kind == "array":
+            shape = frame.get("shape")
+            try:
+                payload = ArrayPayload(
+                    data=view, dtype=str(frame.get("dtype")), shape=tuple(shape)
+                )
+            except (TypeError, ValueError):
+                return None
+            return {"ev": "post", "message": payload}
+        try:
+            inner = _codec.decode(view)
+        except _codec.CodecError:
+            return None
+        # An out-of-line body is already charged and must not nest another.
+        if not isinstance(inner, dict) or inner.get("ev") == "shm":
+            return None
+        return inner
+
+    # -- output quota ------------------------------------------------------
+
+    def _charge_output(self, size: int) -> bool:
+        """Charge *size* output bytes; on overrun kill the guest and say so."""
+        if self.output_bytes_max is None:
+            return True
+        self._output_bytes += size
+        if self._output_bytes <= self.output_bytes_max:
+            return True
+        self._on_output_exceeded()
+        return False
+
+    def _on_output_exceeded(self) -> None:
+        if self.termination_reason is not None:
+            return
+        self.termination_reason = "output_exceeded"
+        self._errors += 1
+        logger.warning(
+            "sandbox %s exceeded its %d-byte output quota; killing guest",
+            self.name,
+            self.output_bytes_max,
+        )
+        # Runs on the reader, possibly the hub thread every sandbox shares;
+        # killing the guest can block, so do it elsewhere.
+        threading.Thread(
+            target=self._kill_and_surface,
+            name=f"pyisolate-output-{self.name}",
+            daemon=True,
+        ).start()
+
+    def _kill_and_surface(self) -> None:
+        self.kill(timeout=0.2)
+        self._surface_termination()
 
     # -- wall-clock enforcement -------------------------------------------
 
@@ -389,17 +669,20 @@ class ProcessSandbox:
 
     def _arm_timer_locked(self) -> None:
         assert self.wall_time_ms is not None
-        timer = threading.Timer(self.wall_time_ms / 1000.0, self._on_wall_timeout)
-        timer.daemon = True
-        self._wall_timer = timer
-        timer.start()
+        if self._timers is None:
+            self._timers = shared_timer_wheel()
+        self._wall_generation += 1
+        self._wall_timer = self._timers.call_later(
+            self.wall_time_ms / 1000.0,
+            functools.partial(self._on_wall_deadline, self._wall_generation),
+        )
 
     def _cancel_timer_locked(self) -> None:
         if self._wall_timer is not None:
             self._wall_timer.cancel()
             self._wall_timer = None
 
-    def _surface_termination(self) -> None:
+    def _surface_termination(self, exc: Optional[Exception] = None) -> None:
         """Hand a waiting ``recv`` exactly one error for an unexpected death.
 
         The wall-clock timer and the reader thread can both observe the guest
@@ -411,16 +694,36 @@ class ProcessSandbox:
             if self._termination_surfaced:
                 return
             self._termination_surfaced = True
-        if self.termination_reason == "wall_time_exceeded":
+        if exc is not None:
+            self._outbox.put(exc)
+        elif self.termination_reason == "wall_time_exceeded":
             self._outbox.put(errors.WallTimeExceeded())
+        elif self.termination_reason == "output_exceeded":
+            self._outbox.put(errors.OutputExceeded())
         else:
             self._outbox.put(
                 errors.SandboxError("guest process terminated unexpectedly")
             )
 
-    def _on_wall_timeout(self) -> None:
-        """Kill a guest that overran its wall-clock budget and report it."""
+    def _on_wall_deadline(self, generation: int) -> None:
+        # Runs on the timer-wheel thread, which every sandbox shares; killing
+        # the guest can block, so do it elsewhere.
+        threading.Thread(
+            target=self._on_wall_timeout,
+            args=(generation,),
+            name=f"pyisolate-walltime-{self.name}",
+            daemon=True,
+        ).start()
+
+    def _on_wall_timeout(self, generation: int) -> None:
+        """Kill a guest that overran its wall-clock budget and report it.
+
+        The deadline may have been cancelled or re-armed while this thread
+        started; only the timer still armed, *generation*, may kill the guest.
+        """
         with self._timer_lock:
+            if self._wall_timer is None or generation != self._wall_generation:
+                return
             self._wall_timer = None
             self._pending_ops = 0
         if not self.is_alive():
@@ -445,9 +748,11 @@ class ProcessSandbox:
             self._outbox.put(frame.get("message"))
         elif ev == "error":
             self._errors += 1
+            self._record_op_usage(frame)
             self._op_finished()
             self._outbox.put(self._rebuild_exception(frame))
         elif ev == "done":
+            self._record_op_usage(frame)
             self._op_finished()
         elif ev == "request":
             # A capability-gated broker request from the guest. Surface it as a
@@ -463,9 +768,19 @@ class ProcessSandbox:
         elif ev == "confinement":
             self.confinement = frame
             self._confined.set()
-        # "ready", "log", and "metric" are lifecycle/telemetry frames that do
-        # not feed recv(); logging/metrics routing is added with the
-        # observability wiring for this backend.
+        elif ev == "ready":
+            # The guest echoes the codec it picked; switch our own sends to it.
+            # Only accept a codec we offered and can decode ourselves.
+            chosen = frame.get("codec", _codec.CODEC_JSON)
+            if chosen in self._offered_codecs:
+                with self._lock:
+                    self._encode = _codec.encoder_for(chosen)
+                    self.codec = chosen
+            boot_cpu_ms = _usage_ms(frame.get("cpu_ms"))
+            self.boot_cpu_ms = 0.0 if boot_cpu_ms is None else boot_cpu_ms
+        # "log" and "metric" are telemetry frames that do not feed recv();
+        # logging/metrics routing is added with the observability wiring for
+        # this backend.
 
     @staticmethod
     def _rebuild_exception(frame: dict[str, Any]) -> Exception:
@@ -522,8 +837,29 @@ class ProcessSandbox:
 
     # -- lifecycle ---------------------------------------------------------
 
+    def enforce_quota_breach(
+        self, exc: Exception, reason: str, timeout: float = 0.05
+    ) -> bool:
+        """Kill the guest for a quota breach the watchdog observed.
+
+        Mirrors :meth:`SandboxThread.enforce_quota_breach`: the reason is
+        recorded first so the EOF the kill causes does not report a generic
+        death, and a waiting ``recv`` gets *exc* once the guest is gone.
+        """
+        if self.termination_reason is None:
+            self.termination_reason = reason
+            self._errors += 1
+        stopped = self.kill(timeout=timeout)
+        self._surface_termination(exc)
+        return stopped
+
+    @property
+    def pid(self) -> int:
+        """Process id of the guest."""
+        return self._proc.pid
+
     def is_alive(self) -> bool:
-        return self._proc.poll() is None
+        return self._poll() is None
 
     @property
     def returncode(self) -> Optional[int]:
@@ -531,18 +867,62 @@ class ProcessSandbox:
 
         A guest killed by its seccomp filter reports ``-signal.SIGSYS``.
         """
-        return self._proc.poll()
+        return self._poll()
 
-    def cancel(self, timeout: float = 0.2) -> bool:
+    def _poll(self) -> Optional[int]:
+        """Reap the guest if it has exited, keeping its rusage; see ``_wait``."""
+        with self._reap_lock:
+            if self._proc.returncode is not None:
+                return self._proc.returncode
+            try:
+                pid, status, usage = os.wait4(self._proc.pid, os.WNOHANG)
+            except ChildProcessError:
+                # Reaped through the Popen object directly; it kept the status.
+                return self._proc.poll()
+            if pid == 0:
+                return None
+            self._proc.returncode = os.waitstatus_to_exitcode(status)
+        self._on_final_sample(sample_from_rusage(usage))
+        self._notify_exit()
+        return self._proc.returncode
+
+    def _wait(self, timeout: float) -> int:
+        """``Popen.wait`` through :meth:`_poll`, so the exit rusage is kept."""
+        deadline = time.monotonic() + timeout
+        delay = 0.0005
+        while True:
+            returncode = self._poll()
+            if returncode is not None:
+                return returncode
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self._proc.args, timeout)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+
+    def _signal(self, sig: int) -> None:
+        # Under the reap lock the pid cannot be reaped -- and reused -- between
+        # the liveness check and the kill.
+        with self._reap_lock:
+            if self._proc.returncode is None:
+                try:
+                    os.kill(self._proc.pid, sig)
+                except ProcessLookupError:
+                    pass
+
+    def request_stop(self) -> None:
+        """Ask the guest to stop cooperatively, without waiting."""
         with self._lock:
             if not self._closed:
                 try:
-                    data = json.dumps({"op": "stop"}).encode("utf-8")
-                    self._sock.sendall(_LEN.pack(len(data)) + data)
+                    send_frame(self._sock, self._encode({"op": "stop"}))
                 except OSError:
                     pass
+
+    def cancel(self, timeout: float = 0.2) -> bool:
+        self.request_stop()
         try:
-            self._proc.wait(timeout=timeout)
+            self._wait(timeout)
         except subprocess.TimeoutExpired:
             return False
         return not self.is_alive()
@@ -551,13 +931,13 @@ class ProcessSandbox:
         if self.cancel(timeout=timeout):
             self._teardown()
             return True
-        self._proc.terminate()
+        self._signal(signal.SIGTERM)
         try:
-            self._proc.wait(timeout=timeout)
+            self._wait(timeout)
         except subprocess.TimeoutExpired:
-            self._proc.kill()
+            self._signal(signal.SIGKILL)
             try:
-                self._proc.wait(timeout=timeout)
+                self._wait(timeout)
             except subprocess.TimeoutExpired:
                 pass
         self._teardown()
@@ -578,10 +958,13 @@ class ProcessSandbox:
             self._cancel_timer_locked()
         with self._lock:
             self._closed = True
+            self._stop_reading()
             try:
                 self._sock.close()
             except OSError:
                 pass
+        self._frames.close()
+        self._procstats.unregister(self._proc.pid)
 
     def quarantine(self, reason: str) -> None:
         self._quarantine_reason = reason
@@ -597,18 +980,63 @@ class ProcessSandbox:
     def get_syscall_log(self) -> list[str]:
         return []
 
+    def _record_op_usage(self, frame: dict[str, Any]) -> None:
+        """Fold the CPU and wall time a finished operation reported into stats."""
+        cpu_ms = _usage_ms(frame.get("cpu_ms"))
+        wall_ms = _usage_ms(frame.get("wall_ms"))
+        with self._usage_lock:
+            if cpu_ms is not None and not self._exited:
+                self._cpu_ms_since_sample += cpu_ms
+            if wall_ms is not None:
+                self._latency_sum += wall_ms
+                for bucket, bound in _LATENCY_BUCKETS:
+                    if wall_ms <= bound:
+                        self._latency[bucket] += 1
+                        break
+                else:
+                    self._latency["inf"] += 1
+
+    def _on_sample(self, sample: ProcSample) -> None:
+        # A sample already covers every operation reported before it, so the
+        # reported CPU starts accumulating afresh.
+        with self._usage_lock:
+            if self._exited:
+                return
+            self._cpu_ms_sampled = max(self._cpu_ms_sampled, sample.cpu_ms)
+            self._cpu_ms_since_sample = 0.0
+            self._rss_bytes = sample.rss_bytes
+            self._peak_rss_bytes = max(self._peak_rss_bytes, sample.peak_rss_bytes)
+
+    def _on_final_sample(self, sample: ProcSample) -> None:
+        with self._usage_lock:
+            # The exit rusage is exact; it replaces the running estimate.
+            self._exited = True
+            self._cpu_ms_sampled = sample.cpu_ms
+            self._cpu_ms_since_sample = 0.0
+            self._rss_bytes = 0
+            self._peak_rss_bytes = max(self._peak_rss_bytes, sample.peak_rss_bytes)
+        self._procstats.unregister(self._proc.pid)
+
     @property
     def stats(self) -> Stats:
-        # CPU/memory accounting for the process backend arrives with the rlimit
-        # and cgroup layers; operations and errors are tracked here already.
+        return self.sample_stats()
+
+    def sample_stats(self, *, denials: bool = True) -> Stats:
+        """Return a :class:`Stats` snapshot; no denials are collected yet."""
+        self._procstats.refresh()
+        with self._usage_lock:
+            cpu_ms = self._cpu_ms_sampled + self._cpu_ms_since_sample
+            mem_bytes = self._peak_rss_bytes
+            latency = dict(self._latency)
+            latency_sum = self._latency_sum
         return Stats(
-            cpu_ms=0.0,
-            mem_bytes=0,
-            latency={"0.5": 0, "1": 0, "5": 0, "10": 0, "inf": 0},
-            latency_sum=0.0,
+            cpu_ms=cpu_ms,
+            mem_bytes=mem_bytes,
+            latency=latency,
+            latency_sum=latency_sum,
             errors=self._errors,
             operations=self._ops,
-            cost=0.0,
+            cost=cpu_ms * 0.0001 + mem_bytes * 1e-9,
             denials=[],
         )
 
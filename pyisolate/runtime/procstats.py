@@ -0,0 +1,247 @@
+"""CPU and memory accounting for process-backend guests.
+
+A ``ProcessSandbox`` cannot measure its guest the way ``SandboxThread`` measures
+itself, so its numbers come from three places:
+
+* the guest reports the CPU and wall time of each operation in its ``done`` and
+  ``error`` frames, which keeps the latency histogram and CPU total fresh
+  between samples;
+* :class:`ProcStatsCollector` samples ``/proc/<pid>/stat`` (user + system
+  ticks) and ``/proc/<pid>/status`` (``VmRSS``/``VmHWM``) for every registered
+  guest in one pass. The files are opened once at registration and re-read
+  with ``pread``, so a pass costs two reads per guest. A descriptor opened for
+  a pid keeps referring to that process, so a pass never reports a recycled
+  pid's numbers;
+* ``os.wait4`` returns the final rusage when the guest is reaped
+  (:func:`sample_from_rusage`).
+
+CPU time and the resident-set high-water mark only ever grow, so a sample
+taken when someone asks loses nothing a periodic one would have caught. The
+collector therefore has no thread: reading a sandbox's stats calls
+:meth:`ProcStatsCollector.refresh`, which samples every guest at once unless a
+pass ran within ``max_age`` seconds. A scrape of many sandboxes costs one pass,
+and an unobserved supervisor costs nothing.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import resource
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+__all__ = [
+    "ProcSample",
+    "ProcStatsCollector",
+    "parse_stat",
+    "parse_status",
+    "read_sample",
+    "sample_from_rusage",
+    "shared_proc_stats",
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE = 1.0
+"""Seconds a pass stays fresh enough for :meth:`ProcStatsCollector.refresh`."""
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_READ_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class ProcSample:
+    """One accounting reading for a guest process."""
+
+    cpu_ms: float
+    """User plus system CPU time the process has used, in milliseconds."""
+    rss_bytes: int
+    """Resident set size now; ``0`` once the process has exited."""
+    peak_rss_bytes: int
+    """High-water mark of the resident set size."""
+
+
+SampleCallback = Callable[[ProcSample], None]
+
+
+def parse_stat(data: bytes) -> float:
+    """Return the user + system CPU milliseconds in a ``/proc/<pid>/stat`` line.
+
+    The command name is parenthesised and may itself contain spaces or
+    parentheses, so fields are counted from the last ``)``.
+    """
+    fields = data[data.rindex(b")") + 2 :].split()
+    # utime and stime are fields 14 and 15; the first field after the name is 3.
+    ticks = int(fields[11]) + int(fields[12])
+    return ticks * 1000.0 / _CLOCK_TICKS
+
+
+def parse_status(data: bytes) -> tuple[int, int]:
+    """Return ``(VmRSS, VmHWM)`` in bytes from ``/proc/<pid>/status``.
+
+    Both are ``0`` for a process without an address space (a zombie).
+    """
+    rss = peak = 0
+    for line in data.splitlines():
+        if line.startswith(b"VmRSS:"):
+            rss = int(line.split()[1]) * 1024
+        elif line.startswith(b"VmHWM:"):
+            peak = int(line.split()[1]) * 1024
+    return rss, peak
+
+
+def read_sample(pid: int) -> Optional[ProcSample]:
+    """Sample *pid* once; ``None`` if it is gone or ``/proc`` is unavailable."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as fh:
+            cpu_ms = parse_stat(fh.read())
+        with open(f"/proc/{pid}/status", "rb") as fh:
+            rss, peak = parse_status(fh.read())
+    except (OSError, ValueError, IndexError):
+        return None
+    return ProcSample(cpu_ms=cpu_ms, rss_bytes=rss, peak_rss_bytes=peak)
+
+
+def sample_from_rusage(usage: resource.struct_rusage) -> ProcSample:
+    """Convert the rusage ``os.wait4`` returns for a reaped child."""
+    return ProcSample(
+        cpu_ms=(usage.ru_utime + usage.ru_stime) * 1000.0,
+        rss_bytes=0,
+        # Linux reports ru_maxrss in KiB.
+        peak_rss_bytes=usage.ru_maxrss * 1024,
+    )
+
+
+class _Target:
+    __slots__ = ("stat_fd", "status_fd", "callback")
+
+    def __init__(self, stat_fd: int, status_fd: int, callback: SampleCallback):
+        self.stat_fd = stat_fd
+        self.status_fd = status_fd
+        self.callback = callback
+
+    def read(self) -> ProcSample:
+        cpu_ms = parse_stat(os.pread(self.stat_fd, _READ_SIZE, 0))
+        rss, peak = parse_status(os.pread(self.status_fd, _READ_SIZE, 0))
+        return ProcSample(cpu_ms=cpu_ms, rss_bytes=rss, peak_rss_bytes=peak)
+
+    def close(self) -> None:
+        for fd in (self.stat_fd, self.status_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class ProcStatsCollector:
+    """Samples every registered guest process in one batch, on demand."""
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE) -> None:
+        if max_age < 0:
+            raise ValueError("max_age must not be negative")
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # Serialises passes; a caller that finds one running waits for its
+        # result instead of starting another.
+        self._pass_lock = threading.Lock()
+        self._targets: dict[int, _Target] = {}
+        self._last_pass: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def register(self, pid: int, callback: SampleCallback) -> bool:
+        """Deliver samples of *pid* to *callback* from each pass.
+
+        Returns ``False`` when *pid* cannot be sampled (no ``/proc``, or the
+        process is already gone); the caller keeps whatever the guest and
+        ``wait4`` report.
+        """
+        try:
+            stat_fd = os.open(f"/proc/{pid}/stat", os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            return False
+        try:
+            status_fd = os.open(f"/proc/{pid}/status", os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            os.close(stat_fd)
+            return False
+        with self._lock:
+            previous = self._targets.pop(pid, None)
+            self._targets[pid] = _Target(stat_fd, status_fd, callback)
+        if previous is not None:
+            self._close_targets([previous])
+        return True
+
+    def unregister(self, pid: int) -> None:
+        """Stop sampling *pid*; safe to call more than once."""
+        with self._lock:
+            target = self._targets.pop(pid, None)
+        if target is not None:
+            self._close_targets([target])
+
+    def refresh(self) -> int:
+        """Run a pass unless one ran within ``max_age``; return guests sampled."""
+        with self._pass_lock:
+            last = self._last_pass
+            if last is not None and time.monotonic() - last < self.max_age:
+                return 0
+            return self._sample_locked()
+
+    def sample(self) -> int:
+        """Run one pass now; return the number of guests sampled."""
+        with self._pass_lock:
+            return self._sample_locked()
+
+    def _sample_locked(self) -> int:
+        with self._lock:
+            targets = list(self._targets.items())
+        sampled = 0
+        for pid, target in targets:
+            try:
+                reading = target.read()
+            except (OSError, ValueError, IndexError):
+                # Exited and reaped: wait4 reports the final numbers.
+                with self._lock:
+                    if self._targets.get(pid) is target:
+                        del self._targets[pid]
+                target.close()
+                continue
+            try:
+                target.callback(reading)
+            except Exception:  # noqa: BLE001 - keep sampling the other guests
+                logger.exception("process stats callback failed")
+            sampled += 1
+        self._last_pass = time.monotonic()
+        return sampled
+
+    def close(self) -> None:
+        """Forget every registration and close its descriptors."""
+        with self._lock:
+            targets = list(self._targets.values())
+            self._targets.clear()
+            self._last_pass = None
+        self._close_targets(targets)
+
+    def _close_targets(self, targets: list[_Target]) -> None:
+        # Not while a pass may still be reading them: a descriptor number
+        # reused meanwhile would be read as this guest's.
+        with self._pass_lock:
+            for target in targets:
+                target.close()
+
+
+_shared: Optional[ProcStatsCollector] = None
+_shared_lock = threading.Lock()
+
+
+def shared_proc_stats() -> ProcStatsCollector:
+    """Return the process-wide collector used when no supervisor supplies one."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ProcStatsCollector()
+        return _shared
@@ -9,6 +9,9 @@ capability request instead of growing the guest surface.
 
 from __future__ import annotations
 
+import math
+import sys
+from array import array
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
@@ -105,6 +108,143 @@ class PostEvent:
     op: CellOp = CellOp.POST
 
 
+# dtype codes follow NumPy's ``typestr`` spelling: byte order (``<`` little
+# endian, ``|`` not applicable), kind (signed/unsigned int, float, bool) and
+# item size in bytes. Only the fixed-width numeric kinds listed here are
+# representable.
+_DTYPE_TO_FORMAT = {
+    "|i1": "b",
+    "|u1": "B",
+    "|b1": "?",
+    "<i2": "h",
+    "<u2": "H",
+    "<i4": "i",
+    "<u4": "I",
+    "<i8": "q",
+    "<u8": "Q",
+    "<f4": "f",
+    "<f8": "d",
+}
+_SIGNED_FORMATS = frozenset("bhilqn")
+_UNSIGNED_FORMATS = frozenset("BHILQN")
+_FLOAT_FORMATS = frozenset("fd")
+_BIG_ENDIAN_HOST = sys.byteorder == "big"
+
+
+def _dtype_for_format(fmt: str, itemsize: int) -> str:
+    """Map a buffer-protocol format to a little-endian dtype code."""
+    order, code = (fmt[0], fmt[1:]) if fmt[0] in "@=<>!" else ("@", fmt)
+    # Explicit byte orders other than the host's are not converted.
+    if len(code) != 1 or order in ">!" or (order == "<" and _BIG_ENDIAN_HOST):
+        raise TypeError(f"unsupported array format {fmt!r}")
+    if code in _SIGNED_FORMATS:
+        kind = "i"
+    elif code in _UNSIGNED_FORMATS:
+        kind = "u"
+    elif code in _FLOAT_FORMATS:
+        kind = "f"
+    elif code == "?":
+        kind = "b"
+    else:
+        raise TypeError(f"unsupported array format {fmt!r}")
+    dtype = f"{'|' if itemsize == 1 else '<'}{kind}{itemsize}"
+    if dtype not in _DTYPE_TO_FORMAT:
+        raise TypeError(f"unsupported array format {fmt!r}")
+    return dtype
+
+
+@dataclass(frozen=True)
+class ArrayPayload:
+    """Homogeneous numeric array crossing the cell boundary as one buffer.
+
+    ``data`` holds the elements as raw little-endian bytes in C order,
+    ``dtype`` is a NumPy-style type code such as ``"<f8"`` and ``shape`` the
+    dimensions. The host can wrap it without copying -- ``numpy.asarray``
+    understands :attr:`__array_interface__` -- or read it through
+    :meth:`view`.
+    """
+
+    data: memoryview
+    dtype: str
+    shape: tuple[int, ...]
+
+    def __post_init__(self) -> None:
+        data = memoryview(self.data)
+        if data.format != "B" or data.ndim != 1:
+            data = data.cast("B")
+        object.__setattr__(self, "data", data.toreadonly())
+        object.__setattr__(self, "shape", tuple(self.shape))
+        if self.dtype not in _DTYPE_TO_FORMAT:
+            raise ValueError(f"unsupported dtype {self.dtype!r}")
+        if any(type(dim) is not int or dim < 0 for dim in self.shape):
+            raise ValueError("shape must be a tuple of non-negative ints")
+        if math.prod(self.shape) * self.itemsize != self.data.nbytes:
+            raise ValueError(
+                f"{self.data.nbytes} bytes do not hold shape {self.shape} of "
+                f"{self.dtype}"
+            )
+
+    @classmethod
+    def from_buffer(
+        cls, obj: Any, shape: tuple[int, ...] | None = None
+    ) -> "ArrayPayload":
+        """Describe a C-contiguous buffer-protocol object (``array.array``,
+        ``memoryview``, a NumPy array, ...) without copying it."""
+        view = memoryview(obj)
+        if not view.c_contiguous:
+            raise ValueError("array payloads must be C-contiguous")
+        dtype = _dtype_for_format(view.format, view.itemsize)
+        if shape is None:
+            shape = tuple(view.shape or ())
+        raw = view.cast("B") if view.format != "B" or view.ndim != 1 else view
+        if _BIG_ENDIAN_HOST and view.itemsize > 1:
+            swapped = array(_DTYPE_TO_FORMAT[dtype], raw.tobytes())
+            swapped.byteswap()
+            raw = memoryview(swapped).cast("B")
+        return cls(data=raw, dtype=dtype, shape=tuple(shape))
+
+    @property
+    def itemsize(self) -> int:
+        return int(self.dtype[2:])
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    @property
+    def __array_interface__(self) -> dict[str, Any]:
+        return {
+            "version": 3,
+            "shape": self.shape,
+            "typestr": self.dtype,
+            "data": self.data,
+        }
+
+    def detached(self) -> "ArrayPayload":
+        """Return a copy that no longer shares memory with the producer."""
+        return ArrayPayload(
+            data=memoryview(self.data.tobytes()), dtype=self.dtype, shape=self.shape
+        )
+
+    def view(self) -> memoryview:
+        """Return a typed, shaped ``memoryview`` of the elements.
+
+        Zero-copy on little-endian hosts; big-endian hosts get a byte-swapped
+        copy.
+        """
+        fmt = _DTYPE_TO_FORMAT[self.dtype]
+        raw = self.data
+        if _BIG_ENDIAN_HOST and self.itemsize > 1:
+            swapped = array(fmt, raw.tobytes())
+            swapped.byteswap()
+            raw = memoryview(swapped).cast("B")
+        return raw.cast(fmt, list(self.shape)) if self.shape else raw.cast(fmt)
+
+    def tolist(self) -> Any:
+        """Return the elements as (nested) Python lists."""
+        return self.view().tolist()
+
+
 @dataclass(frozen=True)
 class LogEvent:
     """Structured guest log record emitted on the cell channel."""
@@ -0,0 +1,88 @@
+"""Sealed ``memfd`` buffers for out-of-line transfer on the process channel.
+
+Large payloads posted by a ``backend="process"`` guest do not travel through
+the socket byte stream. The guest copies them once into an anonymous
+``memfd_create`` file, seals it against any further change, and passes the file
+descriptor to the supervisor with ``SCM_RIGHTS`` next to a small descriptor
+frame. The supervisor maps the file read-only and hands the caller a
+``memoryview`` of the mapping -- no ``recv`` chunking, no join, no decode.
+
+The descriptor comes from untrusted guest code, so the receiving side trusts
+nothing about it: :func:`map_sealed` requires the shrink/grow/write seals
+(which only a memfd can carry, and which make the contents immutable for the
+lifetime of the mapping, so the guest can neither change the data after it has
+been checked nor truncate it to fault the supervisor with ``SIGBUS``), checks
+the size against the one the frame declared, and always closes the descriptor.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+from typing import Any
+
+__all__ = [
+    "SHM_THRESHOLD",
+    "ShmError",
+    "available",
+    "create_sealed",
+    "map_sealed",
+]
+
+SHM_THRESHOLD = 1 << 20
+"""Payloads at least this large (in bytes) are sent through a sealed memfd."""
+
+_SEALS = getattr(fcntl, "F_SEAL_SHRINK", 0) | getattr(fcntl, "F_SEAL_GROW", 0)
+_SEALS |= getattr(fcntl, "F_SEAL_WRITE", 0)
+_ALL_SEALS = _SEALS | getattr(fcntl, "F_SEAL_SEAL", 0)
+
+
+class ShmError(ValueError):
+    """Raised when a shared-memory buffer fails validation."""
+
+
+def available() -> bool:
+    """Return whether this platform can create and seal memfd buffers."""
+    return hasattr(os, "memfd_create") and hasattr(fcntl, "F_ADD_SEALS")
+
+
+def create_sealed(data: Any, name: str = "pyisolate") -> int:
+    """Copy the buffer *data* into a new sealed memfd and return its descriptor.
+
+    The caller owns the returned descriptor and must close it once it has been
+    sent.
+    """
+    view = memoryview(data).cast("B")
+    fd = os.memfd_create(name, os.MFD_CLOEXEC | os.MFD_ALLOW_SEALING)
+    try:
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+        fcntl.fcntl(fd, fcntl.F_ADD_SEALS, _ALL_SEALS)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def map_sealed(fd: int, size: int) -> memoryview:
+    """Map a sealed memfd of exactly *size* bytes read-only.
+
+    *fd* is always closed, whether or not validation succeeds; the returned
+    ``memoryview`` keeps the mapping alive on its own.
+    """
+    try:
+        try:
+            seals = fcntl.fcntl(fd, fcntl.F_GET_SEALS)
+        except OSError:
+            raise ShmError("descriptor is not a sealable memfd") from None
+        if seals & _SEALS != _SEALS:
+            raise ShmError("memfd is not sealed against writes and resizing")
+        actual = os.fstat(fd).st_size
+        if size <= 0 or actual != size:
+            raise ShmError(f"memfd holds {actual} bytes, frame declared {size}")
+        mapping = mmap.mmap(fd, size, flags=mmap.MAP_SHARED, prot=mmap.PROT_READ)
+    finally:
+        os.close(fd)
+    return memoryview(mapping)
@@ -59,6 +59,7 @@ from ..observability.trace import Tracer
 from ..policy.model import RuntimePolicy, from_sandbox_policy
 from ..telemetry import Decision, DenialEvent
 from .protocol import (
+    ArrayPayload,
     AttachCgroupRequest,
     BrokerRequest,
     CallRequest,
@@ -1053,6 +1054,8 @@ class Stats:
     operations: int
     cost: float
     denials: list[DenialEvent] = field(default_factory=list)
+    denial_counts: dict[tuple[str, str, str, str], int] = field(default_factory=dict)
+    """Denials per ``(capability, policy_rule, kernel_decision, broker_decision)``."""
 
 
 class SandboxThread(threading.Thread):
@@ -1175,6 +1178,7 @@ class SandboxThread(threading.Thread):
         self._output_bytes = 0
         self._child_work = 0
         self._denial_events: list[DenialEvent] = []
+        self._denial_counts: dict[tuple[str, str, str, str], int] = {}
 
     def __init__(
         self,
@@ -1194,6 +1198,7 @@ class SandboxThread(threading.Thread):
         cgroup_path=None,
         capabilities: Optional[dict[str, Any]] = None,
         enforcement_status: Any = None,
+        on_exit: Optional[Callable[["SandboxThread"], object]] = None,
     ):
         super().__init__(name=name, daemon=True)
         self._logger = logging.getLogger(f"pyisolate.{name}")
@@ -1201,6 +1206,8 @@ class SandboxThread(threading.Thread):
         self._outbox: "queue.Queue[Any]" = queue.Queue()
         self._stop_event = threading.Event()
         self._on_violation = on_violation
+        # Called from this thread as its run loop returns, however it ends.
+        self._on_exit = on_exit
         self._tracer = tracer or Tracer()
         self._init_config_wiring(
             policy=policy,
@@ -1293,11 +1300,17 @@ class SandboxThread(threading.Thread):
     def _estimate_output_size(item: Any) -> int:
         if isinstance(item, bytes):
             return len(item)
+        if isinstance(item, ArrayPayload):
+            return item.nbytes
         if isinstance(item, str):
             return len(item.encode("utf-8"))
         return len(repr(item).encode("utf-8"))
 
     def _post(self, item: Any) -> None:
+        if isinstance(item, ArrayPayload):
+            # Host and guest share an address space here; snapshot the buffer
+            # so later guest writes cannot change what the host received.
+            item = item.detached()
         self._emit(item)
 
     def _emit(self, item: Any) -> None:
@@ -1361,9 +1374,17 @@ class SandboxThread(threading.Thread):
 
     def _record_denial(self, event: DenialEvent) -> None:
         self._denial_events.append(event)
-        self._logger.warning(
-            "operation denied", extra={"denial_event": event.to_dict()}
+        key = (
+            event.capability,
+            event.policy_rule,
+            event.kernel_decision,
+            event.broker_decision,
         )
+        self._denial_counts[key] = self._denial_counts.get(key, 0) + 1
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._logger.warning(
+                "operation denied", extra={"denial_event": event.to_dict()}
+            )
 
     def get_denial_events(self) -> list[dict[str, str]]:
         """Return structured denial telemetry for this sandbox."""
@@ -1410,13 +1431,27 @@ class SandboxThread(threading.Thread):
         except queue.Empty:
             raise errors.TimeoutError("no message received")
 
-    def cancel(self, timeout: float = 0.2) -> bool:
-        """Request cooperative shutdown and wait up to *timeout* seconds."""
+    def request_stop(self) -> None:
+        """Ask the sandbox to stop cooperatively, without waiting."""
         self._stop_event.set()
         self._inbox.put(StopRequest())
+
+    def cancel(self, timeout: float = 0.2) -> bool:
+        """Request cooperative shutdown and wait up to *timeout* seconds."""
+        self.request_stop()
         self.join(timeout)
         return not self.is_alive()
 
+    def interrupt(self) -> None:
+        """Raise a kill request in the sandbox thread, without waiting."""
+        if self.ident is None:
+            return
+        result = ctypes.pythonapi.PyThreadState_SetAsyncExc(
+            ctypes.c_ulong(self.ident), ctypes.py_object(_KillRequest)
+        )
+        if result > 1:
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self.ident), None)
+
     def kill(self, timeout: float = 0.2) -> bool:
         """Attempt non-cooperative termination for wedged guest code."""
         if self.cancel(timeout=timeout):
@@ -1424,13 +1459,7 @@ class SandboxThread(threading.Thread):
         if self.ident is None:
             return not self.is_alive()
         for _ in range(3):
-            result = ctypes.pythonapi.PyThreadState_SetAsyncExc(
-                ctypes.c_ulong(self.ident), ctypes.py_object(_KillRequest)
-            )
-            if result > 1:
-                ctypes.pythonapi.PyThreadState_SetAsyncExc(
-                    ctypes.c_ulong(self.ident), None
-                )
+            self.interrupt()
             self.join(timeout / 3 if timeout > 0 else 0)
             if not self.is_alive():
                 return True
@@ -1521,6 +1550,15 @@ class SandboxThread(threading.Thread):
 
     @property
     def stats(self):
+        return self.sample_stats()
+
+    def sample_stats(self, *, denials: bool = True) -> Stats:
+        """Return a :class:`Stats` snapshot.
+
+        ``denials=False`` leaves :attr:`Stats.denials` empty instead of copying
+        the denial log; :attr:`Stats.denial_counts` still summarizes it. The
+        metrics exporter samples every sandbox this way on each scrape.
+        """
         # ``stats`` is read from other threads (the metrics scraper, supervisor)
         # while the sandbox thread concurrently flips ``_start_time`` between a
         # float and ``None`` in its run loop. Snapshot it once so the value
@@ -1540,7 +1578,8 @@ class SandboxThread(threading.Thread):
             errors=self._errors,
             operations=self._ops,
             cost=cost,
-            denials=list(self._denial_events),
+            denials=list(self._denial_events) if denials else [],
+            denial_counts=dict(self._denial_counts),
         )
 
     # internal thread run loop
@@ -1571,6 +1610,7 @@ class SandboxThread(threading.Thread):
                 "metric": self._metric,
                 "request": self._request,
                 "caps": self._capabilities,
+                "ArrayPayload": ArrayPayload,
             }
 
             if self.numa_node is not None:
@@ -1718,3 +1758,8 @@ class SandboxThread(threading.Thread):
         finally:
             if prev_handler is not None:
                 signal.signal(signal.SIGXCPU, prev_handler)
+            if self._on_exit is not None:
+                try:
+                    self._on_exit(self)
+                except Exception:  # noqa: BLE001 - the thread is exiting anyway
+                    self._logger.exception("exit callback failed")
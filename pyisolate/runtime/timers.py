@@ -0,0 +1,194 @@
+"""Shared timer wheel for supervisor-side deadlines.
+
+Wall-clock quotas are enforced in the supervisor by arming a deadline when an
+operation is dispatched and cancelling it when the guest reports completion.
+Giving every deadline its own ``threading.Timer`` costs one OS thread per
+dispatched operation, so a busy supervisor spends most of its time creating
+and joining threads that almost never fire.
+
+:class:`TimerWheel` is a hashed timing wheel serviced by one daemon thread.
+Arming hashes the deadline's tick into a slot and cancelling removes it from
+that slot, both O(1) under a single lock. The thread advances the wheel one tick
+at a time while timers are pending and sleeps without a timeout when none are,
+so an idle wheel costs nothing. Deadlines fire no earlier than requested and at
+most one tick late.
+
+Callbacks run on the wheel thread, so they must be quick; anything that may
+block (killing a process, say) should hand off to another thread.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+__all__ = ["TimerHandle", "TimerWheel", "shared_timer_wheel"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK = 0.005
+"""Wheel resolution in seconds."""
+
+DEFAULT_SLOTS = 1024
+"""Number of wheel slots; deadlines further out than one turn wrap around."""
+
+
+class TimerHandle:
+    """A pending deadline returned by :meth:`TimerWheel.call_later`."""
+
+    __slots__ = ("_wheel", "_tick", "_callback", "_slot")
+
+    def __init__(
+        self, wheel: "TimerWheel", tick: int, callback: Callable[[], None]
+    ) -> None:
+        self._wheel = wheel
+        self._tick = tick
+        self._callback: Optional[Callable[[], None]] = callback
+        self._slot: Optional[dict[TimerHandle, None]] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether the deadline is still armed (not fired, not cancelled)."""
+        return self._callback is not None
+
+    def cancel(self) -> None:
+        """Disarm the deadline; a no-op if it already fired or was cancelled."""
+        self._wheel._cancel(self)
+
+
+class TimerWheel:
+    """Hashed timing wheel with O(1) arm and cancel, driven by one thread."""
+
+    def __init__(
+        self,
+        tick: float = DEFAULT_TICK,
+        slots: int = DEFAULT_SLOTS,
+        name: str = "pyisolate-timers",
+    ) -> None:
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+        if slots <= 0:
+            raise ValueError("slots must be positive")
+        self._tick = tick
+        self._slots: list[dict[TimerHandle, None]] = [{} for _ in range(slots)]
+        self._name = name
+        self._origin = time.monotonic()
+        # The last tick whose slot has been serviced.
+        self._cursor = self._now_tick()
+        self._pending = 0
+        self._cond = threading.Condition(threading.Lock())
+        # The thread servicing the wheel; a thread that finds it is no longer
+        # this one (after close) exits.
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def _now_tick(self) -> int:
+        return int((time.monotonic() - self._origin) / self._tick)
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run *callback* on the wheel thread once *delay* seconds have passed."""
+        with self._cond:
+            # Round up, plus one tick, so a deadline never fires early: the
+            # current tick is already partly elapsed.
+            due = math.ceil((time.monotonic() - self._origin + delay) / self._tick) + 1
+            handle = TimerHandle(self, due, callback)
+            slot = self._slots[due % len(self._slots)]
+            slot[handle] = None
+            handle._slot = slot
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            elif self._pending == 1:
+                self._cond.notify()
+        return handle
+
+    def _cancel(self, handle: TimerHandle) -> None:
+        with self._cond:
+            slot = handle._slot
+            if slot is None:
+                return
+            del slot[handle]
+            handle._slot = None
+            handle._callback = None
+            self._pending -= 1
+
+    def close(self) -> None:
+        """Stop the wheel thread; pending deadlines are dropped unfired.
+
+        The wheel stays usable: arming a new deadline starts a fresh thread.
+        """
+        with self._cond:
+            for slot in self._slots:
+                for handle in slot:
+                    handle._slot = None
+                    handle._callback = None
+                slot.clear()
+            self._pending = 0
+            thread, self._thread = self._thread, None
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1.0)
+
+    def _collect_due(self) -> list[Callable[[], None]]:
+        """Advance the cursor to now and detach every deadline that is due."""
+        now = self._now_tick()
+        due: list[Callable[[], None]] = []
+        # After a long sleep only one full turn needs visiting: every slot is
+        # checked against the current tick, not the one being stepped over.
+        start = max(self._cursor + 1, now - len(self._slots) + 1)
+        for tick in range(start, now + 1):
+            slot = self._slots[tick % len(self._slots)]
+            if not slot:
+                continue
+            for handle in [h for h in slot if h._tick <= now]:
+                del slot[handle]
+                handle._slot = None
+                callback, handle._callback = handle._callback, None
+                self._pending -= 1
+                if callback is not None:
+                    due.append(callback)
+        self._cursor = now
+        return due
+
+    def _run(self) -> None:
+        me = threading.current_thread()
+        while True:
+            with self._cond:
+                while self._thread is me and not self._pending:
+                    self._cond.wait()
+                if self._thread is not me:
+                    return
+                # Sleep to the next tick boundary, then service the slots.
+                next_tick = (self._cursor + 1) * self._tick + self._origin
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    if self._thread is not me:
+                        return
+                due = self._collect_due()
+            for callback in due:
+                try:
+                    callback()
+                except Exception:  # noqa: BLE001 - keep the wheel running
+                    logger.exception("timer callback failed")
+
+
+_shared: Optional[TimerWheel] = None
+_shared_lock = threading.Lock()
+
+
+def shared_timer_wheel() -> TimerWheel:
+    """Return the process-wide wheel used when no supervisor supplies one."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TimerWheel()
+        return _shared
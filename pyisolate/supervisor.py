@@ -10,25 +10,46 @@ layers are best-effort and degrade on hosts that lack them.
 
 from __future__ import annotations
 
+import contextlib
 import importlib
 import logging
 import os
 import re
+import signal
 import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Literal, Optional, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Literal,
+    Mapping,
+    Optional,
+    Union,
+    cast,
+)
 
 from . import cgroup, recovery
+from .bpf.contract import cgroup_id_for_path, compile_deny_mask
 from .capabilities import ROOT, RootCapability
 from .errors import PolicyAuthError, TenantQuotaExceeded
+from .events import DEFAULT_MAXSIZE, EventHub, EventSubscription
 from .observability.alerts import AlertManager
 from .observability.trace import Tracer
-from .policy import resolve_policy
+from .policy import RuntimePolicySet, resolve_policy
+from .reaper import SandboxReaper
 from .runtime import microvm as _microvm
+from .runtime.iohub import IOHub
 from .runtime.process_backend import ProcessSandbox
+from .runtime.procstats import ProcStatsCollector
 from .runtime.protocol import CapabilityHandle, ControlRequest
 from .runtime.thread import SandboxThread
-from .telemetry import DenialEvent
+from .runtime.timers import TimerWheel
+from .telemetry import DenialEvent, LifecycleKind
 from .watchdog import ResourceWatchdog
 
 logger = logging.getLogger(__name__)
@@ -51,6 +72,11 @@ SUPPORTED_BACKENDS: tuple[BackendMode, ...] = (
 )
 IMPLEMENTED_BACKENDS: tuple[BackendMode, ...] = ("subinterpreter", "process")
 
+DEFAULT_STOP_TIMEOUT = 1.0
+"""Seconds :meth:`Supervisor.close_many` and ``shutdown`` allow, in total."""
+
+_SPAWN_MANY_WORKERS = 32
+
 
 def _normalize_backend(backend: str) -> BackendMode:
     if backend not in SUPPORTED_BACKENDS:
@@ -61,12 +87,12 @@ def _normalize_backend(backend: str) -> BackendMode:
 
 # Quotas the sub-interpreter backend enforces with in-process counters that have
 # no equivalent in the process backend yet: the guest runs in another address
-# space, so the supervisor cannot see its socket operations, its stdout volume,
-# or the threads it starts. Accepting these silently would hand callers a limit
-# that does nothing, which is worse than refusing them.
+# space, so the supervisor cannot see its socket operations or the threads it
+# starts. Accepting these silently would hand callers a limit that does nothing,
+# which is worse than refusing them. (``output_bytes_max`` is enforced: every
+# output frame crosses the supervisor's channel and is charged there.)
 PROCESS_UNSUPPORTED_QUOTAS: tuple[str, ...] = (
     "network_ops_max",
-    "output_bytes_max",
     "child_work_max",
     "numa_node",
 )
@@ -94,6 +120,49 @@ def _require_implemented_backend(backend: BackendMode) -> None:
     )
 
 
+def _wait_stopped(sandboxes: list[Any], until: float) -> list[Any]:
+    """Poll *sandboxes* until all have stopped or *until*; return the rest."""
+    alive = [sb for sb in sandboxes if sb.is_alive()]
+    delay = 0.0005
+    while alive:
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.02)
+        alive = [sb for sb in alive if sb.is_alive()]
+    return alive
+
+
+def _stop_concurrently(sandboxes: list[Any], timeout: float) -> list[Any]:
+    """Stop *sandboxes* together within *timeout* seconds; return survivors.
+
+    Every sandbox is asked to stop before any is waited for, so they wind
+    down in parallel and the call takes at most *timeout* however many there
+    are. Half the budget goes to cooperative stops. Sandboxes still running
+    then are interrupted (threads) or sent ``SIGTERM`` (processes), and after
+    another quarter interrupted again or sent ``SIGKILL``.
+    """
+    deadline = time.monotonic() + timeout
+    for sb in sandboxes:
+        sb.request_stop()
+    alive = _wait_stopped(sandboxes, deadline - timeout / 2)
+    for sig, until in (
+        (signal.SIGTERM, deadline - timeout / 4),
+        (signal.SIGKILL, deadline),
+    ):
+        for sb in alive:
+            if isinstance(sb, ProcessSandbox):
+                sb._signal(sig)
+            else:
+                sb.interrupt()
+        alive = _wait_stopped(alive, until)
+    for sb in sandboxes:
+        if isinstance(sb, ProcessSandbox):
+            sb._teardown()
+    return alive
+
+
 class Sandbox:
     """Handle to a sandbox.
 
@@ -197,6 +266,10 @@ class Sandbox:
     def stats(self):
         return self._thread.stats
 
+    def sample_stats(self, *, denials: bool = True):
+        """Return :attr:`stats`, optionally without copying the denial log."""
+        return self._thread.sample_stats(denials=denials)
+
     @property
     def termination_reason(self) -> str | None:
         return self._thread.termination_reason
@@ -211,6 +284,35 @@ class Sandbox:
         return self._thread._quarantine_reason
 
 
+class _SpawnPlan:
+    """One sandbox on its way through :meth:`Supervisor._spawn_plans`."""
+
+    def __init__(
+        self,
+        name: str,
+        backend: BackendMode,
+        config: dict[str, Any],
+        tenant: Optional[str],
+        tenant_quota: Optional[int],
+    ) -> None:
+        self.name = name
+        self.backend = backend
+        self.config = config
+        self.tenant = tenant
+        self.tenant_quota = tenant_quota
+        # Set as the spawn progresses, so a failure undoes only what was done.
+        self.reserved = False
+        self.usage_reserved = False
+        self.evicted: list[Any] = []
+        self.warm: Optional[SandboxThread] = None
+        self.cg_status: Optional[cgroup.CgroupEnforcement] = None
+        self.cg_path: Any = None
+        self.cgroup_id: Optional[int] = None
+        self.temp_dir: Optional[Path] = None
+        self.sandbox: Any = None
+        self.registering = False
+
+
 class Supervisor:
     """Main supervisor owning all sandboxes."""
 
@@ -229,9 +331,27 @@ class Supervisor:
         # SandboxThread instances, so the watchdog/warm-pool/cgroup machinery
         # that iterates ``_sandboxes`` must not see them.
         self._process_sandboxes: Dict[str, ProcessSandbox] = {}
+        # Live indexes over both registries for O(1) lookup by the watchdog,
+        # maintained under ``_lock`` wherever a registry entry is added or
+        # removed: by name, and by cgroup id (the key resource_guard events
+        # carry) for sandboxes that have a cgroup.
+        self._live: Dict[str, Any] = {}
+        self._by_cgroup_id: Dict[int, Any] = {}
+        self._cgroup_id_of: Dict[str, int] = {}
         self._lock = threading.Lock()
-        self._alerts = AlertManager()
+        # Exited sandboxes are torn down in batches off the spawn path. A name
+        # whose teardown is in flight maps to an event set when it is done, so
+        # a respawn under that name waits instead of racing the deletion.
+        self._reaper = SandboxReaper(self._reap)
+        self._reaping: Dict[str, threading.Event] = {}
+        # Likewise for a name whose spawn is building its sandbox outside the
+        # lock; a concurrent spawn of the same name waits for it.
+        self._spawning: Dict[str, threading.Event] = {}
+        # Thread sandboxes take pre-created cgroups from the pool, and hand
+        # them back to it to be deleted in the background.
+        self._cgroups = cgroup.CgroupPool()
         self._tracer = Tracer()
+        self._events = EventHub()
         bpf_mod = importlib.import_module("pyisolate.bpf.manager")
         self._bpf = bpf_mod.BPFManager()
         self._rollout_mode = rollout_mode
@@ -245,40 +365,44 @@ class Supervisor:
         self._recover_state()
         self._warm_pool: list[SandboxThread] = []
         for i in range(warm_pool):
-            t = SandboxThread(name=f"warm-{i}")
+            t = SandboxThread(name=f"warm-{i}", on_exit=self._reaper.notify)
             t.start()
             self._warm_pool.append(t)
         self._watchdog = ResourceWatchdog(self)
         self._watchdog.start()
+        # One wheel services every process sandbox's wall-clock deadline.
+        self._timers = TimerWheel(name="pyisolate-supervisor-timers")
+        # Violations are queued by the guest thread and dispatched off it, with
+        # callback deadlines armed on the same wheel.
+        self._alerts = AlertManager(asynchronous=True, schedule=self._timers.call_later)
+        # ... and one selector thread reads every process sandbox's channel.
+        self._iohub = IOHub(name="pyisolate-supervisor-iohub")
+        # ... and one collector samples their CPU and memory from /proc in
+        # batches, when their stats are read.
+        self._procstats = ProcStatsCollector()
         self._policy_token: str | None = None
         self._tenant_usage: dict[str, int] = {}
-        self._quota_ledger = os.environ.get("PYISOLATE_QUOTA_LEDGER")
+        # Reservations are batched into the ledger, and the timer wheel hands
+        # due batches to the ledger's flusher thread; the finalizer writes out
+        # a pending batch for a supervisor that is dropped without
+        # ``shutdown``.
+        self._quota_ledger: recovery.QuotaLedger | None = None
+        ledger_path = os.environ.get("PYISOLATE_QUOTA_LEDGER")
+        if ledger_path:
+            self._quota_ledger = recovery.QuotaLedger(
+                ledger_path, schedule=self._timers.call_later
+            )
+            weakref.finalize(self, self._quota_ledger.close)
         self._replay_quota_ledger()
 
     def _replay_quota_ledger(self) -> None:
-        if not self._quota_ledger:
-            return
-        path = Path(self._quota_ledger)
-        if not path.exists():
-            return
-        for line in path.read_text(encoding="utf-8").splitlines():
-            tenant, _, delta_str = line.partition(",")
-            if not tenant:
-                continue
-            try:
-                delta = int(delta_str)
-            except ValueError:
-                continue
-            self._tenant_usage[tenant] = self._tenant_usage.get(tenant, 0) + delta
+        if self._quota_ledger is not None:
+            self._tenant_usage = self._quota_ledger.load()
 
     def _record_tenant_usage(self, tenant: str, delta: int = 1) -> None:
         self._tenant_usage[tenant] = self._tenant_usage.get(tenant, 0) + delta
-        if not self._quota_ledger:
-            return
-        path = Path(self._quota_ledger)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("a", encoding="utf-8") as handle:
-            handle.write(f"{tenant},{delta}\n")
+        if self._quota_ledger is not None:
+            self._quota_ledger.record(tenant, delta)
 
     def _mark_tenant_reservation(
         self,
@@ -314,7 +438,7 @@ class Supervisor:
                 recovery.cleanup_temp_dir(Path(temp_dir))
             else:
                 recovery.cleanup_temp_dir(name)
-            recovery.drop_sandbox(name)
+        recovery.drop_sandboxes(stale)
         cgroup.cleanup_orphans(set())
         recovery.cleanup_temp_orphans(set())
 
@@ -324,9 +448,39 @@ class Supervisor:
         return self._name_pattern if self._name_pattern is not None else NAME_PATTERN
 
     def register_alert_handler(self, callback) -> None:
-        """Subscribe to policy violation alerts."""
+        """Subscribe to policy violation alerts.
+
+        Callbacks run on alert worker threads, not the violating sandbox's own
+        thread; see :class:`~pyisolate.observability.alerts.AlertManager`.
+        """
         self._alerts.register(callback)
 
+    def events(
+        self,
+        *,
+        kinds: Optional[Iterable[LifecycleKind]] = None,
+        maxsize: int = DEFAULT_MAXSIZE,
+    ) -> EventSubscription:
+        """Subscribe to sandbox lifecycle events.
+
+        Yields a :class:`~pyisolate.telemetry.LifecycleEvent` for every sandbox
+        spawned, exited, quarantined, killed for a quota breach or recycled,
+        and for every policy reload -- only those of *kinds*, if given. Iterate
+        it with ``for`` or ``async for``; at most *maxsize* events are buffered
+        before the oldest are dropped. Close it, or use it as a context
+        manager, to unsubscribe; :meth:`shutdown` closes every subscription.
+        """
+        return self._events.subscribe(kinds=kinds, maxsize=maxsize)
+
+    def enforce_quota_breach(self, sandbox: Any, exc: Exception, reason: str) -> bool:
+        """Stop *sandbox* for a quota breach the watchdog observed.
+
+        Publishes a ``quota_breach`` event, then calls the sandbox's own
+        ``enforce_quota_breach``; returns whether it stopped.
+        """
+        self._events.publish("quota_breach", sandbox.name, reason)
+        return sandbox.enforce_quota_breach(exc, reason)
+
     def spawn(
         self,
         name: str,
@@ -358,6 +512,68 @@ class Supervisor:
             # refuse with an actionable diagnostic rather than the generic
             # not-implemented error. The launcher itself is still pending.
             return self._spawn_microvm(name)
+        plan = self._plan_spawn(
+            name,
+            policy=policy,
+            cpu_ms=cpu_ms,
+            mem_bytes=mem_bytes,
+            wall_time_ms=wall_time_ms,
+            open_files_max=open_files_max,
+            network_ops_max=network_ops_max,
+            output_bytes_max=output_bytes_max,
+            child_work_max=child_work_max,
+            allowed_imports=allowed_imports,
+            numa_node=numa_node,
+            capabilities=capabilities,
+            tenant=tenant,
+            tenant_quota=tenant_quota,
+            backend=backend,
+        )
+        return self._spawn_plans([plan])[0]
+
+    def spawn_many(self, specs: Iterable[Mapping[str, Any]]) -> list[Sandbox]:
+        """Create and start one sandbox per spec, all or none.
+
+        Each spec holds the keyword arguments of :meth:`spawn`, ``name``
+        included. Every name and tenant quota is reserved in one critical
+        section, the sandboxes are started in parallel, and their recovery
+        registry entries are written in one journal append. If any sandbox
+        cannot be spawned, the ones already started are stopped and torn down
+        and the error is raised. Handles are returned in spec order.
+        """
+        plans: list[_SpawnPlan] = []
+        for spec in specs:
+            kwargs = dict(spec)
+            backend = _normalize_backend(kwargs.pop("backend", DEFAULT_BACKEND))
+            if backend == "microvm":
+                self._spawn_microvm(kwargs.get("name", ""))
+            plans.append(self._plan_spawn(backend=backend, **kwargs))
+        names = [plan.name for plan in plans]
+        if len(set(names)) != len(names):
+            raise ValueError("spawn_many specs must have distinct names")
+        if not plans:
+            return []
+        return self._spawn_plans(plans)
+
+    def _plan_spawn(
+        self,
+        name: str,
+        policy=None,
+        cpu_ms: Optional[int] = None,
+        mem_bytes: Optional[int] = None,
+        wall_time_ms: Optional[int] = None,
+        open_files_max: Optional[int] = None,
+        network_ops_max: Optional[int] = None,
+        output_bytes_max: Optional[int] = None,
+        child_work_max: Optional[int] = None,
+        allowed_imports: Optional[list[str]] = None,
+        numa_node: Optional[int] = None,
+        capabilities: Optional[dict[str, object]] = None,
+        tenant: Optional[str] = None,
+        tenant_quota: Optional[int] = None,
+        backend: BackendMode = DEFAULT_BACKEND,
+    ) -> "_SpawnPlan":
+        """Validate one sandbox's spawn arguments; nothing is reserved yet."""
         _require_implemented_backend(backend)
         if not isinstance(name, str) or not name:
             raise ValueError("Sandbox name must be non-empty string")
@@ -366,7 +582,6 @@ class Supervisor:
         pattern = self.name_pattern
         if pattern.fullmatch(name) is None:
             raise ValueError("Sandbox name contains invalid characters")
-        self._cleanup()
 
         policy = resolve_policy(policy)
 
@@ -377,133 +592,249 @@ class Supervisor:
             allowed_imports = list(imports)
 
         if backend == "process":
-            return self._spawn_process(
-                name,
-                policy=policy,
-                allowed_imports=allowed_imports,
-                capabilities=capabilities,
-                cpu_ms=cpu_ms,
-                mem_bytes=mem_bytes,
-                wall_time_ms=wall_time_ms,
-                open_files_max=open_files_max,
+            _reject_unsupported_process_quotas(
                 network_ops_max=network_ops_max,
-                output_bytes_max=output_bytes_max,
                 child_work_max=child_work_max,
                 numa_node=numa_node,
-                tenant=tenant,
-                tenant_quota=tenant_quota,
             )
+        config = {
+            "policy": policy,
+            "cpu_ms": cpu_ms,
+            "mem_bytes": mem_bytes,
+            "wall_time_ms": wall_time_ms,
+            "open_files_max": open_files_max,
+            "network_ops_max": network_ops_max,
+            "output_bytes_max": output_bytes_max,
+            "child_work_max": child_work_max,
+            "allowed_imports": allowed_imports,
+            "numa_node": numa_node,
+            "capabilities": capabilities,
+        }
+        return _SpawnPlan(name, backend, config, tenant, tenant_quota)
+
+    def _spawn_plans(self, plans: list["_SpawnPlan"]) -> list[Sandbox]:
+        """Reserve, build and publish *plans*, or undo all of them.
+
+        Only reserving the names and tenant quotas and publishing the finished
+        sandboxes happen under ``_lock``. Building them -- cgroups, the BPF map
+        update, temp directories, starting threads or guest processes and the
+        registry write -- does not, so spawns of different names run
+        concurrently.
+        """
+        try:
+            self._reserve_plans(plans)
+            evicted = [sb for plan in plans for sb in plan.evicted]
+            # Released here, so _abort_plans must not release them again: the
+            # evicted sandbox's cgroup path is the new plan's by now.
+            for plan in plans:
+                plan.evicted = []
+            self._release_resources(evicted)
+            threads = [plan for plan in plans if plan.backend != "process"]
+            for plan in threads:
+                self._create_resources(plan)
+            self._start_plans(plans)
+            self._register_plans(threads)
+            with self._lock:
+                for plan in plans:
+                    if plan.backend == "process":
+                        registry: Dict[str, Any] = self._process_sandboxes
+                    else:
+                        registry = self._sandboxes
+                    registry[plan.name] = plan.sandbox
+                    self._index_sandbox(plan.name, plan.sandbox, plan.cgroup_id)
+                    self._finish_spawn_locked(plan.name)
+        except BaseException:
+            self._abort_plans(plans)
+            raise
+        self._watchdog.wake()
+        for plan in plans:
+            self._events.publish("spawned", plan.name)
+        return [Sandbox(plan.sandbox, self) for plan in plans]
+
+    def _reserve_plans(self, plans: list["_SpawnPlan"]) -> None:
+        """Reserve every plan's name, tenant quota and warm thread at once."""
+        with self._name_lock(*(plan.name for plan in plans)):
+            for plan in plans:
+                plan.evicted = self._evict_exited_locked(plan.name)
+                self._spawning[plan.name] = threading.Event()
+                plan.reserved = True
+                plan.usage_reserved = self._reserve_tenant_usage_locked(
+                    plan.tenant, plan.tenant_quota
+                )
+                if plan.backend != "process":
+                    plan.warm = self._pop_warm_locked()
+
+    def _pop_warm_locked(self) -> Optional[SandboxThread]:
+        while self._warm_pool and not self._warm_pool[-1].is_alive():
+            self._warm_pool.pop()
+        return self._warm_pool.pop() if self._warm_pool else None
+
+    def _create_resources(self, plan: "_SpawnPlan") -> None:
+        """Create a thread sandbox's cgroup, kernel policy and temp directory."""
+        plan.cg_status = self._cgroups.checkout(
+            plan.name,
+            plan.config["cpu_ms"],
+            plan.config["mem_bytes"],
+            mode=cast(cgroup.RolloutMode, self._rollout_mode),
+        )
+        plan.cg_path = plan.cg_status.path
+        # Resolved here, outside ``_lock``, for the kernel policy and for the
+        # cgroup-id index the sandbox is published to.
+        plan.cgroup_id = cgroup_id_for_path(cgroup._as_path(plan.cg_path))
+        self._apply_kernel_policy(plan.cg_path, plan.cgroup_id, plan.config["policy"])
+        plan.temp_dir = recovery.allocate_temp_dir(plan.name)
+
+    def _start_plans(self, plans: list["_SpawnPlan"]) -> None:
+        """Start every planned sandbox, in parallel when there are several."""
+        if len(plans) == 1:
+            self._start_plan(plans[0])
+            return
+        # A guest process spends most of its start-up in its own bootstrap, so
+        # starting them side by side overlaps those waits.
+        with ThreadPoolExecutor(
+            max_workers=min(len(plans), _SPAWN_MANY_WORKERS),
+            thread_name_prefix="pyisolate-spawn",
+        ) as pool:
+            futures = [pool.submit(self._start_plan, plan) for plan in plans]
+        for future in futures:
+            future.result()
+
+    def _start_plan(self, plan: "_SpawnPlan") -> None:
+        config = plan.config
+        if plan.backend == "process":
+            plan.sandbox = self._start_process(plan.name, config)
+        elif plan.warm is not None:
+            thread = plan.sandbox = plan.warm
+            # Intentionally mirrors Sandbox.reset by sharing the config.
+            thread.reset(
+                plan.name,
+                cgroup_path=plan.cg_path,
+                enforcement_status=plan.cg_status,
+                **config,
+            )
+            thread._on_violation = self._alerts.notify
+            thread._tracer = self._tracer
+            thread._backend = plan.backend
+        else:
+            thread = plan.sandbox = SandboxThread(
+                name=plan.name,
+                **config,
+                on_violation=self._alerts.notify,
+                tracer=self._tracer,
+                cgroup_path=plan.cg_path,
+                enforcement_status=plan.cg_status,
+                on_exit=self._reaper.notify,
+            )
+            thread._backend = plan.backend
+            thread.start()
+        self._mark_tenant_reservation(plan.sandbox, plan.tenant, plan.tenant_quota)
+        if plan.backend != "process":
+            plan.sandbox._temp_dir = plan.temp_dir
+
+    def _start_process(self, name: str, config: dict[str, Any]) -> ProcessSandbox:
+        """Start a sandbox behind a real OS-process boundary.
+
+        This path deliberately skips the SandboxThread-specific machinery
+        (warm pool, per-thread cgroup attach).
+
+        Quotas this backend can enforce are forwarded to the guest process:
+        ``cpu_ms`` and ``mem_bytes`` and ``open_files_max`` become rlimits
+        applied before guest code runs, and the resource watchdog also enforces
+        ``cpu_ms`` and ``mem_bytes`` from ``/proc`` at a finer grain than
+        ``RLIMIT_CPU``'s whole seconds. ``wall_time_ms`` is enforced by a
+        supervisor-side timer, and ``output_bytes_max`` is charged by the
+        supervisor for every output frame the guest sends. Quotas with no
+        enforcement path here are rejected rather than accepted and ignored --
+        see :data:`PROCESS_UNSUPPORTED_QUOTAS`.
+        """
+        # Starts the guest and waits for its bootstrap handshake, so it must
+        # not run under ``_lock``.
+        return ProcessSandbox(
+            name,
+            policy=config["policy"],
+            allowed_imports=config["allowed_imports"],
+            capabilities=config["capabilities"],
+            backend="process",
+            cpu_ms=config["cpu_ms"],
+            mem_bytes=config["mem_bytes"],
+            wall_time_ms=config["wall_time_ms"],
+            open_files_max=config["open_files_max"],
+            output_bytes_max=config["output_bytes_max"],
+            timers=self._timers,
+            iohub=self._iohub,
+            procstats=self._procstats,
+            on_exit=self._reaper.notify,
+            require_seccomp=self._rollout_mode == "hardened",
+            require_landlock=self._rollout_mode == "hardened",
+        )
 
+    def _register_plans(self, plans: list["_SpawnPlan"]) -> None:
+        """Record thread sandboxes in the recovery registry in one append."""
+        entries = {}
+        for plan in plans:
+            status = plan.cg_status
+            entries[plan.name] = {
+                "name": plan.name,
+                "cgroup_path": str(plan.cg_path) if plan.cg_path is not None else None,
+                "quota_enforcement": {
+                    "mode": status.mode,
+                    "cpu": status.cpu,
+                    "memory": status.memory,
+                    "errors": list(status.errors),
+                },
+                "temp_dir": str(plan.temp_dir),
+            }
+            plan.registering = True
+        if len(entries) == 1:
+            ((name, meta),) = entries.items()
+            recovery.update_sandbox(name, meta)
+        elif entries:
+            recovery.update_sandboxes(entries)
+
+    def _abort_plans(self, plans: list["_SpawnPlan"]) -> None:
+        """Undo whatever part of *plans* was reserved or built."""
+        kept_warm = []
+        dropped = []
+        for plan in plans:
+            if not plan.reserved:
+                continue
+            sandbox = plan.sandbox
+            # Return a borrowed warm thread to the pool rather than destroying
+            # it. The warm pool is only filled at startup and never
+            # replenished, so stopping a reused thread on every failed spawn
+            # would permanently shrink it. The next spawn that pops it calls
+            # reset() again, reconfiguring it cleanly.
+            if plan.warm is not None and plan.warm.is_alive():
+                kept_warm.append(plan)
+            elif sandbox is not None and sandbox.is_alive():
+                sandbox.stop()
+            self._release_resources(plan.evicted)
+            self._cgroups.release(plan.cg_path)
+            if plan.temp_dir is not None:
+                recovery.cleanup_temp_dir(plan.temp_dir)
+            if plan.registering:
+                dropped.append(plan.name)
+        if dropped:
+            recovery.drop_sandboxes(dropped)
         with self._lock:
-            existing = self._sandboxes.get(name)
-            existing_proc = self._process_sandboxes.get(name)
-            if (existing is not None and existing.is_alive()) or (
-                existing_proc is not None and existing_proc.is_alive()
-            ):
-                raise RuntimeError(f"sandbox '{name}' already exists")
-            usage_reserved = False
-            if tenant and tenant_quota is not None:
-                if self._tenant_usage.get(tenant, 0) >= tenant_quota:
-                    raise TenantQuotaExceeded()
-                self._record_tenant_usage(tenant, 1)
-                usage_reserved = True
-
-            cg_path = None
-            temp_dir = None
-            thread = None
-            reused_warm = False
-            try:
-                cg_status = cgroup.create(
-                    name,
-                    cpu_ms,
-                    mem_bytes,
-                    mode=cast(cgroup.RolloutMode, self._rollout_mode),
-                )
-                cg_path = cg_status.path
-                self._apply_kernel_policy(cg_path, policy)
-                temp_dir = recovery.allocate_temp_dir(name)
-                reset_config = {
-                    "policy": policy,
-                    "cpu_ms": cpu_ms,
-                    "mem_bytes": mem_bytes,
-                    "wall_time_ms": wall_time_ms,
-                    "open_files_max": open_files_max,
-                    "network_ops_max": network_ops_max,
-                    "output_bytes_max": output_bytes_max,
-                    "child_work_max": child_work_max,
-                    "allowed_imports": allowed_imports,
-                    "numa_node": numa_node,
-                    "capabilities": capabilities,
-                }
-                if self._warm_pool:
-                    thread = self._warm_pool.pop()
-                    reused_warm = True
-                    # Intentionally mirrors Sandbox.reset by sharing reset_config.
-                    thread.reset(
-                        name,
-                        cgroup_path=cg_path,
-                        enforcement_status=cg_status,
-                        **reset_config,
-                    )
-                    thread._on_violation = self._alerts.notify
-                    thread._tracer = self._tracer
-                    thread._backend = backend
-                else:
-                    thread = SandboxThread(
-                        name=name,
-                        **reset_config,
-                        on_violation=self._alerts.notify,
-                        tracer=self._tracer,
-                        cgroup_path=cg_path,
-                        enforcement_status=cg_status,
-                    )
-                    thread._backend = backend
-                    thread.start()
-                self._mark_tenant_reservation(thread, tenant, tenant_quota)
-                thread._temp_dir = temp_dir
-                self._sandboxes[name] = thread
-                recovery.update_sandbox(
-                    name,
-                    {
-                        "name": name,
-                        "cgroup_path": str(cg_path) if cg_path is not None else None,
-                        "quota_enforcement": {
-                            "mode": cg_status.mode,
-                            "cpu": cg_status.cpu,
-                            "memory": cg_status.memory,
-                            "errors": list(cg_status.errors),
-                        },
-                        "temp_dir": str(temp_dir),
-                    },
-                )
-            except Exception:
-                self._sandboxes.pop(name, None)
-                if reused_warm and thread is not None and thread.is_alive():
-                    # Return the borrowed warm thread to the pool rather than
-                    # destroying it. The warm pool is only filled at startup and
-                    # never replenished, so stopping a reused thread on every
-                    # failed spawn would permanently shrink it. The next spawn
-                    # that pops it calls reset() again, reconfiguring it cleanly.
-                    self._warm_pool.append(thread)
-                elif thread is not None and thread.is_alive():
-                    thread.stop()
-                cgroup.delete(cg_path)
-                if temp_dir is not None:
-                    recovery.cleanup_temp_dir(temp_dir)
-                recovery.drop_sandbox(name)
+            for plan in kept_warm:
+                self._warm_pool.append(plan.warm)
+            for plan in plans:
+                if not plan.reserved:
+                    continue
                 released = (
-                    self._release_tenant_reservation(thread)
-                    if thread is not None
+                    self._release_tenant_reservation(plan.sandbox)
+                    if plan.sandbox is not None
                     else False
                 )
-                if usage_reserved and tenant and not released:
-                    self._record_tenant_usage(tenant, -1)
-                raise
-        # Remove references to any terminated sandboxes
-        self._cleanup()
-        return Sandbox(thread, self)
+                if plan.usage_reserved and plan.tenant and not released:
+                    self._record_tenant_usage(plan.tenant, -1)
+                plan.reserved = plan.usage_reserved = False
+                self._finish_spawn_locked(plan.name)
 
-    def _apply_kernel_policy(self, cg_path: Any, policy: Any) -> None:
+    def _apply_kernel_policy(
+        self, cg_path: Any, cgroup_id: Optional[int], policy: Any
+    ) -> None:
         """Publish this sandbox's coarse deny-mask to the eBPF ``sandbox_policy``
         map, keyed by its cgroup id, so the LSM program enforces it.
 
@@ -512,10 +843,7 @@ class Supervisor:
         """
         if cg_path is None:
             return
-        from .bpf.contract import cgroup_id_for_path, compile_deny_mask
-
         strict = self._rollout_mode == "hardened"
-        cgroup_id = cgroup_id_for_path(cg_path)
         if cgroup_id is None:
             if strict:
                 raise RuntimeError(f"cannot resolve cgroup id for {cg_path}")
@@ -549,84 +877,8 @@ class Supervisor:
             "in the meantime."
         )
 
-    def _spawn_process(
-        self,
-        name: str,
-        *,
-        policy: Any,
-        allowed_imports: Optional[list[str]],
-        capabilities: Optional[dict[str, Any]],
-        cpu_ms: Optional[int] = None,
-        mem_bytes: Optional[int] = None,
-        wall_time_ms: Optional[int] = None,
-        open_files_max: Optional[int] = None,
-        network_ops_max: Optional[int] = None,
-        output_bytes_max: Optional[int] = None,
-        child_work_max: Optional[int] = None,
-        numa_node: Optional[int] = None,
-        tenant: Optional[str] = None,
-        tenant_quota: Optional[int] = None,
-    ) -> Sandbox:
-        """Spawn a sandbox behind a real OS-process boundary.
-
-        This path deliberately skips the SandboxThread-specific machinery
-        (warm pool, in-process quota watchdog, per-thread cgroup attach).
-
-        Quotas this backend can enforce are forwarded to the guest process:
-        ``cpu_ms`` and ``mem_bytes`` and ``open_files_max`` become rlimits
-        applied before guest code runs, and ``wall_time_ms`` is enforced by a
-        supervisor-side timer. Quotas with no enforcement path here are
-        rejected rather than accepted and ignored -- see
-        :data:`PROCESS_UNSUPPORTED_QUOTAS`.
-        """
-        _reject_unsupported_process_quotas(
-            network_ops_max=network_ops_max,
-            output_bytes_max=output_bytes_max,
-            child_work_max=child_work_max,
-            numa_node=numa_node,
-        )
-        with self._lock:
-            existing_thread = self._sandboxes.get(name)
-            existing_proc = self._process_sandboxes.get(name)
-            if (existing_thread is not None and existing_thread.is_alive()) or (
-                existing_proc is not None and existing_proc.is_alive()
-            ):
-                raise RuntimeError(f"sandbox '{name}' already exists")
-
-            usage_reserved = False
-            if tenant and tenant_quota is not None:
-                if self._tenant_usage.get(tenant, 0) >= tenant_quota:
-                    raise TenantQuotaExceeded()
-                self._record_tenant_usage(tenant, 1)
-                usage_reserved = True
-
-            try:
-                proc = ProcessSandbox(
-                    name,
-                    policy=policy,
-                    allowed_imports=allowed_imports,
-                    capabilities=capabilities,
-                    backend="process",
-                    cpu_ms=cpu_ms,
-                    mem_bytes=mem_bytes,
-                    wall_time_ms=wall_time_ms,
-                    open_files_max=open_files_max,
-                    require_seccomp=self._rollout_mode == "hardened",
-                    require_landlock=self._rollout_mode == "hardened",
-                )
-            except Exception:
-                if usage_reserved and tenant:
-                    self._record_tenant_usage(tenant, -1)
-                raise
-
-            self._mark_tenant_reservation(proc, tenant, tenant_quota)
-            self._process_sandboxes[name] = proc
-        self._cleanup()
-        return Sandbox(proc, self)
-
     def list_active(self) -> Dict[str, Sandbox]:
         """Return currently active sandboxes."""
-        self._cleanup()
         with self._lock:
             active: Dict[str, Sandbox] = {
                 name: Sandbox(t, self)
@@ -642,12 +894,62 @@ class Supervisor:
             )
             return active
 
+    def active_items(self) -> list[tuple[str, Any]]:
+        """Return ``(name, sandbox)`` for every active sandbox, both backends.
+
+        Unlike :meth:`list_active` this builds no :class:`Sandbox` handles;
+        the metrics exporter reads every sandbox's stats this way per scrape.
+        """
+        with self._lock:
+            items = list(self._live.items())
+        return [(name, sb) for name, sb in items if sb.is_alive()]
+
     def get_active_threads(self) -> list[SandboxThread]:
         """Return active sandbox threads for internal consumers."""
-        self._cleanup()
         with self._lock:
             return [t for t in self._sandboxes.values() if t.is_alive()]
 
+    def lookup_sandbox(self, name: str) -> Any:
+        """Return the registered sandbox called *name*, or ``None``.
+
+        An O(1) read of the live index that never runs :meth:`_cleanup`, so
+        hot paths such as the watchdog's event dispatch can call it per event.
+        The sandbox may have died since; callers check ``is_alive()``.
+        """
+        return self._live.get(name)
+
+    def lookup_cgroup(self, cgroup_id: int) -> Any:
+        """Return the sandbox whose cgroup has id *cgroup_id*, or ``None``."""
+        return self._by_cgroup_id.get(cgroup_id)
+
+    def live_sandboxes(self) -> list[Any]:
+        """Snapshot of every registered sandbox, both backends, unfiltered."""
+        with self._lock:
+            return list(self._live.values())
+
+    def _index_sandbox(self, name: str, sandbox: Any, cgroup_id: Optional[int]) -> None:
+        # Caller holds ``_lock``; *cgroup_id* was resolved before taking it.
+        self._unindex_sandbox(name, self._live.get(name))
+        self._live[name] = sandbox
+        if cgroup_id is not None:
+            self._by_cgroup_id[cgroup_id] = sandbox
+            self._cgroup_id_of[name] = cgroup_id
+
+    def _unindex_sandbox(self, name: str, sandbox: Any) -> None:
+        # Caller holds ``_lock``. Only drop entries that still point at
+        # *sandbox*: a new sandbox may already have taken the name.
+        if sandbox is None or self._live.get(name) is not sandbox:
+            return
+        del self._live[name]
+        cgroup_id = self._cgroup_id_of.pop(name, None)
+        if cgroup_id is not None and self._by_cgroup_id.get(cgroup_id) is sandbox:
+            del self._by_cgroup_id[cgroup_id]
+
+    def get_active_process_sandboxes(self) -> list[ProcessSandbox]:
+        """Return live process-backend sandboxes for internal consumers."""
+        with self._lock:
+            return [p for p in self._process_sandboxes.values() if p.is_alive()]
+
     def _authorize_control(
         self, token: str | RootCapability, op: str
     ) -> ControlRequest:
@@ -684,8 +986,32 @@ class Supervisor:
             raise FileNotFoundError(policy_path)
 
         logger.debug("control operation accepted: %s", request.op)
+        self._reload_bpf(self._bpf.hot_reload, policy_path)
+        self._events.publish("policy_reloaded", reason=policy_path)
+
+    def apply_policy(
+        self, policy_set: RuntimePolicySet, token: str | RootCapability
+    ) -> None:
+        """Hot-reload an already-compiled policy set without touching disk.
+
+        Authorized like :meth:`reload_policy`; use it when the policy was
+        compiled in memory, for example by :func:`pyisolate.policy.refresh`.
+        """
+
+        request = self._authorize_control(token, op="policy.reload")
+        if not isinstance(policy_set, RuntimePolicySet):
+            raise TypeError(
+                f"expected a RuntimePolicySet, got {type(policy_set).__name__}"
+            )
+
+        logger.debug("control operation accepted: %s", request.op)
+        self._reload_bpf(self._bpf.apply_policy, policy_set)
+        self._events.publish("policy_reloaded")
+
+    @staticmethod
+    def _reload_bpf(apply: Callable[[Any], None], policy: Any) -> None:
         try:
-            self._bpf.hot_reload(policy_path)
+            apply(policy)
         except RuntimeError as exc:
             logger.warning("policy reload failed: %s", exc)
             if str(exc) != "BPF disabled":
@@ -693,41 +1019,101 @@ class Supervisor:
         except Exception as exc:  # broad: surface as auth failure
             raise PolicyAuthError(f"failed to reload policy: {exc}") from exc
 
-    def shutdown(self, cap: RootCapability = ROOT) -> None:
+    def close_many(
+        self,
+        sandboxes: Iterable[Union[Sandbox, str]],
+        timeout: float = DEFAULT_STOP_TIMEOUT,
+    ) -> list[str]:
+        """Stop several sandboxes together, within *timeout* seconds in total.
+
+        Takes handles or names; names of unknown sandboxes are ignored. All
+        sandboxes are signalled before any is waited for, then escalated
+        together (see :func:`_stop_concurrently`). Exited sandboxes are torn
+        down by the reaper as usual. Returns the names of any still running.
+        """
+        targets = []
+        for item in sandboxes:
+            if isinstance(item, Sandbox):
+                targets.append(item._thread)
+            else:
+                sandbox = self.lookup_sandbox(item)
+                if sandbox is not None:
+                    targets.append(sandbox)
+        return [sb.name for sb in _stop_concurrently(targets, timeout)]
+
+    def shutdown(
+        self, cap: RootCapability = ROOT, timeout: float = DEFAULT_STOP_TIMEOUT
+    ) -> None:
         """Stop watchdog and terminate all running sandboxes.
 
         The ``cap`` argument models a privileged capability required to shut
         down the supervisor. Raises ``PolicyAuthError`` if ``cap`` is not
-        ``ROOT``.
+        ``ROOT``. Sandboxes are stopped concurrently, within *timeout* seconds
+        in total.
         """
         if cap is not ROOT:
             raise PolicyAuthError("invalid capability for shutdown")
         self._watchdog.stop()
+        self._wait_for_spawns()
         with self._lock:
             sandboxes = list(self._sandboxes.values())
             warm = list(self._warm_pool)
             self._warm_pool.clear()
             procs = list(self._process_sandboxes.values())
-        for sb in sandboxes + warm:
-            sb.stop()
-        for proc in procs:
-            proc.stop()
+        stuck = _stop_concurrently(sandboxes + warm + procs, timeout)
+        if stuck:
+            logger.warning(
+                "%d sandboxes still running at shutdown: %s",
+                len(stuck),
+                ", ".join(sb.name for sb in stuck),
+            )
         self._cleanup()
+        self._reaper.close(timeout=1.0)
+        self._cgroups.close(timeout=1.0)
+        self._alerts.close(timeout=1.0)
+        if self._quota_ledger is not None:
+            self._quota_ledger.close()
+        self._timers.close()
+        self._iohub.close()
+        self._procstats.close()
+        self._events.close()
+
+    def _finish_spawn_locked(self, name: str) -> None:
+        # Caller holds ``_lock``: wake spawns of *name* queued behind this one.
+        event = self._spawning.pop(name, None)
+        if event is not None:
+            event.set()
+
+    def _wait_for_spawns(self) -> None:
+        """Wait for spawns already building a sandbox to publish or fail."""
+        while True:
+            with self._lock:
+                pending = list(self._spawning.values())
+            if not pending:
+                return
+            for event in pending:
+                event.wait()
 
     def quarantine(self, name: str, reason: str) -> None:
         with self._lock:
             thread = self._sandboxes.get(name)
+            proc = self._process_sandboxes.get(name) if thread is None else None
+        if proc is not None:
+            logger.warning("sandbox %s quarantined: %s", name, reason)
+            self._events.publish("quarantined", name, reason)
+            proc.quarantine(reason)
+            return
         if thread is None:
             return
         logger.warning("sandbox %s quarantined: %s", name, reason)
+        self._events.publish("quarantined", name, reason)
         thread.quarantine(reason)
         if thread.is_alive():
             thread.kill(timeout=0.2)
         thread.reap()
         with self._lock:
-            self._sandboxes.pop(name, None)
-            self._release_tenant_reservation(thread)
-        cgroup.delete(getattr(thread, "_cgroup_path", None))
+            self._unregister_locked(thread)
+        self._cgroups.release(getattr(thread, "_cgroup_path", None))
         recovery.cleanup_temp_dir(getattr(thread, "_temp_dir", name))
         recovery.drop_sandbox(name)
 
@@ -747,9 +1133,8 @@ class Supervisor:
             else:
                 thread.reap()
         with self._lock:
-            self._sandboxes.pop(name, None)
-            self._release_tenant_reservation(thread)
-        return self.spawn(
+            self._unregister_locked(thread)
+        sandbox = self.spawn(
             name=snap["name"],
             policy=snap["policy"],
             cpu_ms=snap["cpu_ms"],
@@ -765,27 +1150,153 @@ class Supervisor:
             tenant=tenant,
             tenant_quota=tenant_quota,
         )
+        self._events.publish("recycled", name)
+        return sandbox
+
+    @contextlib.contextmanager
+    def _name_lock(self, *names: str):
+        """Hold ``_lock`` once no spawn or teardown of any of *names* is in
+        flight.
+
+        A sandbox's cgroup and temp directory are named after it, so a spawn
+        must not create them while the reaper is still deleting the last ones,
+        nor while another spawn of the same name is creating its own.
+        """
+        while True:
+            self._lock.acquire()
+            busy = next(
+                (
+                    event
+                    for name in names
+                    for event in (self._reaping.get(name), self._spawning.get(name))
+                    if event is not None
+                ),
+                None,
+            )
+            if busy is None:
+                break
+            self._lock.release()
+            busy.wait()
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def _evict_exited_locked(self, name: str) -> list[Any]:
+        """Make *name* free for a new sandbox; the caller holds ``_lock``.
+
+        Raises ``RuntimeError`` if a live sandbox has the name. A dead one the
+        reaper has not reached yet is unregistered and returned: the caller
+        tears it down with :meth:`_release_resources`, outside the lock but
+        before reusing its cgroup and temp directory.
+        """
+        evicted = []
+        for registry in (self._sandboxes, self._process_sandboxes):
+            existing = registry.get(name)
+            if existing is None:
+                continue
+            if existing.is_alive():
+                raise RuntimeError(f"sandbox '{name}' already exists")
+            self._unregister_locked(existing)
+            evicted.append(existing)
+        return evicted
+
+    def _reserve_tenant_usage_locked(
+        self, tenant: str | None, tenant_quota: int | None
+    ) -> bool:
+        """Count one more sandbox against *tenant*; the caller holds ``_lock``.
+
+        Returns whether a reservation was recorded, and raises
+        ``TenantQuotaExceeded`` if the tenant is at its quota.
+        """
+        if not tenant or tenant_quota is None:
+            return False
+        if self._tenant_usage.get(tenant, 0) >= tenant_quota:
+            self._release_exited_reservations(tenant)
+        if self._tenant_usage.get(tenant, 0) >= tenant_quota:
+            raise TenantQuotaExceeded()
+        self._record_tenant_usage(tenant, 1)
+        return True
+
+    def _release_exited_reservations(self, tenant: str) -> None:
+        # Slow path of the tenant quota check, under ``_lock``: a sandbox that
+        # has exited but is still queued for the reaper must not hold its
+        # tenant's quota, or closing one and spawning another would fail.
+        for sb in self._reaper.pending():
+            if getattr(sb, "_tenant", None) == tenant and not sb.is_alive():
+                self._release_tenant_reservation(sb)
+
+    def _unregister_locked(self, sandbox: Any) -> bool:
+        """Drop *sandbox* from the registry if it is still there as itself.
+
+        Every registered sandbox leaves through here exactly once, so this is
+        where its ``exited`` event is published.
+        """
+        if isinstance(sandbox, ProcessSandbox):
+            registry: Dict[str, Any] = self._process_sandboxes
+        else:
+            registry = self._sandboxes
+        name = sandbox.name
+        if registry.get(name) is not sandbox:
+            return False
+        del registry[name]
+        self._unindex_sandbox(name, sandbox)
+        self._release_tenant_reservation(sandbox)
+        self._events.publish(
+            "exited",
+            name,
+            getattr(sandbox, "termination_reason", None)
+            or getattr(sandbox, "_quarantine_reason", None),
+        )
+        return True
+
+    def _release_resources(self, sandboxes: list[Any]) -> None:
+        """Delete the cgroups, temp directories and registry entries of
+        unregistered *sandboxes*, rewriting the recovery registry once."""
+        names = []
+        for sb in sandboxes:
+            if isinstance(sb, ProcessSandbox):
+                sb.reap()
+                continue
+            self._cgroups.release(getattr(sb, "_cgroup_path", None))
+            recovery.cleanup_temp_dir(getattr(sb, "_temp_dir", sb.name))
+            names.append(sb.name)
+        if names:
+            recovery.drop_sandboxes(names)
+
+    def _reap(self, sandboxes: list[Any]) -> None:
+        """Tear down a batch of exited sandboxes; runs on the reaper thread.
+
+        Only the registry bookkeeping happens under ``_lock``. The deletions
+        run outside it, with each name marked busy so a respawn waits for them.
+        """
+        claimed = []
+        with self._lock:
+            for sb in sandboxes:
+                # Skips sandboxes already torn down, or replaced, meanwhile.
+                if self._unregister_locked(sb):
+                    self._reaping[sb.name] = threading.Event()
+                    claimed.append(sb)
+        if not claimed:
+            return
+        try:
+            self._release_resources(claimed)
+        finally:
+            with self._lock:
+                for sb in claimed:
+                    self._reaping.pop(sb.name).set()
 
     def _cleanup(self) -> None:
-        """Remove dead sandboxes from the registry."""
+        """Tear down every dead sandbox now, whether or not it was reported.
+
+        Spawning and listing no longer call this; exited sandboxes are
+        reaped in the background. Shutdown uses it as a final sweep.
+        """
         with self._lock:
-            dead = [n for n, t in self._sandboxes.items() if not t.is_alive()]
-            for n in dead:
-                thread = self._sandboxes[n]
-                cgroup.delete(getattr(thread, "_cgroup_path", None))
-                recovery.cleanup_temp_dir(getattr(thread, "_temp_dir", n))
-                recovery.drop_sandbox(n)
-                self._release_tenant_reservation(thread)
-                del self._sandboxes[n]
+            dead = [t for t in self._sandboxes.values() if not t.is_alive()]
+            dead += [p for p in self._process_sandboxes.values() if not p.is_alive()]
             self._warm_pool = [t for t in self._warm_pool if t.is_alive()]
-            dead_procs = [
-                n for n, p in self._process_sandboxes.items() if not p.is_alive()
-            ]
-            for n in dead_procs:
-                proc = self._process_sandboxes[n]
-                proc.reap()
-                self._release_tenant_reservation(proc)
-                del self._process_sandboxes[n]
+        self._reap(dead)
 
 
 _supervisor: Supervisor | None = None
@@ -810,14 +1321,42 @@ def spawn(*args, **kwargs):
     return _get_supervisor().spawn(*args, **kwargs)
 
 
+def spawn_many(specs: Iterable[Mapping[str, Any]]) -> list[Sandbox]:
+    return _get_supervisor().spawn_many(specs)
+
+
+def close_many(
+    sandboxes: Iterable[Union[Sandbox, str]], timeout: float = DEFAULT_STOP_TIMEOUT
+) -> list[str]:
+    return _get_supervisor().close_many(sandboxes, timeout)
+
+
 def list_active() -> Dict[str, Sandbox]:
     return _get_supervisor().list_active()
 
 
+def active_items() -> list[tuple[str, Any]]:
+    return _get_supervisor().active_items()
+
+
+def events(
+    *,
+    kinds: Optional[Iterable[LifecycleKind]] = None,
+    maxsize: int = DEFAULT_MAXSIZE,
+) -> EventSubscription:
+    return _get_supervisor().events(kinds=kinds, maxsize=maxsize)
+
+
 def reload_policy(policy_path: str, token: str | RootCapability = ROOT) -> None:
     _get_supervisor().reload_policy(policy_path, token)
 
 
+def apply_policy(
+    policy_set: RuntimePolicySet, token: str | RootCapability = ROOT
+) -> None:
+    _get_supervisor().apply_policy(policy_set, token)
+
+
 def set_policy_token(token: str) -> None:
     _get_supervisor().set_policy_token(token)
 
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
-from typing import Literal
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Literal, Optional
 
 Decision = Literal["allow", "deny", "not_evaluated", "unavailable"]
 
@@ -27,3 +28,28 @@ class DenialEvent:
         """Return a JSON-serializable representation of this denial."""
 
         return asdict(self)
+
+
+LifecycleKind = Literal[
+    "spawned", "exited", "quarantined", "quota_breach", "policy_reloaded", "recycled"
+]
+
+
+@dataclass(frozen=True)
+class LifecycleEvent:
+    """A supervisor lifecycle change, published to :meth:`Supervisor.events`.
+
+    ``reason`` is the termination reason of an ``exited`` sandbox, the reason
+    given for a quarantine, the breached quota (``cpu_exceeded`` or
+    ``memory_exceeded``) or the path of a reloaded policy file.
+    """
+
+    kind: LifecycleKind
+    sandbox: Optional[str]
+    reason: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, object]:
+        """Return a JSON-serializable representation of this event."""
+
+        return asdict(self)
@@ -1,108 +1,629 @@
 """ResourceWatchdog implementation.
 
-Consumes events from the BPF ring buffer and stops sandboxes when quotas are
-breached. Events are dictionaries with the sandbox ``name`` and current
-``cpu_ms`` and ``rss_bytes`` counters.
+Stops sandboxes when CPU or memory quotas are breached. Usage arrives as events:
+dictionaries with the sandbox ``name`` and current ``cpu_ms`` and ``rss_bytes``
+counters, from two sources:
+
+* the BPF ring buffer, when the resource-guard program is loaded;
+* :class:`QuotaCollector`, which needs no BPF. It batch-reads ``cpu.stat``,
+  ``memory.current`` and ``memory.events`` for every sandbox cgroup with a
+  quota, and ``/proc`` for process-backend sandboxes. An inotify watch on each
+  ``memory.events`` reports ``max``/``oom``/``oom_kill`` as soon as the kernel
+  counts them, so only usage needs polling. The poll interval adapts to the
+  sandbox projected to breach first, and backs off while nothing is consuming.
+
+Both feed the same ``enforce_quota_breach`` path. Ring-buffer records may also
+be raw ``struct resource_event`` bytes or dicts keyed by ``cgroup_id``, and an
+iterator may yield a list of them at once. Each batch is resolved through the
+supervisor's name and cgroup-id indexes and merged per sandbox before any quota
+is checked.
 """
 
 from __future__ import annotations
 
+import ctypes
 import logging
+import os
+import selectors
+import socket
+import struct
 import threading
 import time
-from collections.abc import Iterator, Mapping
-from typing import TYPE_CHECKING
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import TYPE_CHECKING, Any, Optional
 
-from . import errors
+from . import cgroup, errors
+from .bpf.contract import RESOURCE_CPU, RESOURCE_RSS, decode_resource_event
+from .runtime.procstats import ProcSample, ProcStatsCollector
 
 if TYPE_CHECKING:
     from .supervisor import Supervisor
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MIN_POLL = 0.01
+"""Shortest interval between usage passes, in seconds."""
+
+DEFAULT_MAX_POLL = 1.0
+"""Longest interval between usage passes, and between ring-buffer retries."""
+
+_IN_MODIFY = 0x2
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# memory.events counters that mean the cgroup hit memory.max.
+_MEMORY_BREACH_COUNTERS = ("max", "oom", "oom_kill")
+
+
+class _Inotify:
+    """Minimal non-blocking inotify instance (the stdlib has no binding)."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._libc = libc
+        self.fd = fd
+
+    def add(self, path: os.PathLike[str]) -> Optional[int]:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _IN_MODIFY)
+        return wd if wd >= 0 else None
+
+    def remove(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> set[int]:
+        """Drain pending events; return the watch descriptors that fired."""
+        fired: set[int] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except (BlockingIOError, InterruptedError):
+                return fired
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                wd, _mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                fired.add(wd)
+                offset += _INOTIFY_EVENT.size + length
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _open(path: os.PathLike[str]) -> Optional[int]:
+    try:
+        return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+
+
+def _pread(fd: Optional[int]) -> Optional[bytes]:
+    if fd is None:
+        return None
+    try:
+        return os.pread(fd, 4096, 0)
+    except OSError:
+        return None
+
+
+class _Watched:
+    """Open handles and the last reading for one sandbox."""
+
+    __slots__ = (
+        "sandbox",
+        "name",
+        "pid",
+        "cpu_fd",
+        "memory_fd",
+        "events_fd",
+        "wd",
+        "memory_events",
+        "cpu_ms",
+        "rss_bytes",
+        "read_at",
+    )
+
+    def __init__(self, sandbox: Any) -> None:
+        self.sandbox = sandbox
+        self.name: str = sandbox.name
+        self.pid: Optional[int] = getattr(sandbox, "pid", None)
+        self.cpu_fd: Optional[int] = None
+        self.memory_fd: Optional[int] = None
+        self.events_fd: Optional[int] = None
+        self.wd: Optional[int] = None
+        self.memory_events: dict[str, int] = {}
+        self.cpu_ms: Optional[float] = None
+        self.rss_bytes: Optional[int] = None
+        self.read_at = 0.0
+
+    def close(self) -> None:
+        for fd in (self.cpu_fd, self.memory_fd, self.events_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.cpu_fd = self.memory_fd = self.events_fd = None
+
+
+class QuotaCollector:
+    """Userspace usage source for the watchdog; works without BPF.
+
+    Thread sandboxes are read through their cgroup. Process-backend sandboxes,
+    which expose ``pid``, are read from ``/proc``; their CPU counts from the
+    guest's ``boot_cpu_ms`` so interpreter start-up is not charged to the
+    quota. Files are opened once per sandbox and re-read with ``pread``.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_POLL,
+        max_interval: float = DEFAULT_MAX_POLL,
+    ) -> None:
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("need 0 < min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = max_interval
+        self._watched: dict[str, _Watched] = {}
+        self._by_wd: dict[int, _Watched] = {}
+        self._procs = ProcStatsCollector(max_age=0)
+        self._proc_samples: dict[int, ProcSample] = {}
+        self._inotify: Optional[_Inotify]
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError):
+            # No inotify: memory.max breaches are caught by polling instead.
+            self._inotify = None
+
+    def __len__(self) -> int:
+        return len(self._watched)
+
+    def fileno(self) -> Optional[int]:
+        """The inotify descriptor to wait on, if inotify is available."""
+        return self._inotify.fd if self._inotify is not None else None
+
+    def sync(self, sandboxes: Iterable[Any]) -> None:
+        """Watch exactly the sandboxes in *sandboxes* that have a quota."""
+        current = {
+            sb.name: sb
+            for sb in sandboxes
+            if getattr(sb, "cpu_quota_ms", None) is not None
+            or getattr(sb, "mem_quota_bytes", None) is not None
+        }
+        for name, watched in list(self._watched.items()):
+            if current.get(name) is not watched.sandbox:
+                self._drop(name)
+        for name, sb in current.items():
+            if name not in self._watched:
+                self._watch(sb)
+
+    def _watch(self, sandbox: Any) -> None:
+        watched = _Watched(sandbox)
+        if watched.pid is not None:
+            self._procs.register(watched.pid, self._make_proc_callback(watched.pid))
+        else:
+            path = cgroup._as_path(getattr(sandbox, "_cgroup_path", None))
+            if path is not None:
+                watched.cpu_fd = _open(path / "cpu.stat")
+                watched.memory_fd = _open(path / "memory.current")
+                watched.events_fd = _open(path / "memory.events")
+                data = _pread(watched.events_fd)
+                if data is not None:
+                    watched.memory_events = cgroup.parse_memory_events(data)
+                    if self._inotify is not None:
+                        watched.wd = self._inotify.add(path / "memory.events")
+                        if watched.wd is not None:
+                            self._by_wd[watched.wd] = watched
+        self._watched[watched.name] = watched
+
+    def _make_proc_callback(self, pid: int):
+        def _store(sample: ProcSample) -> None:
+            self._proc_samples[pid] = sample
+
+        return _store
+
+    def _drop(self, name: str) -> None:
+        watched = self._watched.pop(name)
+        if watched.pid is not None:
+            self._procs.unregister(watched.pid)
+        if watched.wd is not None:
+            self._by_wd.pop(watched.wd, None)
+            if self._inotify is not None:
+                try:
+                    self._inotify.remove(watched.wd)
+                except OSError:
+                    pass
+        watched.close()
+
+    def _read(self, watched: _Watched) -> tuple[Optional[float], Optional[int]]:
+        """Return ``(cpu_ms, rss_bytes)`` for *watched*; ``None`` if unknown."""
+        if watched.pid is not None:
+            sample = self._proc_samples.get(watched.pid)
+            if sample is None:
+                return None, None
+            boot = getattr(watched.sandbox, "boot_cpu_ms", None)
+            cpu_ms = None if boot is None else max(0.0, sample.cpu_ms - boot)
+            return cpu_ms, sample.rss_bytes
+        cpu_ms = rss = None
+        data = _pread(watched.cpu_fd)
+        if data is not None:
+            try:
+                cpu_ms = cgroup.parse_cpu_stat(data)
+            except (ValueError, IndexError):
+                pass
+        data = _pread(watched.memory_fd)
+        if data is not None:
+            try:
+                rss = int(data)
+            except ValueError:
+                pass
+        return cpu_ms, rss
+
+    def poll(self) -> list[dict[str, Any]]:
+        """Read every watched sandbox in one pass and return usage events.
+
+        Also sets :attr:`interval` for the next pass: half the shortest
+        projected time for any sandbox to reach a quota at its current rate,
+        clamped to ``[min_interval, max_interval]``, or double the last
+        interval when nothing is approaching one.
+        """
+        self._proc_samples.clear()
+        if len(self._procs):
+            self._procs.sample()
+        now = time.monotonic()
+        events: list[dict[str, Any]] = []
+        horizons: list[float] = []
+        for watched in list(self._watched.values()):
+            cpu_ms, rss = self._read(watched)
+            if cpu_ms is None and rss is None:
+                continue
+            events.append(
+                {"name": watched.name, "cpu_ms": cpu_ms or 0, "rss_bytes": rss or 0}
+            )
+            elapsed = now - watched.read_at
+            sb = watched.sandbox
+            for used, previous, quota in (
+                (cpu_ms, watched.cpu_ms, getattr(sb, "cpu_quota_ms", None)),
+                (rss, watched.rss_bytes, getattr(sb, "mem_quota_bytes", None)),
+            ):
+                if None in (used, previous, quota) or used <= previous:
+                    continue
+                rate = (used - previous) / elapsed
+                horizons.append(max(0.0, quota - used) / rate / 2)
+            watched.cpu_ms, watched.rss_bytes, watched.read_at = cpu_ms, rss, now
+        if horizons:
+            self.interval = min(
+                max(min(horizons), self.min_interval), self.max_interval
+            )
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return events
+
+    def read_notifications(self) -> list[dict[str, Any]]:
+        """Drain inotify and return an event per changed ``memory.events``.
+
+        A rise in ``max``, ``oom`` or ``oom_kill`` marks the event
+        ``memory_breach``: the cgroup hit ``memory.max``, which is the quota.
+        """
+        if self._inotify is None:
+            return []
+        events: list[dict[str, Any]] = []
+        for wd in self._inotify.read():
+            watched = self._by_wd.get(wd)
+            if watched is None:
+                continue
+            data = _pread(watched.events_fd)
+            if data is None:
+                continue
+            counters = cgroup.parse_memory_events(data)
+            previous, watched.memory_events = watched.memory_events, counters
+            _cpu_ms, rss = self._read(watched)
+            event: dict[str, Any] = {
+                "name": watched.name,
+                "cpu_ms": 0,
+                "rss_bytes": rss or 0,
+            }
+            if any(
+                counters.get(key, 0) > previous.get(key, 0)
+                for key in _MEMORY_BREACH_COUNTERS
+            ):
+                event["memory_breach"] = True
+            events.append(event)
+        return events
+
+    def close(self) -> None:
+        for name in list(self._watched):
+            self._drop(name)
+        self._procs.close()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
 
 class ResourceWatchdog(threading.Thread):
-    """Polls sandbox stats and enforces resource quotas."""
+    """Watches sandbox usage and enforces resource quotas."""
 
-    def __init__(self, supervisor: "Supervisor", interval: float = 0.05):
+    def __init__(
+        self,
+        supervisor: "Supervisor",
+        interval: float = 0.05,
+        *,
+        min_poll: float = DEFAULT_MIN_POLL,
+        max_poll: float = DEFAULT_MAX_POLL,
+    ):
         super().__init__(daemon=True)
         self._supervisor = supervisor
         self._interval = interval
+        self._max_poll = max(max_poll, interval)
         self._stop_event = threading.Event()
         self._rb_iter: Iterator[object] | None = None
+        # An exhausted ring buffer (no BPF program, or nothing to report) is
+        # reopened after a delay that doubles up to ``max_poll``.
+        self._rb_delay = interval
+        self._rb_retry_at = 0.0
+        self._collector = QuotaCollector(min(min_poll, max_poll), max_poll)
+        self._next_collect = 0.0
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+    def wake(self) -> None:
+        """Sync the watched sandboxes now, e.g. after a spawn."""
+        self._next_collect = 0.0
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            # A full wake pipe already guarantees a wakeup; a closed one means
+            # the watchdog has stopped.
+            pass
 
     def stop(self, timeout: float = 0.2) -> None:
         self._stop_event.set()
+        self.wake()
         self.join(timeout)
 
     def run(self) -> None:
-        while not self._stop_event.is_set():
-            if self._rb_iter is None:
-                self._rb_iter = self._supervisor._bpf.open_ring_buffer()
-            try:
-                event = next(self._rb_iter)
-            except StopIteration:
-                self._rb_iter = None
-                time.sleep(self._interval)
-                continue
-            except Exception:
-                logger.exception("watchdog ring-buffer iterator failed; resetting")
-                self._rb_iter = None
-                time.sleep(self._interval)
-                continue
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        if self._collector.fileno() is not None:
+            selector.register(self._collector.fileno(), selectors.EVENT_READ)
+        try:
+            while not self._stop_event.is_set():
+                if self._next_ring_buffer_event():
+                    continue
+                self._collect_if_due()
+                now = time.monotonic()
+                timeout = max(
+                    0.0,
+                    min(self._next_collect, self._rb_retry_at) - now,
+                )
+                for key, _events in selector.select(timeout):
+                    if key.fileobj is self._wake_r:
+                        try:
+                            while self._wake_r.recv(4096):
+                                pass
+                        except (BlockingIOError, OSError):
+                            pass
+                    else:
+                        self._handle_events(self._collector.read_notifications())
+        finally:
+            selector.close()
+            self._collector.close()
+            self._wake_r.close()
+            self._wake_w.close()
 
-            if not isinstance(event, Mapping):
-                logger.warning("watchdog ignored non-mapping event payload: %r", event)
-                continue
+    def _next_ring_buffer_event(self) -> bool:
+        """Handle one ring-buffer event; ``False`` when none is available."""
+        if self._rb_iter is None:
+            if time.monotonic() < self._rb_retry_at:
+                return False
+            self._rb_iter = self._supervisor._bpf.open_ring_buffer()
+        try:
+            event = next(self._rb_iter)
+        except StopIteration:
+            self._ring_buffer_exhausted()
+            return False
+        except Exception:
+            logger.exception("watchdog ring-buffer iterator failed; resetting")
+            self._ring_buffer_exhausted()
+            return False
+        self._rb_delay = self._interval
+        self._handle_events([event])
+        # A busy ring buffer must not starve the userspace collector.
+        self._collect_if_due()
+        return True
+
+    def _ring_buffer_exhausted(self) -> None:
+        self._rb_iter = None
+        self._rb_retry_at = time.monotonic() + self._rb_delay
+        self._rb_delay = min(self._rb_delay * 2, self._max_poll)
+
+    def _collect_if_due(self) -> None:
+        now = time.monotonic()
+        if now < self._next_collect:
+            return
+        try:
+            self._collector.sync(self._live_sandboxes())
+            events = self._collector.poll()
+        except Exception:
+            logger.exception("watchdog usage collection failed")
+            events = []
+        self._next_collect = now + self._collector.interval
+        self._handle_events(events)
+
+    def _live_sandboxes(self) -> list[Any]:
+        live = getattr(self._supervisor, "live_sandboxes", None)
+        if live is None:
+            return list(self._active_sandboxes().values())
+        return [sb for sb in live() if sb.is_alive()]
+
+    def _active_sandboxes(self) -> dict[str, Any]:
+        active: dict[str, Any] = {
+            t.name: t for t in self._supervisor.get_active_threads()
+        }
+        get_processes = getattr(self._supervisor, "get_active_process_sandboxes", None)
+        if get_processes is not None:
+            active.update((p.name, p) for p in get_processes())
+        return active
 
+    def _resolver(self) -> Callable[[Mapping[str, Any]], Any]:
+        """Return a function mapping an event to its sandbox, or ``None``.
+
+        The supervisor's name and cgroup-id indexes answer in O(1) without a
+        registry sweep. A supervisor without them is asked for its active
+        sandboxes once, on the first event that needs it.
+        """
+        by_name = getattr(self._supervisor, "lookup_sandbox", None)
+        by_cgroup = getattr(self._supervisor, "lookup_cgroup", None)
+        active: Optional[dict[str, Any]] = None
+
+        def _resolve(event: Mapping[str, Any]) -> Any:
+            nonlocal active
+            cgroup_id = event.get("cgroup_id")
             name = event.get("name")
-            if not isinstance(name, str):
+            if by_cgroup is not None and isinstance(cgroup_id, int):
+                sb = by_cgroup(cgroup_id)
+            elif by_name is not None and isinstance(name, str):
+                sb = by_name(name)
+            else:
+                sb = None
+            if sb is not None:
+                # The indexes hold every registered sandbox, live or not.
+                return sb if sb.is_alive() else None
+            if not isinstance(name, str) or by_name is not None:
+                return None
+            if active is None:
+                active = self._active_sandboxes()
+            return active.get(name)
+
+        return _resolve
+
+    @staticmethod
+    def _flatten(events: Iterable[object]) -> Iterator[object]:
+        for event in events:
+            if isinstance(event, (list, tuple)):
+                yield from event
+            elif isinstance(event, (bytes, bytearray, memoryview)):
+                try:
+                    yield decode_resource_event(event)
+                except struct.error:
+                    logger.warning("watchdog ignored malformed ring-buffer record")
+            else:
+                yield event
+
+    def _handle_events(self, events: Iterable[object]) -> None:
+        """Enforce quotas for a batch of events.
+
+        Events are resolved to sandboxes through the supervisor's indexes and
+        merged per sandbox -- highest counters, any breach flag -- so a burst
+        of events about one sandbox costs one check and at most one
+        enforcement.
+        """
+        resolve: Optional[Callable[[Mapping[str, Any]], Any]] = None
+        merged: dict[int, list[Any]] = {}
+        for event in self._flatten(events):
+            if not isinstance(event, Mapping):
+                logger.warning("watchdog ignored non-mapping event payload: %r", event)
                 continue
-            cpu_ms = event.get("cpu_ms", 0)
-            rss = event.get("rss_bytes", 0)
-            # The quota comparisons below run outside their try/except blocks, so
-            # a non-numeric counter (e.g. a malformed ring-buffer event with a
-            # string cpu_ms) would raise TypeError out of run(), killing the
-            # watchdog thread and silently disabling quota enforcement for every
-            # sandbox. Validate up front and skip the event instead.
-            if not isinstance(cpu_ms, (int, float)) or not isinstance(
-                rss, (int, float)
-            ):
+            usage = _event_usage(event)
+            if usage is None:
+                # The quota comparisons below run outside their try/except
+                # blocks, so a non-numeric counter (e.g. a malformed ring-buffer
+                # event with a string cpu_ms) would raise TypeError out of
+                # run(), killing the watchdog thread and silently disabling
+                # quota enforcement for every sandbox. Skip the event instead.
                 logger.warning(
                     "watchdog ignored event with non-numeric counters: %r", event
                 )
                 continue
-            active = {t.name: t for t in self._supervisor.get_active_threads()}
-            sb = active.get(name)
-            if not sb:
+            if resolve is None:
+                resolve = self._resolver()
+            sb = resolve(event)
+            if sb is None:
                 continue
-            if sb.cpu_quota_ms is not None and cpu_ms >= sb.cpu_quota_ms:
-                try:
-                    stopped = sb.enforce_quota_breach(
-                        errors.CPUExceeded(), "cpu_exceeded"
-                    )
-                    if not stopped:
-                        self._supervisor.quarantine(
-                            sb.name, "cpu_exceeded: unresponsive after watchdog breach"
-                        )
-                except Exception:
-                    logger.exception(
-                        "watchdog failed to stop sandbox %r after CPU quota breach",
-                        name,
-                    )
-                continue
-            if sb.mem_quota_bytes is not None and rss >= sb.mem_quota_bytes:
-                try:
-                    stopped = sb.enforce_quota_breach(
-                        errors.MemoryExceeded(), "memory_exceeded"
+            cpu_ms, rss, cpu_breach, memory_breach = usage
+            entry = merged.get(id(sb))
+            if entry is None:
+                merged[id(sb)] = [sb, cpu_ms, rss, cpu_breach, memory_breach]
+            else:
+                entry[1] = max(entry[1], cpu_ms)
+                entry[2] = max(entry[2], rss)
+                entry[3] = entry[3] or cpu_breach
+                entry[4] = entry[4] or memory_breach
+        for sb, cpu_ms, rss, cpu_breach, memory_breach in merged.values():
+            self._enforce(sb, cpu_ms, rss, cpu_breach, memory_breach)
+
+    def _breach(self, sb: Any, exc: Exception, reason: str) -> bool:
+        # Through the supervisor when it can publish the breach as an event.
+        enforce = getattr(self._supervisor, "enforce_quota_breach", None)
+        if enforce is None:
+            return sb.enforce_quota_breach(exc, reason)
+        return enforce(sb, exc, reason)
+
+    def _enforce(
+        self,
+        sb: Any,
+        cpu_ms: float,
+        rss: float,
+        cpu_breach: bool,
+        memory_breach: bool,
+    ) -> None:
+        name = sb.name
+        if sb.cpu_quota_ms is not None and (cpu_breach or cpu_ms >= sb.cpu_quota_ms):
+            try:
+                stopped = self._breach(sb, errors.CPUExceeded(), "cpu_exceeded")
+                if not stopped:
+                    self._supervisor.quarantine(
+                        name, "cpu_exceeded: unresponsive after watchdog breach"
                     )
-                    if not stopped:
-                        self._supervisor.quarantine(
-                            sb.name,
-                            "memory_exceeded: unresponsive after watchdog breach",
-                        )
-                except Exception:
-                    logger.exception(
-                        "watchdog failed to stop sandbox %r after memory quota breach",
+            except Exception:
+                logger.exception(
+                    "watchdog failed to stop sandbox %r after CPU quota breach",
+                    name,
+                )
+            return
+        if sb.mem_quota_bytes is not None and (
+            memory_breach or rss >= sb.mem_quota_bytes
+        ):
+            try:
+                stopped = self._breach(sb, errors.MemoryExceeded(), "memory_exceeded")
+                if not stopped:
+                    self._supervisor.quarantine(
                         name,
+                        "memory_exceeded: unresponsive after watchdog breach",
                     )
+            except Exception:
+                logger.exception(
+                    "watchdog failed to stop sandbox %r after memory quota breach",
+                    name,
+                )
+
+
+def _event_usage(
+    event: Mapping[str, Any],
+) -> Optional[tuple[float, float, bool, bool]]:
+    """Return ``(cpu_ms, rss_bytes, cpu_breach, memory_breach)`` for *event*.
+
+    Understands both the collector's ``cpu_ms``/``rss_bytes`` events and the
+    ``struct resource_event`` records resource_guard writes, which carry one
+    ``observed`` counter for one ``resource``. ``None`` if a counter is not a
+    number.
+    """
+    resource = event.get("resource")
+    if resource is not None:
+        observed = event.get("observed", 0)
+        if not isinstance(observed, (int, float)):
+            return None
+        breached = bool(event.get("breached"))
+        if resource == RESOURCE_CPU:
+            return observed / 1_000_000, 0, breached, False
+        if resource == RESOURCE_RSS:
+            return 0, observed, False, breached
+        # Network quotas are enforced in the kernel; nothing to stop here.
+        return 0, 0, False, False
+    cpu_ms = event.get("cpu_ms", 0)
+    rss = event.get("rss_bytes", 0)
+    if not isinstance(cpu_ms, (int, float)) or not isinstance(rss, (int, float)):
+        return None
+    return cpu_ms, rss, False, event.get("memory_breach") is True
@@ -1,29 +1,76 @@
 #!/usr/bin/env python3
 """Reproducible micro-benchmarks for PyIsolate on the current host.
 
-Reports spawn latency and cell round-trip time for the sub-interpreter backend
-(and, with ``--backend process``, the process backend). The numbers are
-hardware-, kernel-, and build-dependent, so run this on your own machine rather
-than trusting a headline figure copied from someone else's.
+The default ``cell`` suite reports spawn latency and cell round-trip time for
+the sub-interpreter backend (and, with ``--backend process``, the process
+backend). Other suites, selected with ``--suite``, isolate one subsystem:
+
+* ``codec`` -- encode/decode throughput and frame size of the process-channel
+  codecs (JSON vs binary) on representative payloads.
+* ``timers`` -- cost of arming and cancelling a wall-clock deadline on the
+  shared timer wheel versus a per-operation ``threading.Timer``.
+* ``transport`` -- framed throughput over a socketpair for 1 KiB, 64 KiB and
+  16 MiB frames: ``sendmsg`` plus a reusable ``recv_into`` buffer versus
+  concatenating the header and joining ``recv`` chunks.
+* ``iohub`` -- supervisor threads and CPU time to drive ``--sandboxes`` process
+  sandboxes read by the shared I/O hub versus one reader thread each.
+* ``registry`` -- spawn+close throughput with ``--live`` other sandboxes in the
+  recovery registry: the append-only journal versus rewriting the whole
+  registry file on every spawn and teardown.
+* ``lifecycle`` -- spawn and teardown latency percentiles with cgroups taken
+  from the pre-created pool and deleted in the background, versus created and
+  deleted inline.
+* ``spawn`` -- spawn throughput with ``--threads`` callers spawning at once,
+  with every ``spawn`` serialized behind one lock versus running concurrently.
+* ``policy`` -- compile time of a synthetic policy document of ``--sandboxes``
+  sandboxes extending a few templates ``--depth`` levels deep: inheritance
+  resolved once per template with hash-set merges, versus re-resolved for
+  every sandbox with list-membership merges.
+* ``logging`` -- exec+recv throughput of a guest with sandbox logging at
+  debug level: no handler, a synchronous JSON ``StreamHandler``, the batched
+  queue pipeline, and the pipeline with a per-sandbox rate limit.
+
+The numbers are hardware-, kernel-, and build-dependent, so run this on your
+own machine rather than trusting a headline figure copied from someone else's.
 
 Usage::
 
     python scripts/benchmark.py
     python scripts/benchmark.py --backend process --iterations 500
+    python scripts/benchmark.py --suite codec
+    python scripts/benchmark.py --suite iohub --sandboxes 128 --iterations 20
+    python scripts/benchmark.py --suite registry --live 10000 --iterations 100
+    python scripts/benchmark.py --suite spawn --threads 32 --iterations 512
+    python scripts/benchmark.py --suite lifecycle --iterations 500
+    python scripts/benchmark.py --suite policy --sandboxes 20000 --depth 8
+    python scripts/benchmark.py --suite logging --iterations 2000
 """
 
 from __future__ import annotations
 
 import argparse
+import logging
+import socket
 import statistics
 import sys
+import tempfile
+import threading
 import time
 from pathlib import Path
+from typing import Any, Iterable
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 import pyisolate as iso
+from pyisolate import cgroup, recovery
+from pyisolate.logging import JSONFormatter, LoggingPipeline
+from pyisolate.policy import compiler as _compiler
+from pyisolate.runtime import codec as _codec
+from pyisolate.runtime.framing import LEN, FrameBuffer, send_frame
+from pyisolate.runtime.iohub import IOHub
+from pyisolate.runtime.process_backend import ProcessSandbox
+from pyisolate.runtime.timers import TimerWheel
 
 
 def bench_spawn(iterations: int, backend: str) -> list[float]:
@@ -52,13 +99,580 @@ def bench_roundtrip(iterations: int, backend: str) -> list[float]:
     return samples
 
 
+CODEC_PAYLOADS: dict[str, object] = {
+    "small-dict": {"ev": "post", "message": {"id": 7, "ok": True, "tag": "x"}},
+    "floats-10k": {"ev": "post", "message": [i / 7 for i in range(10_000)]},
+    "ints-10k": {"ev": "post", "message": list(range(10_000))},
+    "records-1k": {
+        "ev": "post",
+        "message": [
+            {"id": i, "name": f"row-{i}", "score": i * 0.5} for i in range(1_000)
+        ],
+    },
+    "text-64k": {"ev": "post", "message": "x" * 65_536},
+}
+
+
+def bench_codec(iterations: int) -> dict[str, dict[str, dict[str, float]]]:
+    """Return per-payload, per-codec frame size and encode/decode times (us)."""
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for name, payload in CODEC_PAYLOADS.items():
+        per_codec: dict[str, dict[str, float]] = {}
+        for codec in (_codec.CODEC_JSON, _codec.CODEC_BINARY):
+            encode = _codec.encoder_for(codec)
+            body = encode(payload)
+            enc: list[float] = []
+            dec: list[float] = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                encode(payload)
+                enc.append((time.perf_counter() - start) * 1e6)
+                start = time.perf_counter()
+                _codec.decode(body)
+                dec.append((time.perf_counter() - start) * 1e6)
+            per_codec[codec] = {
+                "bytes": float(len(body)),
+                "encode": statistics.median(enc),
+                "decode": statistics.median(dec),
+            }
+        results[name] = per_codec
+    return results
+
+
+def bench_timers(iterations: int) -> dict[str, list[float]]:
+    """Return per-op arm+cancel times in microseconds for each timer strategy."""
+
+    def _noop() -> None:
+        pass
+
+    wheel = TimerWheel()
+    wheel_samples: list[float] = []
+    thread_samples: list[float] = []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            wheel.call_later(30.0, _noop).cancel()
+            wheel_samples.append((time.perf_counter() - start) * 1e6)
+
+            start = time.perf_counter()
+            timer = threading.Timer(30.0, _noop)
+            timer.daemon = True
+            timer.start()
+            timer.cancel()
+            timer.join()
+            thread_samples.append((time.perf_counter() - start) * 1e6)
+    finally:
+        wheel.close()
+    return {"timer-wheel": wheel_samples, "threading.Timer": thread_samples}
+
+
+TRANSPORT_FRAME_SIZES = {
+    "1 KiB": 1024,
+    "64 KiB": 64 * 1024,
+    "16 MiB": 16 * 1024 * 1024,
+}
+
+
+def _concat_send(sock: socket.socket, body: bytes) -> None:
+    # The transport before scatter/gather: the frame is copied to prepend its
+    # header.
+    sock.sendall(LEN.pack(len(body)) + body)
+
+
+def _chunked_recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise EOFError
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _chunked_recv(sock: socket.socket) -> bytes:
+    (size,) = LEN.unpack(_chunked_recv_exact(sock, LEN.size))
+    return _chunked_recv_exact(sock, size)
+
+
+def _buffered_recv(sock: socket.socket, frames: FrameBuffer) -> memoryview:
+    # The codec decodes the borrowed view in place, so no copy is taken here.
+    while (body := frames.pop()) is None:
+        if not frames.recv(sock):
+            raise EOFError
+    return body
+
+
+def bench_transport(iterations: int) -> dict[str, dict[str, float]]:
+    """Return MiB/s per frame size for the old and new framing transports.
+
+    A sender thread streams frames over a socketpair while the calling thread
+    receives them, so both halves of each transport are measured together.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for label, size in TRANSPORT_FRAME_SIZES.items():
+        body = bytes(size)
+        count = max(4, min(iterations * 10, (64 * 1024 * 1024) // size))
+        row: dict[str, float] = {}
+        for name in ("concat+recv", "sendmsg+recv_into"):
+            ours, theirs = socket.socketpair()
+            if name == "concat+recv":
+                send, frames = _concat_send, None
+            else:
+                send, frames = send_frame, FrameBuffer()
+
+            def _produce(send=send, sock=theirs) -> None:
+                for _ in range(count):
+                    send(sock, body)
+
+            sender = threading.Thread(target=_produce)
+            try:
+                start = time.perf_counter()
+                sender.start()
+                for _ in range(count):
+                    if frames is None:
+                        _chunked_recv(ours)
+                    else:
+                        _buffered_recv(ours, frames)
+                elapsed = time.perf_counter() - start
+            finally:
+                sender.join()
+                ours.close()
+                theirs.close()
+            row[name] = size * count / elapsed / (1024 * 1024)
+        results[label] = row
+    return results
+
+
+def bench_iohub(sandboxes: int, iterations: int) -> dict[str, dict[str, float]]:
+    """Return supervisor thread count and per-round cost for each reader mode.
+
+    A round sends one ``exec`` to every sandbox and waits for every reply;
+    ``cpu_ms`` is supervisor process CPU time for the round, across all of its
+    threads, and ``threads`` is how many threads the sandboxes added.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for mode in ("hub", "thread"):
+        hub = IOHub(name="pyisolate-bench-iohub") if mode == "hub" else None
+        baseline = threading.active_count()
+        procs: list[ProcessSandbox] = []
+        cpu_samples: list[float] = []
+        wall_samples: list[float] = []
+        try:
+            for i in range(sandboxes):
+                procs.append(
+                    ProcessSandbox(
+                        f"bench-io-{mode}-{i}", confine=False, io=mode, iohub=hub
+                    )
+                )
+            # Warm up: every guest has booted and answered once. Booting many
+            # interpreters at once on a small host is slow, so be generous.
+            for proc in procs:
+                proc.exec("post(0)")
+            for proc in procs:
+                proc.recv(timeout=120)
+            threads = threading.active_count() - baseline
+            for _ in range(iterations):
+                cpu = time.process_time()
+                wall = time.perf_counter()
+                for proc in procs:
+                    proc.exec("post(1)")
+                for proc in procs:
+                    proc.recv(timeout=10)
+                wall_samples.append((time.perf_counter() - wall) * 1e3)
+                cpu_samples.append((time.process_time() - cpu) * 1e3)
+        finally:
+            for proc in procs:
+                proc.stop()
+            if hub is not None:
+                hub.close()
+        results[mode] = {
+            "threads": float(threads),
+            "cpu_ms": statistics.fmean(cpu_samples) if cpu_samples else 0.0,
+            "wall_ms": statistics.fmean(wall_samples) if wall_samples else 0.0,
+        }
+    return results
+
+
+_REWRITE_LOCK = threading.Lock()
+
+
+def _rewrite_update(name: str, meta: dict[str, Any]) -> None:
+    # The registry before the journal: read, modify and rewrite the whole file.
+    with _REWRITE_LOCK:
+        sandboxes = recovery._read_registry()
+        sandboxes[name] = dict(meta)
+        recovery._write_registry(sandboxes)
+
+
+def _rewrite_drop(names: Iterable[str]) -> None:
+    with _REWRITE_LOCK:
+        sandboxes = recovery._read_registry()
+        for name in names:
+            sandboxes.pop(name, None)
+        recovery._write_registry(sandboxes)
+
+
+def bench_registry(live: int, iterations: int) -> dict[str, dict[str, float]]:
+    """Return spawn+close throughput with *live* other sandboxes registered.
+
+    The registry is seeded with *live* entries standing in for running
+    sandboxes -- starting that many sandbox threads would measure the host,
+    not the registry -- and then ``iterations`` sandboxes are spawned and
+    closed through a real supervisor, counting until their teardown has been
+    recorded. ``rewrite`` patches in the read-modify-rewrite registry the
+    journal replaced.
+    """
+    results: dict[str, dict[str, float]] = {}
+    saved_path = recovery._REGISTRY_PATH
+    saved_update, saved_drop = recovery.update_sandbox, recovery.drop_sandboxes
+    seed = {
+        f"bench-live-{i}": {"name": f"bench-live-{i}", "temp_dir": None}
+        for i in range(live)
+    }
+    try:
+        for mode in ("journal", "rewrite"):
+            with tempfile.TemporaryDirectory(prefix="pyisolate-bench-") as tmp:
+                recovery._REGISTRY_PATH = Path(tmp) / "supervisor_registry.json"
+                sup = iso.Supervisor()
+                try:
+                    if mode == "journal":
+                        recovery._append(
+                            [
+                                {"op": "put", "name": name, "meta": meta}
+                                for name, meta in seed.items()
+                            ]
+                        )
+                    else:
+                        recovery._write_registry(seed)
+                        recovery.update_sandbox = _rewrite_update
+                        recovery.drop_sandboxes = _rewrite_drop
+                    start = time.perf_counter()
+                    for i in range(iterations):
+                        sup.spawn(f"bench-reg-{i}").close()
+                    sup._reaper.flush()
+                    elapsed = time.perf_counter() - start
+                    registered = len(recovery.recover())
+                finally:
+                    recovery.update_sandbox = saved_update
+                    recovery.drop_sandboxes = saved_drop
+                    sup.shutdown()
+                    if recovery._journal is not None:
+                        recovery._journal.close()
+                        recovery._journal = None
+            results[mode] = {
+                "spawns_per_s": iterations / elapsed,
+                "ms_per_spawn": elapsed * 1e3 / iterations,
+                "registered": float(registered),
+            }
+    finally:
+        recovery._REGISTRY_PATH = saved_path
+    return results
+
+
+def bench_concurrent_spawn(
+    threads: int, iterations: int
+) -> dict[str, dict[str, float]]:
+    """Return spawn throughput with *threads* callers spawning concurrently.
+
+    ``iterations`` sandboxes are spawned per mode, split across the callers.
+    ``serialized`` holds one lock around every ``spawn`` call, as the
+    supervisor used to hold its registry lock across cgroup creation, the BPF
+    map update, the temp directory and the registry write; ``concurrent``
+    calls ``spawn`` directly. ``single`` is one caller, for reference.
+    """
+    results: dict[str, dict[str, float]] = {}
+    saved_path = recovery._REGISTRY_PATH
+    try:
+        for mode, callers in (
+            ("single", 1),
+            ("serialized", threads),
+            ("concurrent", threads),
+        ):
+            with tempfile.TemporaryDirectory(prefix="pyisolate-bench-") as tmp:
+                recovery._REGISTRY_PATH = Path(tmp) / "supervisor_registry.json"
+                sup = iso.Supervisor()
+                gate = threading.Lock() if mode == "serialized" else None
+                per_caller = max(1, iterations // callers)
+                barrier = threading.Barrier(callers + 1)
+                spawned: list[Any] = []
+                errors: list[BaseException] = []
+
+                def _caller(index: int) -> None:
+                    barrier.wait()
+                    try:
+                        for i in range(per_caller):
+                            name = f"bench-spawn-{index}-{i}"
+                            if gate is None:
+                                spawned.append(sup.spawn(name))
+                            else:
+                                with gate:
+                                    spawned.append(sup.spawn(name))
+                    except BaseException as exc:  # noqa: BLE001 - reported below
+                        errors.append(exc)
+
+                workers = [
+                    threading.Thread(target=_caller, args=(i,)) for i in range(callers)
+                ]
+                try:
+                    for worker in workers:
+                        worker.start()
+                    barrier.wait()
+                    start = time.perf_counter()
+                    for worker in workers:
+                        worker.join()
+                    elapsed = time.perf_counter() - start
+                    if errors:
+                        raise errors[0]
+                finally:
+                    for sb in spawned:
+                        sb.close()
+                    sup.shutdown()
+                    if recovery._journal is not None:
+                        recovery._journal.close()
+                        recovery._journal = None
+            total = per_caller * callers
+            results[mode] = {
+                "callers": float(callers),
+                "spawns_per_s": total / elapsed,
+                "ms_per_spawn": elapsed * 1e3 / total,
+            }
+    finally:
+        recovery._REGISTRY_PATH = saved_path
+    return results
+
+
+class _DirectCgroups:
+    """Creates and deletes cgroups inline, as spawn and teardown did before
+    the cgroup pool."""
+
+    def checkout(self, name, cpu_ms=None, mem_bytes=None, *, mode="dev"):
+        return cgroup.create(name, cpu_ms, mem_bytes, mode=mode)
+
+    def release(self, path) -> None:
+        cgroup.delete(path)
+
+    def close(self, timeout=None) -> None:
+        pass
+
+
+def bench_lifecycle(iterations: int) -> dict[str, dict[str, list[float]]]:
+    """Return spawn and teardown latencies in ms, with and without the pool.
+
+    Spawn latency is one ``spawn`` call. Teardown latency is the supervisor's
+    own work to tear the closed sandbox down on the reaper thread: registry
+    drop, temp directory and cgroup. ``direct`` creates and deletes each
+    cgroup inline instead of using the pool.
+    """
+    results: dict[str, dict[str, list[float]]] = {}
+    saved_path = recovery._REGISTRY_PATH
+    try:
+        for mode in ("pooled", "direct"):
+            with tempfile.TemporaryDirectory(prefix="pyisolate-bench-") as tmp:
+                recovery._REGISTRY_PATH = Path(tmp) / "supervisor_registry.json"
+                sup = iso.Supervisor()
+                if mode == "direct":
+                    sup._cgroups.close()
+                    sup._cgroups = _DirectCgroups()
+                else:
+                    sup._cgroups.fill()
+                spawn: list[float] = []
+                teardown: list[float] = []
+                reap = sup._reaper._teardown
+
+                def _timed_reap(batch: list[Any]) -> None:
+                    start = time.perf_counter()
+                    reap(batch)
+                    teardown.append((time.perf_counter() - start) * 1e3)
+
+                sup._reaper._teardown = _timed_reap
+                try:
+                    for i in range(iterations):
+                        start = time.perf_counter()
+                        sb = sup.spawn(f"bench-life-{i}")
+                        spawn.append((time.perf_counter() - start) * 1e3)
+                        sb.close()
+                        sup._reaper.flush()
+                finally:
+                    sup.shutdown()
+                    if recovery._journal is not None:
+                        recovery._journal.close()
+                        recovery._journal = None
+            results[mode] = {"spawn": spawn, "teardown": teardown}
+    finally:
+        recovery._REGISTRY_PATH = saved_path
+    return results
+
+
+def synthetic_policy(
+    sandboxes: int, *, templates: int = 4, depth: int = 8, rules: int = 16
+) -> dict[str, Any]:
+    """Return a policy document shaped like a large generated deployment.
+
+    *templates* chains of *depth* templates each add *rules* filesystem rules
+    plus a quarter as many network and import rules per level; *sandboxes*
+    leaf sandboxes each extend the last template of one chain and add one
+    rule of their own.
+    """
+    boxes: dict[str, dict[str, Any]] = {}
+    for t in range(templates):
+        parent = None
+        for level in range(depth):
+            name = f"tpl{t}-{level}"
+            cfg: dict[str, Any] = {
+                "fs": [{"read": f"/srv/t{t}/l{level}/{i}"} for i in range(rules)],
+                "net": [
+                    {"connect": f"10.{t}.{level}.{i}:443"} for i in range(rules // 4)
+                ],
+                "imports": [f"mod_{t}_{level}_{i}" for i in range(rules // 4)],
+            }
+            if parent is not None:
+                cfg["extends"] = parent
+            boxes[name] = cfg
+            parent = name
+    for i in range(sandboxes):
+        boxes[f"sb{i}"] = {
+            "extends": f"tpl{i % templates}-{depth - 1}",
+            "fs": [{"write": f"/srv/sb{i}"}],
+            "imports": ["json"],
+        }
+    return {"version": "1.0", "defaults": {"imports": ["math"]}, "sandboxes": boxes}
+
+
+class _PerSandboxResolver:
+    """Resolves and compiles every sandbox's ``extends`` chain from scratch
+    with list-membership merges, as the compiler did before memoization."""
+
+    def __init__(self, raw_boxes, defaults) -> None:
+        self._raw = raw_boxes
+        self._defaults = defaults
+        self._last: dict[str, Any] = {}
+
+    @staticmethod
+    def _merge(parent: list, child: list) -> list:
+        merged = list(parent)
+        for item in child:
+            if item not in merged:
+                merged.append(item)
+        return merged
+
+    def compiled(self, name: str, field: str) -> Any:
+        rules = self._last[field]
+        return _compiler._CompiledRules(field).extended(rules, name)
+
+    def resolve(self, name: str) -> dict[str, Any]:
+        self._last = self._resolve(name)
+        return self._last
+
+    def _resolve(self, name: str) -> dict[str, Any]:
+        cfg = self._raw[name]
+        parent = {}
+        if cfg.get("extends") is not None:
+            parent = self._resolve(cfg["extends"])
+        out = {"cpu_ms": cfg.get("cpu_ms", parent.get("cpu_ms"))}
+        for field in ("fs", "net", "imports"):
+            base = self._merge(self._defaults.get(field, []), parent.get(field, []))
+            out[field] = self._merge(base, cfg.get(field, []))
+        return out
+
+
+def bench_policy(
+    sandboxes: int, depth: int, repeats: int
+) -> dict[str, dict[str, float]]:
+    """Return the best-of-*repeats* compile time of a synthetic policy.
+
+    ``memoized`` is the compiler as shipped; ``per-sandbox`` patches in the
+    resolution it replaced.
+    """
+    doc = synthetic_policy(sandboxes, depth=depth)
+    results: dict[str, dict[str, float]] = {}
+    saved = _compiler._InheritanceResolver
+    try:
+        for mode in ("memoized", "per-sandbox"):
+            if mode == "per-sandbox":
+                _compiler._InheritanceResolver = _PerSandboxResolver  # type: ignore
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                compiled = _compiler.compile_policy_data(doc)
+                best = min(best, time.perf_counter() - start)
+            results[mode] = {
+                "ms": best * 1e3,
+                "sandboxes_per_s": len(compiled.sandboxes) / best,
+            }
+    finally:
+        _compiler._InheritanceResolver = saved  # type: ignore[misc]
+    return results
+
+
+def bench_logging(iterations: int) -> dict[str, dict[str, float]]:
+    """Return guest exec+recv throughput for each way of handling its logs.
+
+    Every ``exec`` logs a debug record to the sandbox's logger, which is
+    written as JSON to a temporary file: synchronously by a ``StreamHandler``,
+    or by the batched pipeline, with and without a rate limit. ``off`` has no
+    handler and the logger above debug level.
+    """
+    results: dict[str, dict[str, float]] = {}
+    logger = logging.getLogger("pyisolate")
+    saved = (logger.level, logger.propagate, list(logger.handlers))
+    try:
+        for mode in ("off", "sync", "batched", "rate-limited"):
+            with tempfile.TemporaryFile("w+") as out:
+                pipeline = None
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                logger.propagate = False
+                if mode == "off":
+                    logger.setLevel(logging.WARNING)
+                else:
+                    logger.setLevel(logging.DEBUG)
+                    if mode == "sync":
+                        handler = logging.StreamHandler(out)
+                        handler.setFormatter(JSONFormatter())
+                    else:
+                        rate = 100.0 if mode == "rate-limited" else None
+                        pipeline = LoggingPipeline(out, rate=rate)
+                        pipeline.start()
+                        handler = pipeline.handler
+                    logger.addHandler(handler)
+                with iso.spawn(f"bench-log-{mode}") as sb:
+                    sb.exec("post(1)")
+                    sb.recv(timeout=5)
+                    start = time.perf_counter()
+                    for _ in range(iterations):
+                        sb.exec("post(1)")
+                        sb.recv(timeout=5)
+                    elapsed = time.perf_counter() - start
+                row = {"ops_per_s": iterations / elapsed}
+                if pipeline is not None:
+                    pipeline.stop()
+                    stats = pipeline.stats()
+                    row["writes"] = stats.writes
+                    row["suppressed"] = stats.suppressed
+                    row["dropped"] = stats.dropped
+                results[mode] = row
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        level, propagate, handlers = saved
+        logger.setLevel(level)
+        logger.propagate = propagate
+        for handler in handlers:
+            logger.addHandler(handler)
+    return results
+
+
 def _summary(samples: list[float]) -> dict[str, float]:
     ordered = sorted(samples)
     p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
     return {
         "mean": statistics.fmean(samples),
         "median": statistics.median(samples),
         "p95": p95,
+        "p99": p99,
         "min": ordered[0],
         "max": ordered[-1],
     }
@@ -66,6 +680,12 @@ def _summary(samples: list[float]) -> dict[str, float]:
 
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--suite",
+        default="cell",
+        choices=sorted(SUITES),
+        help="benchmark suite to run (default: cell)",
+    )
     parser.add_argument(
         "--backend",
         default="subinterpreter",
@@ -78,11 +698,42 @@ def main(argv: list[str] | None = None) -> int:
         default=200,
         help="samples per benchmark (default: 200)",
     )
+    parser.add_argument(
+        "--sandboxes",
+        type=int,
+        default=64,
+        help="concurrent sandboxes for the iohub suite, or leaf sandboxes for "
+        "the policy suite (default: 64)",
+    )
+    parser.add_argument(
+        "--live",
+        type=int,
+        default=10_000,
+        help="registered sandboxes for the registry suite (default: 10000)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=32,
+        help="concurrent callers for the spawn suite (default: 32)",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=8,
+        help="template inheritance depth for the policy suite (default: 8)",
+    )
     args = parser.parse_args(argv)
 
-    print(f"PyIsolate benchmark  backend={args.backend}  n={args.iterations}")
+    print(
+        f"PyIsolate benchmark  suite={args.suite}  backend={args.backend}  "
+        f"n={args.iterations}"
+    )
     print(f"python={sys.version.split()[0]}  platform={sys.platform}\n")
+    return SUITES[args.suite](args)
+
 
+def _run_cell(args: argparse.Namespace) -> int:
     spawn = _summary(bench_spawn(args.iterations, args.backend))
     rt = _summary(bench_roundtrip(args.iterations, args.backend))
 
@@ -98,5 +749,120 @@ def main(argv: list[str] | None = None) -> int:
     return 0
 
 
+def _run_codec(args: argparse.Namespace) -> int:
+    results = bench_codec(args.iterations)
+    print(
+        f"{'payload':<14}{'codec':<10}{'bytes':>10}"
+        f"{'encode us':>12}{'decode us':>12}"
+    )
+    for name, per_codec in results.items():
+        for codec, row in per_codec.items():
+            print(
+                f"{name:<14}{codec:<10}{int(row['bytes']):>10}"
+                f"{row['encode']:>12.1f}{row['decode']:>12.1f}"
+            )
+    return 0
+
+
+def _run_timers(args: argparse.Namespace) -> int:
+    print(f"{'arm+cancel (us)':<22}{'mean':>10}{'median':>10}{'p95':>10}")
+    for name, samples in bench_timers(args.iterations).items():
+        row = _summary(samples)
+        print(
+            f"{name:<22}"
+            f"{row['mean']:>10.2f}{row['median']:>10.2f}{row['p95']:>10.2f}"
+        )
+    return 0
+
+
+def _run_transport(args: argparse.Namespace) -> int:
+    print(f"{'frame':<10}{'concat+recv MiB/s':>20}{'sendmsg+recv_into MiB/s':>26}")
+    for label, row in bench_transport(args.iterations).items():
+        print(
+            f"{label:<10}{row['concat+recv']:>20.1f}"
+            f"{row['sendmsg+recv_into']:>26.1f}"
+        )
+    return 0
+
+
+def _run_iohub(args: argparse.Namespace) -> int:
+    print(f"sandboxes={args.sandboxes}")
+    print(f"{'reader':<10}{'threads':>10}{'cpu ms/round':>16}{'wall ms/round':>16}")
+    for mode, row in bench_iohub(args.sandboxes, args.iterations).items():
+        print(
+            f"{mode:<10}{int(row['threads']):>10}"
+            f"{row['cpu_ms']:>16.2f}{row['wall_ms']:>16.2f}"
+        )
+    return 0
+
+
+def _run_registry(args: argparse.Namespace) -> int:
+    print(f"live={args.live}")
+    print(f"{'registry':<10}{'spawns/s':>12}{'ms/spawn':>12}")
+    for mode, row in bench_registry(args.live, args.iterations).items():
+        print(f"{mode:<10}{row['spawns_per_s']:>12.1f}{row['ms_per_spawn']:>12.2f}")
+    return 0
+
+
+def _run_spawn(args: argparse.Namespace) -> int:
+    print(f"threads={args.threads}")
+    print(f"{'mode':<12}{'callers':>8}{'spawns/s':>12}{'ms/spawn':>12}")
+    for mode, row in bench_concurrent_spawn(args.threads, args.iterations).items():
+        print(
+            f"{mode:<12}{int(row['callers']):>8}"
+            f"{row['spawns_per_s']:>12.1f}{row['ms_per_spawn']:>12.2f}"
+        )
+    return 0
+
+
+def _run_lifecycle(args: argparse.Namespace) -> int:
+    print(f"{'latency (ms)':<22}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for mode, phases in bench_lifecycle(args.iterations).items():
+        for phase, samples in phases.items():
+            row = _summary(samples)
+            print(
+                f"{phase + ' ' + mode:<22}{row['median']:>10.3f}"
+                f"{row['p95']:>10.3f}{row['p99']:>10.3f}{row['max']:>10.3f}"
+            )
+    return 0
+
+
+def _run_policy(args: argparse.Namespace) -> int:
+    # Each repeat compiles the whole document; a few are enough for a best-of.
+    repeats = max(1, min(args.iterations, 5))
+    print(f"sandboxes={args.sandboxes}  depth={args.depth}  best of {repeats}")
+    print(f"{'resolution':<14}{'ms':>12}{'sandboxes/s':>14}")
+    for mode, row in bench_policy(args.sandboxes, args.depth, repeats).items():
+        print(f"{mode:<14}{row['ms']:>12.1f}{row['sandboxes_per_s']:>14.0f}")
+    return 0
+
+
+def _run_logging(args: argparse.Namespace) -> int:
+    print(
+        f"{'handler':<14}{'ops/s':>12}{'writes':>10}"
+        f"{'suppressed':>12}{'dropped':>10}"
+    )
+    for mode, row in bench_logging(args.iterations).items():
+        print(
+            f"{mode:<14}{row['ops_per_s']:>12.0f}{int(row.get('writes', 0)):>10}"
+            f"{int(row.get('suppressed', 0)):>12}{int(row.get('dropped', 0)):>10}"
+        )
+    return 0
+
+
+SUITES = {
+    "cell": _run_cell,
+    "codec": _run_codec,
+    "timers": _run_timers,
+    "transport": _run_transport,
+    "iohub": _run_iohub,
+    "lifecycle": _run_lifecycle,
+    "logging": _run_logging,
+    "policy": _run_policy,
+    "registry": _run_registry,
+    "spawn": _run_spawn,
+}
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -1,4 +1,6 @@
 import sys
+import threading
+import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -96,3 +98,140 @@ def test_denied_operation_emits_structured_telemetry(tmp_path):
         "broker_decision": "deny",
     }
     assert sb.get_denial_events() == [event.to_dict()]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_async_notify_only_enqueues():
+    from pyisolate.observability.alerts import AlertManager
+
+    release = threading.Event()
+    seen: list[tuple[str, str]] = []
+
+    def slow(sb, err):
+        release.wait(5)
+        seen.append((sb, threading.current_thread().name))
+
+    manager = AlertManager(asynchronous=True)
+    manager.register(slow)
+    started = time.monotonic()
+    assert manager.notify("sb", iso.PolicyError("boom")) == []
+    assert time.monotonic() - started < 0.5
+    assert seen == []
+    release.set()
+    assert manager.flush(timeout=5)
+    assert seen == [("sb", "pyisolate-alerts")]
+    stats = manager.stats()
+    assert (stats.enqueued, stats.dispatched, stats.queued) == (1, 1, 0)
+    _wait_for(lambda: manager.stats().workers == 0)
+
+
+def test_repeated_alerts_are_coalesced_within_the_window():
+    from pyisolate.observability.alerts import AlertManager
+
+    calls: list[tuple[str, str]] = []
+    manager = AlertManager(asynchronous=True, coalesce_window=0.2)
+    manager.register(lambda sb, err: calls.append((sb, type(err).__name__)))
+    for _ in range(5):
+        manager.notify("a", iso.PolicyError("x"))
+    manager.notify("a", iso.CPUExceeded())
+    manager.notify("b", iso.PolicyError("x"))
+    assert manager.flush(timeout=5)
+    assert sorted(calls) == [
+        ("a", "CPUExceeded"),
+        ("a", "PolicyError"),
+        ("b", "PolicyError"),
+    ]
+    assert manager.stats().coalesced == 4
+    time.sleep(0.25)
+    manager.notify("a", iso.PolicyError("x"))
+    assert manager.flush(timeout=5)
+    assert len(calls) == 4
+
+
+def test_full_queue_drops_and_counts():
+    from pyisolate.observability.alerts import AlertManager
+
+    entered = threading.Event()
+    release = threading.Event()
+
+    def blocking(sb, err):
+        entered.set()
+        release.wait(5)
+
+    manager = AlertManager(asynchronous=True, workers=1, maxsize=2)
+    manager.register(blocking)
+    manager.notify("a", iso.PolicyError("x"))
+    assert entered.wait(5)
+    for name in ("b", "c", "d", "e"):
+        manager.notify(name, iso.PolicyError("x"))
+    stats = manager.stats()
+    assert (stats.queued, stats.dropped) == (2, 2)
+    release.set()
+    manager.close(timeout=5)
+    assert manager.stats().dispatched == 3
+    manager.notify("f", iso.PolicyError("x"))
+    assert manager.stats().dropped == 3
+
+
+def test_slow_callback_is_abandoned_after_its_timeout():
+    from pyisolate.observability.alerts import AlertManager
+
+    release = threading.Event()
+    fast: list[str] = []
+    failures: list[str] = []
+
+    def stuck(sb, err):
+        release.wait(5)
+
+    def failing(sb, err):
+        failures.append(sb)
+        raise RuntimeError("webhook down")
+
+    manager = AlertManager(asynchronous=True, workers=1, callback_timeout=0.05)
+    manager.register(stuck)
+    manager.register(failing)
+    manager.register(lambda sb, err: fast.append(sb))
+    try:
+        manager.notify("a", iso.PolicyError("x"))
+        manager.notify("b", iso.PolicyError("x"))
+        # The stuck callback holds one thread; the rest are dispatched anyway.
+        _wait_for(lambda: manager.stats().timed_out == 2)
+        assert manager.flush(timeout=5)
+        assert sorted(fast) == ["a", "b"]
+        assert manager.stats().failed == 2
+    finally:
+        release.set()
+    _wait_for(
+        lambda: not [t for t in threading.enumerate() if t.name == "pyisolate-alerts"]
+    )
+
+
+def test_supervisor_alerts_do_not_stall_the_guest():
+    release = threading.Event()
+    called: list[str] = []
+
+    def webhook(sb, err):
+        release.wait(5)
+        called.append(sb)
+
+    sup = iso.Supervisor()
+    sup.register_alert_handler(webhook)
+    sb = sup.spawn("alert-async")
+    try:
+        sb.exec("import pyisolate as iso; raise iso.PolicyError('boom')")
+        with assert_policy_error():
+            sb.recv(timeout=0.5)
+        sb.exec("post(1)")
+        assert sb.recv(timeout=0.5) == 1
+        assert called == []
+    finally:
+        release.set()
+        sb.close()
+        sup.shutdown()
+    assert called == ["alert-async"]
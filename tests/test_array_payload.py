@@ -0,0 +1,139 @@
+"""Tests for typed array payloads crossing the cell boundary."""
+
+import sys
+from array import array
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate.runtime import codec, shm
+from pyisolate.runtime.protocol import ArrayPayload
+
+
+@pytest.mark.parametrize(
+    "typecode, dtype",
+    [
+        ("b", "|i1"),
+        ("B", "|u1"),
+        ("h", "<i2"),
+        ("I", "<u4"),
+        ("q", "<i8"),
+        ("f", "<f4"),
+        ("d", "<f8"),
+    ],
+)
+def test_from_buffer_maps_array_typecodes_to_dtypes(typecode, dtype):
+    payload = ArrayPayload.from_buffer(array(typecode, [1, 2, 3, 4]))
+    assert payload.dtype == dtype
+    assert payload.shape == (4,)
+    assert payload.tolist() == [1, 2, 3, 4]
+
+
+def test_from_buffer_does_not_copy_and_keeps_shape():
+    source = array("d", range(6))
+    payload = ArrayPayload.from_buffer(source, shape=(2, 3))
+    assert payload.view().tolist() == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+    assert payload.data.readonly
+    source[0] = 42.0
+    assert payload.view()[0, 0] == 42.0
+    assert payload.detached().data.obj is not source
+
+
+def test_multidimensional_memoryview_keeps_its_shape():
+    view = memoryview(bytearray(24)).cast("i", [2, 3])
+    assert ArrayPayload.from_buffer(view).shape == (2, 3)
+
+
+def test_invalid_payloads_are_rejected():
+    with pytest.raises(ValueError, match="shape"):
+        ArrayPayload.from_buffer(array("d", [1.0, 2.0]), shape=(3,))
+    with pytest.raises(ValueError, match="dtype"):
+        ArrayPayload(data=memoryview(b"\x00" * 8), dtype="<c8", shape=(1,))
+    with pytest.raises(ValueError, match="contiguous"):
+        ArrayPayload.from_buffer(memoryview(array("d", range(4)))[::2])
+    with pytest.raises(TypeError, match="format"):
+        ArrayPayload.from_buffer(memoryview(b"ab").cast("c"))
+
+
+def test_numpy_wraps_payload_without_copying():
+    np = pytest.importorskip("numpy")
+    payload = ArrayPayload.from_buffer(array("f", [1.0, 2.0, 3.0, 4.0]), shape=(2, 2))
+    wrapped = np.asarray(payload)
+    assert wrapped.shape == (2, 2)
+    assert wrapped.dtype == np.float32
+    assert not wrapped.flags.writeable
+    assert np.shares_memory(wrapped, np.frombuffer(payload.data, dtype=np.uint8))
+
+
+def test_binary_codec_decodes_arrays_as_views_into_the_frame():
+    payload = ArrayPayload.from_buffer(array("q", range(10)), shape=(5, 2))
+    body = codec.encode_binary({"message": payload})
+    decoded = codec.decode(body)["message"]
+    assert decoded == payload
+    assert decoded.data.obj is body
+
+
+def test_arrays_decoded_from_a_reusable_buffer_are_copied_out():
+    payload = ArrayPayload.from_buffer(array("d", [1.0, 2.0]))
+    buffer = bytearray(codec.encode_binary(payload))
+    decoded = codec.decode(memoryview(buffer))
+    buffer[:] = bytes(len(buffer))
+    assert decoded.tolist() == [1.0, 2.0]
+
+
+def test_binary_codec_rejects_inconsistent_arrays():
+    good = codec.encode_binary(ArrayPayload.from_buffer(array("i", [1, 2])))
+    # Declared shape [2] but claim 3 elements: patch the only dimension.
+    bad = good.replace((2).to_bytes(8, "little"), (3).to_bytes(8, "little"), 1)
+    with pytest.raises(codec.CodecError, match="array"):
+        codec.decode(bad)
+
+
+def test_json_codec_refuses_arrays():
+    with pytest.raises(TypeError):
+        codec.encode({"message": ArrayPayload.from_buffer(array("d", [1.0]))})
+
+
+@pytest.mark.parametrize("backend", ["subinterpreter", "process"])
+def test_guest_posts_array_payload(backend):
+    with iso.spawn(
+        f"array-{backend}", backend=backend, allowed_imports=["array"]
+    ) as sb:
+        sb.exec(
+            "import array\n"
+            "data = array.array('d', range(6))\n"
+            "post(ArrayPayload.from_buffer(data, shape=(3, 2)))\n"
+            "data[0] = -1.0\n"
+        )
+        received = sb.recv(timeout=5)
+        assert isinstance(received, ArrayPayload)
+        assert received.shape == (3, 2)
+        # The host sees the value at post time, not later guest writes.
+        assert received.tolist() == [[0.0, 1.0], [2.0, 3.0], [4.0, 5.0]]
+
+
+@pytest.mark.skipif(not shm.available(), reason="memfd sealing unavailable")
+def test_large_process_array_is_mapped_from_shared_memory():
+    count = shm.SHM_THRESHOLD // 4
+    with iso.spawn("array-shm", backend="process", allowed_imports=["array"]) as sb:
+        sb.exec(
+            f"import array\npost(ArrayPayload.from_buffer(array.array('i', range({count}))))"
+        )
+        received = sb.recv(timeout=10)
+        assert received.dtype == "<i4"
+        assert received.shape == (count,)
+        assert type(received.data.obj).__name__ == "mmap"
+        assert received.view()[count - 1] == count - 1
+
+
+def test_array_payload_counts_against_thread_output_quota():
+    with iso.spawn("array-quota", output_bytes_max=16, allowed_imports=["array"]) as sb:
+        sb.exec(
+            "import array\npost(ArrayPayload.from_buffer(array.array('d', range(4))))"
+        )
+        with pytest.raises(iso.OutputExceeded):
+            sb.recv(timeout=5)
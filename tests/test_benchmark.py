@@ -6,6 +6,7 @@ statistics helper so the benchmark does not silently bit-rot.
 """
 
 import importlib.util
+import logging
 import sys
 from pathlib import Path
 
@@ -37,3 +38,97 @@ def test_benchmark_exposes_expected_entry_points():
     assert callable(bench.bench_spawn)
     assert callable(bench.bench_roundtrip)
     assert callable(bench.main)
+
+
+def test_codec_suite_reports_both_codecs_per_payload():
+    bench = _load_benchmark()
+    results = bench.bench_codec(2)
+    assert set(results) == set(bench.CODEC_PAYLOADS)
+    for per_codec in results.values():
+        assert set(per_codec) == {"json", "binary/1"}
+        assert all(row["bytes"] > 0 for row in per_codec.values())
+    assert "codec" in bench.SUITES
+
+
+def test_timer_suite_compares_wheel_and_thread_timers():
+    bench = _load_benchmark()
+    results = bench.bench_timers(3)
+    assert set(results) == {"timer-wheel", "threading.Timer"}
+    assert all(len(samples) == 3 for samples in results.values())
+
+
+def test_iohub_suite_compares_reader_modes():
+    bench = _load_benchmark()
+    results = bench.bench_iohub(2, 1)
+    assert set(results) == {"hub", "thread"}
+    assert results["thread"]["threads"] >= 2
+    assert results["hub"]["threads"] <= 1
+    assert "iohub" in bench.SUITES
+
+
+def test_transport_suite_measures_both_framings_per_size():
+    bench = _load_benchmark()
+    results = bench.bench_transport(1)
+    assert set(results) == set(bench.TRANSPORT_FRAME_SIZES)
+    for row in results.values():
+        assert set(row) == {"concat+recv", "sendmsg+recv_into"}
+        assert all(rate > 0 for rate in row.values())
+    assert "transport" in bench.SUITES
+
+
+def test_registry_suite_compares_journal_and_rewrite():
+    bench = _load_benchmark()
+    results = bench.bench_registry(200, 3)
+    assert set(results) == {"journal", "rewrite"}
+    for row in results.values():
+        assert row["spawns_per_s"] > 0
+        # Every spawned sandbox's teardown was recorded before timing stopped.
+        assert row["registered"] == 200
+    assert "registry" in bench.SUITES
+
+
+def test_spawn_suite_compares_serialized_and_concurrent_callers():
+    bench = _load_benchmark()
+    results = bench.bench_concurrent_spawn(4, 8)
+    assert set(results) == {"single", "serialized", "concurrent"}
+    assert results["concurrent"]["callers"] == 4
+    for row in results.values():
+        assert row["spawns_per_s"] > 0
+    assert "spawn" in bench.SUITES
+
+
+def test_lifecycle_suite_reports_spawn_and_teardown_latency():
+    bench = _load_benchmark()
+    results = bench.bench_lifecycle(5)
+    assert set(results) == {"pooled", "direct"}
+    for phases in results.values():
+        assert len(phases["spawn"]) == 5
+        # Every closed sandbox was torn down before the next spawn.
+        assert len(phases["teardown"]) == 5
+        assert bench._summary(phases["spawn"])["p99"] > 0
+    assert "lifecycle" in bench.SUITES
+
+
+def test_policy_suite_compiles_synthetic_policy_both_ways():
+    bench = _load_benchmark()
+    doc = bench.synthetic_policy(10, templates=2, depth=3, rules=4)
+    assert len(doc["sandboxes"]) == 10 + 2 * 3
+    assert doc["sandboxes"]["sb3"]["extends"] == "tpl1-2"
+    results = bench.bench_policy(10, 3, 1)
+    assert set(results) == {"memoized", "per-sandbox"}
+    assert all(row["ms"] > 0 for row in results.values())
+    assert "policy" in bench.SUITES
+
+
+def test_logging_suite_compares_handlers_and_restores_logger():
+    bench = _load_benchmark()
+    logger = logging.getLogger("pyisolate")
+    before = (logger.level, logger.propagate, list(logger.handlers))
+    results = bench.bench_logging(300)
+    assert list(results) == ["off", "sync", "batched", "rate-limited"]
+    assert all(row["ops_per_s"] > 0 for row in results.values())
+    # Batching writes far fewer times than once per record.
+    assert 0 < results["batched"]["writes"] < 300
+    assert results["rate-limited"]["suppressed"] > 0
+    assert (logger.level, logger.propagate, list(logger.handlers)) == before
+    assert "logging" in bench.SUITES
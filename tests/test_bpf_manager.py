@@ -260,7 +260,7 @@ def test_hot_reload_handles_nested_policy(tmp_path, monkeypatch):
         "pinned",
         "/sys/fs/bpf/policy_net_allow",
         "key",
-        *encode_map_field("default:0", BPF_KEY_BYTES),
+        *encode_map_field("default:1.1.1.1:80", BPF_KEY_BYTES),
         "value",
         *encode_map_field("1.1.1.1:80", BPF_VALUE_BYTES),
         "any",
@@ -495,21 +495,34 @@ def test_hot_reload_midway_failure_keeps_policy_maps_unchanged_and_rolls_back(
 
     calls = []
 
-    def fail_second_update(self, cmd, *, raise_on_error=False):
+    new_value = encode_map_field("2.2.2.2:443", BPF_VALUE_BYTES)
+
+    def fail_new_net_rule(self, cmd, *, raise_on_error=False):
         calls.append(cmd)
-        if "policy_net_allow" in cmd[4]:
+        if cmd[-len(new_value) - 1 : -1] == new_value:
             raise RuntimeError("midway map failure")
         return True
 
-    monkeypatch.setattr(BPFManager, "_run", fail_second_update)
+    monkeypatch.setattr(BPFManager, "_run", fail_new_net_rule)
 
     with pytest.raises(RuntimeError) as exc:
         mgr.hot_reload(str(policy))
 
     assert mgr.policy_maps == original
-    assert "policy_net_allow[default:0]" in str(exc.value)
+    assert "policy_net_allow[default:2.2.2.2:443]" in str(exc.value)
     assert "2.2.2.2:443" in str(exc.value)
-    assert "after 1 successful update" in str(exc.value)
+    # Both old allow entries were deleted and the new fs entry written first.
+    assert "after 3 successful update" in str(exc.value)
+    rollback = calls[4:]
+    assert [
+        "bpftool",
+        "map",
+        "delete",
+        "pinned",
+        "/sys/fs/bpf/policy_fs_allow",
+        "key",
+        *encode_map_field("default:/tmp/replacement/**", BPF_KEY_BYTES),
+    ] in rollback
     assert [
         "bpftool",
         "map",
@@ -517,8 +530,20 @@ def test_hot_reload_midway_failure_keeps_policy_maps_unchanged_and_rolls_back(
         "pinned",
         "/sys/fs/bpf/policy_fs_allow",
         "key",
-        *encode_map_field("default:0", BPF_KEY_BYTES),
+        *encode_map_field("default:/tmp/original/**", BPF_KEY_BYTES),
         "value",
-        *encode_map_field("/tmp/original/**", BPF_VALUE_BYTES),
+        *encode_map_field("readwrite:/tmp/original/**", BPF_VALUE_BYTES),
         "any",
-    ] in calls
+    ] in rollback
+    assert [
+        "bpftool",
+        "map",
+        "update",
+        "pinned",
+        "/sys/fs/bpf/policy_net_allow",
+        "key",
+        *encode_map_field("default:1.1.1.1:80", BPF_KEY_BYTES),
+        "value",
+        *encode_map_field("1.1.1.1:80", BPF_VALUE_BYTES),
+        "any",
+    ] in rollback
@@ -0,0 +1,334 @@
+"""Tests for native pinned-map access through bpf(2)."""
+
+import errno
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from pyisolate.bpf import contract
+from pyisolate.bpf.manager import (
+    BPF_KEY_BYTES,
+    BPF_VALUE_BYTES,
+    BPFManager,
+    encode_map_bytes,
+)
+from pyisolate.bpf.maps import BpfBatchError, BpfMapClient, BpfSyscalls
+
+
+class FakeBpf:
+    """In-memory stand-in for :class:`BpfSyscalls`: pinned maps are dicts."""
+
+    def __init__(self, *paths, key_size=8, batch=True, fail_key=None):
+        self.maps = {str(path): {} for path in paths}
+        self.key_size = key_size
+        self.batch = batch
+        self.fail_key = fail_key
+        self.calls = []
+        self._open = {}
+        self._next_fd = 100
+
+    def obj_get(self, path):
+        self.calls.append(("obj_get", path))
+        if path not in self.maps:
+            raise OSError(errno.ENOENT, "not pinned")
+        self._next_fd += 1
+        self._open[self._next_fd] = path
+        return self._next_fd
+
+    def _write(self, fd, key, value):
+        if key == self.fail_key:
+            raise OSError(errno.E2BIG, "map full")
+        self.maps[self._open[fd]][key] = value
+
+    def map_update(self, fd, key, value, flags):
+        self.calls.append(("update", fd))
+        self._write(fd, key, value)
+
+    def map_delete(self, fd, key):
+        self.calls.append(("delete", fd))
+        if self.maps[self._open[fd]].pop(key, None) is None:
+            raise OSError(errno.ENOENT, "no such key")
+
+    def _split(self, data, count):
+        size = len(data) // count
+        return [data[i * size : (i + 1) * size] for i in range(count)]
+
+    def map_update_batch(self, fd, keys, values, count, flags):
+        self.calls.append(("update_batch", fd))
+        if not self.batch:
+            raise BpfBatchError(errno.EINVAL, "no batch support", 0)
+        pairs = zip(self._split(keys, count), self._split(values, count))
+        for done, (key, value) in enumerate(pairs):
+            try:
+                self._write(fd, key, value)
+            except OSError as exc:
+                raise BpfBatchError(exc.errno, exc.strerror, done) from None
+
+    def map_delete_batch(self, fd, keys, count):
+        self.calls.append(("delete_batch", fd))
+        entries = self.maps[self._open[fd]]
+        for done, key in enumerate(self._split(keys, count)):
+            if entries.pop(key, None) is None:
+                raise BpfBatchError(errno.ENOENT, "no such key", done)
+
+    def close(self, fd):
+        self.calls.append(("close", fd))
+        del self._open[fd]
+
+    def count(self, name):
+        return sum(1 for call in self.calls if call[0] == name)
+
+
+def _items(n):
+    return [(i.to_bytes(8, "little"), (i * 7).to_bytes(8, "little")) for i in range(n)]
+
+
+def test_client_opens_each_pinned_map_once():
+    fake = FakeBpf("/pinned/a")
+    client = BpfMapClient(fake)
+    assert client.update("/pinned/a", b"k" * 8, b"v" * 8)
+    assert client.update("/pinned/a", b"k" * 8, b"w" * 8)
+    assert fake.count("obj_get") == 1
+    assert fake.maps["/pinned/a"] == {b"k" * 8: b"w" * 8}
+    client.forget("/pinned/a")
+    client.update("/pinned/a", b"k" * 8, b"v" * 8)
+    assert fake.count("obj_get") == 2
+    client.close()
+    assert not fake._open
+
+
+def test_client_reports_maps_it_cannot_open_for_fallback():
+    fake = FakeBpf()
+    client = BpfMapClient(fake)
+    assert client.update("/pinned/missing", b"k" * 8, b"v" * 8) is False
+    assert client.update_batch("/pinned/missing", _items(3)) is False
+    assert client.available
+
+
+def test_client_disables_itself_without_the_syscall():
+    class NoBpf(FakeBpf):
+        def obj_get(self, path):
+            raise OSError(errno.ENOSYS, "no bpf")
+
+    client = BpfMapClient(NoBpf("/pinned/a"))
+    assert client.update("/pinned/a", b"k" * 8, b"v" * 8) is False
+    assert not client.available
+
+
+def test_update_batch_writes_every_entry_in_one_call():
+    fake = FakeBpf("/pinned/a")
+    client = BpfMapClient(fake)
+    assert client.update_batch("/pinned/a", _items(500))
+    assert fake.count("update_batch") == 1
+    assert fake.count("update") == 0
+    assert fake.maps["/pinned/a"] == dict(_items(500))
+
+
+def test_update_batch_falls_back_to_single_updates_and_remembers():
+    fake = FakeBpf("/pinned/a", batch=False)
+    client = BpfMapClient(fake)
+    assert client.update_batch("/pinned/a", _items(4))
+    assert client.update_batch("/pinned/a", _items(4))
+    assert fake.count("update_batch") == 1
+    assert fake.count("update") == 8
+    assert fake.maps["/pinned/a"] == dict(_items(4))
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_update_batch_reports_how_many_entries_were_written(batch):
+    items = _items(5)
+    fake = FakeBpf("/pinned/a", batch=batch, fail_key=items[3][0])
+    client = BpfMapClient(fake)
+    with pytest.raises(BpfBatchError) as exc:
+        client.update_batch("/pinned/a", items)
+    assert exc.value.done == 3
+    assert exc.value.errno == errno.E2BIG
+    assert fake.maps["/pinned/a"] == dict(items[:3])
+
+
+def test_delete_batch_skips_keys_that_are_already_gone():
+    fake = FakeBpf("/pinned/a")
+    client = BpfMapClient(fake)
+    client.update_batch("/pinned/a", _items(6))
+    keys = [key for key, _ in _items(8)]
+    assert client.delete_batch("/pinned/a", keys)
+    assert fake.maps["/pinned/a"] == {}
+
+
+def test_real_syscalls_raise_oserror_for_an_unpinned_path(tmp_path):
+    with pytest.raises(OSError):
+        BpfSyscalls().obj_get(str(tmp_path / "missing"))
+
+
+@pytest.fixture
+def native_manager(monkeypatch):
+    commands = []
+
+    def record(self, cmd, *, raise_on_error=False):
+        commands.append(cmd)
+        return True
+
+    monkeypatch.setattr(BPFManager, "_run", record)
+    mgr = BPFManager()
+    mgr.loaded = True
+    fake = FakeBpf(
+        "/sys/fs/bpf/policy_fs_allow",
+        "/sys/fs/bpf/policy_net_allow",
+        "/sys/fs/bpf/policy_import_allow",
+        mgr._bpffs_root / contract.SANDBOX_POLICY_MAP,
+    )
+    mgr._maps = BpfMapClient(fake)
+    return mgr, fake, commands
+
+
+def _policy(tmp_path, *, fs_paths, tcp_addr="1.1.1.1:80"):
+    data = {
+        "schema_version": "1.0",
+        "semantics_version": 1,
+        "sandboxes": {
+            "default": {
+                "allow_fs": [
+                    {"action": "allow", "path": path, "access": "readwrite"}
+                    for path in fs_paths
+                ],
+                "deny_fs": [],
+                "allow_tcp": [{"action": "connect", "destination": tcp_addr}],
+                "deny_tcp": [],
+                "imports": ["math"],
+            }
+        },
+        "deny_log": [],
+    }
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_hot_reload_batches_each_map_without_bpftool(native_manager, tmp_path):
+    mgr, fake, commands = native_manager
+    paths = [f"/srv/{i}/**" for i in range(200)]
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=paths)))
+    assert commands == []
+    # The 200 filesystem rules go in one call; the single-entry maps in one each.
+    assert fake.count("update_batch") == 1
+    assert fake.count("update") == 2
+    fs_map = fake.maps["/sys/fs/bpf/policy_fs_allow"]
+    assert len(fs_map) == 200
+    key = encode_map_bytes("default:/srv/7/**", BPF_KEY_BYTES)
+    assert fs_map[key] == encode_map_bytes("readwrite:/srv/7/**", BPF_VALUE_BYTES)
+
+
+def test_hot_reload_rolls_back_a_partially_written_batch(native_manager, tmp_path):
+    mgr, fake, commands = native_manager
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=["/a/**", "/b/**", "/c/**"])))
+    original = dict(fake.maps["/sys/fs/bpf/policy_fs_allow"])
+    before = mgr.policy_maps
+
+    fake.fail_key = encode_map_bytes("default:/z/**", BPF_KEY_BYTES)
+    replacement = _policy(tmp_path, fs_paths=["/x/**", "/y/**", "/z/**"])
+    # Three deletes of the old rules, then two of the three inserts.
+    with pytest.raises(RuntimeError, match=r"after 5 successful update\(s\)"):
+        mgr.hot_reload(str(replacement))
+    assert mgr.policy_maps == before
+    assert fake.maps["/sys/fs/bpf/policy_fs_allow"] == original
+    assert commands == []
+
+
+def test_hot_reload_uses_bpftool_for_maps_that_are_not_pinned(native_manager, tmp_path):
+    mgr, fake, commands = native_manager
+    del fake.maps["/sys/fs/bpf/policy_net_allow"]
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=["/a/**"])))
+    assert [cmd[4] for cmd in commands] == ["/sys/fs/bpf/policy_net_allow"]
+    assert len(fake.maps["/sys/fs/bpf/policy_fs_allow"]) == 1
+
+
+def test_set_sandbox_policy_writes_the_map_natively(native_manager):
+    mgr, fake, commands = native_manager
+    assert mgr.set_sandbox_policy(11, contract.DENY_NET, audit_only=True)
+    assert mgr.set_sandbox_policy(12, contract.DENY_FS)
+    assert commands == []
+    assert fake.count("obj_get") == 1
+    entries = fake.maps[str(mgr._bpffs_root / contract.SANDBOX_POLICY_MAP)]
+    assert entries[contract.sandbox_policy_key(11)] == contract.sandbox_policy_value(
+        contract.DENY_NET, True
+    )
+
+
+def test_set_sandbox_policy_reports_native_write_failures(native_manager):
+    mgr, fake, commands = native_manager
+    fake.fail_key = contract.sandbox_policy_key(13)
+    assert mgr.set_sandbox_policy(13, contract.DENY_NET) is False
+    with pytest.raises(RuntimeError, match="map full"):
+        mgr.set_sandbox_policy(13, contract.DENY_NET, strict=True)
+    assert commands == []
+
+
+def test_load_drops_descriptors_of_previously_pinned_maps(native_manager):
+    mgr, fake, _ = native_manager
+    mgr.set_sandbox_policy(11, contract.DENY_NET)
+    assert fake._open
+    mgr.load()
+    assert not fake._open
+
+
+def test_reload_after_load_rewrites_every_rule(native_manager, tmp_path):
+    mgr, fake, _ = native_manager
+    paths = [f"/srv/{i}/**" for i in range(10)]
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=paths)))
+    mgr.load()
+    # Loading re-pins the maps, so they start out empty.
+    for entries in fake.maps.values():
+        entries.clear()
+    mgr.loaded = True
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=paths[1:] + ["/srv/new/**"])))
+    fs_map = fake.maps["/sys/fs/bpf/policy_fs_allow"]
+    assert len(fs_map) == 10
+    assert encode_map_bytes("default:/srv/5/**", BPF_KEY_BYTES) in fs_map
+    assert len(fake.maps["/sys/fs/bpf/policy_net_allow"]) == 1
+    assert len(fake.maps["/sys/fs/bpf/policy_import_allow"]) == 1
+
+
+def test_hot_reload_writes_only_the_rules_that_changed(native_manager, tmp_path):
+    mgr, fake, commands = native_manager
+    paths = [f"/srv/{i}/**" for i in range(1000)]
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=paths)))
+    fake.calls.clear()
+
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=paths[1:] + ["/srv/new/**"])))
+    assert [name for name, _ in fake.calls] == ["delete", "update"]
+    fs_map = fake.maps["/sys/fs/bpf/policy_fs_allow"]
+    assert len(fs_map) == 1000
+    assert encode_map_bytes("default:/srv/0/**", BPF_KEY_BYTES) not in fs_map
+    assert commands == []
+
+
+def test_failed_rollback_is_repaired_by_the_next_reload(native_manager, tmp_path):
+    mgr, fake, _ = native_manager
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=["/a/**"])))
+    fake.fail_key = encode_map_bytes("default:/c/**", BPF_KEY_BYTES)
+    delete = fake.map_delete
+
+    def refuse_delete(fd, key):
+        if key == encode_map_bytes("default:/b/**", BPF_KEY_BYTES):
+            raise OSError(errno.EPERM, "denied")
+        delete(fd, key)
+
+    fake.map_delete = refuse_delete
+    with pytest.raises(RuntimeError, match=r"rollback errors: delete policy_fs_allow"):
+        mgr.hot_reload(str(_policy(tmp_path, fs_paths=["/b/**", "/c/**"])))
+    # /b was written and could not be removed again; /a was still restored.
+    fs_map = fake.maps["/sys/fs/bpf/policy_fs_allow"]
+    assert set(fs_map) == {
+        encode_map_bytes("default:/a/**", BPF_KEY_BYTES),
+        encode_map_bytes("default:/b/**", BPF_KEY_BYTES),
+    }
+
+    fake.map_delete = delete
+    fake.fail_key = None
+    mgr.hot_reload(str(_policy(tmp_path, fs_paths=["/a/**"])))
+    assert set(fs_map) == {encode_map_bytes("default:/a/**", BPF_KEY_BYTES)}
@@ -0,0 +1,96 @@
+"""Tests for incremental BPF policy reload planning."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from pyisolate.bpf.reload import MapOp, plan_reload
+from pyisolate.policy.model import (
+    FilesystemRule,
+    NetworkRule,
+    RuntimePolicy,
+    RuntimePolicySet,
+    to_bpf_map_state,
+)
+
+
+def _policy_set(fs_paths, *, deny_tcp=(), access="readwrite"):
+    return RuntimePolicySet(
+        sandboxes={
+            "default": RuntimePolicy(
+                allow_fs=tuple(
+                    FilesystemRule("allow", path, access) for path in fs_paths
+                ),
+                deny_tcp=tuple(NetworkRule("deny", dest) for dest in deny_tcp),
+                imports=("math",),
+            )
+        }
+    )
+
+
+def test_map_state_keys_rules_by_content():
+    state = to_bpf_map_state(_policy_set(["/a", "/b"]))
+    assert state[("policy_fs_allow", "default:/b")] == "readwrite:/b"
+    assert state[("policy_import_allow", "default:math")] == "math"
+    # Inserting a rule in front keeps every other rule's key.
+    shifted = to_bpf_map_state(_policy_set(["/new", "/a", "/b"]))
+    assert set(state) < set(shifted)
+
+
+def test_map_state_merges_access_modes_of_a_repeated_path():
+    policy_set = RuntimePolicySet(
+        sandboxes={
+            "default": RuntimePolicy(
+                allow_fs=(
+                    FilesystemRule("allow", "/srv", "read"),
+                    FilesystemRule("allow", "/srv", "write"),
+                    FilesystemRule("allow", "/etc", "read"),
+                )
+            )
+        }
+    )
+    state = to_bpf_map_state(policy_set)
+    assert state[("policy_fs_allow", "default:/srv")] == "readwrite:/srv"
+    assert state[("policy_fs_allow", "default:/etc")] == "read:/etc"
+
+
+def test_plan_touches_only_the_rules_that_changed():
+    paths = [f"/srv/{i}" for i in range(2000)]
+    current = to_bpf_map_state(_policy_set(paths))
+    target = to_bpf_map_state(_policy_set(["/srv/new"] + paths[1:]))
+    plan = plan_reload(current, target)
+    assert plan.counts() == {"insert": 1, "update": 0, "delete": 1}
+    assert plan_reload(target, target).ops == ()
+
+
+def test_plan_updates_a_rule_whose_value_changed():
+    current = to_bpf_map_state(_policy_set(["/srv"], access="read"))
+    target = to_bpf_map_state(_policy_set(["/srv"]))
+    (op,) = plan_reload(current, target).ops
+    assert op == MapOp(
+        "update", "policy_fs_allow", "default:/srv", "readwrite:/srv", "read:/srv"
+    )
+
+
+def test_plan_restricts_before_it_relaxes():
+    current = to_bpf_map_state(_policy_set(["/old"], deny_tcp=["10.0.0.1:1"]))
+    target = to_bpf_map_state(_policy_set(["/new"], deny_tcp=["10.0.0.2:2"]))
+    ops = plan_reload(current, target).ops
+    assert [(op.kind, op.map_name) for op in ops] == [
+        ("delete", "policy_fs_allow"),
+        ("insert", "policy_net_deny"),
+        ("insert", "policy_fs_allow"),
+        ("delete", "policy_net_deny"),
+    ]
+
+
+def test_inverse_of_an_applied_prefix_restores_the_previous_entries():
+    current = to_bpf_map_state(_policy_set(["/a", "/b"], access="read"))
+    target = to_bpf_map_state(_policy_set(["/b", "/c"], deny_tcp=["1.2.3.4:5"]))
+    plan = plan_reload(current, target)
+    assert plan.apply_to(current) == target
+    for applied in range(len(plan) + 1):
+        partial = type(plan)(plan.ops[:applied]).apply_to(current)
+        assert plan.inverse(applied).apply_to(partial) == current
@@ -0,0 +1,120 @@
+"""Tests for spawning and closing sandboxes in bulk."""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate import recovery
+from pyisolate.runtime.thread import SandboxThread
+
+
+@pytest.fixture
+def sup():
+    supervisor = iso.Supervisor()
+    yield supervisor
+    supervisor.shutdown()
+
+
+def test_spawn_many_registers_every_sandbox_in_one_append(sup, monkeypatch):
+    batches = []
+    update_many = recovery.update_sandboxes
+
+    def _update_many(entries):
+        batches.append(sorted(entries))
+        update_many(entries)
+
+    def _update_one(name, meta):
+        raise AssertionError("spawn_many wrote a registry entry on its own")
+
+    monkeypatch.setattr(recovery, "update_sandboxes", _update_many)
+    monkeypatch.setattr(recovery, "update_sandbox", _update_one)
+    handles = sup.spawn_many({"name": f"bulk-{i}"} for i in range(5))
+    assert [sb._thread.name for sb in handles] == [f"bulk-{i}" for i in range(5)]
+    assert batches == [[f"bulk-{i}" for i in range(5)]]
+    assert all(sup.lookup_sandbox(f"bulk-{i}").is_alive() for i in range(5))
+    assert set(recovery.recover()) >= {f"bulk-{i}" for i in range(5)}
+    handles[0].exec("post(6 * 7)")
+    assert handles[0].recv(timeout=5) == 42
+
+
+def test_spawn_many_is_all_or_nothing(sup):
+    taken = sup.spawn("bulk-taken")
+    with pytest.raises(RuntimeError, match="already exists"):
+        sup.spawn_many(
+            [
+                {"name": "bulk-a", "tenant": "acme", "tenant_quota": 5},
+                {"name": "bulk-taken"},
+            ]
+        )
+    assert sup.lookup_sandbox("bulk-a") is None
+    assert sup.lookup_sandbox("bulk-taken") is taken._thread
+    assert sup._tenant_usage.get("acme", 0) == 0
+    assert not sup._spawning
+
+
+def test_spawn_many_stops_the_started_sandboxes_when_one_fails(sup, monkeypatch):
+    start = SandboxThread.start
+
+    def _start(self):
+        if self.name == "bulk-bad":
+            raise RuntimeError("start failed")
+        start(self)
+
+    monkeypatch.setattr(SandboxThread, "start", _start)
+    with pytest.raises(RuntimeError, match="start failed"):
+        sup.spawn_many(
+            {"name": name, "tenant": "acme", "tenant_quota": 5}
+            for name in ("bulk-good", "bulk-bad")
+        )
+    assert sup.live_sandboxes() == []
+    assert sup._tenant_usage.get("acme", 0) == 0
+    assert not {"bulk-good", "bulk-bad"} & set(recovery.recover())
+    # Both names are free again.
+    monkeypatch.undo()
+    assert len(sup.spawn_many([{"name": "bulk-good"}, {"name": "bulk-bad"}])) == 2
+
+
+def test_spawn_many_rejects_duplicate_names_before_reserving(sup):
+    with pytest.raises(ValueError, match="distinct names"):
+        sup.spawn_many([{"name": "twice"}, {"name": "twice"}])
+    with pytest.raises(ValueError, match="invalid characters"):
+        sup.spawn_many([{"name": "ok"}, {"name": "not ok"}])
+    assert sup.live_sandboxes() == []
+    assert sup.spawn_many([]) == []
+
+
+def test_spawn_many_starts_process_guests_in_parallel(sup):
+    handles = sup.spawn_many(
+        [{"name": f"bulk-proc-{i}", "backend": "process"} for i in range(3)]
+        + [{"name": "bulk-thread"}]
+    )
+    for i, sb in enumerate(handles[:3]):
+        assert sb.backend == "process"
+        sb.exec(f"post({i})")
+        assert sb.recv(timeout=10) == i
+    assert handles[3].backend == "subinterpreter"
+
+
+def test_close_many_shares_one_deadline_between_wedged_sandboxes(sup):
+    handles = sup.spawn_many({"name": f"wedged-{i}"} for i in range(6))
+    handles.append(sup.spawn("wedged-proc", backend="process"))
+    for sb in handles:
+        sb.exec("while True: pass")
+    time.sleep(0.1)
+    started = time.monotonic()
+    assert sup.close_many(handles, timeout=1.0) == []
+    # One deadline for all of them, not one per sandbox.
+    assert time.monotonic() - started < 1.5
+    assert not any(sb._thread.is_alive() for sb in handles)
+
+
+def test_close_many_accepts_names_and_ignores_unknown_ones(sup):
+    sup.spawn_many([{"name": "by-name-0"}, {"name": "by-name-1"}])
+    assert sup.close_many(["by-name-0", "by-name-1", "never-spawned"]) == []
+    assert not sup.lookup_sandbox("by-name-0").is_alive()
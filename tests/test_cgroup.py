@@ -152,3 +152,19 @@ def test_create_rejects_unsafe_names(monkeypatch, tmp_path, bad):
         cgroup.create(bad)
     # Rejected before any mkdir, so nothing is created inside or outside _BASE.
     assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_cpu_stat_and_memory_events():
+    cpu_stat = b"usage_usec 2500\nuser_usec 2000\nsystem_usec 500\n"
+    assert cgroup.parse_cpu_stat(cpu_stat) == 2.5
+    with pytest.raises(ValueError):
+        cgroup.parse_cpu_stat(b"nr_periods 0\n")
+    events = b"low 0\nhigh 3\nmax 1\noom 0\noom_kill 0\noom_group_kill 0\n"
+    assert cgroup.parse_memory_events(events) == {
+        "low": 0,
+        "high": 3,
+        "max": 1,
+        "oom": 0,
+        "oom_kill": 0,
+        "oom_group_kill": 0,
+    }
@@ -0,0 +1,245 @@
+"""Tests for pre-created cgroups and background cgroup deletion."""
+
+import errno
+import logging
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+import pyisolate.cgroup as cgroup
+from pyisolate import recovery
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    root = tmp_path / "pyisolate"
+    monkeypatch.setattr(cgroup, "_BASE", root)
+    return root
+
+
+@pytest.fixture
+def pool(base):
+    pool = cgroup.CgroupPool(size=2, retry_for=5.0)
+    yield pool
+    pool.close(timeout=5)
+
+
+@pytest.fixture
+def busy_when_tasked(monkeypatch):
+    """Fail ``rmdir`` with ``EBUSY``, as cgroupfs does, while a ``task`` file
+    stands in for a task that has not left the cgroup yet."""
+    rmdir = Path.rmdir
+
+    def _rmdir(self):
+        if (self / "task").exists():
+            raise OSError(errno.EBUSY, "Device or resource busy", str(self))
+        rmdir(self)
+
+    monkeypatch.setattr(Path, "rmdir", _rmdir)
+
+
+@pytest.fixture
+def cgroupfs_rmdir(monkeypatch):
+    """Remove a cgroup like cgroupfs, whose interface files (``cpu.max``,
+    ``cgroup.threads``, ...) do not keep ``rmdir`` from succeeding; return the
+    names of the threads that removed one."""
+    removers = []
+    rmdir = Path.rmdir
+
+    def _rmdir(self):
+        removers.append(threading.current_thread().name)
+        for child in self.iterdir():
+            if child.is_file():
+                child.unlink()
+        rmdir(self)
+
+    monkeypatch.setattr(Path, "rmdir", _rmdir)
+    return removers
+
+
+def _names(base):
+    return sorted(p.name for p in base.iterdir())
+
+
+def test_checkout_configures_a_spare_in_place(base, pool):
+    assert pool.fill() == 2
+    spares = _names(base)
+    assert all(name.startswith(".pool-") for name in spares)
+    status = pool.checkout("sb", cpu_ms=5, mem_bytes=4096)
+    # cgroup v2 cannot rename a cgroup, so the spare keeps its own path.
+    assert status.path.name in spares
+    assert status.cpu and status.memory and status.enforced
+    assert (status.path / "cpu.max").read_text() == "5000 1000000"
+    assert (status.path / "memory.max").read_text() == "4096"
+    assert not (base / "sb").exists()
+    # One spare was used up and the worker makes another.
+    assert pool.flush(timeout=5)
+    assert len(pool) == 2
+    assert len(set(_names(base)) - set(spares)) == 1
+
+
+def test_checkout_without_spares_creates_the_cgroup(base):
+    pool = cgroup.CgroupPool(size=0)
+    status = pool.checkout("plain", cpu_ms=5)
+    assert status == cgroup.CgroupEnforcement(path=base / "plain", mode="dev", cpu=True)
+    assert _names(base) == ["plain"]
+    pool.close()
+
+
+def test_checkout_validates_like_create(pool):
+    with pytest.raises(ValueError):
+        pool.checkout("../escape")
+    with pytest.raises(ValueError):
+        pool.checkout("ok", mode="bogus")
+
+
+def test_release_reserves_the_path_and_retries_busy_deletes(base, busy_when_tasked):
+    pool = cgroup.CgroupPool(size=0, retry_for=5.0)
+    status = pool.checkout("busy")
+    assert status.path == base / "busy"
+    (status.path / "task").write_text("")
+    pool.release(status)
+    assert pool.pending() == [base / "busy"]
+    # The name's own cgroup is still being deleted, so it is not shared.
+    again = pool.checkout("busy")
+    assert again.path != base / "busy"
+    assert again.path.name.startswith(".pool-")
+    (base / "busy" / "task").unlink()
+    assert pool.flush(timeout=5)
+    assert not (base / "busy").exists()
+    assert pool.pending() == []
+    assert pool.checkout("busy").path == base / "busy"
+    pool.close()
+
+
+def test_release_gives_up_on_a_cgroup_that_stays_busy(base, caplog, busy_when_tasked):
+    pool = cgroup.CgroupPool(size=0, retry_for=0.05)
+    status = pool.checkout("stuck")
+    (status.path / "task").write_text("")
+    with caplog.at_level(logging.WARNING, logger=cgroup.__name__):
+        pool.release(status)
+        assert pool.flush(timeout=5)
+    assert "still busy" in caplog.text
+    assert pool.pending() == []
+    pool.close()
+
+
+def test_release_does_not_retry_a_directory_that_is_not_empty(base, caplog):
+    pool = cgroup.CgroupPool(size=0, retry_for=5.0)
+    status = pool.checkout("full")
+    (status.path / "leftover").write_text("")
+    with caplog.at_level(logging.WARNING, logger=cgroup.__name__):
+        pool.release(status)
+        assert pool.flush(timeout=1)
+    assert "busy/non-empty" in caplog.text
+    assert "still busy" not in caplog.text
+    assert pool.pending() == []
+    pool.close()
+
+
+def test_close_removes_spares_and_tries_pending_deletes(base):
+    pool = cgroup.CgroupPool(size=3)
+    pool.fill()
+    pool.release(pool.checkout("gone"))
+    pool.close(timeout=5)
+    assert _names(base) == []
+    # A closed pool still deletes what it is given, just not in the background.
+    status = cgroup.create("late")
+    pool.release(status)
+    assert _names(base) == []
+    assert pool._thread is None
+
+
+def test_checkout_falls_back_when_the_cgroup_root_moved(tmp_path, monkeypatch, pool):
+    monkeypatch.setattr(cgroup, "_BASE", tmp_path / "old")
+    pool.fill()
+    monkeypatch.setattr(cgroup, "_BASE", tmp_path / "new")
+    assert pool.checkout("moved").path == tmp_path / "new" / "moved"
+    assert pool.flush(timeout=5)
+    # The stale spare it took was deleted rather than used.
+    assert len(list((tmp_path / "old").iterdir())) == 1
+
+
+def test_pool_stops_making_spares_where_cgroups_cannot_be_created(
+    tmp_path, monkeypatch
+):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setattr(cgroup, "_BASE", blocker / "pyisolate")
+    pool = cgroup.CgroupPool(size=2)
+    assert pool.fill() == 0
+    status = pool.checkout("nowhere")
+    assert status.path is None and status.errors
+    # Nothing to make and nothing to delete: no worker is started.
+    assert pool._thread is None
+    pool.close()
+
+
+def test_cleanup_orphans_keeps_spares_of_running_processes(base, pool):
+    pool.fill()
+    dead_pid = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    leaked = base / f".pool-{dead_pid}-0"
+    leaked.mkdir()
+    (base / "orphan").mkdir()
+    removed = cgroup.cleanup_orphans(set())
+    assert sorted(p.name for p in removed) == sorted([leaked.name, "orphan"])
+    assert len(pool) == 2
+    assert all(name.startswith(".pool-") for name in _names(base))
+
+
+def test_supervisor_reuses_a_released_name_without_waiting(base, cgroupfs_rmdir):
+    sup = iso.Supervisor()
+    try:
+        first = sup.spawn("pooled")
+        first.close()
+        sup._reaper.flush(timeout=5)
+        second = sup.spawn("pooled")
+        assert second._thread._cgroup_path.is_dir()
+    finally:
+        sup.shutdown()
+    assert not any(p.name.startswith(".pool-") for p in base.iterdir())
+
+
+def test_spawn_and_teardown_never_rename_or_delete_inline(
+    base, monkeypatch, cgroupfs_rmdir
+):
+    # cgroup v2 refuses to rename a cgroup directory.
+    def _refuse(*args, **kwargs):
+        raise OSError(errno.EPERM, "Operation not permitted")
+
+    monkeypatch.setattr(cgroup.os, "rename", _refuse)
+    registered = {}
+    update = recovery.update_sandbox
+
+    def _update(name, meta):
+        registered[name] = meta
+        update(name, meta)
+
+    monkeypatch.setattr(recovery, "update_sandbox", _update)
+    sup = iso.Supervisor()
+    try:
+        sup._cgroups.fill()
+        sb = sup.spawn("in-place")
+        path = sb._thread._cgroup_path
+        assert path.name.startswith(".pool-")
+        assert registered["in-place"]["cgroup_path"] == str(path)
+        assert sup.lookup_cgroup(os.stat(path).st_ino) is sb._thread
+        sb.close()
+        assert sup._reaper.flush(timeout=5)
+        assert sup._cgroups.flush(timeout=5)
+        assert not path.exists()
+        assert cgroupfs_rmdir and set(cgroupfs_rmdir) == {"pyisolate-cgroups"}
+    finally:
+        sup.shutdown()
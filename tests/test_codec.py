@@ -0,0 +1,182 @@
+"""Tests for the process-channel frame codecs."""
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate.runtime import codec
+from pyisolate.runtime.process_backend import ProcessSandbox
+from pyisolate.runtime.protocol import ArrayPayload
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        False,
+        0,
+        -1,
+        2**63 - 1,
+        -(2**63),
+        2**200,
+        -(2**90),
+        1.5,
+        float("inf"),
+        "",
+        "snowman ☃",
+        b"",
+        b"\x00\xff" * 100,
+        [],
+        (),
+        {},
+        [1, "two", 3.0, None],
+        (1, (2, (3,))),
+        {"nested": {"k": [1, 2, {"deep": b"bytes"}]}, 7: "int key"},
+        [0.25] * 1000,
+        list(range(-500, 500)),
+        [2**70] * 10,
+        [1, 2, 3, 4, 5, 6, 7, 8.0],
+    ],
+)
+def test_binary_roundtrip_preserves_value_and_type(value):
+    decoded = codec.decode(codec.encode_binary(value))
+    assert decoded == value
+    assert type(decoded) is type(value)
+
+
+@pytest.mark.parametrize("wrap", [bytearray, lambda b: memoryview(bytearray(b))])
+def test_decode_reads_writable_buffers_in_place(wrap):
+    value = {"s": "text", "b": b"raw", "n": [1.5] * 10, "big": 2**80}
+    json_value = {"s": "text", "n": [1.5] * 10}
+    for body in (codec.encode_binary(value), codec.encode(json_value)):
+        buffer = wrap(body)
+        decoded = codec.decode(buffer)
+        if body[:1] != b"{":
+            assert type(decoded["b"]) is bytes
+        # Nothing decoded still points into the caller's buffer.
+        buffer[:] = bytes(len(buffer))
+        assert decoded["s"] == "text"
+
+
+def test_packed_numeric_lists_are_smaller_than_json():
+    floats = [i / 3 for i in range(10_000)]
+    assert len(codec.encode_binary(floats)) < len(json.dumps(floats))
+    # One tag and a count, then exactly eight bytes per element.
+    assert len(codec.encode_binary(floats)) == 2 + 1 + 4 + 8 * len(floats)
+
+
+def test_decode_sniffs_json_and_binary_bodies():
+    frame = {"ev": "post", "message": [1, 2]}
+    assert codec.decode(json.dumps(frame).encode()) == frame
+    assert codec.decode(codec.encode_binary(frame)) == frame
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"\x00\x01",  # no value
+        b"\x00\x01s\xff\xff\xff\x7f",  # string length past the end
+        b"\x00\x01NN",  # trailing bytes
+        b"\x00\x01X",  # unknown tag
+        b"\x00\x02N",  # unsupported version
+        b"\x00\x01s\x01\x00\x00\x00\xff",  # invalid UTF-8
+        b"\x00\x01m\x01\x00\x00\x00l\x00\x00\x00\x00N",  # unhashable key
+        b"not json",
+    ],
+)
+def test_malformed_bodies_raise_codec_error(body):
+    with pytest.raises(codec.CodecError):
+        codec.decode(body)
+
+
+def test_decoder_bounds_nesting_depth():
+    body = b"\x00\x01" + b"l\x01\x00\x00\x00" * (codec.MAX_DEPTH + 10) + b"N"
+    with pytest.raises(codec.CodecError, match="deeper"):
+        codec.decode(body)
+
+
+def test_encoder_refuses_executable_and_unknown_objects():
+    class Str(str):
+        pass
+
+    for value in (object(), len, lambda: None, {1, 2}, Str("x")):
+        with pytest.raises(TypeError):
+            codec.encode_binary(value)
+
+
+def test_encoder_rejects_self_referencing_containers():
+    cyclic: list = []
+    cyclic.append(cyclic)
+    with pytest.raises(codec.CodecError):
+        codec.encode_binary(cyclic)
+
+
+def test_negotiate_prefers_offer_order_and_falls_back_to_json():
+    assert codec.negotiate([codec.CODEC_BINARY, codec.CODEC_JSON]) == (
+        codec.CODEC_BINARY
+    )
+    assert codec.negotiate([codec.CODEC_JSON]) == codec.CODEC_JSON
+    assert codec.negotiate(["binary/99"]) == codec.CODEC_JSON
+    assert codec.negotiate(None) == codec.CODEC_JSON
+
+
+def test_process_backend_negotiates_binary_and_carries_bytes_and_tuples():
+    with iso.spawn("codec-bin", backend="process") as sb:
+        sb.exec("post(b'\\x00raw'); post((1, 'a'))")
+        assert sb.recv(timeout=5) == b"\x00raw"
+        assert sb.recv(timeout=5) == (1, "a")
+        assert sb._thread.codec == codec.CODEC_BINARY
+
+
+def test_process_backend_json_mode_keeps_the_compatibility_contract():
+    proc = ProcessSandbox("codec-json", codec="json")
+    try:
+        proc.exec("post((1, 2))")
+        assert proc.recv(timeout=5) == [1, 2]
+        assert proc.codec == codec.CODEC_JSON
+        proc.exec("post(b'raw')")
+        with pytest.raises(iso.SandboxError, match="TypeError"):
+            proc.recv(timeout=5)
+    finally:
+        proc.stop()
+
+
+def test_json_codec_refuses_array_payloads_with_a_clear_error():
+    payload = ArrayPayload(data=bytes(16), dtype="<f8", shape=(2,))
+    with pytest.raises(TypeError, match="ArrayPayload.*binary"):
+        codec.encode({"ev": "post", "message": payload}, codec.CODEC_JSON)
+    with pytest.raises(TypeError, match="not JSON serializable"):
+        codec.encode(object(), codec.CODEC_JSON)
+    proc = ProcessSandbox("codec-json-array", codec="json")
+    try:
+        proc.exec("post(ArrayPayload(data=bytes(8), dtype='<f8', shape=(1,)))")
+        with pytest.raises(iso.SandboxError, match="ArrayPayload.*binary"):
+            proc.recv(timeout=5)
+        proc.exec("post(1)")
+        assert proc.recv(timeout=5) == 1
+    finally:
+        proc.stop()
+
+
+def test_process_backend_rejects_unknown_codec():
+    with pytest.raises(ValueError, match="codec"):
+        ProcessSandbox("codec-bad", codec="pickle")
+
+
+def test_process_backend_ignores_a_codec_it_did_not_offer():
+    proc = ProcessSandbox("codec-json-only", codec="json")
+    try:
+        # A guest cannot switch a JSON-only supervisor to the binary codec.
+        proc._dispatch({"ev": "ready", "codec": codec.CODEC_BINARY})
+        assert proc.codec == codec.CODEC_JSON
+        proc.exec("post(1)")
+        assert proc.recv(timeout=5) == 1
+    finally:
+        proc.stop()
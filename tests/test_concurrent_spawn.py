@@ -0,0 +1,180 @@
+"""Tests for spawning sandboxes from many threads at once."""
+
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate import cgroup
+
+
+@pytest.fixture
+def blocked_create(monkeypatch):
+    """Hold cgroup checkout for the sandbox called ``slow`` until released."""
+    entered = threading.Event()
+    release = threading.Event()
+    checkout = cgroup.CgroupPool.checkout
+
+    def _checkout(self, name, *args, **kwargs):
+        if name == "slow":
+            entered.set()
+            assert release.wait(10)
+        return checkout(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(cgroup.CgroupPool, "checkout", _checkout)
+    yield entered, release
+    release.set()
+
+
+def _spawn_in_thread(sup, name, results, **kwargs):
+    def _run():
+        try:
+            results[name] = sup.spawn(name, **kwargs)
+        except Exception as exc:  # noqa: BLE001 - checked by the test
+            results[name] = exc
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    return thread
+
+
+def test_slow_spawn_does_not_block_other_names(blocked_create):
+    entered, release = blocked_create
+    sup = iso.Supervisor()
+    results = {}
+    try:
+        slow = _spawn_in_thread(sup, "slow", results)
+        assert entered.wait(5)
+        # The slow spawn is past its name reservation and holds no lock.
+        fast = sup.spawn("fast")
+        assert sup.lookup_sandbox("fast") is fast._thread
+        assert sup.lookup_sandbox("slow") is None
+        release.set()
+        slow.join(10)
+        assert isinstance(results["slow"], iso.Sandbox)
+        assert sup.lookup_sandbox("slow") is results["slow"]._thread
+        assert fast._thread.is_alive() and results["slow"]._thread.is_alive()
+    finally:
+        release.set()
+        sup.shutdown()
+
+
+def test_spawning_a_name_already_being_spawned_waits_then_fails(blocked_create):
+    entered, release = blocked_create
+    sup = iso.Supervisor()
+    results = {}
+    try:
+        first = _spawn_in_thread(sup, "slow", results)
+        assert entered.wait(5)
+        second_results = {}
+        second = _spawn_in_thread(sup, "slow", second_results)
+        second.join(0.2)
+        assert second.is_alive()
+        release.set()
+        first.join(10)
+        second.join(10)
+        assert isinstance(results["slow"], iso.Sandbox)
+        assert isinstance(second_results["slow"], RuntimeError)
+        assert "already exists" in str(second_results["slow"])
+    finally:
+        release.set()
+        sup.shutdown()
+
+
+def test_tenant_quota_is_reserved_before_the_slow_phase(blocked_create):
+    entered, release = blocked_create
+    sup = iso.Supervisor()
+    results = {}
+    try:
+        slow = _spawn_in_thread(sup, "slow", results, tenant="acme", tenant_quota=1)
+        assert entered.wait(5)
+        with pytest.raises(iso.TenantQuotaExceeded):
+            sup.spawn("other", tenant="acme", tenant_quota=1)
+        release.set()
+        slow.join(10)
+        assert sup._tenant_usage["acme"] == 1
+    finally:
+        release.set()
+        sup.shutdown()
+
+
+def test_failed_spawn_frees_its_name_and_quota(monkeypatch):
+    sup = iso.Supervisor()
+    calls = []
+
+    def _fail_once(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("registry update failed")
+
+    monkeypatch.setattr("pyisolate.recovery.update_sandbox", _fail_once)
+    try:
+        with pytest.raises(RuntimeError, match="registry update failed"):
+            sup.spawn("retry", tenant="acme", tenant_quota=1)
+        assert not sup._spawning
+        assert sup._tenant_usage.get("acme", 0) == 0
+        retried = sup.spawn("retry", tenant="acme", tenant_quota=1)
+        assert sup.lookup_sandbox("retry") is retried._thread
+    finally:
+        sup.shutdown()
+
+
+def test_failed_respawn_releases_the_evicted_sandbox_once(monkeypatch):
+    sup = iso.Supervisor()
+    # Leave exited sandboxes registered, as if the reaper had not reached them.
+    sup._reaper._teardown = lambda batch: None
+    released = []
+    release = sup._release_resources
+
+    def _record(sandboxes):
+        released.extend(sandboxes)
+        release(sandboxes)
+
+    monkeypatch.setattr(sup, "_release_resources", _record)
+
+    def _fail(*args, **kwargs):
+        raise RuntimeError("registry update failed")
+
+    try:
+        old = sup.spawn("again")
+        old.close()
+        old._thread.join(5)
+        monkeypatch.setattr("pyisolate.recovery.update_sandbox", _fail)
+        with pytest.raises(RuntimeError, match="registry update failed"):
+            sup.spawn("again")
+        assert released == [old._thread]
+    finally:
+        sup.shutdown()
+
+
+def test_shutdown_waits_for_an_in_flight_spawn(blocked_create):
+    entered, release = blocked_create
+    sup = iso.Supervisor()
+    results = {}
+    slow = _spawn_in_thread(sup, "slow", results)
+    assert entered.wait(5)
+    threading.Timer(0.1, release.set).start()
+    sup.shutdown()
+    slow.join(10)
+    # The sandbox was published before shutdown stopped everything.
+    assert not results["slow"]._thread.is_alive()
+
+
+def test_many_threads_spawn_distinct_names():
+    sup = iso.Supervisor()
+    results = {}
+    try:
+        threads = [_spawn_in_thread(sup, f"many-{i}", results) for i in range(32)]
+        for thread in threads:
+            thread.join(30)
+        assert all(isinstance(sb, iso.Sandbox) for sb in results.values())
+        live = sup.live_sandboxes()
+        assert len(live) == 32
+        assert all(sb.is_alive() for sb in live)
+    finally:
+        sup.shutdown()
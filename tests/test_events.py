@@ -0,0 +1,158 @@
+"""Tests for the supervisor lifecycle event stream."""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate.bpf.manager import BPFManager
+from pyisolate.events import EventHub
+from pyisolate.telemetry import LifecycleEvent
+
+
+def _drain(subscription, until, timeout=5.0):
+    """Collect events until one of kind *until* arrives."""
+    seen = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        event = subscription.get(timeout=deadline - time.monotonic())
+        if event is None:
+            break
+        seen.append(event)
+        if event.kind == until:
+            return seen
+    raise AssertionError(f"no {until!r} event; saw {seen}")
+
+
+def test_full_buffer_drops_oldest_and_counts_it():
+    hub = EventHub()
+    with hub.subscribe(maxsize=2) as sub:
+        for name in ("a", "b", "c"):
+            hub.publish("spawned", name)
+        assert sub.dropped == 1
+        assert [sub.get(0).sandbox, sub.get(0).sandbox] == ["b", "c"]
+        assert sub.get(timeout=0.01) is None
+
+
+def test_subscription_filters_kinds_and_ends_when_closed():
+    hub = EventHub()
+    sub = hub.subscribe(kinds={"exited"})
+    hub.publish("spawned", "a")
+    hub.publish("exited", "a", "cpu_exceeded")
+    threading.Timer(0.05, hub.close).start()
+    events = list(sub)
+    assert [(e.kind, e.sandbox, e.reason) for e in events] == [
+        ("exited", "a", "cpu_exceeded")
+    ]
+    assert sub.closed
+    hub.publish("exited", "b")
+    assert len(sub) == 0
+
+
+def test_async_iteration_is_woken_from_another_thread():
+    hub = EventHub()
+
+    async def consume():
+        received = []
+        async for event in hub.subscribe():
+            received.append(event.sandbox)
+            if len(received) == 2:
+                break
+        return received
+
+    def publish():
+        time.sleep(0.05)
+        hub.publish("spawned", "x")
+        hub.publish("exited", "x")
+
+    threading.Thread(target=publish).start()
+    assert asyncio.run(asyncio.wait_for(consume(), 5)) == ["x", "x"]
+
+
+def test_event_to_dict():
+    event = LifecycleEvent("quarantined", "sb", "wedged")
+    assert event.to_dict() == {
+        "kind": "quarantined",
+        "sandbox": "sb",
+        "reason": "wedged",
+        "timestamp": event.timestamp,
+    }
+
+
+def test_supervisor_publishes_lifecycle_events():
+    sup = iso.Supervisor()
+    try:
+        sub = sup.events()
+        sb = sup.spawn("ev-a")
+        assert _drain(sub, "spawned")[-1].sandbox == "ev-a"
+        sb.close()
+        exited = _drain(sub, "exited")[-1]
+        assert (exited.sandbox, exited.reason) == ("ev-a", None)
+
+        sb = sup.spawn("ev-b")
+        sb.quarantine("wedged task")
+        seen = _drain(sub, "exited")
+        assert [(e.kind, e.reason) for e in seen[-2:]] == [
+            ("quarantined", "wedged task"),
+            ("exited", "wedged task"),
+        ]
+
+        sb = sup.spawn("ev-c")
+        sb.recycle()
+        seen = [(e.kind, e.sandbox) for e in _drain(sub, "recycled")]
+        assert seen[-3:] == [
+            ("exited", "ev-c"),
+            ("spawned", "ev-c"),
+            ("recycled", "ev-c"),
+        ]
+        # Each sandbox exits exactly once.
+        sup.close_many(["ev-b", "ev-c"])
+    finally:
+        sup.shutdown()
+    rest = list(sub)
+    assert sub.closed
+    assert [e.sandbox for e in rest if e.kind == "exited"] == ["ev-c"]
+
+
+def test_quota_breach_is_published_before_the_exit():
+    sup = iso.Supervisor()
+    try:
+        sub = sup.events(kinds=["quota_breach", "exited"])
+        sb = sup.spawn("ev-spin")
+        sb.exec("while True:\n    pass")
+        time.sleep(0.05)
+        assert sup.enforce_quota_breach(sb._thread, iso.CPUExceeded(), "cpu_exceeded")
+        with pytest.raises(iso.CPUExceeded):
+            sb.recv(timeout=1)
+        seen = _drain(sub, "exited")
+        assert [(e.kind, e.reason) for e in seen] == [
+            ("quota_breach", "cpu_exceeded"),
+            ("exited", "cpu_exceeded"),
+        ]
+    finally:
+        sup.shutdown()
+
+
+def test_policy_reload_is_published(tmp_path, monkeypatch):
+    monkeypatch.setattr(BPFManager, "hot_reload", lambda self, path: None)
+    sup = iso.Supervisor()
+    try:
+        sub = sup.events(kinds=["policy_reloaded"])
+        path = tmp_path / "p.yml"
+        path.write_text("{}")
+        sup.reload_policy(str(path), iso.ROOT)
+        event = sub.get(timeout=1)
+        assert (event.kind, event.sandbox, event.reason) == (
+            "policy_reloaded",
+            None,
+            str(path),
+        )
+    finally:
+        sup.shutdown()
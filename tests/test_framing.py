@@ -0,0 +1,184 @@
+"""Tests for the process-channel framing: sendmsg sends, recv_into buffers."""
+
+import os
+import socket
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from pyisolate.runtime import framing
+from pyisolate.runtime.framing import LEN, FrameBuffer, send_frame
+
+
+def _frame(body: bytes) -> bytes:
+    return LEN.pack(len(body)) + body
+
+
+def _closed(fd: int) -> bool:
+    try:
+        os.fstat(fd)
+    except OSError:
+        return True
+    return False
+
+
+def _read_frames(sock: socket.socket, frames: FrameBuffer, count: int) -> list[bytes]:
+    bodies = []
+    while len(bodies) < count:
+        body = frames.pop()
+        if body is None:
+            assert frames.recv(sock), "unexpected end of stream"
+            continue
+        bodies.append(bytes(body))
+    return bodies
+
+
+def test_frames_split_anywhere_are_reassembled():
+    ours, theirs = socket.socketpair()
+    stream = _frame(b"first") + _frame(b"") + _frame(b"x" * 300)
+    frames = FrameBuffer()
+    bodies = []
+    try:
+        for i in range(len(stream)):
+            theirs.sendall(stream[i : i + 1])
+            assert frames.recv(ours) == 1
+            while (body := frames.pop()) is not None:
+                bodies.append(bytes(body))
+    finally:
+        ours.close()
+        theirs.close()
+    assert bodies == [b"first", b"", b"x" * 300]
+    assert frames.next_length() is None
+    assert len(frames) == 0
+
+
+def test_send_frame_sends_header_and_body_without_joining_them():
+    ours, theirs = socket.socketpair()
+    frames = FrameBuffer()
+    try:
+        send_frame(theirs, b"bytes body")
+        send_frame(theirs, memoryview(b"view body"))
+        assert _read_frames(ours, frames, 2) == [b"bytes body", b"view body"]
+    finally:
+        ours.close()
+        theirs.close()
+
+
+class _ShortSocket:
+    """Accepts only ``limit`` bytes per sendmsg, like a nearly full socket."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.wire = bytearray()
+
+    def sendmsg(self, buffers, ancillary=()):
+        data = b"".join(bytes(b) for b in buffers)[: self.limit]
+        self.wire += data
+        return len(data)
+
+    def sendall(self, data) -> None:
+        self.wire += bytes(data)
+
+
+@pytest.mark.parametrize("limit", [0, 2, 4, 7])
+def test_short_sendmsg_is_finished_with_sendall(limit):
+    sock = _ShortSocket(limit)
+    send_frame(sock, b"payload")
+    assert bytes(sock.wire) == _frame(b"payload")
+
+
+def test_large_frame_grows_buffer_by_doubling_and_shrinks_after():
+    ours, theirs = socket.socketpair()
+    body = os.urandom(16 * 1024 * 1024)
+    frames = FrameBuffer()
+    capacities = []
+
+    def _send() -> None:
+        send_frame(theirs, body)
+        send_frame(theirs, body)
+        send_frame(theirs, b"small")
+
+    sender = threading.Thread(target=_send)
+    sender.start()
+    try:
+        for _ in range(2):
+            while (view := frames.pop()) is None:
+                before = frames.capacity
+                assert frames.recv(ours)
+                capacities.append(frames.capacity)
+                # Never more than double per read, and never ahead of the frame.
+                assert frames.capacity <= max(2 * before, len(frames))
+            assert view == body
+        # The grown buffer is reused while large frames keep coming...
+        assert len(set(capacities[-10:])) == 1
+        assert max(capacities) >= len(body)
+        # ...and dropped once a small frame drains it.
+        assert _read_frames(ours, frames, 1) == [b"small"]
+        assert frames.capacity == framing.RECV_SIZE
+    finally:
+        sender.join()
+        ours.close()
+        theirs.close()
+
+
+def test_declared_length_alone_does_not_allocate():
+    ours, theirs = socket.socketpair()
+    frames = FrameBuffer()
+    try:
+        theirs.sendall(LEN.pack(2**32 - 1) + b"tiny")
+        frames.recv(ours)
+        assert frames.next_length() == 2**32 - 1
+        theirs.sendall(b"more")
+        frames.recv(ours)
+        assert frames.capacity <= 2 * framing.RECV_SIZE
+    finally:
+        ours.close()
+        theirs.close()
+
+
+def test_popped_view_is_released_by_the_next_pop():
+    ours, theirs = socket.socketpair()
+    frames = FrameBuffer()
+    try:
+        theirs.sendall(_frame(b"one") + _frame(b"two"))
+        frames.recv(ours)
+        first = frames.pop()
+        assert first == b"one"
+        assert frames.pop() == b"two"
+        with pytest.raises(ValueError):
+            bytes(first)
+    finally:
+        ours.close()
+        theirs.close()
+
+
+def test_descriptors_are_queued_in_order_and_closed_with_the_buffer():
+    ours, theirs = socket.socketpair()
+    frames = FrameBuffer()
+    read_a, write_a = os.pipe()
+    read_b, write_b = os.pipe()
+    try:
+        send_frame(theirs, b"a", [read_a])
+        send_frame(theirs, b"b", [read_b])
+        assert _read_frames(ours, frames, 2) == [b"a", b"b"]
+        first = frames.take_fd()
+        os.write(write_a, b"!")
+        assert os.read(first, 1) == b"!"
+        os.close(first)
+        (second,) = frames._fds
+        frames.close()
+        assert frames.take_fd() is None
+        assert _closed(second)
+    finally:
+        for fd in (read_a, write_a, read_b, write_b):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        ours.close()
+        theirs.close()
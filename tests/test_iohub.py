@@ -0,0 +1,161 @@
+"""Tests for the shared I/O hub that reads process-backend channels."""
+
+import socket
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate.runtime.iohub import IOHub
+from pyisolate.runtime.process_backend import ProcessSandbox
+
+
+def _hub_threads(name: str) -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name == name]
+
+
+def test_hub_calls_back_when_readable_and_stops_after_unregister():
+    hub = IOHub(name="pyisolate-iohub-test-basic")
+    ours, theirs = socket.socketpair()
+    ours.setblocking(False)
+    received = []
+    ready = threading.Event()
+
+    def on_readable():
+        received.append(ours.recv(64))
+        ready.set()
+
+    try:
+        hub.register(ours, on_readable)
+        theirs.sendall(b"ping")
+        assert ready.wait(2)
+        assert received == [b"ping"]
+        assert len(hub) == 1
+        hub.unregister(ours)
+        ready.clear()
+        theirs.sendall(b"ignored")
+        assert not ready.wait(0.1)
+        assert len(hub) == 0
+    finally:
+        hub.close()
+        ours.close()
+        theirs.close()
+
+
+def test_failing_callback_does_not_stop_the_hub(caplog):
+    hub = IOHub()
+    bad, bad_peer = socket.socketpair()
+    good, good_peer = socket.socketpair()
+    done = threading.Event()
+
+    def boom():
+        bad.recv(64)
+        raise RuntimeError("boom")
+
+    def on_good():
+        good.recv(64)
+        done.set()
+
+    try:
+        with caplog.at_level("ERROR", logger="pyisolate.runtime.iohub"):
+            hub.register(bad, boom)
+            hub.register(good, on_good)
+            bad_peer.sendall(b"x")
+            good_peer.sendall(b"y")
+            assert done.wait(2)
+        assert "I/O hub callback failed" in caplog.text
+    finally:
+        hub.close()
+        for sock in (bad, bad_peer, good, good_peer):
+            sock.close()
+
+
+def test_close_stops_the_thread_and_hub_restarts_on_demand():
+    name = "pyisolate-iohub-test-restart"
+    hub = IOHub(name=name)
+    ours, theirs = socket.socketpair()
+    done = threading.Event()
+    try:
+        hub.register(ours, lambda: (ours.recv(64), done.set()))
+        assert len(_hub_threads(name)) == 1
+        hub.close()
+        assert not _hub_threads(name)
+        assert len(hub) == 0
+        hub.register(ours, lambda: (ours.recv(64), done.set()))
+        theirs.sendall(b"again")
+        assert done.wait(2)
+    finally:
+        hub.close()
+        ours.close()
+        theirs.close()
+
+
+@pytest.mark.parametrize("io", ["hub", "thread"])
+def test_process_sandbox_round_trips_in_both_reader_modes(io):
+    hub = IOHub() if io == "hub" else None
+    proc = ProcessSandbox(f"iohub-{io}", io=io, iohub=hub)
+    try:
+        assert proc.io == io
+        assert (proc._reader is None) == (io == "hub")
+        proc.exec("post(b'abc'); post({'n': 1})")
+        assert proc.recv(timeout=10) == b"abc"
+        assert proc.recv(timeout=5) == {"n": 1}
+        proc.exec("raise ValueError('nope')")
+        with pytest.raises(iso.SandboxError, match="nope"):
+            proc.recv(timeout=5)
+    finally:
+        proc.stop()
+        if hub is not None:
+            hub.close()
+
+
+def test_unknown_reader_mode_is_rejected():
+    with pytest.raises(ValueError, match="io"):
+        ProcessSandbox("iohub-bad", io="poll")
+
+
+def test_hub_mode_does_not_add_a_thread_per_sandbox():
+    name = "pyisolate-iohub-test-scale"
+    hub = IOHub(name=name)
+    before = threading.active_count()
+    procs = [ProcessSandbox(f"iohub-scale-{i}", iohub=hub) for i in range(8)]
+    try:
+        assert threading.active_count() - before <= 1
+        for proc in procs:
+            proc.exec("post(1)")
+        assert [proc.recv(timeout=60) for proc in procs] == [1] * 8
+        assert len(_hub_threads(name)) == 1
+    finally:
+        for proc in procs:
+            proc.stop()
+        hub.close()
+
+
+def test_guest_death_is_surfaced_through_the_hub():
+    hub = IOHub()
+    proc = ProcessSandbox("iohub-death", iohub=hub)
+    try:
+        proc.exec("post(1)")
+        assert proc.recv(timeout=10) == 1
+        proc._proc.kill()
+        with pytest.raises(iso.SandboxError, match="terminated unexpectedly"):
+            proc.recv(timeout=5)
+    finally:
+        proc.stop()
+        hub.close()
+
+
+def test_supervisor_reads_process_sandboxes_through_its_own_hub():
+    sup = iso.Supervisor()
+    try:
+        sb = sup.spawn("iohub-supervisor", backend="process")
+        sb.exec("post('hi')")
+        assert sb.recv(timeout=10) == "hi"
+        assert len(sup._iohub) == 1
+    finally:
+        sup.shutdown()
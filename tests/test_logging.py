@@ -1,7 +1,17 @@
+import io
 import json
 import logging
+import queue
+import time
 
-from pyisolate.logging import JSONFormatter, setup_structured_logging
+from pyisolate.logging import (
+    BatchingJSONHandler,
+    DroppingQueueHandler,
+    JSONFormatter,
+    LoggingPipeline,
+    RateLimitFilter,
+    setup_structured_logging,
+)
 
 
 def test_structured_log_output_is_valid_json():
@@ -29,3 +39,86 @@ def test_setup_structured_logging():
     setup_structured_logging()
     assert root.level == logging.INFO
     assert root.handlers
+
+
+def _record(msg, name="pyisolate.sb", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, msg, (), None)
+
+
+class _CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.write_calls = 0
+
+    def write(self, s):
+        self.write_calls += 1
+        return super().write(s)
+
+
+def test_batching_handler_writes_once_per_batch():
+    stream = _CountingStream()
+    handler = BatchingJSONHandler(stream, batch_size=3, flush_interval=60)
+    for i in range(7):
+        handler.emit(_record(f"m{i}"))
+    assert stream.write_calls == 2
+    assert handler.flush_due() is not None
+    handler.flush()
+    assert stream.write_calls == 3 and handler.flush_due() is None
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["message"] for line in lines] == [
+        f"m{i}" for i in range(7)
+    ]
+
+
+def test_queue_handler_overflow_policies():
+    q = queue.Queue(2)
+    handler = DroppingQueueHandler(q, "drop_new")
+    for msg in ("a", "b", "c"):
+        handler.handle(_record(msg))
+    assert handler.dropped == 1
+    assert [q.get_nowait().msg for _ in range(2)] == ["a", "b"]
+
+    handler = DroppingQueueHandler(q, "drop_oldest")
+    for msg in ("a", "b", "c"):
+        handler.handle(_record(msg))
+    assert handler.dropped == 1
+    assert [q.get_nowait().msg for _ in range(2)] == ["b", "c"]
+
+
+def test_rate_limit_is_per_logger_and_reports_suppressed():
+    limit = RateLimitFilter(rate=0.001, burst=2)
+    admitted = [limit.filter(_record("denied")) for _ in range(5)]
+    assert admitted == [True, True, False, False, False]
+    assert limit.filter(_record("denied", name="pyisolate.other"))
+    assert limit.filter(_record("denied", level=logging.ERROR))
+    assert limit.suppressed == 3
+
+    limit._buckets[("pyisolate.sb", "denied")][0] = 1.0
+    record = _record("denied")
+    assert limit.filter(record)
+    assert record.suppressed == 3
+    assert json.loads(JSONFormatter().format(record))["suppressed"] == 3
+
+
+def test_pipeline_flushes_on_interval_and_on_stop():
+    stream = io.StringIO()
+    logger = logging.getLogger("pyisolate.test-pipeline")
+    pipeline = LoggingPipeline(stream, batch_size=1000, flush_interval=0.02)
+    logger.addHandler(pipeline.handler)
+    logger.propagate = False
+    try:
+        with pipeline:
+            logger.warning("first")
+            deadline = time.monotonic() + 5
+            while "first" not in stream.getvalue() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert pipeline.stats().writes == 1
+            for i in range(50):
+                logger.warning("later %d", i)
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 51
+        assert json.loads(lines[-1])["message"] == "later 49"
+        assert pipeline.stats().queued == 0
+    finally:
+        logger.removeHandler(pipeline.handler)
+        logger.propagate = True
@@ -113,6 +113,23 @@ def test_export_sanitizes_sandbox_name(monkeypatch):
         sb.close()
 
 
+def test_export_builds_no_sandbox_handles(monkeypatch):
+    import pyisolate.supervisor as supervisor
+
+    sb = iso.spawn("metrics-handles")
+    try:
+
+        def _no_handles(*args, **kwargs):
+            raise AssertionError("exporter built a Sandbox handle")
+
+        monkeypatch.setattr(supervisor, "Sandbox", _no_handles)
+        metrics = MetricsExporter().export()
+        assert 'pyisolate_cpu_ms{sandbox="metrics-handles"}' in metrics
+    finally:
+        monkeypatch.undo()
+        sb.close()
+
+
 def test_export_latency_bucket_order_and_cumulative_values(monkeypatch):
     import pyisolate.supervisor as supervisor
 
@@ -131,7 +148,7 @@ def test_export_latency_bucket_order_and_cumulative_values(monkeypatch):
             )
 
     monkeypatch.setattr(
-        supervisor, "list_active", lambda: {"sandbox-z": _FakeSandbox()}
+        supervisor, "active_items", lambda: [("sandbox-z", _FakeSandbox())]
     )
     metrics = MetricsExporter().export()
     bucket_lines = [
@@ -164,7 +181,7 @@ def test_export_latency_missing_buckets_default_to_zero(monkeypatch):
             )
 
     monkeypatch.setattr(
-        supervisor, "list_active", lambda: {"sandbox-missing": _FakeSandbox()}
+        supervisor, "active_items", lambda: [("sandbox-missing", _FakeSandbox())]
     )
     metrics = MetricsExporter().export()
     bucket_lines = [
@@ -199,3 +216,139 @@ def test_export_contains_denial_metrics():
         assert 'broker_decision="deny"' in metrics
     finally:
         sb.close()
+
+
+class _SampledSandbox:
+    def __init__(self, **overrides):
+        values = dict(
+            cpu_ms=2.0,
+            mem_bytes=128,
+            errors=1,
+            operations=3,
+            cost=0.5,
+            latency={"0.5": 1, "1": 1, "5": 1},
+            latency_sum=3.5,
+            denials=[],
+            denial_counts={("filesystem", "fs.read", "not_evaluated", "deny"): 2},
+        )
+        values.update(overrides)
+        self.values = values
+        self.samples = []
+
+    def sample_stats(self, *, denials=True):
+        self.samples.append(denials)
+        return types.SimpleNamespace(**self.values)
+
+    @property
+    def stats(self):  # pragma: no cover - the exporter must not copy denials
+        raise AssertionError("exporter read the full stats")
+
+
+def test_export_samples_without_copying_denials_and_aggregates_them(monkeypatch):
+    import pyisolate.supervisor as supervisor
+
+    sb = _SampledSandbox()
+    monkeypatch.setattr(supervisor, "active_items", lambda: [("agg", sb)])
+    metrics = MetricsExporter().export()
+    assert sb.samples == [False]
+    assert 'pyisolate_denials_total{sandbox="agg"} 2' in metrics
+    assert (
+        'pyisolate_denial_events_total{sandbox="agg",capability="filesystem",'
+        'policy_rule="fs.read",kernel_decision="not_evaluated",'
+        'broker_decision="deny"} 2'
+    ) in metrics.splitlines()
+
+
+def test_export_groups_families_and_reuses_unchanged_samples(monkeypatch):
+    import pyisolate.supervisor as supervisor
+
+    active = {"b": _SampledSandbox(), "a": _SampledSandbox()}
+    monkeypatch.setattr(supervisor, "active_items", lambda: list(active.items()))
+    exporter = MetricsExporter()
+    first = exporter.export()
+    chunks = exporter._series["a"].chunks
+    lines = first.splitlines()
+    # Each family is contiguous: its metadata, then every sandbox's samples.
+    cpu = lines.index("# TYPE pyisolate_cpu_ms gauge")
+    assert lines[cpu + 1 : cpu + 3] == [
+        'pyisolate_cpu_ms{sandbox="a"} 2',
+        'pyisolate_cpu_ms{sandbox="b"} 2',
+    ]
+    second = exporter.export()
+    assert exporter._series["a"].chunks is chunks
+    assert "pyisolate_scrape_duration_seconds " in second
+    active["a"].values["errors"] = 7
+    del active["b"]
+    third = exporter.export()
+    assert 'pyisolate_errors_total{sandbox="a"} 7' in third
+    assert 'sandbox="b"' not in third
+    assert set(exporter._series) == {"a"}
+
+
+def test_export_openmetrics(monkeypatch):
+    import pyisolate.supervisor as supervisor
+
+    monkeypatch.setattr(supervisor, "active_items", lambda: [("om", _SampledSandbox())])
+    metrics = MetricsExporter().export(openmetrics=True)
+    assert metrics.endswith("# EOF\n")
+    assert "# TYPE pyisolate_errors counter" in metrics
+    assert "# TYPE pyisolate_errors_total" not in metrics
+    assert 'pyisolate_errors_total{sandbox="om"} 1' in metrics
+    assert "# TYPE pyisolate_latency_ms histogram" in metrics
+    assert MetricsExporter().export(openmetrics=False).count("# EOF") == 0
+
+
+def test_metrics_server_caches_negotiates_and_compresses(monkeypatch):
+    import gzip
+    import http.client
+    import threading
+
+    import pyisolate.supervisor as supervisor
+    from pyisolate.observability.metrics import MetricsServer
+
+    calls = []
+
+    def _active():
+        calls.append(1)
+        return [("srv", _SampledSandbox())]
+
+    monkeypatch.setattr(supervisor, "active_items", _active)
+
+    def get(server, path="/metrics", **headers):
+        conn = http.client.HTTPConnection(*server.address, timeout=5)
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.headers, response.read()
+        finally:
+            conn.close()
+
+    with MetricsServer(max_age=60.0) as server:
+        status, headers, body = get(server)
+        assert status == 200
+        assert headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert b'pyisolate_cpu_ms{sandbox="srv"} 2' in body
+        # Within max_age the cached exposition is served.
+        assert get(server)[2] == body
+        assert len(calls) == 1
+
+        status, headers, zipped = get(server, **{"Accept-Encoding": "gzip"})
+        assert headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(zipped) == body
+
+        accept = (
+            "application/openmetrics-text;version=1.0.0,"
+            "text/plain;version=0.0.4;q=0.5,*/*;q=0.1"
+        )
+        status, headers, om = get(server, Accept=accept)
+        assert headers["Content-Type"].startswith("application/openmetrics-text")
+        assert om.endswith(b"# EOF\n")
+        assert len(calls) == 2
+        assert get(server, "/other")[0] == 404
+
+    server.max_age = 0
+    assert b"pyisolate_scrape_duration_seconds" in server.exposition()
+    assert len(calls) == 3
+    assert not [
+        t for t in threading.enumerate() if t.name == "pyisolate-metrics-server"
+    ]
@@ -191,10 +191,10 @@ def test_refresh_validation_fails_before_compile_or_reload(
     def fake_reload(*_args, **_kwargs):
         nonlocal reload_calls
         reload_calls += 1
-        raise AssertionError("reload_policy must not run for invalid schema/version")
+        raise AssertionError("apply_policy must not run for invalid schema/version")
 
     monkeypatch.setattr(policy, "compile_policy", fake_compile)
-    monkeypatch.setattr("pyisolate.supervisor.reload_policy", fake_reload)
+    monkeypatch.setattr("pyisolate.supervisor.apply_policy", fake_reload)
 
     with pytest.raises(ValueError, match=msg):
         policy.refresh(str(path), token="tok")
@@ -207,7 +207,7 @@ def test_refresh_validation_fails_before_compile_or_reload(
 def test_templates_parse(monkeypatch, name):
     policy = load_policy()
     monkeypatch.setattr(
-        "pyisolate.bpf.manager.BPFManager.hot_reload", lambda *a, **k: None
+        "pyisolate.bpf.manager.BPFManager.apply_policy", lambda *a, **k: None
     )
     path = ROOT / "policy" / name
     compiled = policy.compile_policy(str(path))
@@ -224,11 +224,16 @@ def test_refresh_passes_compiled_policy(monkeypatch, tmp_path):
 
     captured: dict[str, dict] = {}
 
-    def fake_hot_reload(self, policy_path):
-        with open(policy_path, "r", encoding="utf-8") as fh:
-            captured["data"] = json.load(fh)
+    def fake_apply_policy(self, policy_set):
+        captured["data"] = policy_set.to_dict()
+
+    def no_files(*_args, **_kwargs):
+        raise AssertionError("refresh must hand the policy over in memory")
 
-    monkeypatch.setattr("pyisolate.bpf.manager.BPFManager.hot_reload", fake_hot_reload)
+    monkeypatch.setattr(
+        "pyisolate.bpf.manager.BPFManager.apply_policy", fake_apply_policy
+    )
+    monkeypatch.setattr("pyisolate.bpf.manager.BPFManager.hot_reload", no_files)
     iso.set_policy_token("tok")
 
     path = tmp_path / "p.yml"
@@ -262,7 +267,7 @@ def test_refresh_dry_run_compiles_without_reload(monkeypatch, tmp_path):
         nonlocal called
         called = True
 
-    monkeypatch.setattr("pyisolate.supervisor.reload_policy", fake_reload)
+    monkeypatch.setattr("pyisolate.supervisor.apply_policy", fake_reload)
     iso.set_policy_token("tok")
     path = tmp_path / "p.yml"
     path.write_text(
@@ -274,6 +279,97 @@ def test_refresh_dry_run_compiles_without_reload(monkeypatch, tmp_path):
     assert called is False
 
 
+def test_compile_policy_data_matches_compile_policy(tmp_path):
+    import pyisolate.policy as policy
+
+    doc = (
+        "version: 1.0\n"
+        "sandboxes:\n"
+        "  base:\n"
+        "    net:\n"
+        '      - deny: "10.0.0.0/8"\n'
+        "  child:\n"
+        "    extends: base\n"
+        "    imports:\n"
+        "      - json\n"
+    )
+    f = tmp_path / "p.yml"
+    f.write_text(doc)
+    data = {
+        "version": "1.0",
+        "sandboxes": {
+            "base": {"net": [{"deny": "10.0.0.0/8"}]},
+            "child": {"extends": "base", "imports": ["json"]},
+        },
+    }
+    assert policy.compile_policy_data(data) == policy.compile_policy(str(f))
+    with pytest.raises(policy.PolicyCompilerError, match="mapping"):
+        policy.compile_policy_data(["not", "a", "mapping"])
+    with pytest.raises(policy.PolicyCompilerError, match="cyclic"):
+        policy.compile_policy_data(
+            {"sandboxes": {"a": {"extends": "b"}, "b": {"extends": "a"}}}
+        )
+
+
+def test_inheritance_resolves_each_template_once_and_deduplicates_rules(
+    monkeypatch,
+):
+    from pyisolate.policy import compiler
+
+    boxes = {
+        "base": {
+            "fs": [{"read": "/srv"}, {"read": "/srv"}],
+            "net": [{"connect": ["10.0.0.1:443", "10.0.0.2:443"]}],
+        },
+        "mid": {
+            "extends": "base",
+            "fs": [{"read": "/srv"}, {"write": "/out"}],
+            "net": [{"connect": ["10.0.0.1:443", "10.0.0.2:443"]}],
+        },
+    }
+    for i in range(50):
+        boxes[f"leaf{i}"] = {"extends": "mid", "imports": ["json", "json"]}
+    inherits = []
+    inherit = compiler._InheritanceResolver._inherit
+
+    def counting(self, name):
+        inherits.append(name)
+        return inherit(self, name)
+
+    monkeypatch.setattr(compiler._InheritanceResolver, "_inherit", counting)
+    compiled = compiler.compile_policy_data({"version": "1.0", "sandboxes": boxes})
+    assert sorted(inherits) == sorted(boxes)
+    leaf = compiled.sandboxes["leaf7"]
+    assert [(r.action, r.path) for r in leaf.fs] == [
+        ("read", "/srv"),
+        ("write", "/out"),
+    ]
+    assert [r.addr for r in leaf.tcp] == ["10.0.0.1:443", "10.0.0.2:443"]
+    assert leaf.imports == ["json"]
+
+
+def test_inheritance_depth_is_not_bounded_by_the_recursion_limit():
+    from pyisolate.policy import compile_policy_data
+
+    depth = sys.getrecursionlimit() + 100
+    boxes = {"t0": {"imports": ["m0"]}}
+    for level in range(1, depth):
+        boxes[f"t{level}"] = {"extends": f"t{level - 1}", "imports": [f"m{level}"]}
+    compiled = compile_policy_data({"version": "1.0", "sandboxes": boxes})
+    assert len(compiled.sandboxes[f"t{depth - 1}"].imports) == depth
+
+
+def test_inherited_rule_errors_name_the_sandbox_being_compiled():
+    from pyisolate.policy import PolicyCompilerError, compile_policy_data
+
+    boxes = {
+        "child": {"extends": "base"},
+        "base": {"fs": [{"read": "/a"}, {"deny": "/a"}]},
+    }
+    with pytest.raises(PolicyCompilerError, match="'/a' in 'child'"):
+        compile_policy_data({"version": "1.0", "sandboxes": boxes})
+
+
 def test_compile_policy_supports_inheritance_and_defaults(tmp_path):
     import pyisolate.policy as policy
 
@@ -314,7 +410,7 @@ def test_refresh_logs_explicit_deny_rules(tmp_path, caplog, monkeypatch):
     import pyisolate as iso
 
     monkeypatch.setattr(
-        "pyisolate.bpf.manager.BPFManager.hot_reload", lambda *a, **k: None
+        "pyisolate.bpf.manager.BPFManager.apply_policy", lambda *a, **k: None
     )
     iso.set_policy_token("tok")
     path = tmp_path / "deny.yml"
@@ -591,9 +687,9 @@ def test_canonical_yaml_policy_drives_sandbox_and_bpf_maps(tmp_path, monkeypatch
         "pinned",
         "/sys/fs/bpf/policy_fs_allow",
         "key",
-        *encode_map_field("default:0", BPF_KEY_BYTES),
+        *encode_map_field(f"default:{allowed_dir}/**", BPF_KEY_BYTES),
         "value",
-        *encode_map_field(f"{allowed_dir}/**", BPF_VALUE_BYTES),
+        *encode_map_field(f"readwrite:{allowed_dir}/**", BPF_VALUE_BYTES),
         "any",
     ] in calls
     assert [
@@ -603,7 +699,7 @@ def test_canonical_yaml_policy_drives_sandbox_and_bpf_maps(tmp_path, monkeypatch
         "pinned",
         "/sys/fs/bpf/policy_net_allow",
         "key",
-        *encode_map_field("default:0", BPF_KEY_BYTES),
+        *encode_map_field("default:127.0.0.1:9", BPF_KEY_BYTES),
         "value",
         *encode_map_field("127.0.0.1:9", BPF_VALUE_BYTES),
         "any",
@@ -795,30 +891,26 @@ def test_canonical_policy_accepts_consistent_actions():
     assert [r.action for r in rp.deny_tcp] == ["deny"]
 
 
-def test_from_yaml_dict_cleans_up_tempfile_on_dump_error(tmp_path, monkeypatch):
-    # from_yaml_dict writes a delete=False temp file before compiling it. If the
-    # YAML serialization raises, the file must still be removed rather than
-    # leaked once per failure.
+def test_from_yaml_dict_compiles_in_memory(monkeypatch):
+    # Mappings are compiled directly, without a YAML round-trip through a
+    # temporary file.
     import tempfile
 
     import yaml
 
     from pyisolate.policy.model import from_yaml_dict
 
-    real_named_temp = tempfile.NamedTemporaryFile
-
-    def named_temp_in_tmp_path(*args, **kwargs):
-        kwargs.setdefault("dir", str(tmp_path))
-        return real_named_temp(*args, **kwargs)
-
-    monkeypatch.setattr(tempfile, "NamedTemporaryFile", named_temp_in_tmp_path)
-
     def boom(*args, **kwargs):
-        raise RuntimeError("dump failed")
+        raise AssertionError("from_yaml_dict must not serialize the mapping")
 
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", boom)
     monkeypatch.setattr(yaml, "safe_dump", boom)
 
-    with pytest.raises(RuntimeError, match="dump failed"):
-        from_yaml_dict({"version": "1.0", "sandboxes": {}})
-
-    assert list(tmp_path.iterdir()) == []
+    data = {
+        "version": "1.0",
+        "sandboxes": {"sb": {"fs": ({"read": "/srv"},), "imports": ["math"]}},
+    }
+    policy_set = from_yaml_dict(data)
+    assert policy_set.sandbox("sb").imports == ("math",)
+    assert policy_set.sandbox("sb").allow_fs[0].path == "/srv"
+    assert data["sandboxes"]["sb"]["fs"] == ({"read": "/srv"},)
@@ -0,0 +1,184 @@
+"""Tests for memoized policy compilation."""
+
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from pyisolate.bpf.manager import BPFManager
+from pyisolate.policy import cache as policy_cache
+from pyisolate.policy.cache import PolicyCache, shared_policy_cache
+
+POLICY = """\
+version: 1.0
+sandboxes:
+  base:
+    imports:
+      - math
+  worker:
+    extends: base
+    fs:
+      - read: "{path}"
+"""
+
+
+@pytest.fixture
+def compiles(monkeypatch):
+    calls = []
+    compile_text = policy_cache._compile_text
+
+    def _counting(text):
+        calls.append(text)
+        return compile_text(text)
+
+    monkeypatch.setattr(policy_cache, "_compile_text", _counting)
+    return calls
+
+
+def _write(path, text, *, age=10.0):
+    path.write_text(text)
+    stamp = time.time_ns() - int(age * 1e9)
+    os.utime(path, ns=(stamp, stamp))
+    return stamp
+
+
+def test_file_is_compiled_once_and_shared(tmp_path, compiles):
+    cache = PolicyCache()
+    path = tmp_path / "policy.yml"
+    _write(path, POLICY.format(path="/srv"))
+    first = cache.runtime(path)
+    assert cache.runtime(str(path)) is first
+    assert len(compiles) == 1
+    assert cache.stats().hits == 1
+    assert first.sandbox("worker").imports == ("math",)
+    with pytest.raises(TypeError):
+        first.sandboxes["worker"] = None
+
+
+def test_edited_file_is_recompiled(tmp_path, compiles):
+    cache = PolicyCache()
+    path = tmp_path / "policy.yml"
+    _write(path, POLICY.format(path="/srv"))
+    cache.runtime(path)
+    _write(path, POLICY.format(path="/data/longer"), age=5.0)
+    assert cache.runtime(path).sandbox("worker").allow_fs[0].path == "/data/longer"
+    assert len(compiles) == 2
+
+
+def test_recently_modified_file_is_rehashed(tmp_path, compiles):
+    cache = PolicyCache()
+    path = tmp_path / "policy.yml"
+    stamp = _write(path, POLICY.format(path="/srv/a"), age=0)
+    cache.runtime(path)
+    # Same size and timestamp: only the content tells the versions apart.
+    path.write_text(POLICY.format(path="/srv/b"))
+    os.utime(path, ns=(stamp, stamp))
+    assert cache.runtime(path).sandbox("worker").allow_fs[0].path == "/srv/b"
+
+
+def test_invalidate_drops_an_entry_the_stat_index_would_reuse(tmp_path, compiles):
+    cache = PolicyCache()
+    path = tmp_path / "policy.yml"
+    stamp = _write(path, POLICY.format(path="/srv/a"))
+    cache.runtime(path)
+    path.write_text(POLICY.format(path="/srv/b"))
+    os.utime(path, ns=(stamp, stamp))
+    assert cache.runtime(path).sandbox("worker").allow_fs[0].path == "/srv/a"
+    cache.invalidate(path)
+    assert cache.runtime(path).sandbox("worker").allow_fs[0].path == "/srv/b"
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_identical_files_share_one_compilation(tmp_path, compiles):
+    cache = PolicyCache()
+    a, b = tmp_path / "a.yml", tmp_path / "b.yml"
+    _write(a, POLICY.format(path="/srv"))
+    _write(b, POLICY.format(path="/srv"))
+    assert cache.runtime(a) is cache.runtime(b)
+    assert len(compiles) == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, compiles):
+    cache = PolicyCache(maxsize=2)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"p{i}.yml"
+        _write(path, POLICY.format(path=f"/srv/{i}"))
+        paths.append(path)
+    cache.runtime(paths[0])
+    cache.runtime(paths[1])
+    cache.runtime(paths[0])
+    cache.runtime(paths[2])
+    assert len(cache) == 2
+    assert len(compiles) == 3
+    cache.runtime(paths[0])
+    assert len(compiles) == 3
+    cache.runtime(paths[1])
+    assert len(compiles) == 4
+
+
+def test_mappings_are_keyed_by_canonical_content():
+    cache = PolicyCache()
+    data = {"version": "1.0", "sandboxes": {"default": {"imports": ["math"]}}}
+    reordered = {"sandboxes": {"default": {"imports": ["math"]}}, "version": "1.0"}
+    first = cache.runtime_from_mapping(data)
+    assert cache.runtime_from_mapping(reordered) is first
+    changed = {"version": "1.0", "sandboxes": {"default": {"imports": ["json"]}}}
+    assert cache.runtime_from_mapping(changed).sandbox().imports == ("json",)
+    assert cache.stats().misses == 2
+
+
+def test_resolve_policy_reuses_compiled_inputs(tmp_path):
+    from pyisolate.policy import resolve_policy
+
+    shared_policy_cache().invalidate()
+    path = tmp_path / "worker.yml"
+    _write(path, POLICY.format(path="/srv"))
+    assert resolve_policy(str(path)) is resolve_policy(str(path))
+    data = {"version": "1.0", "sandboxes": {"default": {"imports": ["math"]}}}
+    assert resolve_policy(data) is resolve_policy(dict(data))
+
+
+def test_hot_reload_of_an_unchanged_file_does_not_recompile(compiles, monkeypatch):
+    monkeypatch.setattr(
+        BPFManager, "_run", lambda self, cmd, *, raise_on_error=False: True
+    )
+    shared_policy_cache().invalidate()
+    mgr = BPFManager()
+    mgr.loaded = True
+    mgr.hot_reload(str(ROOT / "policy" / "readonly-fs.yml"))
+    mgr.hot_reload(str(ROOT / "policy" / "readonly-fs.yml"))
+    assert len(compiles) == 1
+
+
+def test_refresh_of_an_unchanged_file_does_not_recompile(tmp_path, monkeypatch):
+    policy = importlib.import_module("pyisolate.policy")
+    calls = []
+    compile_text = policy._compile_text
+
+    def _counting(text):
+        calls.append(text)
+        return compile_text(text)
+
+    reloads = []
+    monkeypatch.setattr(policy, "_compile_text", _counting)
+    monkeypatch.setattr(
+        "pyisolate.supervisor.apply_policy",
+        lambda policy_set, token: reloads.append(policy_set),
+    )
+    path = tmp_path / "policy.yml"
+    _write(path, POLICY.format(path="/srv"))
+    policy.refresh(str(path), token="tok")
+    policy.refresh(str(path), token="tok")
+    assert len(calls) == 1
+    assert len(reloads) == 2 and reloads[0] is reloads[1]
+    # A dry run validates the file afresh.
+    assert policy.refresh(str(path), token="tok", dry_run=True).sandboxes
+    assert len(calls) == 2
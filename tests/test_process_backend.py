@@ -2,6 +2,7 @@
 
 import os
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -205,6 +206,33 @@ def test_wall_time_quota_rearms_across_sequential_operations():
         assert sb._thread.is_alive()
 
 
+def test_stale_wall_deadline_after_a_rearm_is_ignored():
+    with iso.spawn(
+        "proc-wall-stale",
+        allowed_imports=["math"],
+        backend="process",
+        wall_time_ms=10_000,
+    ) as sb:
+        proc = sb._thread
+        proc._op_started()
+        stale = proc._wall_timer._callback
+        proc._op_started()
+        # The first operation finishes: its deadline is cancelled and a new
+        # one armed for the second, but the old callback still gets to run.
+        proc._op_finished()
+        current = proc._wall_timer
+        stale()
+        for thread in threading.enumerate():
+            if thread.name == "pyisolate-walltime-proc-wall-stale":
+                thread.join(5)
+        assert proc.is_alive()
+        assert proc.termination_reason is None
+        assert proc._pending_ops == 1
+        assert proc._wall_timer is current and current.active
+        proc._op_finished()
+        assert not current.active
+
+
 def test_open_files_quota_reaches_the_guest_as_an_rlimit():
     with iso.spawn(
         "proc-nofile",
@@ -258,7 +286,7 @@ def test_sub_second_cpu_budget_rounds_up_and_warns(caplog):
 
 @pytest.mark.parametrize(
     "quota",
-    ["network_ops_max", "output_bytes_max", "child_work_max", "numa_node"],
+    ["network_ops_max", "child_work_max", "numa_node"],
 )
 def test_unenforceable_quotas_are_refused_not_silently_ignored(quota):
     # These used to be accepted and dropped on the floor, leaving callers with a
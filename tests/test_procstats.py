@@ -0,0 +1,171 @@
+"""Tests for process-backend CPU and memory accounting."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from pyisolate.runtime import procstats
+from pyisolate.runtime.process_backend import ProcessSandbox, _usage_ms
+from pyisolate.runtime.procstats import (
+    ProcSample,
+    ProcStatsCollector,
+    parse_stat,
+    parse_status,
+)
+
+needs_proc = pytest.mark.skipif(
+    not os.path.exists(f"/proc/{os.getpid()}/stat"), reason="needs /proc"
+)
+
+
+def test_parse_stat_counts_fields_from_the_last_parenthesis():
+    ticks = procstats._CLOCK_TICKS
+    line = b"42 (odd) name) (x) S 1 42 42 0 -1 4194304 10 0 0 0 %d %d 0 0\n" % (
+        ticks,
+        ticks // 2,
+    )
+    assert parse_stat(line) == pytest.approx(1500.0)
+
+
+def test_parse_status_reads_rss_and_high_water_mark():
+    data = b"Name:\tpython\nVmHWM:\t    2048 kB\nVmRSS:\t    1024 kB\nThreads:\t1\n"
+    assert parse_status(data) == (1024 * 1024, 2048 * 1024)
+    # A zombie has no address space and no Vm* lines.
+    assert parse_status(b"Name:\tpython\nState:\tZ (zombie)\n") == (0, 0)
+
+
+@needs_proc
+def test_collector_samples_registered_processes_in_one_pass():
+    collector = ProcStatsCollector(max_age=60)
+    samples: list[ProcSample] = []
+    try:
+        assert collector.register(os.getpid(), samples.append)
+        assert collector.sample() == 1
+        assert samples[0].cpu_ms > 0
+        assert samples[0].peak_rss_bytes >= samples[0].rss_bytes > 0
+        collector.unregister(os.getpid())
+        assert collector.sample() == 0
+    finally:
+        collector.close()
+
+
+@needs_proc
+def test_refresh_batches_passes_within_max_age():
+    collector = ProcStatsCollector(max_age=60)
+    samples: list[ProcSample] = []
+    try:
+        collector.register(os.getpid(), samples.append)
+        assert collector.refresh() == 1
+        # Every sandbox's stats read during a scrape shares that one pass.
+        assert collector.refresh() == 0
+        assert len(samples) == 1
+        assert collector.sample() == 1
+    finally:
+        collector.close()
+    assert len(collector) == 0
+
+
+@needs_proc
+def test_collector_drops_processes_that_were_reaped():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    collector = ProcStatsCollector(max_age=60)
+    try:
+        assert collector.register(child.pid, lambda sample: None)
+        child.kill()
+        child.wait()
+        assert collector.sample() == 0
+        assert len(collector) == 0
+    finally:
+        collector.close()
+        child.kill()
+        child.wait()
+
+
+def test_collector_rejects_a_process_it_cannot_open():
+    collector = ProcStatsCollector()
+    assert not collector.register(2**22 + 1, lambda sample: None)
+    assert len(collector) == 0
+
+
+@pytest.mark.parametrize("value", [None, "1", True, -1.0, float("nan"), float("inf")])
+def test_guest_reported_durations_must_be_sane_numbers(value):
+    assert _usage_ms(value) is None
+
+
+@needs_proc
+def test_process_sandbox_reports_cpu_memory_and_latency():
+    collector = ProcStatsCollector(max_age=60)
+    proc = ProcessSandbox("procstats-usage", procstats=collector)
+    try:
+        proc.exec("x = sum(i * i for i in range(300000)); post(1)")
+        assert proc.recv(timeout=10) == 1
+        proc.exec("raise ValueError('nope')")
+        with pytest.raises(Exception, match="nope"):
+            proc.recv(timeout=5)
+        # Both finished operations reported their CPU and wall time.
+        reported = proc.stats
+        assert reported.operations == 2
+        assert sum(reported.latency.values()) == 2
+        assert reported.latency_sum > 0
+        assert reported.cpu_ms > 0
+        # A fresh /proc sample adds interpreter start-up and the resident set.
+        collector.max_age = 0
+        sampled = proc.stats
+        assert sampled.cpu_ms > 0
+        assert sampled.mem_bytes > 0
+        assert sampled.cost > 0
+    finally:
+        proc.stop()
+        collector.close()
+    # wait4 supplied the final numbers when the guest was reaped.
+    final = proc.stats
+    assert final.cpu_ms >= sampled.cpu_ms - 10
+    assert final.mem_bytes >= sampled.mem_bytes
+    assert proc.returncode is not None
+    assert len(collector) == 0
+
+
+@needs_proc
+def test_killed_guest_keeps_its_exit_status_and_rusage():
+    collector = ProcStatsCollector(max_age=60)
+    proc = ProcessSandbox("procstats-kill", procstats=collector)
+    try:
+        proc.exec("post(1)")
+        assert proc.recv(timeout=10) == 1
+        proc._signal(9)
+        proc._wait(5)
+        assert proc.returncode == -9
+        assert proc.stats.cpu_ms > 0
+        assert proc.stats.mem_bytes > 0
+    finally:
+        proc.stop()
+        collector.close()
+
+
+@needs_proc
+def test_metrics_exporter_reports_process_sandbox_usage():
+    import pyisolate as iso
+    from pyisolate.observability.metrics import MetricsExporter
+    from pyisolate.supervisor import _get_supervisor
+
+    sb = iso.spawn("procstats-metrics", backend="process")
+    try:
+        sb.exec("post(sum(range(100000)))")
+        assert sb.recv(timeout=10) == 4999950000
+        _get_supervisor()._procstats.sample()
+        text = MetricsExporter().export()
+        (cpu,) = [
+            line
+            for line in text.splitlines()
+            if line.startswith('pyisolate_cpu_ms{sandbox="procstats-metrics"}')
+        ]
+        assert float(cpu.split()[-1]) > 0
+        assert 'pyisolate_latency_ms_count{sandbox="procstats-metrics"} 1' in text
+    finally:
+        sb.close()
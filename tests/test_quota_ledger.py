@@ -0,0 +1,198 @@
+"""Tests for the batched, compacting tenant quota ledger."""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pyisolate as iso
+from pyisolate.recovery import QuotaLedger
+
+
+def _lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_records_are_written_in_batches(tmp_path, monkeypatch):
+    path = tmp_path / "quota.log"
+    writes = []
+    write = os.write
+
+    def _write(fd, data):
+        writes.append(bytes(data))
+        return write(fd, data)
+
+    ledger = QuotaLedger(path, flush_every=4, schedule=lambda delay, cb: None)
+    ledger.load()
+    monkeypatch.setattr(os, "write", _write)
+    for _ in range(5):
+        ledger.record("acme", 1)
+    assert writes == [b"acme,1\n" * 4]
+    ledger.close()
+    monkeypatch.undo()
+    assert len(writes) == 2
+    assert _lines(path) == ["acme,1"] * 5
+    # Records after close are dropped rather than written to a closed file.
+    ledger.record("acme", 1)
+    assert _lines(path) == ["acme,1"] * 5
+
+
+def test_scheduled_flush_writes_a_partial_batch(tmp_path, monkeypatch):
+    path = tmp_path / "quota.log"
+    scheduled = []
+    ledger = QuotaLedger(path, schedule=lambda delay, cb: scheduled.append((delay, cb)))
+    ledger.load()
+    ledger.record("acme", 1)
+    ledger.record("acme", -1)
+    # One timer covers the whole batch.
+    assert len(scheduled) == 1
+    assert _lines(path) == []
+    writers = []
+    write = os.write
+
+    def _write(fd, data):
+        writers.append(threading.current_thread())
+        return write(fd, data)
+
+    monkeypatch.setattr(os, "write", _write)
+    # The scheduled callback hands the write to the flusher thread.
+    scheduled[0][1]()
+    flusher = ledger._flusher
+    if flusher is not None:
+        flusher.join(5)
+    assert _lines(path) == ["acme,1", "acme,-1"]
+    assert writers and threading.current_thread() not in writers
+    assert ledger._flusher is None
+    ledger.close()
+
+
+def test_compaction_folds_the_ledger_into_per_tenant_totals(tmp_path):
+    path = tmp_path / "quota.log"
+    ledger = QuotaLedger(path, flush_every=1, compact_every=10)
+    ledger.load()
+    for i in range(25):
+        ledger.record("acme", 1)
+        ledger.record("beta", -1 if i % 2 else 1)
+    ledger.close()
+    snapshot = json.loads(ledger.snapshot_path.read_text(encoding="utf-8"))
+    assert snapshot == {"epoch": 5, "totals": {"acme": 25, "beta": 1}}
+    assert _lines(path) == ["#epoch,5"]
+
+    replay = QuotaLedger(path)
+    assert replay.load() == {"acme": 25, "beta": 1}
+    replay.close()
+
+
+def test_startup_reads_the_snapshot_and_the_ledger_tail(tmp_path):
+    path = tmp_path / "quota.log"
+    ledger = QuotaLedger(path, flush_every=1, compact_every=1000)
+    ledger.load()
+    for i in range(2000):
+        ledger.record(f"t{i % 3}", 1)
+    ledger.record("t0", -1)
+    ledger.close()
+    # Only the lines since the last compaction are left to replay.
+    assert _lines(path) == ["#epoch,2", "t0,-1"]
+    replay = QuotaLedger(path)
+    assert replay.load() == {"t0": 666, "t1": 667, "t2": 666}
+    replay.close()
+
+
+def test_crash_between_snapshot_and_ledger_reset_does_not_double_count(tmp_path):
+    path = tmp_path / "quota.log"
+    ledger = QuotaLedger(path, flush_every=1)
+    ledger.load()
+    for _ in range(3):
+        ledger.record("acme", 1)
+    ledger.close()
+    saved = path.read_bytes()
+    compacting = QuotaLedger(path)
+    compacting.load()
+    compacting.compact()
+    compacting.close()
+    # Put the pre-compaction ledger back, as if the process died after the
+    # snapshot was written but before the ledger was replaced.
+    path.write_bytes(saved)
+
+    replay = QuotaLedger(path)
+    assert replay.load() == {"acme": 3}
+    replay.close()
+    assert _lines(path) == ["#epoch,2"]
+
+
+def test_torn_and_invalid_lines_are_ignored(tmp_path):
+    path = tmp_path / "quota.log"
+    path.write_text("acme,1\nacme,1\ngarbage\n,1\nbeta,x\nacme,-", encoding="utf-8")
+    ledger = QuotaLedger(path)
+    assert ledger.load() == {"acme": 2}
+    ledger.record("acme", -1)
+    ledger.flush()
+    ledger.close()
+    # The torn line was cut off, so the next record was not glued onto it.
+    assert _lines(path) == ["acme,1", "acme,1", "garbage", ",1", "beta,x", "acme,-1"]
+    replay = QuotaLedger(path)
+    assert replay.load() == {"acme": 1}
+    replay.close()
+
+
+def test_legacy_ledger_is_compacted_when_it_is_long(tmp_path):
+    path = tmp_path / "quota.log"
+    path.write_text("acme,1\n" * 30 + "acme,-1\n" * 10, encoding="utf-8")
+    ledger = QuotaLedger(path, compact_every=20)
+    assert ledger.load() == {"acme": 20}
+    ledger.close()
+    assert _lines(path) == ["#epoch,1"]
+    replay = QuotaLedger(path)
+    assert replay.load() == {"acme": 20}
+    replay.close()
+
+
+def test_any_tenant_name_round_trips(tmp_path):
+    path = tmp_path / "quota.log"
+    tenants = ["a,b", "line\nbreak", "[bracket", "#hash", "plain", "\u2028"]
+    ledger = QuotaLedger(path)
+    ledger.load()
+    for tenant in tenants:
+        ledger.record(tenant, 1)
+    ledger.close()
+    assert _lines(path)[1] == json.dumps(["line\nbreak", 1])
+    assert "plain,1" in _lines(path)
+    replay = QuotaLedger(path)
+    assert replay.load() == {tenant: 1 for tenant in tenants}
+    replay.close()
+
+
+def test_supervisor_accepts_a_tenant_with_a_comma(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYISOLATE_QUOTA_LEDGER", str(tmp_path / "quota.log"))
+    sup = iso.Supervisor()
+    try:
+        sup.spawn("ledger-comma", tenant="a,b", tenant_quota=2)
+        assert sup._tenant_usage == {"a,b": 1}
+    finally:
+        sup.shutdown()
+    replay = iso.Supervisor()
+    try:
+        assert replay._tenant_usage.get("a,b", 0) == 0
+    finally:
+        replay.shutdown()
+
+
+def test_supervisor_flushes_the_ledger_on_shutdown(tmp_path, monkeypatch):
+    path = tmp_path / "quota.log"
+    monkeypatch.setenv("PYISOLATE_QUOTA_LEDGER", str(path))
+    sup = iso.Supervisor()
+    try:
+        sup.spawn("ledger-batch", tenant="acme", tenant_quota=2)
+        sup.spawn("ledger-batch-2", tenant="acme", tenant_quota=2)
+    finally:
+        sup.shutdown()
+    assert _lines(path) == ["acme,1", "acme,1", "acme,-1", "acme,-1"]
+    replay = iso.Supervisor()
+    try:
+        assert replay._tenant_usage.get("acme", 0) == 0
+    finally:
+        replay.shutdown()
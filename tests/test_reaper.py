@@ -0,0 +1,169 @@
+"""Tests for background teardown of exited sandboxes."""
+
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate import recovery
+from pyisolate.reaper import SandboxReaper
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class _Exiting:
+    def __init__(self, alive_checks=0):
+        self.alive_checks = alive_checks
+
+    def is_alive(self):
+        self.alive_checks -= 1
+        return self.alive_checks >= 0
+
+
+def test_reaper_batches_exits_and_reaps_each_sandbox_once():
+    batches = []
+    reaper = SandboxReaper(batches.append, batch_window=0.05)
+    first, second = _Exiting(), _Exiting()
+    reaper.notify(first)
+    reaper.notify(second)
+    reaper.notify(first)
+    assert reaper.flush(timeout=2)
+    assert batches == [[first, second]]
+    assert len(reaper) == 0
+    reaper.close()
+
+
+def test_reaper_retries_a_sandbox_that_is_still_exiting():
+    batches = []
+    reaper = SandboxReaper(batches.append, batch_window=0)
+    late = _Exiting(alive_checks=3)
+    reaper.notify(late)
+    assert reaper.pending() == [late]
+    assert reaper.flush(timeout=2)
+    assert batches == [[late]]
+    reaper.close()
+
+
+def test_reaper_worker_exits_when_idle_and_close_drops_the_queue():
+    reaper = SandboxReaper(lambda batch: None, batch_window=0, retry_for=60)
+    reaper.notify(_Exiting())
+    assert reaper.flush(timeout=2)
+    assert reaper._thread is None
+    stuck = _Exiting(alive_checks=10**9)
+    reaper.notify(stuck)
+    started = time.monotonic()
+    reaper.close(timeout=2)
+    assert time.monotonic() - started < 1
+    assert len(reaper) == 0
+    reaper.notify(_Exiting())
+    assert len(reaper) == 0
+
+
+@pytest.fixture
+def teardown_log(monkeypatch):
+    log = []
+    drop = recovery.drop_sandboxes
+
+    def _drop(names):
+        names = list(names)
+        if names:
+            log.append((threading.current_thread().name, names))
+        drop(names)
+
+    monkeypatch.setattr(recovery, "drop_sandboxes", _drop)
+    return log
+
+
+def test_exited_sandboxes_are_torn_down_off_the_spawn_path(teardown_log):
+    sup = iso.Supervisor()
+    try:
+        closed = [sup.spawn(f"reap-{i}") for i in range(3)]
+        for sb in closed:
+            sb.close()
+        assert _wait_for(lambda: sum(len(names) for _, names in teardown_log) == 3)
+        assert not sup._sandboxes
+        assert sup.lookup_sandbox("reap-0") is None
+        assert {thread for thread, _ in teardown_log} == {"pyisolate-reaper"}
+        assert sorted(n for _, names in teardown_log for n in names) == [
+            "reap-0",
+            "reap-1",
+            "reap-2",
+        ]
+    finally:
+        sup.shutdown()
+
+
+def test_spawn_does_no_teardown_io_for_unrelated_dead_sandboxes(
+    teardown_log, monkeypatch
+):
+    sup = iso.Supervisor()
+    try:
+        # Leave the dead sandboxes queued, as if the reaper had not run yet.
+        monkeypatch.setattr(sup._reaper, "notify", lambda sandbox: None)
+        for i in range(5):
+            sup.spawn(f"dead-{i}").close()
+        sup.spawn("fresh").close()
+        sup.list_active()
+        assert teardown_log == []
+        assert len(sup._sandboxes) == 6
+    finally:
+        sup.shutdown()
+    # The shutdown sweep still cleans everything up, in one registry rewrite.
+    assert [sorted(names) for _, names in teardown_log] == [
+        sorted([f"dead-{i}" for i in range(5)] + ["fresh"])
+    ]
+
+
+def test_respawning_a_name_waits_for_its_teardown(monkeypatch):
+    sup = iso.Supervisor()
+    release = threading.Event()
+    cleanup = recovery.cleanup_temp_dir
+
+    def _slow_cleanup(path):
+        release.wait(5)
+        cleanup(path)
+
+    monkeypatch.setattr(recovery, "cleanup_temp_dir", _slow_cleanup)
+    try:
+        first = sup.spawn("reborn")
+        temp_dir = first._thread._temp_dir
+        first.close()
+        assert _wait_for(lambda: "reborn" in sup._reaping)
+        threading.Timer(0.1, release.set).start()
+        second = sup.spawn("reborn")
+        # The old teardown finished first and did not delete the new directory.
+        assert second._thread._temp_dir == temp_dir
+        assert temp_dir.is_dir()
+        assert sup.lookup_sandbox("reborn") is second._thread
+    finally:
+        release.set()
+        sup.shutdown()
+
+
+def test_process_guest_that_dies_on_its_own_is_reaped():
+    sup = iso.Supervisor()
+    try:
+        sb = sup.spawn("reap-proc", backend="process")
+        sb.exec("post(1)")
+        assert sb.recv(timeout=10) == 1
+        os.kill(sb._thread.pid, signal.SIGKILL)
+        assert _wait_for(lambda: sup.lookup_sandbox("reap-proc") is None)
+        assert "reap-proc" not in sup._process_sandboxes
+        assert sb._thread.returncode == -signal.SIGKILL
+    finally:
+        sup.shutdown()
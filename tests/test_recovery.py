@@ -1,5 +1,8 @@
 import json
+import os
 import sys
+import threading
+import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -136,3 +139,102 @@ def test_cleanup_temp_dir_rejects_escaping_name(monkeypatch, tmp_path):
 
     assert victim.exists()
     assert (victim / "data.txt").read_text() == "keep me"
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    reg = tmp_path / "registry.json"
+    monkeypatch.setattr(recovery, "_REGISTRY_PATH", reg)
+    yield reg
+    if recovery._journal is not None:
+        recovery._journal.close()
+        recovery._journal = None
+
+
+def _journal_records(reg):
+    path = reg.with_name(reg.name + ".journal")
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _crash():
+    # Drop the open journal without the close-time fsync or any compaction,
+    # as if the supervisor process had died.
+    os.close(recovery._journal._fd)
+    recovery._journal = None
+
+
+def test_updates_append_to_the_journal_instead_of_rewriting(registry):
+    recovery.update_sandbox("a", {"name": "a"})
+    recovery.update_sandbox("b", {"name": "b"})
+    recovery.drop_sandboxes(["a", "missing"])
+    # No snapshot is written until the journal is compacted.
+    assert not registry.exists()
+    assert _journal_records(registry) == [
+        {"op": "put", "name": "a", "meta": {"name": "a"}},
+        {"op": "put", "name": "b", "meta": {"name": "b"}},
+        {"op": "drop", "name": "a"},
+    ]
+    _crash()
+    assert recovery.recover() == {"b": {"name": "b"}}
+    # Recovery folded the journal into the snapshot.
+    assert json.loads(registry.read_text()) == {"sandboxes": {"b": {"name": "b"}}}
+    assert _journal_records(registry) == []
+
+
+def test_recover_ignores_a_torn_final_record(registry):
+    recovery.update_sandbox("kept", {"name": "kept"})
+    _crash()
+    journal = registry.with_name(registry.name + ".journal")
+    with journal.open("a") as fh:
+        fh.write('{"op":"put","name":"half')
+    assert recovery.recover() == {"kept": {"name": "kept"}}
+
+
+def test_journal_is_compacted_into_a_snapshot(registry, monkeypatch):
+    monkeypatch.setattr(recovery, "_COMPACT_MIN_RECORDS", 4)
+    for i in range(10):
+        recovery.update_sandbox(f"sb-{i}", {"i": i})
+        if i % 2:
+            recovery.drop_sandbox(f"sb-{i}")
+    # 15 records were written; the journal only holds those since the last
+    # compaction, which is bounded by twice the live count.
+    assert json.loads(registry.read_text())["sandboxes"]
+    assert len(_journal_records(registry)) <= 2 * 5
+    expected = {f"sb-{i}": {"i": i} for i in range(0, 10, 2)}
+    _crash()
+    assert recovery.recover() == expected
+
+
+def test_crash_between_snapshot_and_truncate_replays_to_the_same_state(registry):
+    recovery.update_sandbox("a", {"v": 1})
+    recovery.update_sandbox("b", {"v": 1})
+    recovery.drop_sandbox("a")
+    recovery.update_sandbox("a", {"v": 2})
+    # The snapshot reached disk, but the journal was never truncated.
+    recovery._write_registry(dict(recovery._journal.sandboxes))
+    _crash()
+    assert recovery.recover() == {"a": {"v": 2}, "b": {"v": 1}}
+
+
+def test_concurrent_writers_share_an_fsync(registry, monkeypatch):
+    recovery.update_sandbox("warm", {})
+    fsync = os.fsync
+    calls = []
+
+    def slow_fsync(fd):
+        calls.append(fd)
+        time.sleep(0.02)
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+    threads = [
+        threading.Thread(target=recovery.update_sandbox, args=(f"t-{i}", {"i": i}))
+        for i in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) < len(threads)
+    _crash()
+    assert len(recovery.recover()) == 17
@@ -16,7 +16,7 @@ import pyisolate.policy as policy
 
 @pytest.fixture
 def policy_token():
-    # refresh_remote ends in Supervisor.reload_policy, which authorizes against
+    # refresh_remote ends in Supervisor.apply_policy, which authorizes against
     # the global supervisor's policy token. Set it here (and restore afterwards)
     # so this file does not depend on an earlier test file having set it.
     sup = pyisolate.supervisor._get_supervisor()
@@ -38,7 +38,20 @@ class PolicyHandler(BaseHTTPRequestHandler):
         return
 
 
-def test_refresh_remote(tmp_path, policy_token):
+def test_refresh_remote(tmp_path, policy_token, monkeypatch):
+    import tempfile
+
+    import pyisolate.bpf.manager as mgr
+
+    applied = []
+    monkeypatch.setattr(
+        mgr.BPFManager, "apply_policy", lambda self, ps: applied.append(ps)
+    )
+
+    def no_temp_files(*_args, **_kwargs):
+        raise AssertionError("refresh_remote must compile the document in memory")
+
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", no_temp_files)
     addr = ("127.0.0.1", 0)
     httpd = HTTPServer(addr, PolicyHandler)
     port = httpd.server_address[1]
@@ -46,17 +59,11 @@ def test_refresh_remote(tmp_path, policy_token):
     thread = threading.Thread(target=httpd.serve_forever, daemon=True)
     thread.start()
     try:
-        import pyisolate.bpf.manager as mgr
-
-        orig = mgr.BPFManager.hot_reload
-        mgr.BPFManager.hot_reload = lambda *a, **k: None
-        try:
-            policy.refresh_remote(f"http://127.0.0.1:{port}", token="tok")
-        finally:
-            mgr.BPFManager.hot_reload = orig
+        policy.refresh_remote(f"http://127.0.0.1:{port}", token="tok")
     finally:
         httpd.shutdown()
         thread.join()
+    assert [ps.schema_version for ps in applied] == ["0.1"]
 
 
 class SlowFirstHandler(BaseHTTPRequestHandler):
@@ -89,14 +96,14 @@ def test_refresh_remote_retries_on_timeout(tmp_path, policy_token):
     try:
         import pyisolate.bpf.manager as mgr
 
-        orig = mgr.BPFManager.hot_reload
-        mgr.BPFManager.hot_reload = lambda *a, **k: None
+        orig = mgr.BPFManager.apply_policy
+        mgr.BPFManager.apply_policy = lambda *a, **k: None
         try:
             policy.refresh_remote(
                 f"http://127.0.0.1:{port}", token="tok", timeout=0.05, max_retries=1
             )
         finally:
-            mgr.BPFManager.hot_reload = orig
+            mgr.BPFManager.apply_policy = orig
     finally:
         httpd.shutdown()
         thread.join()
@@ -128,15 +135,15 @@ def test_refresh_remote_timeout_error(tmp_path):
     try:
         import pyisolate.bpf.manager as mgr
 
-        orig = mgr.BPFManager.hot_reload
-        mgr.BPFManager.hot_reload = lambda *a, **k: None
+        orig = mgr.BPFManager.apply_policy
+        mgr.BPFManager.apply_policy = lambda *a, **k: None
         try:
             with pytest.raises(TimeoutError):
                 policy.refresh_remote(
                     f"http://127.0.0.1:{port}", token="tok", timeout=0.05, max_retries=1
                 )
         finally:
-            mgr.BPFManager.hot_reload = orig
+            mgr.BPFManager.apply_policy = orig
     finally:
         httpd.shutdown()
         thread.join()
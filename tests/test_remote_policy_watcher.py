@@ -0,0 +1,225 @@
+"""Tests for the conditional-GET remote policy watcher."""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from pyisolate.policy import RemotePolicyWatcher, invalidate_policy_cache
+
+DOC = 'version: 1.0\nsandboxes:\n  web:\n    fs:\n      - read: "{path}"\n'
+
+
+class PolicyServer:
+    """A keep-alive HTTP/1.1 policy server honouring conditional requests."""
+
+    def __init__(self, *, etag=True, last_modified=True):
+        self.body = DOC.format(path="/srv/a").encode()
+        self.version = 1
+        self.etag = etag
+        self.last_modified = last_modified
+        self.status = None
+        self.drop_idle = False
+        self.requests = []
+        self.connections = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                if server.status is not None:
+                    self.send_response(server.status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                tag = f'"v{server.version}"'
+                stamp = f"Mon, 19 Oct 2026 00:00:{server.version:02d} GMT"
+                if server.etag and self.headers.get("If-None-Match") == tag:
+                    self.send_response(304)
+                    self.send_header("ETag", tag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if server.etag:
+                    self.send_header("ETag", tag)
+                if server.last_modified:
+                    self.send_header("Last-Modified", stamp)
+                self.send_header("Content-Length", str(len(server.body)))
+                self.end_headers()
+                self.wfile.write(server.body)
+                # Close without announcing it, as an idle timeout would.
+                self.close_connection = server.drop_idle
+
+            def log_message(self, format, *args):  # pragma: no cover - quiet
+                return
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/policy.yml"
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, args=(0.01,), daemon=True
+        )
+
+    def publish(self, path, *, bump=True):
+        self.body = DOC.format(path=path).encode()
+        if bump:
+            self.version += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "pyisolate.supervisor.apply_policy",
+        lambda policy_set, token: calls.append((policy_set, token)),
+    )
+    invalidate_policy_cache()
+    return calls
+
+
+def test_unchanged_document_is_not_reapplied(applied):
+    with PolicyServer() as server:
+        watcher = RemotePolicyWatcher(server.url, "tok")
+        try:
+            assert watcher.poll() == "applied"
+            assert watcher.poll() == "not-modified"
+            assert watcher.poll() == "not-modified"
+        finally:
+            watcher.stop()
+    assert len(applied) == 1
+    policy_set, token = applied[0]
+    assert token == "tok"
+    assert policy_set.sandbox("web").allow_fs[0].path == "/srv/a"
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert "If-Modified-Since" in server.requests[1]
+    # All polls used one keep-alive connection.
+    assert server.connections == 1
+    stats = watcher.stats()
+    assert (stats.polls, stats.applied, stats.not_modified) == (3, 1, 2)
+    assert stats.version == '"v1"'
+    assert stats.fetch_seconds is not None and stats.apply_seconds is not None
+    assert stats.applied_at is not None
+
+
+def test_identical_body_without_validators_is_not_reapplied(applied):
+    with PolicyServer(etag=False, last_modified=False) as server:
+        watcher = RemotePolicyWatcher(server.url, "tok")
+        try:
+            assert watcher.poll() == "applied"
+            assert watcher.poll() == "unchanged"
+            server.publish("/srv/b")
+            assert watcher.poll() == "applied"
+        finally:
+            watcher.stop()
+    assert [ps.sandbox("web").allow_fs[0].path for ps, _ in applied] == [
+        "/srv/a",
+        "/srv/b",
+    ]
+    assert "If-None-Match" not in server.requests[1]
+    assert watcher.stats().version.startswith("sha256:")
+
+
+def test_changed_document_is_applied_and_versioned(applied):
+    with PolicyServer() as server:
+        watcher = RemotePolicyWatcher(server.url, "tok")
+        try:
+            watcher.poll()
+            server.publish("/srv/b")
+            assert watcher.poll() == "applied"
+        finally:
+            watcher.stop()
+    assert watcher.stats().version == '"v2"'
+    assert applied[-1][0].sandbox("web").allow_fs[0].path == "/srv/b"
+
+
+def test_failures_are_counted_and_back_off_with_jitter(applied):
+    with PolicyServer() as server:
+        server.status = 503
+        watcher = RemotePolicyWatcher(
+            server.url, "tok", interval=1.0, max_backoff=8.0, jitter=0.25
+        )
+        try:
+            assert 0.75 <= watcher.next_delay() <= 1.25
+            for failures in range(1, 6):
+                with pytest.raises(RuntimeError, match="HTTP 503"):
+                    watcher.poll()
+                expected = min(8.0, 2.0**failures)
+                delays = {watcher.next_delay() for _ in range(20)}
+                assert all(0.75 * expected <= d <= 1.25 * expected for d in delays)
+                assert len(delays) > 1
+            stats = watcher.stats()
+            assert (stats.errors, stats.consecutive_errors) == (5, 5)
+            assert "503" in stats.last_error
+            server.status = None
+            assert watcher.poll() == "applied"
+            assert watcher.stats().consecutive_errors == 0
+            assert 0.75 <= watcher.next_delay() <= 1.25
+        finally:
+            watcher.stop()
+
+
+def test_invalid_document_is_not_recorded_as_applied(applied):
+    with PolicyServer() as server:
+        server.body = b"version: 9\n"
+        watcher = RemotePolicyWatcher(server.url, "tok")
+        try:
+            with pytest.raises(ValueError, match="unsupported policy version"):
+                watcher.poll()
+            # Without a recorded version the next poll is unconditional.
+            server.publish("/srv/a", bump=False)
+            assert watcher.poll() == "applied"
+        finally:
+            watcher.stop()
+    assert "If-None-Match" not in server.requests[1]
+    assert len(applied) == 1
+
+
+def test_closed_keep_alive_connection_is_reopened(applied):
+    with PolicyServer() as server:
+        server.drop_idle = True
+        watcher = RemotePolicyWatcher(server.url, "tok")
+        try:
+            watcher.poll()
+            assert watcher.poll() == "not-modified"
+        finally:
+            watcher.stop()
+    assert server.connections == 2
+
+
+def test_background_thread_polls_until_stopped(applied):
+    with PolicyServer() as server:
+        with RemotePolicyWatcher(server.url, "tok", interval=0.01) as watcher:
+            deadline = time.monotonic() + 5
+            while watcher.stats().not_modified < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert watcher.running
+        assert not watcher.running
+    assert watcher.stats().applied == 1
+    assert watcher.stats().not_modified >= 2
+    assert not [t for t in threading.enumerate() if t.name == watcher._name]
+
+
+def test_rejects_non_http_urls():
+    with pytest.raises(ValueError, match="scheme"):
+        RemotePolicyWatcher("file:///etc/policy.yml", "tok")
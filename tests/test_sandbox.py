@@ -144,7 +144,7 @@ def test_policy_refresh_parses_yaml(tmp_path, monkeypatch):
     import pyisolate.policy as policy
 
     monkeypatch.setattr(
-        "pyisolate.bpf.manager.BPFManager.hot_reload", lambda *a, **k: None
+        "pyisolate.bpf.manager.BPFManager.apply_policy", lambda *a, **k: None
     )
 
     iso.set_policy_token("tok")
@@ -0,0 +1,109 @@
+"""Tests for sealed-memfd transfer of large process-backend payloads."""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+import pyisolate as iso
+from pyisolate.runtime import shm
+from pyisolate.runtime.process_backend import ProcessSandbox
+
+pytestmark = pytest.mark.skipif(not shm.available(), reason="memfd sealing unavailable")
+
+
+def _closed(fd: int) -> bool:
+    try:
+        os.fstat(fd)
+    except OSError:
+        return True
+    return False
+
+
+def test_sealed_roundtrip_maps_read_only_and_closes_descriptor():
+    payload = bytes(range(256)) * 64
+    fd = shm.create_sealed(payload)
+    view = shm.map_sealed(fd, len(payload))
+    assert _closed(fd)
+    assert view.readonly
+    assert view == payload
+
+
+def test_unsealed_memfd_is_rejected():
+    fd = os.memfd_create("unsealed", os.MFD_CLOEXEC)
+    os.write(fd, b"x" * 16)
+    with pytest.raises(shm.ShmError, match="sealable|sealed"):
+        shm.map_sealed(fd, 16)
+    assert _closed(fd)
+
+
+def test_non_memfd_descriptor_is_rejected():
+    read_end, write_end = os.pipe()
+    try:
+        with pytest.raises(shm.ShmError, match="memfd"):
+            shm.map_sealed(read_end, 1)
+        assert _closed(read_end)
+    finally:
+        os.close(write_end)
+
+
+def test_size_mismatch_is_rejected():
+    fd = shm.create_sealed(b"x" * 32)
+    with pytest.raises(shm.ShmError, match="declared"):
+        shm.map_sealed(fd, 64)
+    assert _closed(fd)
+
+
+def test_large_bytes_post_arrives_as_read_only_memoryview():
+    size = shm.SHM_THRESHOLD * 3
+    with iso.spawn("shm-bytes", backend="process") as sb:
+        sb.exec(f"post(b'\\x07' * {size})")
+        message = sb.recv(timeout=10)
+        assert isinstance(message, memoryview)
+        assert message.readonly
+        assert message.nbytes == size
+        assert message[0] == 7 and message[-1] == 7
+        # Small buffers still travel inline as plain bytes.
+        sb.exec("post(b'small')")
+        assert sb.recv(timeout=5) == b"small"
+
+
+def test_large_structured_frame_goes_out_of_line():
+    count = shm.SHM_THRESHOLD // 4
+    with iso.spawn("shm-frame", backend="process") as sb:
+        sb.exec(f"post(list(range({count})))")
+        assert sb.recv(timeout=10) == list(range(count))
+
+
+def test_json_mode_still_refuses_large_bytes():
+    proc = ProcessSandbox("shm-json", codec="json")
+    try:
+        proc.exec(f"post(b'x' * {shm.SHM_THRESHOLD})")
+        with pytest.raises(iso.SandboxError, match="TypeError"):
+            proc.recv(timeout=10)
+    finally:
+        proc.stop()
+
+
+def test_out_of_line_payloads_count_against_output_bytes_max():
+    size = shm.SHM_THRESHOLD * 2
+    with iso.spawn("shm-quota", backend="process", output_bytes_max=size * 2 - 1) as sb:
+        sb.exec(f"post(b'a' * {size})")
+        assert sb.recv(timeout=10).nbytes == size
+        sb.exec(f"post(b'b' * {size})")
+        with pytest.raises(iso.OutputExceeded):
+            sb.recv(timeout=10)
+        assert sb._thread.termination_reason == "output_exceeded"
+        assert not sb._thread.is_alive()
+
+
+def test_inline_output_counts_against_output_bytes_max():
+    with iso.spawn("shm-inline-quota", backend="process", output_bytes_max=1000) as sb:
+        sb.exec("post('a' * 500); post('b' * 600)")
+        assert sb.recv(timeout=5) == "a" * 500
+        with pytest.raises(iso.OutputExceeded):
+            sb.recv(timeout=5)
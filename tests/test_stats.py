@@ -52,6 +52,7 @@ def test_stats_tolerates_concurrent_start_time_reset(monkeypatch):
     sb._errors = 0
     sb._ops = 0
     sb._denial_events = []
+    sb._denial_counts = {}
 
     # Emulate the run loop nulling `_start_time` *during* the stats computation:
     # the first `monotonic()` call inside `stats` resets it, exactly as a
@@ -79,6 +79,40 @@ def test_reload_policy_preserves_auth_and_accepts_yaml(tmp_path, monkeypatch):
     assert called["path"] == str(p)
 
 
+def test_apply_policy_delegates_compiled_policy(monkeypatch):
+    from pyisolate.policy import compile_policy_data, from_compiled_policy
+
+    called = []
+    monkeypatch.setattr(
+        BPFManager, "apply_policy", lambda self, policy_set: called.append(policy_set)
+    )
+    policy_set = from_compiled_policy(
+        compile_policy_data({"version": "1.0", "imports": ["math"]})
+    )
+    iso.set_policy_token("tok")
+
+    with pytest.raises(iso.PolicyAuthError):
+        iso.apply_policy(policy_set, token="bad")
+    with pytest.raises(TypeError):
+        iso.apply_policy({"version": "1.0"}, token="tok")
+    assert called == []
+
+    iso.apply_policy(policy_set, token="tok")
+    assert called == [policy_set]
+
+
+def test_apply_policy_surfaces_map_failures(monkeypatch):
+    from pyisolate.policy import RuntimePolicySet
+
+    def failing_apply(self, policy_set):
+        raise RuntimeError("BPF map insert failed")
+
+    monkeypatch.setattr(BPFManager, "apply_policy", failing_apply)
+    iso.set_policy_token("tok")
+    with pytest.raises(iso.PolicyAuthError, match="map insert failed"):
+        iso.apply_policy(RuntimePolicySet(), token="tok")
+
+
 def test_shutdown_joins_threads():
     sup = iso.Supervisor()
     sb = sup.spawn("sd")
@@ -0,0 +1,124 @@
+"""Tests for the shared timer wheel behind process-backend wall-clock quotas."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pyisolate as iso
+from pyisolate.runtime.timers import TimerWheel
+
+
+def _wheel_threads(name: str) -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name == name]
+
+
+def test_deadline_fires_once_and_never_early():
+    wheel = TimerWheel(tick=0.002)
+    fired = []
+    done = threading.Event()
+    start = time.monotonic()
+
+    def callback():
+        fired.append(time.monotonic() - start)
+        done.set()
+
+    handle = wheel.call_later(0.05, callback)
+    assert handle.active
+    assert done.wait(2)
+    time.sleep(0.02)
+    assert len(fired) == 1
+    assert fired[0] >= 0.05
+    assert not handle.active
+    assert len(wheel) == 0
+    wheel.close()
+
+
+def test_cancelled_deadline_does_not_fire():
+    wheel = TimerWheel(tick=0.002)
+    fired = threading.Event()
+    handle = wheel.call_later(0.02, fired.set)
+    handle.cancel()
+    handle.cancel()  # idempotent
+    assert len(wheel) == 0
+    assert not fired.wait(0.1)
+    wheel.close()
+
+
+def test_deadlines_beyond_one_turn_wrap_around():
+    wheel = TimerWheel(tick=0.001, slots=8)
+    done = threading.Event()
+    start = time.monotonic()
+    wheel.call_later(0.03, done.set)
+    assert done.wait(2)
+    assert time.monotonic() - start >= 0.03
+    wheel.close()
+
+
+def test_many_deadlines_share_one_thread():
+    name = "pyisolate-timers-test-many"
+    wheel = TimerWheel(tick=0.002, name=name)
+    count = 500
+    # Every other deadline is cancelled below; the rest must all fire.
+    remaining = [count // 2]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def callback():
+        with lock:
+            remaining[0] -= 1
+            if not remaining[0]:
+                done.set()
+
+    handles = [wheel.call_later(0.01 + i * 0.0001, callback) for i in range(count)]
+    for handle in handles[::2]:
+        handle.cancel()
+    assert len(_wheel_threads(name)) == 1
+    assert done.wait(3)
+    wheel.close()
+    assert not _wheel_threads(name)
+
+
+def test_failing_callback_does_not_stop_the_wheel(caplog):
+    wheel = TimerWheel(tick=0.002)
+    done = threading.Event()
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with caplog.at_level("ERROR", logger="pyisolate.runtime.timers"):
+        wheel.call_later(0.005, boom)
+        wheel.call_later(0.02, done.set)
+        assert done.wait(2)
+    assert "timer callback failed" in caplog.text
+    wheel.close()
+
+
+def test_close_drops_pending_and_wheel_restarts_on_demand():
+    wheel = TimerWheel(tick=0.002)
+    dropped = threading.Event()
+    handle = wheel.call_later(0.05, dropped.set)
+    wheel.close()
+    assert not handle.active
+    assert not dropped.wait(0.1)
+    done = threading.Event()
+    wheel.call_later(0.005, done.set)
+    assert done.wait(2)
+    wheel.close()
+
+
+def test_wall_time_ops_do_not_spawn_a_thread_per_operation():
+    before = threading.active_count()
+    with iso.spawn(
+        "timers-wall", allowed_imports=["math"], backend="process", wall_time_ms=10_000
+    ) as sb:
+        peak = 0
+        for _ in range(50):
+            sb.exec("post(1)")
+            sb.recv(timeout=5)
+            peak = max(peak, threading.active_count())
+    # The reader thread plus, at most, the wheel thread -- not one per op.
+    assert peak - before <= 3
@@ -232,3 +232,275 @@ def test_watchdog_kills_large_rss_allocation_without_guest_cooperation(monkeypat
         assert (not sb._thread.is_alive()) or sb.quarantine_reason is not None
     finally:
         sb.close()
+
+
+class _CgroupSandbox:
+    """Thread-sandbox stand-in whose cgroup is a directory of plain files."""
+
+    def __init__(self, name, path, cpu_quota_ms=None, mem_quota_bytes=None):
+        self.name = name
+        self._cgroup_path = path
+        self.cpu_quota_ms = cpu_quota_ms
+        self.mem_quota_bytes = mem_quota_bytes
+        self.breaches = []
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def enforce_quota_breach(self, exc, reason, timeout=0.05):
+        self.breaches.append(reason)
+        self.alive = False
+        return True
+
+
+def _fake_cgroup(path, usage_usec=0, memory=0, events=None):
+    path.mkdir(exist_ok=True)
+    (path / "cpu.stat").write_text(f"usage_usec {usage_usec}\nuser_usec 0\n")
+    (path / "memory.current").write_text(f"{memory}\n")
+    counters = {"low": 0, "high": 0, "max": 0, "oom": 0, "oom_kill": 0}
+    counters.update(events or {})
+    (path / "memory.events").write_text(
+        "".join(f"{key} {value}\n" for key, value in counters.items())
+    )
+    return path
+
+
+def test_quota_collector_batch_reads_cgroup_usage(tmp_path):
+    from pyisolate.watchdog import QuotaCollector
+
+    quota = _CgroupSandbox("cg-a", _fake_cgroup(tmp_path / "a", 5000, 4096), 100)
+    unlimited = _CgroupSandbox("cg-b", _fake_cgroup(tmp_path / "b"))
+    collector = QuotaCollector(min_interval=0.01, max_interval=1.0)
+    try:
+        collector.sync([quota, unlimited])
+        # Sandboxes without a quota are not watched at all.
+        assert len(collector) == 1
+        assert collector.poll() == [{"name": "cg-a", "cpu_ms": 5.0, "rss_bytes": 4096}]
+        collector.sync([])
+        assert len(collector) == 0
+        assert collector.poll() == []
+    finally:
+        collector.close()
+
+
+def test_quota_collector_polls_faster_as_a_sandbox_nears_its_quota(tmp_path):
+    from pyisolate.watchdog import QuotaCollector
+
+    path = _fake_cgroup(tmp_path / "cg")
+    sb = _CgroupSandbox("cg-rate", path, cpu_quota_ms=1000)
+    collector = QuotaCollector(min_interval=0.01, max_interval=1.0)
+    try:
+        collector.sync([sb])
+        collector.poll()
+        # Idle: back off towards the maximum.
+        collector.interval = 0.1
+        collector.poll()
+        assert collector.interval == 0.2
+        # Consuming: the next pass comes before the projected breach.
+        time.sleep(0.05)
+        _fake_cgroup(path, usage_usec=500_000)
+        collector.poll()
+        assert collector.interval < 0.2
+        time.sleep(0.01)
+        _fake_cgroup(path, usage_usec=990_000)
+        collector.poll()
+        assert collector.interval == collector.min_interval
+    finally:
+        collector.close()
+
+
+def test_memory_events_notifications_flag_a_breach(tmp_path):
+    from pyisolate.watchdog import QuotaCollector
+
+    path = _fake_cgroup(tmp_path / "cg", memory=1024)
+    sb = _CgroupSandbox("cg-oom", path, mem_quota_bytes=1 << 20)
+    collector = QuotaCollector()
+    if collector.fileno() is None:
+        collector.close()
+        pytest.skip("inotify unavailable")
+    try:
+        collector.sync([sb])
+        _fake_cgroup(path, memory=1024, events={"high": 1})
+        assert collector.read_notifications() == [
+            {"name": "cg-oom", "cpu_ms": 0, "rss_bytes": 1024}
+        ]
+        _fake_cgroup(path, memory=1024, events={"high": 1, "oom_kill": 1})
+        (event,) = collector.read_notifications()
+        assert event["memory_breach"] is True
+    finally:
+        collector.close()
+
+
+class _NoBPFSupervisor:
+    def __init__(self, threads):
+        self._bpf = _FakeBPF(lambda: iter(()))
+        self._threads = threads
+        self.quarantined = []
+
+    def get_active_threads(self):
+        return [t for t in self._threads if t.is_alive()]
+
+    def quarantine(self, name, reason):  # pragma: no cover - not reached here
+        self.quarantined.append(name)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_watchdog_enforces_cgroup_quotas_without_bpf(tmp_path):
+    from pyisolate.watchdog import ResourceWatchdog
+
+    cpu = _CgroupSandbox("wd-cg-cpu", _fake_cgroup(tmp_path / "cpu"), 50)
+    mem = _CgroupSandbox("wd-cg-mem", _fake_cgroup(tmp_path / "mem"), None, 1 << 20)
+    wd = ResourceWatchdog(_NoBPFSupervisor([cpu, mem]), min_poll=0.01, max_poll=0.05)
+    wd.start()
+    try:
+        time.sleep(0.1)
+        assert cpu.breaches == mem.breaches == []
+        _fake_cgroup(tmp_path / "cpu", usage_usec=60_000)
+        _fake_cgroup(tmp_path / "mem", events={"max": 1})
+        assert _wait_for(lambda: cpu.breaches and mem.breaches)
+        assert cpu.breaches == ["cpu_exceeded"]
+        assert mem.breaches == ["memory_exceeded"]
+    finally:
+        wd.stop()
+    assert not wd.is_alive()
+
+
+def test_watchdog_stops_promptly_while_idle():
+    from pyisolate.watchdog import ResourceWatchdog
+
+    wd = ResourceWatchdog(_NoBPFSupervisor([]), max_poll=30)
+    wd.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    wd.stop(timeout=2)
+    assert not wd.is_alive()
+    assert time.monotonic() - started < 1
+
+
+def test_watchdog_enforces_process_sandbox_cpu_quota():
+    sup = iso.Supervisor()
+    try:
+        sb = sup.spawn("wd-proc-cpu", backend="process", cpu_ms=300)
+        sb.exec("post(1)")
+        assert sb.recv(timeout=10) == 1
+        sb.exec("while True:\n    pass")
+        with pytest.raises(iso.CPUExceeded):
+            sb.recv(timeout=5)
+        assert sb.termination_reason == "cpu_exceeded"
+        assert not sb._thread.is_alive()
+    finally:
+        sup.shutdown()
+
+
+class _IndexedSupervisor:
+    """Exposes only the O(1) lookups; a registry sweep would fail the test."""
+
+    def __init__(self, by_cgroup):
+        self._bpf = _FakeBPF(lambda: iter(()))
+        self._by_cgroup = by_cgroup
+
+    def lookup_cgroup(self, cgroup_id):
+        return self._by_cgroup.get(cgroup_id)
+
+    def lookup_sandbox(self, name):
+        return None
+
+    def get_active_threads(self):  # pragma: no cover - must not be reached
+        raise AssertionError("watchdog swept the registry")
+
+    def quarantine(self, name, reason):  # pragma: no cover - not reached here
+        pass
+
+
+class _IndexedSandbox(_QuotaThread):
+    def __init__(self, alive=True):
+        super().__init__()
+        self.cpu_quota_ms = 100
+        self.mem_quota_bytes = 1 << 20
+        self.alive = alive
+        self.reasons = []
+
+    def is_alive(self):
+        return self.alive
+
+    def enforce_quota_breach(self, exc, reason, **kwargs):
+        self.reasons.append(reason)
+        return super().enforce_quota_breach()
+
+
+def test_watchdog_resolves_resource_guard_records_by_cgroup_id():
+    from pyisolate.bpf.contract import (
+        RESOURCE_CPU,
+        RESOURCE_EVENT,
+        RESOURCE_NET,
+        RESOURCE_RSS,
+    )
+    from pyisolate.watchdog import ResourceWatchdog
+
+    hot, calm, dead = _IndexedSandbox(), _IndexedSandbox(), _IndexedSandbox(False)
+    wd = ResourceWatchdog(_IndexedSupervisor({7: hot, 8: calm, 9: dead}))
+    try:
+        wd._handle_events(
+            [
+                # One iterator item may carry a whole batch.
+                [
+                    RESOURCE_EVENT.pack(
+                        7, 1, 150_000_000, 100_000_000, RESOURCE_CPU, 1
+                    ),
+                    RESOURCE_EVENT.pack(7, 1, 2 << 20, 1 << 20, RESOURCE_RSS, 1),
+                    {"cgroup_id": 7, "resource": RESOURCE_CPU, "observed": 10**9},
+                ],
+                RESOURCE_EVENT.pack(8, 1, 1 << 30, 1 << 20, RESOURCE_NET, 1),
+                RESOURCE_EVENT.pack(8, 1, 10**6, 100_000_000, RESOURCE_CPU, 0),
+                RESOURCE_EVENT.pack(9, 1, 10**12, 1, RESOURCE_CPU, 1),
+                RESOURCE_EVENT.pack(404, 1, 10**12, 1, RESOURCE_CPU, 1),
+                b"truncated",
+            ]
+        )
+    finally:
+        wd._collector.close()
+    # Three events about one sandbox are merged into a single enforcement.
+    assert hot.reasons == ["cpu_exceeded"]
+    assert calm.reasons == dead.reasons == []
+
+
+def test_supervisor_indexes_sandboxes_by_name_and_cgroup_id(tmp_path):
+    import os
+    from types import SimpleNamespace
+
+    sup = iso.Supervisor()
+    try:
+        sb = sup.spawn("wd-index")
+        live = sup.lookup_sandbox("wd-index")
+        assert live is sup._sandboxes["wd-index"]
+        assert live in sup.live_sandboxes()
+        # Resolved while building the sandbox, before it was published.
+        cg_id = os.stat(live._cgroup_path).st_ino
+        assert sup.lookup_cgroup(cg_id) is live
+
+        fake = SimpleNamespace(_cgroup_path=tmp_path)
+        with sup._lock:
+            sup._index_sandbox("wd-index-cg", fake, os.stat(tmp_path).st_ino)
+        assert sup.lookup_cgroup(os.stat(tmp_path).st_ino) is fake
+        with sup._lock:
+            # A stale teardown must not evict whoever holds the name now.
+            sup._unindex_sandbox("wd-index-cg", object())
+            assert sup.lookup_sandbox("wd-index-cg") is fake
+            sup._unindex_sandbox("wd-index-cg", fake)
+        assert sup.lookup_sandbox("wd-index-cg") is None
+        assert sup.lookup_cgroup(os.stat(tmp_path).st_ino) is None
+
+        sb.close()
+        sup._cleanup()
+        assert sup.lookup_sandbox("wd-index") is None
+    finally:
+        sup.shutdown()